@@ -26,6 +26,54 @@ class Settings(BaseSettings):
     vs_tier_limit_pro: int = Field(default=10000, alias="VS_TIER_LIMIT_PRO")
     vs_tier_limit_enterprise: int = Field(default=100000, alias="VS_TIER_LIMIT_ENTERPRISE")
 
+    # Per-identifier burst limit (token bucket, applied atomically with the
+    # daily quota). Capacity 0 disables it.
+    rate_burst_capacity: int = Field(default=10, alias="RATE_BURST_CAPACITY")
+    rate_burst_refill_per_s: float = Field(default=1.0, alias="RATE_BURST_REFILL_PER_S")
+
+    # In-process pre-filter in front of the Redis limiter (per worker)
+    prefilter_max_identifiers: int = Field(default=10000, alias="PREFILTER_MAX_IDENTIFIERS")
+    prefilter_sync_interval_s: float = Field(default=30.0, alias="PREFILTER_SYNC_INTERVAL_S")
+
+    # Slow-scan flight recorder (scans slower than this, or failing, are kept)
+    slow_scan_threshold_ms: float = Field(default=45000.0, alias="SLOW_SCAN_THRESHOLD_MS")
+    slow_scan_buffer_size: int = Field(default=50, alias="SLOW_SCAN_BUFFER_SIZE")
+
+    # Streamed-scan budget: once spent, optional debate/convergence stages are skipped
+    scan_deadline_s: float = Field(default=120.0, alias="SCAN_DEADLINE_S")
+
+    # Max concurrent scans per /v1/scan/batch request
+    batch_scan_concurrency: int = Field(default=8, alias="BATCH_SCAN_CONCURRENCY")
+
+    # DataFetcher upstream cache: memory (per worker) | redis | tiered (memory + redis).
+    # Per-source freshness via FETCH_CACHE_TTLS (see src/services/fetch_cache.py).
+    fetch_cache_backend: str = Field(default="memory", alias="FETCH_CACHE_BACKEND")
+    fetch_cache_max_entries: int = Field(default=4096, alias="FETCH_CACHE_MAX_ENTRIES")
+    # Write-once on-chain facts (creation time, creator, decimals, verified):
+    # redis (Redis hashes, no TTL) | local (memory, or SQLite at VS_FACTS_SQLITE_PATH).
+    facts_store_backend: str = Field(default="redis", alias="FACTS_STORE_BACKEND")
+    # Verified source by content hash + ScamBot/SecurityBot results per source:
+    # redis (shared, src:* keys) | memory (per worker).
+    source_store_backend: str = Field(default="redis", alias="SOURCE_STORE_BACKEND")
+
+    # Global market context (CoinGecko /global) refreshed in the background;
+    # one worker polls upstream per interval, the rest read the Redis copy
+    market_context_interval_s: float = Field(default=120.0, alias="MARKET_CONTEXT_INTERVAL_S")
+
+    # Async scan jobs (POST /v1/scans): record TTL, running jobs per worker,
+    # per-job time limit, and the HMAC key for signing completion webhooks
+    scan_job_ttl_s: int = Field(default=86400, alias="SCAN_JOB_TTL_S")
+    scan_job_concurrency: int = Field(default=8, alias="SCAN_JOB_CONCURRENCY")
+    scan_job_timeout_s: float = Field(default=300.0, alias="SCAN_JOB_TIMEOUT_S")
+    # Worker liveness refresh; unfinished jobs of a worker silent for 4x this are failed
+    scan_job_heartbeat_s: float = Field(default=15.0, alias="SCAN_JOB_HEARTBEAT_S")
+    vs_webhook_secret: Optional[str] = Field(default=None, alias="VS_WEBHOOK_SECRET")
+
+    # Worker threads per workload class (see services/executors.py)
+    executor_fetch_threads: int = Field(default=16, alias="EXECUTOR_FETCH_THREADS")
+    executor_llm_threads: int = Field(default=32, alias="EXECUTOR_LLM_THREADS")
+    executor_render_threads: int = Field(default=4, alias="EXECUTOR_RENDER_THREADS")
+
     def tier_limits(self) -> Dict[str, int]:
         return {
             "agent": int(self.vs_tier_limit_agent),
@@ -20,7 +20,12 @@ async def get_cache(r: redis.Redis = Depends(get_redis)) -> Cache:
 
 async def get_rate_limiter(r: redis.Redis = Depends(get_redis)) -> RedisRateLimiter:
     settings = get_settings()
-    return RedisRateLimiter(r, tier_limits=settings.tier_limits())
+    return RedisRateLimiter(
+        r,
+        tier_limits=settings.tier_limits(),
+        burst_capacity=settings.rate_burst_capacity,
+        burst_refill_per_s=settings.rate_burst_refill_per_s,
+    )
 
 
 _scanner_singleton: ScannerService | None = None
@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 # Ensure workspace root is on sys.path so we can import `projects.verdictswarm.src.*`
+import logging
 import os
 import sys
 from datetime import datetime, timezone
@@ -17,14 +18,25 @@ from fastapi.responses import JSONResponse
 
 from .config import get_settings
 from .models.responses import ErrorResponse
-from .routers import admin, auth, b2a, metrics, pdf, scan, share, stream_scan, usage
+from .routers import admin, auth, b2a, jobs, metrics, pdf, scan, share, stream_scan, usage
 from .middleware.security import SecurityMiddleware
+from .services import prometheus
 from .services.rate_limiter import RateLimitExceeded
+from src.agents.ai_client import add_request_observer
+from src.log_pipeline import configure_logging, shutdown_logging
+
+logger = logging.getLogger(__name__)
 
 
 def create_app() -> FastAPI:
     settings = get_settings()
 
+    # Structured JSON logs via a bounded queue + background writer thread
+    configure_logging(settings.log_level)
+
+    # Feed provider latency/429s from every AIClient call into /metrics
+    add_request_observer(prometheus.observe_llm_request)
+
     app = FastAPI(
         title="VerdictSwarm B2A API",
         version="2.0.0",
@@ -59,6 +71,8 @@ def create_app() -> FastAPI:
             }
         ).model_dump()
         headers = {"Retry-After": str(exc.retry_after_s)}
+        route = request.scope.get("route")
+        prometheus.RATE_LIMITED.inc(endpoint=getattr(route, "path", "unknown"), tier="api")
         return JSONResponse(status_code=429, content=payload, headers=headers)
 
     @app.exception_handler(Exception)
@@ -73,12 +87,14 @@ def create_app() -> FastAPI:
 
     app.include_router(auth.router)
     app.include_router(scan.router)
+    app.include_router(jobs.router)
     app.include_router(stream_scan.router)
     app.include_router(usage.router)
     app.include_router(b2a.router)
     app.include_router(pdf.router)
     app.include_router(share.router)
     app.include_router(metrics.router)
+    app.include_router(metrics.exposition_router)
     app.include_router(admin.router)
 
     @app.on_event("startup")
@@ -93,9 +109,59 @@ def create_app() -> FastAPI:
             init_prompt_store(r)
             await seed_redis_from_env()
             await load_from_redis()
-            print("[INFO] Prompts loaded from Redis")
+            logger.info("Prompts loaded from Redis")
+        except Exception as e:
+            logger.warning("Failed to load prompts from Redis: %s", e)
+
+        # Shared macro snapshot for scans/MacroBot (Redis-coordinated polling)
+        try:
+            import redis.asyncio as _redis
+            from src.services.market_context import get_market_context
+            _settings = get_settings()
+            get_market_context().start(
+                interval_s=_settings.market_context_interval_s,
+                redis_client=_redis.from_url(_settings.redis_url, decode_responses=False),
+            )
+        except Exception as e:
+            logger.warning("Failed to start market context refresher: %s", e)
+
+        # Scan jobs: heartbeat this worker, fail jobs left behind by dead ones
+        try:
+            import redis.asyncio as _redis
+            from .services.scan_jobs import ScanJobStore, start_worker
+            _settings = get_settings()
+            orphaned = await start_worker(
+                ScanJobStore(_redis.from_url(_settings.redis_url, decode_responses=False), ttl_s=_settings.scan_job_ttl_s),
+                heartbeat_s=_settings.scan_job_heartbeat_s,
+            )
+            if orphaned:
+                logger.warning("Marked %s orphaned scan jobs as failed", orphaned)
+        except Exception as e:
+            logger.warning("Failed to start scan job heartbeat: %s", e)
+
+    @app.on_event("shutdown")
+    async def _shutdown():
+        """Drain buffered metrics and queued log records before exit."""
+        try:
+            from src.services.market_context import get_market_context
+            await get_market_context().stop()
+        except Exception as e:
+            logger.warning("Failed to stop market context refresher: %s", e)
+        try:
+            import redis.asyncio as _redis
+            from .services.scan_jobs import ScanJobStore, stop_worker
+            _settings = get_settings()
+            await stop_worker(
+                ScanJobStore(_redis.from_url(_settings.redis_url, decode_responses=False), ttl_s=_settings.scan_job_ttl_s)
+            )
+        except Exception as e:
+            logger.warning("Failed to stop scan job heartbeat: %s", e)
+        try:
+            from .services.metrics import get_metrics_buffer
+            await get_metrics_buffer().close()
         except Exception as e:
-            print(f"[WARN] Failed to load prompts from Redis: {e}")
+            logger.warning("Failed to flush metrics on shutdown: %s", e)
+        shutdown_logging()
 
     @app.get("/health")
     async def health() -> Dict[str, Any]:
@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 from enum import Enum
-from typing import List
+from typing import List, Optional
 
 from pydantic import BaseModel, Field
 
@@ -15,7 +15,10 @@ class ScanDepth(str, Enum):
 
 class DeepScanRequest(BaseModel):
     address: str = Field(..., description="Token contract address")
-    chain: str = Field(default="base", description="Chain name (base/eth/arbitrum/optimism/polygon/bsc/avalanche)")
+    chain: str = Field(
+        default="auto",
+        description="Chain name (base/eth/arbitrum/optimism/polygon/bsc/avalanche/solana), or auto to detect it",
+    )
     depth: ScanDepth = Field(default=ScanDepth.full)
     # Tier used to determine which bots run. Defaults to FREE for public/demo use.
     # Authenticated API calls may override this with the API key's tier.
@@ -25,7 +28,16 @@ class DeepScanRequest(BaseModel):
 
 class BatchScanRequest(BaseModel):
     addresses: List[str] = Field(..., min_length=1, max_length=100)
-    chain: str = Field(default="base")
+    chain: str = Field(default="auto")
     depth: ScanDepth = Field(default=ScanDepth.basic)
     tier: str = Field(default="FREE", description="Access tier (FREE/TIER_1/TIER_2/TIER_3/SWARM_DEBATE)")
     force_refresh: bool = Field(default=False)
+    # Scans run concurrently up to min(concurrency, BATCH_SCAN_CONCURRENCY)
+    concurrency: Optional[int] = Field(default=None, ge=1)
+    # Stream results as NDJSON as they complete (same as Accept: application/x-ndjson)
+    stream: bool = Field(default=False)
+
+
+class ScanJobRequest(DeepScanRequest):
+    # Called with the finished job (HMAC-signed when VS_WEBHOOK_SECRET is set)
+    webhook_url: Optional[str] = Field(default=None, max_length=2048)
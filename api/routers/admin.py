@@ -5,11 +5,15 @@ from __future__ import annotations
 import os
 from typing import Any, Dict
 
-from fastapi import APIRouter, Header, HTTPException, Request
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
 from pydantic import BaseModel
 
 from src.agents.prompts import get_all_prompts, load_from_redis, set_prompt
 
+from ..deps import get_cache
+from ..services.cache import Cache, start_background_sweep
+from ..services.flight_recorder import get_flight_recorder
+
 router = APIRouter(tags=["admin"])
 
 ADMIN_API_KEY = os.environ.get("METRICS_API_KEY", "")  # reuse existing key
@@ -58,35 +62,39 @@ async def bulk_update_prompts(body: BulkPromptUpdate, x_api_key: str | None = He
 
 
 @router.post("/api/admin/cache/flush")
-async def flush_scan_cache(request: Request, x_api_key: str | None = Header(default=None)):
-    """Flush all cached scan results. Use after bug fixes that affect scoring."""
+async def flush_scan_cache(
+    sweep: bool = Query(default=False, description="Also delete stale-generation keys in the background"),
+    x_api_key: str | None = Header(default=None),
+    cache: Cache = Depends(get_cache),
+):
+    """Flush all cached scan results. Use after bug fixes that affect scoring.
+
+    Bumps the cache generation (one INCR) so every scan/preprocessor/agent
+    cache key moves to a fresh namespace. Prompts, metrics and rate-limit
+    counters are untouched. Old entries expire via their TTLs, or are removed
+    by an async background sweep when ``sweep=true``.
+    """
     _check_key(x_api_key)
-    import redis
-    redis_url = os.environ.get("REDIS_URL", "redis://localhost:6379/0")
     try:
-        r = redis.Redis.from_url(redis_url, decode_responses=True)
-        # Delete everything except prompt: keys (preserves custom prompts)
-        deleted = 0
-        for key in r.scan_iter(match="*", count=200):
-            if not key.startswith("prompt:"):
-                r.delete(key)
-                deleted += 1
-        return {"status": "ok", "deleted": deleted}
+        generation = await cache.bump_generation()
     except Exception as e:
         return {"status": "error", "message": str(e)}
+    if sweep:
+        start_background_sweep(cache.r, generation)
+    return {"status": "ok", "generation": generation, "sweeping": sweep}
 
 
 @router.get("/api/admin/redis/keys")
-async def list_redis_keys(x_api_key: str | None = Header(default=None)):
+async def list_redis_keys(
+    x_api_key: str | None = Header(default=None),
+    cache: Cache = Depends(get_cache),
+):
     """List all Redis keys (admin debug)."""
     _check_key(x_api_key)
-    import redis
-    redis_url = os.environ.get("REDIS_URL", "redis://localhost:6379/0")
     try:
-        r = redis.Redis.from_url(redis_url, decode_responses=True)
         keys = []
-        for key in r.scan_iter(match="*", count=500):
-            keys.append(key)
+        async for key in cache.r.scan_iter(match="*", count=500):
+            keys.append(key.decode("utf-8", "replace") if isinstance(key, bytes) else key)
             if len(keys) >= 200:
                 break
         return {"status": "ok", "count": len(keys), "keys": keys}
@@ -94,6 +102,28 @@ async def list_redis_keys(x_api_key: str | None = Header(default=None)):
         return {"status": "error", "message": str(e)}
 
 
+@router.get("/api/admin/slow-scans")
+async def list_slow_scans(
+    limit: int = Query(default=20, ge=1, le=200),
+    summary: bool = Query(default=False, description="Omit span waterfalls and event tapes"),
+    x_api_key: str | None = Header(default=None),
+    cache: Cache = Depends(get_cache),
+):
+    """Recent scans that exceeded SLOW_SCAN_THRESHOLD_MS or ended in error (newest first)."""
+    _check_key(x_api_key)
+    recorder = get_flight_recorder()
+    entries, source = await recorder.recent(cache.r, limit=limit)
+    if summary:
+        entries = [{k: v for k, v in e.items() if k not in ("timing", "events")} for e in entries]
+    return {
+        "status": "ok",
+        "source": source,
+        "threshold_ms": recorder.threshold_ms,
+        "count": len(entries),
+        "scans": entries,
+    }
+
+
 @router.post("/api/admin/prompts/reload")
 async def reload_prompts(x_api_key: str | None = Header(default=None)):
     """Reload all prompts from Redis into memory cache."""
@@ -0,0 +1,110 @@
+from __future__ import annotations
+
+import logging
+from datetime import datetime, timezone
+
+import redis.asyncio as redis
+from fastapi import APIRouter, Depends, HTTPException, Response
+
+from ..config import get_settings
+from ..deps import get_cache, get_rate_limiter, get_redis, get_scanner
+from ..middleware.auth import ApiKeyInfo, require_api_key
+from ..models.requests import ScanJobRequest
+from ..models.responses import SuccessResponse
+from ..services.cache import Cache
+from ..services.rate_limiter import RedisRateLimiter
+from ..services.scan_jobs import (
+    WORKER_ID,
+    ScanJobStore,
+    new_job_id,
+    public_view,
+    start_job,
+    validate_webhook_url,
+)
+from ..services.scanner import ScannerService
+from .scan import _ttl_for_depth
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/v1", tags=["jobs"])
+
+
+async def get_job_store(r: redis.Redis = Depends(get_redis)) -> ScanJobStore:
+    return ScanJobStore(r, ttl_s=get_settings().scan_job_ttl_s)
+
+
+@router.post("/scans", response_model=SuccessResponse, status_code=202)
+async def submit_scan_job(
+    req: ScanJobRequest,
+    response: Response,
+    api_key: ApiKeyInfo = Depends(require_api_key),
+    rl: RedisRateLimiter = Depends(get_rate_limiter),
+    cache: Cache = Depends(get_cache),
+    scanner: ScannerService = Depends(get_scanner),
+    store: ScanJobStore = Depends(get_job_store),
+):
+    """Queue a scan and return its job id immediately (poll ``GET /v1/scans/{id}``)."""
+    if req.webhook_url:
+        problem = validate_webhook_url(req.webhook_url)
+        if problem:
+            raise HTTPException(status_code=422, detail=problem)
+
+    depth = req.depth.value
+    effective_tier = (getattr(req, "tier", None) or api_key.tier or "FREE").upper()
+    # Queuing many jobs at once is the point of this endpoint (they wait behind
+    # SCAN_JOB_CONCURRENCY), so submissions take no burst tokens; the daily
+    # quota still applies.
+    usage = await rl.consume(api_key_id=api_key.api_key_id, tier=api_key.tier, cost=1, burst_cost=0)
+
+    job_id = new_job_id()
+    job = {
+        "job_id": job_id,
+        "status": "queued",
+        "owner": api_key.api_key_id,
+        "worker": WORKER_ID,
+        "request": {
+            "address": req.address,
+            "chain": req.chain,
+            "depth": depth,
+            "tier": effective_tier,
+            "force_refresh": req.force_refresh,
+        },
+        "webhook_url": req.webhook_url,
+        "created_at": datetime.now(timezone.utc).isoformat().replace("+00:00", "Z"),
+        "started_at": None,
+        "finished_at": None,
+        "result": None,
+        "error": None,
+    }
+    try:
+        await store.save(job)
+    except Exception as e:
+        logger.error("Failed to store scan job: %s", e)
+        raise HTTPException(status_code=503, detail="Job store unavailable")
+
+    start_job(job, store=store, cache=cache, scanner=scanner, ttl_s=_ttl_for_depth(depth))
+
+    status_url = f"/v1/scans/{job_id}"
+    response.headers["Location"] = status_url
+    return SuccessResponse(
+        data={"job_id": job_id, "status": "queued", "status_url": status_url},
+        usage=usage.__dict__,
+    )
+
+
+@router.get("/scans/{job_id}", response_model=SuccessResponse)
+async def get_scan_job(
+    job_id: str,
+    api_key: ApiKeyInfo = Depends(require_api_key),
+    store: ScanJobStore = Depends(get_job_store),
+):
+    """Job status (``queued``/``running``/``succeeded``/``failed``) and, when done, the result."""
+    job = await store.get(job_id)
+    # Other keys' jobs look exactly like missing ones.
+    if job is None or job.get("owner") != api_key.api_key_id:
+        raise HTTPException(status_code=404, detail="Job not found")
+    try:
+        await store.fail_if_orphaned(job)
+    except Exception as e:
+        logger.warning("Orphan check failed for %s: %s", job_id, e)
+    return SuccessResponse(data=public_view(job))
@@ -3,15 +3,22 @@
 Endpoints:
   GET /api/metrics/snapshot?key=... — Full daily metrics
   GET /api/metrics/hourly?key=...   — Hourly scan breakdown
+  GET /api/metrics/latency?key=...  — p50/p95/p99 per stage/agent/provider
   GET /api/metrics/health           — Public health check (no auth)
+  GET /metrics                      — OpenMetrics exposition for Prometheus
+                                      (?key=... or Authorization: Bearer ...)
 """
 
 import os
-from fastapi import APIRouter, Depends, Query, HTTPException
+from fastapi import APIRouter, Depends, Header, Query, HTTPException
+from fastapi.responses import Response
 from ..deps import get_cache
+from ..services.latency import load_latency_summary
 from ..services.metrics import MetricsService
+from ..services import prometheus
 
 router = APIRouter(prefix="/api/metrics", tags=["metrics"])
+exposition_router = APIRouter(tags=["metrics"])
 
 METRICS_API_KEY = os.getenv("METRICS_API_KEY", "")
 
@@ -46,6 +53,16 @@ async def hourly(
     return await svc.get_hourly(date)
 
 
+@router.get("/latency")
+async def latency(
+    date: str = None,
+    cache=Depends(get_cache),
+    _auth=Depends(_check_auth),
+):
+    """Latency percentiles merged across all workers (default: today UTC)."""
+    return await load_latency_summary(cache.r, date)
+
+
 @router.get("/health")
 async def health(cache=Depends(get_cache)):
     """Public health check. No auth needed. Use for UptimeRobot."""
@@ -60,3 +77,16 @@ async def health(cache=Depends(get_cache)):
         "redis": redis_ok,
         "service": "verdictswarm-api",
     }
+
+
+@exposition_router.get("/metrics", include_in_schema=False)
+async def openmetrics(
+    key: str = Query(default=""),
+    authorization: str | None = Header(default=None),
+):
+    """Prometheus/OpenMetrics scrape endpoint (in-process instruments only)."""
+    token = key
+    if not token and authorization and authorization.lower().startswith("bearer "):
+        token = authorization[7:].strip()
+    _check_auth(token)
+    return Response(content=prometheus.render(), media_type=prometheus.CONTENT_TYPE)
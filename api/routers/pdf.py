@@ -12,6 +12,8 @@ from pydantic import BaseModel
 # PDF generation (pure python)
 from fpdf import FPDF
 
+from ..services.executors import run_in
+
 router = APIRouter(prefix="/api", tags=["pdf"])
 
 
@@ -431,7 +433,8 @@ def _render_pdf(payload: PdfRequest) -> bytes:
 
 @router.post("/pdf")
 async def generate_pdf(req: PdfRequest):
-    pdf_bytes = _render_pdf(req)
+    # fpdf rendering is CPU-bound; keep it off the event loop and out of the fetch/LLM pools
+    pdf_bytes = await run_in("render", _render_pdf, req)
     headers = {
         "Content-Disposition": 'inline; filename="verdictswarm-report.pdf"'
     }
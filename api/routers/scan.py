@@ -1,17 +1,28 @@
 from __future__ import annotations
 
-from datetime import datetime
+import asyncio
+import logging
+from datetime import datetime, timezone
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
 
-from fastapi import APIRouter, Depends, Query, Response
+import orjson
+from fastapi import APIRouter, Depends, Query, Request, Response
+from fastapi.responses import StreamingResponse
+
+from ..config import get_settings
 
 from ..deps import get_cache, get_rate_limiter, get_scanner
 from ..middleware.auth import ApiKeyInfo, require_api_key
 from ..models.requests import BatchScanRequest, DeepScanRequest, ScanDepth
 from ..models.responses import ErrorResponse, SuccessResponse
+from ..services import prometheus
 from ..services.cache import Cache
 from ..services.rate_limiter import RateLimitExceeded, RedisRateLimiter
 from ..services.scanner import ScannerService
+from src.services.chain_resolver import is_auto_chain
+
 
+logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/v1", tags=["scan"])
 
@@ -30,7 +41,7 @@ def _ttl_for_depth(depth: str) -> int:
 @router.get("/scan/{address}", response_model=SuccessResponse)
 async def quick_scan(
     address: str,
-    chain: str = Query(default="base"),
+    chain: str = Query(default="auto"),
     tier: str = Query(default="FREE"),
     api_key: ApiKeyInfo = Depends(require_api_key),
     rl: RedisRateLimiter = Depends(get_rate_limiter),
@@ -40,16 +51,20 @@ async def quick_scan(
     # Quick scan uses depth=basic and cache by default.
     depth = "basic"
     effective_tier = (tier or api_key.tier or "FREE").upper()
-    cache_key = f"scan:{chain}:{address}:{depth}:{effective_tier}"
+    # Key the cache by the chain the token is actually on, not "auto".
+    chain = await scanner.resolve_chain(address, chain)
+    cache_key = await cache.versioned_key("scan", chain, address, depth, effective_tier)
 
     cached = await cache.get_json(cache_key)
     if cached:
         value, cached_at = cached
+        prometheus.CACHE_REQUESTS.inc(result="hit")
         usage = await rl.consume(api_key_id=api_key.api_key_id, tier=api_key.tier, cost=1)
         value["cached"] = True
         value["cached_at"] = cached_at.isoformat().replace("+00:00", "Z")
         return SuccessResponse(data=value, usage=usage.__dict__)
 
+    prometheus.CACHE_REQUESTS.inc(result="miss")
     usage = await rl.consume(api_key_id=api_key.api_key_id, tier=api_key.tier, cost=1)
     result = await scanner.scan(address=address, chain=chain, depth=depth, tier=effective_tier)
     cached_at = await cache.set_json(cache_key, result, ttl_s=_ttl_for_depth(depth))
@@ -69,55 +84,152 @@ async def deep_scan(
 ):
     depth = req.depth.value
     effective_tier = (getattr(req, "tier", None) or api_key.tier or "FREE").upper()
-    cache_key = f"scan:{req.chain}:{req.address}:{depth}:{effective_tier}"
+    chain = await scanner.resolve_chain(req.address, req.chain)
+    cache_key = await cache.versioned_key("scan", chain, req.address, depth, effective_tier)
 
     if not req.force_refresh:
         cached = await cache.get_json(cache_key)
         if cached:
             value, cached_at = cached
+            prometheus.CACHE_REQUESTS.inc(result="hit")
             usage = await rl.consume(api_key_id=api_key.api_key_id, tier=api_key.tier, cost=1)
             value["cached"] = True
             value["cached_at"] = cached_at.isoformat().replace("+00:00", "Z")
             return SuccessResponse(data=value, usage=usage.__dict__)
 
+    prometheus.CACHE_REQUESTS.inc(result="miss")
     usage = await rl.consume(api_key_id=api_key.api_key_id, tier=api_key.tier, cost=1)
-    result = await scanner.scan(address=req.address, chain=req.chain, depth=depth, tier=effective_tier)
+    result = await scanner.scan(address=req.address, chain=chain, depth=depth, tier=effective_tier)
     cached_at = await cache.set_json(cache_key, result, ttl_s=_ttl_for_depth(depth))
     result["cached"] = False
     result["cached_at"] = cached_at.isoformat().replace("+00:00", "Z")
     return SuccessResponse(data=result, usage=usage.__dict__)
 
 
+def _dedupe_key(address: str) -> str:
+    # EVM addresses are case-insensitive; Solana mints are not.
+    a = (address or "").strip()
+    return a.lower() if a.lower().startswith("0x") else a
+
+
+async def _resolve_chain(scanner: ScannerService, address: str, chain: str) -> str:
+    # A failed lookup leaves the chain as given; the scan then reports the error in place.
+    try:
+        return await scanner.resolve_chain(address, chain)
+    except Exception as e:
+        logger.warning("Chain detection failed for %s: %s", address, e)
+        return chain
+
+
 @router.post("/scan/batch", response_model=SuccessResponse)
 async def batch_scan(
     req: BatchScanRequest,
+    request: Request,
     api_key: ApiKeyInfo = Depends(require_api_key),
     rl: RedisRateLimiter = Depends(get_rate_limiter),
     cache: Cache = Depends(get_cache),
     scanner: ScannerService = Depends(get_scanner),
 ):
+    """Scan many addresses: one MGET for cached results, misses run concurrently.
+
+    Duplicate addresses are scanned (and charged) once. A failing address is
+    reported in place (``{"address", "error"}``) instead of failing the batch.
+    With ``stream=true`` or ``Accept: application/x-ndjson`` each result is
+    written as one JSON line as soon as it completes, followed by a summary line.
+    """
     depth = req.depth.value
     effective_tier = (getattr(req, "tier", None) or api_key.tier or "FREE").upper()
-    results = []
-
-    # Charge 1 call per address.
-    usage = await rl.consume(api_key_id=api_key.api_key_id, tier=api_key.tier, cost=len(req.addresses))
 
+    unique: Dict[str, str] = {}
     for addr in req.addresses:
-        cache_key = f"scan:{req.chain}:{addr}:{depth}:{effective_tier}"
-        if not req.force_refresh:
-            cached = await cache.get_json(cache_key)
-            if cached:
-                value, cached_at = cached
-                value["cached"] = True
-                value["cached_at"] = cached_at.isoformat().replace("+00:00", "Z")
-                results.append(value)
-                continue
-
-        res = await scanner.scan(address=addr, chain=req.chain, depth=depth, tier=effective_tier)
-        cached_at = await cache.set_json(cache_key, res, ttl_s=_ttl_for_depth(depth))
+        unique.setdefault(_dedupe_key(addr), addr.strip())
+    addresses = list(unique.values())
+
+    # Charge 1 call per unique address. The burst bucket takes one token per
+    # address too, but never more than it can hold, so any allowed batch size
+    # can get through once the bucket is full.
+    usage = await rl.consume(
+        api_key_id=api_key.api_key_id,
+        tier=api_key.tier,
+        cost=len(addresses),
+        burst_cost=min(len(addresses), max(rl.burst_capacity, 1)),
+    )
+
+    # "auto" is resolved per address before keying the cache. Market data for
+    # all of them comes first, in a few DexScreener calls the resolver reuses.
+    if is_auto_chain(req.chain):
+        await scanner.prefetch_market(addresses)
+    chains = await asyncio.gather(*(_resolve_chain(scanner, addr, req.chain) for addr in addresses))
+
+    keys = [
+        await cache.versioned_key("scan", chain, addr, depth, effective_tier)
+        for addr, chain in zip(addresses, chains)
+    ]
+    cached_rows: List[Optional[Tuple[Any, datetime]]] = [None] * len(addresses)
+    if not req.force_refresh:
+        try:
+            cached_rows = await cache.get_many_json(keys)
+        except Exception as e:
+            logger.warning("Batch cache lookup failed, scanning all %s addresses: %s", len(addresses), e)
+
+    # Market data for all misses in a few DexScreener calls instead of one per scan.
+    await scanner.prefetch_market([a for a, c in zip(addresses, cached_rows) if not c])
+
+    limit = max(1, get_settings().batch_scan_concurrency)
+    sem = asyncio.Semaphore(min(req.concurrency or limit, limit))
+
+    async def scan_one(addr: str, chain: str, key: str, cached: Optional[Tuple[Any, datetime]]) -> Dict[str, Any]:
+        if cached:
+            value, cached_at = cached
+            prometheus.CACHE_REQUESTS.inc(result="hit")
+            value["cached"] = True
+            value["cached_at"] = cached_at.isoformat().replace("+00:00", "Z")
+            return value
+        prometheus.CACHE_REQUESTS.inc(result="miss")
+        try:
+            async with sem:
+                res = await scanner.scan(address=addr, chain=chain, depth=depth, tier=effective_tier)
+        except Exception as e:
+            logger.warning("Batch scan failed for %s:%s: %s", chain, addr, e)
+            return {"address": addr, "error": {"code": "SCAN_FAILED", "message": str(e)[:300]}}
+        try:
+            cached_at = await cache.set_json(key, res, ttl_s=_ttl_for_depth(depth))
+        except Exception as e:
+            logger.warning("Failed to cache batch scan result for %s: %s", addr, e)
+            cached_at = datetime.now(timezone.utc)
         res["cached"] = False
         res["cached_at"] = cached_at.isoformat().replace("+00:00", "Z")
-        results.append(res)
-
+        return res
+
+    tasks = [
+        asyncio.ensure_future(scan_one(addr, chain, key, cached))
+        for addr, chain, key, cached in zip(addresses, chains, keys, cached_rows)
+    ]
+
+    wants_ndjson = req.stream or "application/x-ndjson" in (request.headers.get("accept") or "")
+    if wants_ndjson:
+        async def ndjson() -> AsyncIterator[bytes]:
+            errors = 0
+            try:
+                for fut in asyncio.as_completed(tasks):
+                    item = await fut
+                    errors += 1 if "error" in item else 0
+                    yield orjson.dumps(item) + b"\n"
+                yield orjson.dumps({
+                    "summary": {
+                        "requested": len(req.addresses),
+                        "unique": len(addresses),
+                        "errors": errors,
+                        "usage": usage.__dict__,
+                    }
+                }, default=str) + b"\n"
+            finally:
+                # Client went away: stop scans nobody will read
+                for t in tasks:
+                    t.cancel()
+
+        return StreamingResponse(ndjson(), media_type="application/x-ndjson")
+
+    by_key = dict(zip(unique.keys(), await asyncio.gather(*tasks)))
+    results = [by_key[_dedupe_key(addr)] for addr in req.addresses]
     return SuccessResponse(data=results, usage=usage.__dict__)
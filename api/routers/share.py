@@ -14,6 +14,8 @@ except Exception as e:  # pragma: no cover
         "Pillow is required for /api/share/image. Add 'pillow' to api/requirements.txt"
     ) from e
 
+from ..services.executors import run_in
+
 
 router = APIRouter(prefix="/api/share", tags=["share"])
 
@@ -50,8 +52,12 @@ def _load_font(size: int, bold: bool = False) -> ImageFont.FreeTypeFont | ImageF
 
 
 @router.post("/image")
-def create_share_image(payload: ShareImageRequest) -> Response:
+async def create_share_image(payload: ShareImageRequest) -> Response:
     """Generate a Twitter-card sized PNG (1200x630) for sharing scan results."""
+    return await run_in("render", _render_share_image, payload)
+
+
+def _render_share_image(payload: ShareImageRequest) -> Response:
 
     W, H = 1200, 630
     bg = (8, 10, 18)  # near-black
@@ -2,21 +2,21 @@ from __future__ import annotations
 
 import asyncio
 import json
+import logging
 import os
 import time
 import uuid
 from datetime import date, datetime, timezone
 from typing import Any, AsyncGenerator, Dict, List, Optional, Tuple
 
-import anyio
 from fastapi import APIRouter, Depends, Query, Request
 from sse_starlette.sse import EventSourceResponse
 
+from ..config import get_settings
 from ..deps import get_cache, get_rate_limiter, get_scanner
 from ..services.metrics import MetricsService
 from ..models.scan_events import (
     AgentInfo,
-    ScanEvent,
     agent_complete,
     agent_error,
     agent_finding,
@@ -33,11 +33,19 @@ from ..models.scan_events import (
 )
 from ..services.cache import Cache
 from ..services.event_bus import ScanEventBus
-from ..services.rate_limiter import RateLimitExceeded, RedisRateLimiter
+from ..services import prometheus
+from ..services.executors import get_limiter, run_in
+from ..services.flight_recorder import EventTape, get_flight_recorder
+from ..services.latency import agent_series, get_latency_recorder, llm_deadline_s
+from ..services.local_limiter import get_prefilter
+from ..services.scan_context import ScanContext
+from ..services.rate_limiter import QuotaDecision, RateLimitExceeded, RedisRateLimiter
 from ..services.scanner import ScannerService
 
+from src.agents.ai_client import AIClient
 from src.agents.base_agent import CallbackEmitter
 from src.free_tier import free_tier_scan
+from src.log_pipeline import bind_log_context, log_context
 # News pre-fetch removed — models (Gemini, Grok) have native real-time news access
 from src.services.token_preprocessor import (
     PreprocessedFacts,
@@ -46,9 +54,12 @@ from src.services.token_preprocessor import (
     format_fact_sheet_for_agent,
     preprocess_token,
 )
+from src.services.tracing import Trace, bind_trace, span
 from src.tier_config import allowed_bots_for_tier, get_rate_limit
 from src.tiers import TierLevel
 
+logger = logging.getLogger(__name__)
+
 
 router = APIRouter(tags=["scan-stream"])
 
@@ -82,18 +93,21 @@ async def _ai_debate_call(
     system: str = "You are a crypto analysis debate participant. Be specific, cite data, and make pointed arguments. Keep responses to 2-3 sentences max.",
 ) -> str:
     """Make a lightweight AI call for debate arguments. Returns empty string on failure."""
-    from src.agents.ai_client import AIClient
+    latency = get_latency_recorder()
     try:
-        client = AIClient()
-        text = await anyio.to_thread.run_sync(
-            lambda: client.chat_text(
-                provider="gemini",
-                system=system,
-                user=prompt,
-                temperature=0.6,
-                max_output_tokens=200,
+        # Debate lines are garnish — cap each call at ~1.5x the observed p99.
+        client = AIClient(timeout_s=latency.deadline_s("llm:debate", 20.0))
+        with latency.time("llm:debate"):
+            text = await run_in(
+                "llm",
+                lambda: client.chat_text(
+                    provider="gemini",
+                    system=system,
+                    user=prompt,
+                    temperature=0.6,
+                    max_output_tokens=200,
+                )
             )
-        )
         if text and len(text) > 300:
             text = text[:297] + "..."
         return (text or "").strip()
@@ -111,7 +125,7 @@ async def _ai_debate_call(
 @router.get("/api/scan/tier1")
 async def tier1_scan(
     address: str,
-    chain: str = Query(default="base"),
+    chain: str = Query(default="auto"),
     scanner: ScannerService = Depends(get_scanner),
 ):
     """Tier 1 (Scout) scan.
@@ -127,6 +141,7 @@ async def tier1_scan(
     from ..agents.social_scanner import SocialScanner
     from ..agents.verdict_bot import VerdictBot
 
+    chain = await scanner.resolve_chain(address, chain)
     token_data = await scanner._fetch_token_data(address, chain)  # noqa: SLF001
 
     contract_source = getattr(token_data, "contract_source", None) or getattr(token_data, "source_code", None) or ""
@@ -201,6 +216,27 @@ def _get_rate_limit_identifier(request: Request, tier_level: TierLevel) -> str:
     return f"wallet:{wallet.lower()}"
 
 
+async def _rate_limit_gen(
+    reason: str, retry_after_s: int, daily_limit: int, tier_value: str
+) -> AsyncGenerator[Dict[str, str], None]:
+    """Single ``scan:error`` event for a rate-limited stream request."""
+    if reason == "burst":
+        message = f"Too many scans in a short time. Try again in {retry_after_s}s."
+    else:
+        message = f"Daily scan limit reached ({daily_limit}/{daily_limit}). Connect a wallet to unlock more scans."
+    yield {
+        "event": "scan:error",
+        "data": json.dumps({
+            "message": message,
+            "code": "RATE_LIMIT",
+            "retryable": reason == "burst",
+            "retry_after": retry_after_s,
+            "limit": daily_limit,
+            "tier": tier_value,
+        }),
+    }
+
+
 def _risk_level(score_0_to_10: float) -> str:
     if score_0_to_10 >= 8.0:
         return "LOW"
@@ -392,30 +428,22 @@ def _make_emitter(bus: ScanEventBus, scan_id: str, agent_id: str, agent_name: st
 # Cross-agent challenge emitter
 # ---------------------------------------------------------------------------
 
-_emitted_challenge_pairs: set = set()
-
-def _emit_cross_agent_challenges(
-    bus: ScanEventBus,
-    scan_id: str,
-    new_bot: str,
-    new_verdict: Any,
-    all_verdicts: Dict[str, Any],
-) -> None:
+def _emit_cross_agent_challenges(ctx: ScanContext, new_bot: str, new_verdict: Any) -> None:
     """After a bot completes, emit challenge/reaction events if scores diverge."""
+    bus, scan_id = ctx.bus, ctx.scan_id
     new_score = float(new_verdict.score)
     new_meta = _AGENT_META.get(new_bot, {})
 
-    for prev_name, prev_verdict in all_verdicts.items():
+    for prev_name, prev_verdict in list(ctx.verdicts.items()):
         if prev_name == new_bot:
             continue
-        # Deduplicate: only emit each pair once per scan
-        pair_key = tuple(sorted([new_bot, prev_name]))
-        if pair_key in _emitted_challenge_pairs:
-            continue
         prev_score = float(prev_verdict.score)
         diff = abs(new_score - prev_score)
         if diff < DEBATE_THRESHOLD:
             continue
+        # Deduplicate: only emit each pair once per scan
+        if not ctx.claim_challenge_pair(new_bot, prev_name):
+            continue
 
         # Determine challenger (lower score) and defender (higher score)
         if new_score < prev_score:
@@ -433,7 +461,6 @@ def _emit_cross_agent_challenges(
         if len(first_sentence) > 120:
             first_sentence = first_sentence[:117] + "..."
 
-        _emitted_challenge_pairs.add(pair_key)
         bus.emit(agent_thinking(
             scan_id, low_name, low_meta.get("name", low_name),
             f"⚔️ Challenging {high_meta.get('display_name', high_name)}'s {high_score:.1f}/10 — {first_sentence}"
@@ -481,7 +508,7 @@ def _build_consensus_narrative(
         if ai_narrative and len(ai_narrative.strip()) > 50:
             return ai_narrative.strip()
     except Exception as e:
-        print(f"[WARN] AI consensus narrative failed, using template: {e}")
+        logger.warning("AI consensus narrative failed, using template: %s", e)
 
     # --- Fallback: template-based narrative ---
     try:
@@ -529,7 +556,7 @@ def _build_consensus_narrative(
         result = "\n".join([l for l in lines if l])
         return result if result else f"The swarm analyzed this token with {len(verdicts)} agents and assigned Grade {grade}."
     except Exception as e:
-        print(f"[WARN] Template consensus narrative also failed for {token_name}: {e}")
+        logger.warning("Template consensus narrative also failed for %s: %s", token_name, e)
         return f"The swarm analyzed this token with {len(verdicts)} agents and assigned Grade {grade}."
 
     # Final catch-all: guarantee non-empty string when verdicts is non-empty
@@ -546,11 +573,12 @@ def _build_consensus_narrative(
 async def stream_scan(
     request: Request,
     address: str,
-    chain: str = Query(default="base"),
+    chain: str = Query(default="auto"),
     depth: str = Query(default="full"),
     tier: str = Query(default="FREE"),
     fresh: bool = Query(default=False),
     wallet: str = Query(default=""),
+    timing: bool = Query(default=False),
     scanner: ScannerService = Depends(get_scanner),
     cache: Cache = Depends(get_cache),
     rate_limiter: RedisRateLimiter = Depends(get_rate_limiter),
@@ -563,11 +591,14 @@ async def stream_scan(
       agent:complete, agent:error, debate:start, debate:message,
       debate:resolved, scan:consensus, scan:complete, scan:error
 
+    With ``timing=true`` a final ``scan:timing`` event carries the span
+    waterfall (also stored on the payload as ``timing``).
+
     Supports reconnection via ``Last-Event-ID`` header.
     """
 
     # Sanitize chain — strip any query param leakage (e.g. "solana?fresh=true" → "solana")
-    chain = chain.split("?")[0].strip().lower() if chain else "base"
+    chain = chain.split("?")[0].strip().lower() if chain else "auto"
 
     # Apply TOKEN_OVERRIDES: resolve symbol → (address, chain)
     from src.data_fetcher import TOKEN_OVERRIDES
@@ -592,8 +623,23 @@ async def stream_scan(
     identifier = _get_rate_limit_identifier(request, tier_level)
     daily_limit = get_rate_limit(tier_level)
 
+    # Obvious floods are turned away in-process, before any Redis round trip
+    prefilter = get_prefilter()
+    if not is_admin:
+        burst_retry = prefilter.check_burst(identifier)
+        if burst_retry is not None:
+            prometheus.PREFILTER_REJECTED.inc(reason="burst")
+            prometheus.RATE_LIMITED.inc(endpoint="/api/scan/stream", tier=tier_level.value)
+            return EventSourceResponse(
+                _rate_limit_gen("burst", burst_retry, daily_limit, tier_level.value),
+                status_code=200,
+            )
+
+    # Detect the chain before it is used in the cache key, metrics and events
+    chain = await scanner.resolve_chain(address, chain)
+
     # Check cache first (before consuming rate limit quota)
-    cache_key = f"{chain}:{address.lower()}:{tier_level.value}"
+    cache_key = await cache.versioned_key(chain, address.lower(), tier_level.value)
     cached_result = None
     cached_at = None
     redis_available = True
@@ -606,70 +652,74 @@ async def stream_scan(
                 # Invalidate stale cache entries that predate consensus_narrative
                 # or other required fields. Forces a fresh scan.
                 if isinstance(cached_result, dict) and cached_result.get("bots") and not cached_result.get("consensus_narrative"):
-                    print(f"[INFO] Cache miss (stale: missing consensus_narrative) for {cache_key}")
+                    logger.info("Cache miss (stale: missing consensus_narrative) for %s", cache_key)
                     cached_result = None
                     cached_at = None
         except Exception as e:
             # Redis connection failed — log and continue without cache
-            print(f"[WARN] Redis cache unavailable: {e}")
+            logger.warning("Redis cache unavailable: %s", e)
             redis_available = False
 
     # If we have a cached result, stream it back immediately
     if cached_result is not None:
+        prometheus.CACHE_REQUESTS.inc(result="hit")
+        prometheus.SCANS.inc(chain=chain, tier=tier_level.value)
         try:
             metrics = MetricsService(cache.r)
             await metrics.track("scans_total", tags={"chain": chain, "tier": tier_level.value})
             await metrics.track("cache_hits", tags={"chain": chain})
         except Exception:
             pass
-        return EventSourceResponse(_replay_cached_scan(cached_result, cached_at))
+        return EventSourceResponse(_tracked_stream(_replay_cached_scan(cached_result, cached_at)))
+    prometheus.CACHE_REQUESTS.inc(result="bypass" if fresh else "miss")
 
     # Consume rate limit quota (only if not cached, and not admin)
     daily_scans_remaining = None
     if is_admin:
         daily_scans_remaining = 9999  # Admin: unlimited
     try:
-        # Track daily scans in Redis
-        today = date.today().isoformat()
-        scan_count_key = f"scans:{today}:{identifier}"
-
-        # Get current count
-        current_count = await cache.r.get(scan_count_key)
-        current_count = int(current_count or 0)
+        # Track daily scans in Redis — check, increment and burst-limit in
+        # one atomic Lua call (admins are counted but never rejected).
+        # Identifiers Redis recently rejected are answered from the local
+        # copy of that verdict until it expires (then Redis is asked again).
+        blocked = None if is_admin else prefilter.blocked(identifier)
+        if blocked is not None:
+            prometheus.PREFILTER_REJECTED.inc(reason=blocked[1])
+            decision = QuotaDecision(
+                allowed=False, used=daily_limit, limit=daily_limit, remaining=0,
+                retry_after_s=blocked[0], reason=blocked[1],
+            )
+        else:
+            today = date.today().isoformat()
+            scan_count_key = f"scans:{today}:{identifier}"
+            decision = await rate_limiter.acquire(
+                scan_count_key,
+                cost=1,
+                limit=0 if is_admin else max(daily_limit, 0),
+                ttl_s=86400,  # 24 hours
+                burst_key=None if is_admin else f"scans:burst:{identifier}",
+            )
+            if not is_admin:
+                prefilter.record(identifier, decision)
 
-        if current_count >= daily_limit and not is_admin:
+        if not decision.allowed:
+            prometheus.RATE_LIMITED.inc(endpoint="/api/scan/stream", tier=tier_level.value)
             try:
                 m = MetricsService(cache.r)
                 await m.track("rate_limits", tags={"tier": tier_level.value})
             except Exception:
                 pass
 
-            async def _rate_limit_gen():
-                yield {
-                    "event": "scan:error",
-                    "data": json.dumps({
-                        "message": f"Daily scan limit reached ({daily_limit}/{daily_limit}). Connect a wallet to unlock more scans.",
-                        "code": "RATE_LIMIT",
-                        "retryable": False,
-                        "limit": daily_limit,
-                        "tier": tier_level.value,
-                    }),
-                }
             return EventSourceResponse(
-                _rate_limit_gen(),
+                _rate_limit_gen(decision.reason, decision.retry_after_s, daily_limit, tier_level.value),
                 status_code=200,
             )
 
-        # Increment scan count
-        pipe = cache.r.pipeline()
-        pipe.incr(scan_count_key)
-        pipe.expire(scan_count_key, 86400)  # 24 hours
-        await pipe.execute()
-
-        daily_scans_remaining = max(daily_limit - current_count - 1, 0)
+        if not is_admin:
+            daily_scans_remaining = decision.remaining
     except Exception as e:
         # Redis rate limiting failed — log and continue (degrade gracefully)
-        print(f"[WARN] Redis rate limiter unavailable: {e}")
+        logger.warning("Redis rate limiter unavailable: %s", e)
         redis_available = False
         daily_scans_remaining = None
 
@@ -695,22 +745,21 @@ async def stream_scan(
     except (ValueError, TypeError):
         last_event_ts = None
 
-    # ---------- Event Bus ----------
-    bus = ScanEventBus()
-    scan_id = uuid.uuid4().hex[:12]
-
-    # Track what we've flushed so far
-    flush_cursor: List[int] = [0]  # mutable int wrapped in list for closure
-
-    def _pending_events() -> List[ScanEvent]:
-        """Get events we haven't yielded yet."""
-        all_events = bus.replay(after_timestamp=last_event_ts)
-        result = all_events[flush_cursor[0]:]
-        flush_cursor[0] = len(all_events)
-        return result
+    # ---------- Per-scan state (bus, cursor, verdicts, debates, deadline) ----------
+    ctx = ScanContext.create(
+        uuid.uuid4().hex[:12],
+        budget_s=get_settings().scan_deadline_s,
+        last_event_ts=last_event_ts,
+    )
+    bus, scan_id, trace = ctx.bus, ctx.scan_id, ctx.trace
+    _pending_events = ctx.pending_events
 
     async def event_generator() -> AsyncGenerator[Dict[str, str], None]:
         scan_start_time = time.perf_counter()
+        latency = get_latency_recorder()
+        # Every log record emitted while this stream runs carries the scan id
+        bind_log_context(scan_id=scan_id, chain=chain)
+        bind_trace(trace)
 
         # ------ Build agent roster ------
         roster: List[AgentInfo] = []
@@ -772,6 +821,7 @@ async def stream_scan(
 
             scanned_at = datetime.now(timezone.utc).isoformat().replace("+00:00", "Z")
             duration_ms = int((time.perf_counter() - scan_start_time) * 1000)
+            latency.record("stage:total", duration_ms)
             payload: Dict[str, Any] = {
                 "address": getattr(token_data, "contract_address", address),
                 "chain": chain,
@@ -797,7 +847,7 @@ async def stream_scan(
                 try:
                     await cache.set_json(cache_key, payload, ttl_s=7200)
                 except Exception as e:
-                    print(f"[WARN] Failed to cache free tier scan results: {e}")
+                    logger.warning("Failed to cache free tier scan results: %s", e)
 
             bus.emit(scan_complete(
                 scan_id=scan_id,
@@ -822,10 +872,12 @@ async def stream_scan(
             "id": str(int(time.time() * 1000)),
         }
         try:
-            preprocessed_facts = await preprocess_token(
-                token_data, chain, address,
-                cache=cache if redis_available else None,
-            )
+            with latency.time("stage:preprocess"), log_context(stage="preprocess"), span("preprocess"):
+                preprocessed_facts = await preprocess_token(
+                    token_data, chain, address,
+                    cache=cache if redis_available else None,
+                    limiter=get_limiter("llm"),
+                )
             if preprocessed_facts:
                 # Attach to token_data so agents can access it
                 token_data.preprocessed_facts = preprocessed_facts  # type: ignore[attr-defined]
@@ -843,13 +895,13 @@ async def stream_scan(
                     "id": str(int(time.time() * 1000)),
                 }
             else:
-                print(f"[INFO] Preprocessor returned None for {chain}:{address} — agents use raw data")
+                logger.info("Preprocessor returned None for %s:%s — agents use raw data", chain, address)
         except Exception as e:
-            print(f"[WARN] Token preprocessor failed (non-fatal): {e}")
+            logger.warning("Token preprocessor failed (non-fatal): %s", e)
 
         # News pre-fetch removed — models have native real-time news access via
         # Gemini (Google News) and Grok (X/Grokpedia). Better prompts > raw headlines.
-            print(f"[WARN] News pre-fetch failed (non-fatal): {e}")
+            logger.warning("News pre-fetch failed (non-fatal): %s", e)
 
         # ------ Paid-tier: run agents in phased parallel ------
         from src.model_router import get_models_for_tier
@@ -884,10 +936,9 @@ async def stream_scan(
             phase = _AGENT_META.get(bot_name, {}).get("phase", 1)
             bots_by_phase.setdefault(phase, []).append(bot_name)
 
-        verdicts: Dict[str, Any] = {}
-        timings: Dict[str, float] = {}
-        _emitted_challenge_pairs.clear()
-        debates_log: List[Dict[str, str]] = []
+        verdicts = ctx.verdicts
+        timings = ctx.timings
+        debates_log = ctx.debates_log
 
         async def run_bot(bot_name: str) -> Tuple[str, str, Any, Optional[str]]:
             """Run a single bot, returns (name, status, verdict_or_None, error_or_None)."""
@@ -906,22 +957,29 @@ async def stream_scan(
                 _raw_cat = (_AGENT_META.get(bot_name, {}).get("category", "")).lower()
                 _cat_key = _cat_remap.get(_raw_cat, _raw_cat)
                 _routed = _tier_routes.get(_cat_key)
+                series = agent_series(bot_name, _routed)
                 bot = bot_cls(
                     provider_model=_routed if isinstance(_routed, tuple) else None,
                     model_overrides=None,
                     emitter=emitter,
+                    # Each LLM call's deadline comes from that model's per-call
+                    # tail, not from this agent's whole (multi-call) analyze time
+                    ai_client=AIClient(timeout_s=20.0, deadline_s=llm_deadline_s),
                 )
 
                 # Devil's Advocate gets all prior verdicts so it can challenge them
-                if bot_name == "DevilsAdvocate" and verdicts:
-                    verdict = await anyio.to_thread.run_sync(
-                        lambda: bot.analyze(token_data, prior_verdicts=verdicts)
-                    )
-                else:
-                    verdict = await anyio.to_thread.run_sync(bot.analyze, token_data)
+                with log_context(agent=bot_name, stage="agent"), span(f"agent:{bot_name}", model=series.split(":", 2)[-1]):
+                    if bot_name == "DevilsAdvocate" and verdicts:
+                        verdict = await run_in(
+                            "llm",
+                            lambda: bot.analyze(token_data, prior_verdicts=verdicts)
+                        )
+                    else:
+                        verdict = await run_in("llm", bot.analyze, token_data)
 
                 elapsed = time.perf_counter() * 1000 - start_ms
                 timings[bot_name] = elapsed
+                latency.record(series, elapsed)
 
                 bus.emit(agent_score(
                     scan_id,
@@ -939,7 +997,7 @@ async def stream_scan(
                 return (bot_name, "complete", verdict, None)
             except Exception as e:
                 elapsed = time.perf_counter() * 1000 - start_ms
-                print(f"[ERROR] {bot_name} failed ({type(e).__name__}): {e}")
+                logger.error("%s failed (%s): %s", bot_name, type(e).__name__, e)
                 bus.emit(agent_error(scan_id, bot_name, a_name, str(e), recoverable=False))
                 return (bot_name, "error", None, str(e))
 
@@ -957,7 +1015,7 @@ async def stream_scan(
                     _, status, verdict, _ = result
                     if status == "complete" and verdict is not None:
                         verdicts[bot_name] = verdict
-                        _emit_cross_agent_challenges(bus, scan_id, bot_name, verdict, verdicts)
+                        _emit_cross_agent_challenges(ctx, bot_name, verdict)
                     for evt in _pending_events():
                         yield evt.to_sse()
         else:
@@ -974,7 +1032,7 @@ async def stream_scan(
                         verdicts[bot_name] = verdict
                 for bot_name, status, verdict, _ in results:
                     if status == "complete" and verdict is not None:
-                        _emit_cross_agent_challenges(bus, scan_id, bot_name, verdict, verdicts)
+                        _emit_cross_agent_challenges(ctx, bot_name, verdict)
                 for evt in _pending_events():
                     yield evt.to_sse()
 
@@ -988,22 +1046,36 @@ async def stream_scan(
                 for evt in _pending_events():
                     yield evt.to_sse()
 
+        # Debates and convergence are optional: skip them once the scan budget is spent
+        if ctx.expired():
+            logger.warning("Scan deadline reached after agents — skipping debates and convergence")
+
         # ------ Cross-agent debates (after all analysis bots, before scoring) ------
-        if len(verdicts) > 1:
-            await _check_and_run_debates(bus, scan_id, verdicts, scanner, debates_log)
+        # Debate latency is only recorded when a debate actually took place.
+        if len(verdicts) > 1 and not ctx.expired():
+            _t0, _n = time.perf_counter(), len(debates_log)
+            with span("debate:category"):
+                await _check_and_run_debates(ctx, scanner)
+            if len(debates_log) > _n:
+                latency.record("debate:category", (time.perf_counter() - _t0) * 1000)
             for evt in _pending_events():
                 yield evt.to_sse()
-            await _check_cross_category_debates(bus, scan_id, verdicts, scanner, debates_log)
+            _t0, _n = time.perf_counter(), len(debates_log)
+            with span("debate:cross_category"):
+                await _check_cross_category_debates(ctx, scanner)
+            if len(debates_log) > _n:
+                latency.record("debate:cross_category", (time.perf_counter() - _t0) * 1000)
             for evt in _pending_events():
                 yield evt.to_sse()
 
-        if "DevilsAdvocate" in verdicts and len(verdicts) > 1:
+        if "DevilsAdvocate" in verdicts and len(verdicts) > 1 and not ctx.expired():
             _tname = getattr(token_data, "name", "") or ""
             _tsymbol = getattr(token_data, "symbol", "") or ""
-            await _run_devils_advocate_debate(
-                bus, scan_id, verdicts, scanner, debates_log,
-                token_name=_tname, token_symbol=_tsymbol,
-            )
+            _t0, _n = time.perf_counter(), len(debates_log)
+            with span("debate:devils_advocate"):
+                await _run_devils_advocate_debate(ctx, scanner, token_name=_tname, token_symbol=_tsymbol)
+            if len(debates_log) > _n:
+                latency.record("debate:devils_advocate", (time.perf_counter() - _t0) * 1000)
             for evt in _pending_events():
                 yield evt.to_sse()
 
@@ -1011,9 +1083,9 @@ async def stream_scan(
         # Only for paid tiers with 3+ scoring agents (not free tier)
         convergence_result = None
         scoreable_agents = {k: v for k, v in verdicts.items() if k != "DevilsAdvocate"}
-        if len(scoreable_agents) >= 3:
+        if len(scoreable_agents) >= 3 and not ctx.expired():
             try:
-                from src.services.convergence import run_full_convergence, format_convergence_for_narrative, ConvergenceResult
+                from src.services.convergence import run_full_convergence
                 _tname = getattr(token_data, "name", "") or ""
                 _tsymbol = getattr(token_data, "symbol", "") or ""
 
@@ -1021,9 +1093,11 @@ async def stream_scan(
                 for evt in _pending_events():
                     yield evt.to_sse()
 
-                convergence_result = await anyio.to_thread.run_sync(
-                    lambda: run_full_convergence(verdicts, token_name=_tname, token_symbol=_tsymbol)
-                )
+                with latency.time("stage:convergence"), log_context(stage="convergence"), span("convergence"):
+                    convergence_result = await run_in(
+                        "llm",
+                        lambda: run_full_convergence(ctx.verdicts, token_name=_tname, token_symbol=_tsymbol)
+                    )
 
                 if convergence_result and convergence_result.total_rounds > 0:
                     # Emit critique events
@@ -1086,17 +1160,17 @@ async def stream_scan(
             except Exception as e:
                 import traceback
                 traceback.print_exc()
-                print(f"[CONVERGENCE] Pipeline failed (non-fatal): {e}")
+                logger.warning("Pipeline failed (non-fatal): %s", e)
 
         # ------ Scoring (uses converged scores if available) ------
-        print(f"[SCORING DEBUG] verdicts count: {len(verdicts)}, keys: {list(verdicts.keys())}")
+        logger.debug("verdicts count: %s, keys: %s", len(verdicts), list(verdicts.keys()))
         for vname, vobj in verdicts.items():
-            print(f"[SCORING DEBUG]   {vname}: score={getattr(vobj, 'score', '?')}, cat={getattr(vobj, 'category', '?')}, conf={getattr(vobj, 'confidence', '?')}")
+            logger.debug("%s: score=%s, cat=%s, conf=%s", vname, getattr(vobj, 'score', '?'), getattr(vobj, 'category', '?'), getattr(vobj, 'confidence', '?'))
         result = scanner.engine.score(verdicts) if verdicts else None
         if result:
-            print(f"[SCORING DEBUG] engine result: final_score={result.final_score}, category_scores={dict(result.category_scores)}")
+            logger.debug("engine result: final_score=%s, category_scores=%s", result.final_score, dict(result.category_scores))
         else:
-            print(f"[SCORING DEBUG] engine result: None (no verdicts)")
+            logger.debug("engine result: None (no verdicts)")
 
         category_score_map: Dict[str, float] = {}
         if result:
@@ -1258,6 +1332,7 @@ async def stream_scan(
         # ------ Emit scan:complete ------
         scanned_at = datetime.now(timezone.utc).isoformat().replace("+00:00", "Z")
         duration_ms = int((time.perf_counter() - scan_start_time) * 1000)
+        latency.record("stage:total", duration_ms)
 
         # Generate summary and consensus narrative
         summary = _generate_summary(token_data, final_score, grade, verdicts, analysis)
@@ -1271,11 +1346,12 @@ async def stream_scan(
                 pass
         if _convergence_context:
             debates_log.append({"topic": "Peer Review", "resolution": _convergence_context[:1000]})
-        consensus_narrative = _build_consensus_narrative(
-            verdicts, debates_log, final_score, grade,
-            token_name=getattr(token_data, "name", "") or "",
-            token_symbol=getattr(token_data, "symbol", "") or "",
-        )
+        with span("narrative"):
+            consensus_narrative = _build_consensus_narrative(
+                verdicts, debates_log, final_score, grade,
+                token_name=getattr(token_data, "name", "") or "",
+                token_symbol=getattr(token_data, "symbol", "") or "",
+            )
 
         # Emit consensus synthesis as a debate event so the IR can animate it.
         # Always emit when narrative exists — even without prior debates, the
@@ -1327,12 +1403,15 @@ async def stream_scan(
         if daily_scans_remaining is not None:
             full_payload["daily_scans_remaining"] = daily_scans_remaining
 
+        # Span waterfall up to this point (on-chain storage runs after caching)
+        full_payload["timing"] = trace.waterfall()
+
         # Store in cache (2-hour TTL)
         if redis_available:
             try:
                 await cache.set_json(cache_key, full_payload, ttl_s=7200)
             except Exception as e:
-                print(f"[WARN] Failed to cache scan results: {e}")
+                logger.warning("Failed to cache scan results: %s", e)
 
         bus.emit(scan_complete(
             scan_id=scan_id,
@@ -1348,6 +1427,7 @@ async def stream_scan(
             yield evt.to_sse()
 
         # --- Track metrics (non-fatal) ---
+        prometheus.SCANS.inc(chain=chain, tier=tier_level.value)
         try:
             metrics = MetricsService(cache.r)
             await metrics.track("scans_total", tags={"chain": chain, "tier": tier_level.value})
@@ -1358,7 +1438,8 @@ async def stream_scan(
         # --- On-chain verdict storage (non-fatal) ---
         try:
             from ..services.solana_verdict import store_verdict_onchain
-            onchain_result = await store_verdict_onchain(full_payload)
+            with latency.time("stage:onchain"), log_context(stage="onchain"), span("onchain"):
+                onchain_result = await store_verdict_onchain(full_payload)
             if onchain_result:
                 yield {
                     "event": "verdict:onchain",
@@ -1366,10 +1447,23 @@ async def stream_scan(
                     "id": str(int(time.time() * 1000)),
                 }
         except Exception as e:
-            print(f"[WARN] On-chain verdict storage failed: {e}")
+            logger.warning("On-chain verdict storage failed: %s", e)
 
-    return EventSourceResponse(
+        if timing:
+            yield {
+                "event": "scan:timing",
+                "data": json.dumps(trace.waterfall()),
+                "id": str(int(time.time() * 1000)),
+            }
+
+    recorded = _flight_recorded(
         event_generator(),
+        trace=trace,
+        meta={"address": address, "chain": chain, "tier": tier_level.value, "depth": depth_l},
+        redis_client=cache.r if redis_available else None,
+    )
+    return EventSourceResponse(
+        _tracked_stream(recorded, in_flight=True),
         ping=15,  # sse-starlette built-in keepalive interval (seconds)
     )
 
@@ -1378,14 +1472,9 @@ async def stream_scan(
 # Debate engine
 # ---------------------------------------------------------------------------
 
-async def _check_and_run_debates(
-    bus: ScanEventBus,
-    scan_id: str,
-    verdicts: Dict[str, Any],
-    scanner: ScannerService,
-    debates_log: List[Dict[str, str]],
-) -> None:
+async def _check_and_run_debates(ctx: ScanContext, scanner: ScannerService) -> None:
     """Check for score disagreements across agents in the same category."""
+    bus, scan_id, verdicts = ctx.bus, ctx.scan_id, ctx.verdicts
 
     by_category: Dict[str, List[Tuple[str, float]]] = {}
     for bot_name, v in verdicts.items():
@@ -1409,21 +1498,16 @@ async def _check_and_run_debates(
             ))
             highest = max(scores, key=lambda x: x[1])
             lowest = min(scores, key=lambda x: x[1])
-            await _run_debate_rounds(bus, scan_id, highest, lowest, cat, debates_log, verdicts)
+            await _run_debate_rounds(ctx, highest, lowest, cat)
 
 
-async def _check_cross_category_debates(
-    bus: ScanEventBus,
-    scan_id: str,
-    verdicts: Dict[str, Any],
-    scanner: ScannerService,
-    debates_log: List[Dict[str, str]],
-) -> None:
+async def _check_cross_category_debates(ctx: ScanContext, scanner: ScannerService) -> None:
     """Check for meaningful disagreements ACROSS categories.
 
     e.g., Technical scores high but Security scores low = interesting conflict.
     Only triggers 1 cross-category debate max per scan.
     """
+    bus, scan_id, verdicts, debates_log = ctx.bus, ctx.scan_id, ctx.verdicts, ctx.debates_log
     cat_scores: Dict[str, Tuple[str, float]] = {}
     for bot_name, v in verdicts.items():
         if bot_name == "DevilsAdvocate":
@@ -1501,15 +1585,13 @@ In 2 sentences, explain why this conflict matters for investors. What does it me
 
 
 async def _run_debate_rounds(
-    bus: ScanEventBus,
-    scan_id: str,
+    ctx: ScanContext,
     bull: Tuple[str, float],
     bear: Tuple[str, float],
     topic: str,
-    debates_log: List[Dict[str, str]],
-    verdicts: Optional[Dict[str, Any]] = None,
 ) -> None:
     """Multi-round debate between two agents with opposing scores."""
+    bus, scan_id, verdicts, debates_log = ctx.bus, ctx.scan_id, ctx.verdicts, ctx.debates_log
 
     bull_name, bull_score = bull
     bear_name, bear_score = bear
@@ -1634,11 +1716,8 @@ In 1 sentence, explain your final stance. Be specific about what convinced you (
 
 
 async def _run_devils_advocate_debate(
-    bus: ScanEventBus,
-    scan_id: str,
-    verdicts: Dict[str, Any],
+    ctx: ScanContext,
     scanner: ScannerService,
-    debates_log: List[Dict[str, str]],
     token_name: str = "",
     token_symbol: str = "",
 ) -> None:
@@ -1647,6 +1726,7 @@ async def _run_devils_advocate_debate(
     Uses real AI (Gemini Flash) to generate genuine debate arguments.
     Falls back to template text if AI calls fail.
     """
+    bus, scan_id, verdicts, debates_log = ctx.bus, ctx.scan_id, ctx.verdicts, ctx.debates_log
 
     from src.services.ai_debate import generate_agent_defense, generate_da_challenge
 
@@ -1680,7 +1760,8 @@ async def _run_devils_advocate_debate(
     da_first_fallback = (da_reasoning.split(".")[0].strip() + ".") if da_reasoning else "Hidden risk factors detected."
 
     # Generate AI challenge in a thread to avoid blocking the event loop
-    ai_challenge = await anyio.to_thread.run_sync(
+    ai_challenge = await run_in(
+        "llm",
         lambda: generate_da_challenge(
             verdicts=verdicts,
             target_name=target_name,
@@ -1716,7 +1797,8 @@ async def _run_devils_advocate_debate(
     # Use the AI challenge text (or fallback) as the challenge to defend against
     defense_challenge = ai_challenge or challenge_text
 
-    ai_defense = await anyio.to_thread.run_sync(
+    ai_defense = await run_in(
+        "llm",
         lambda: generate_agent_defense(
             verdicts=verdicts,
             target_name=target_name,
@@ -1902,6 +1984,53 @@ async def _error_gen(message: str) -> AsyncGenerator[Dict[str, str], None]:
     }
 
 
+async def _tracked_stream(
+    gen: AsyncGenerator[Dict[str, str], None],
+    *,
+    in_flight: bool = False,
+) -> AsyncGenerator[Dict[str, str], None]:
+    """Wrap an SSE generator with connection / in-flight scan gauges."""
+    prometheus.SSE_CONNECTIONS.inc()
+    if in_flight:
+        prometheus.SCANS_IN_FLIGHT.inc()
+    try:
+        async for item in gen:
+            yield item
+    finally:
+        prometheus.SSE_CONNECTIONS.dec()
+        if in_flight:
+            prometheus.SCANS_IN_FLIGHT.dec()
+        await gen.aclose()
+
+
+async def _flight_recorded(
+    gen: AsyncGenerator[Dict[str, str], None],
+    *,
+    trace: Trace,
+    meta: Dict[str, Any],
+    redis_client: Any,
+) -> AsyncGenerator[Dict[str, str], None]:
+    """Tape the event sequence and hand slow/failed scans to the flight recorder."""
+    tape = EventTape()
+    error: Optional[str] = None
+    try:
+        async for item in gen:
+            event = item.get("event", "")
+            tape.add(event)
+            if event == "scan:error" and error is None:
+                try:
+                    error = str(json.loads(item.get("data") or "{}").get("message", "scan:error"))
+                except Exception:
+                    error = "scan:error"
+            yield item
+    except Exception as e:
+        error = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        await gen.aclose()
+        get_flight_recorder().capture(trace, meta=meta, tape=tape, error=error, redis_client=redis_client)
+
+
 async def _replay_cached_scan(cached_data: Dict[str, Any], cached_at: datetime) -> AsyncGenerator[Dict[str, str], None]:
     """Replay a cached scan result as accelerated IR animation.
 
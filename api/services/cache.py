@@ -1,12 +1,35 @@
 from __future__ import annotations
 
+import asyncio
 import json
+import logging
+import time
 from datetime import datetime, timezone
-from typing import Any, Optional, Tuple
+from typing import Any, List, Optional, Set, Tuple
 
 import orjson
 import redis.asyncio as redis
 
+logger = logging.getLogger(__name__)
+
+# Versioned cache namespaces.
+#
+# Every scan/preprocessor/agent cache key is prefixed with the current cache
+# generation (``g{n}:``). Flushing the cache is a single ``INCR`` on
+# GENERATION_KEY: readers immediately start using the new prefix and entries
+# from older generations are never read again — they simply age out via their
+# own TTLs (or get removed by the optional background sweeper below).
+GENERATION_KEY = "cache:generation"
+
+# How long a worker trusts its locally memoised generation before re-reading
+# it from Redis. Keeps the hot path at zero extra round trips; other workers
+# observe a flush within this window.
+GENERATION_REFRESH_S = 5.0
+
+_generation_value: Optional[int] = None
+_generation_fetched_at: float = 0.0
+_sweeper_tasks: Set[asyncio.Task] = set()
+
 
 class Cache:
     def __init__(self, r: redis.Redis):
@@ -16,8 +39,37 @@ class Cache:
     def _key(*parts: str) -> str:
         return ":".join(parts)
 
-    async def get_json(self, key: str) -> Optional[Tuple[Any, datetime]]:
-        raw = await self.r.get(key)
+    async def generation(self) -> int:
+        """Return the current cache generation (memoised per process)."""
+        global _generation_value, _generation_fetched_at
+        now = time.monotonic()
+        if _generation_value is not None and now - _generation_fetched_at < GENERATION_REFRESH_S:
+            return _generation_value
+        try:
+            raw = await self.r.get(GENERATION_KEY)
+            _generation_value = int(raw) if raw else 0
+            _generation_fetched_at = now
+        except Exception:
+            # Redis hiccup: keep serving the last known generation.
+            if _generation_value is None:
+                return 0
+        return _generation_value
+
+    async def versioned_key(self, *parts: str) -> str:
+        """Build a cache key inside the current generation namespace."""
+        gen = await self.generation()
+        return self._key(f"g{gen}", *parts)
+
+    async def bump_generation(self) -> int:
+        """Invalidate every versioned cache entry with a single INCR."""
+        global _generation_value, _generation_fetched_at
+        new_gen = int(await self.r.incr(GENERATION_KEY))
+        _generation_value = new_gen
+        _generation_fetched_at = time.monotonic()
+        return new_gen
+
+    @staticmethod
+    def _decode(raw: Any) -> Optional[Tuple[Any, datetime]]:
         if not raw:
             return None
         try:
@@ -28,8 +80,62 @@ class Cache:
         except Exception:
             return None
 
+    async def get_json(self, key: str) -> Optional[Tuple[Any, datetime]]:
+        return self._decode(await self.r.get(key))
+
+    async def get_many_json(self, keys: List[str]) -> List[Optional[Tuple[Any, datetime]]]:
+        """Bulk :meth:`get_json` — one ``MGET`` round trip, results in key order."""
+        if not keys:
+            return []
+        return [self._decode(raw) for raw in await self.r.mget(keys)]
+
     async def set_json(self, key: str, value: Any, ttl_s: int) -> datetime:
         cached_at = datetime.now(timezone.utc)
         payload = {"cached_at": cached_at.isoformat().replace("+00:00", "Z"), "value": value}
         await self.r.set(key, orjson.dumps(payload), ex=int(ttl_s))
         return cached_at
+
+
+def _key_generation(key: Any) -> Optional[int]:
+    """Parse ``n`` out of a ``g{n}:...`` key, or None for unversioned keys."""
+    if isinstance(key, bytes):
+        key = key.decode("utf-8", "replace")
+    head, sep, _ = str(key).partition(":")
+    if not sep or not head.startswith("g") or not head[1:].isdigit():
+        return None
+    return int(head[1:])
+
+
+async def sweep_stale_generations(r: redis.Redis, current: int, batch_size: int = 500) -> int:
+    """Delete keys from generations older than ``current``.
+
+    Uses async SCAN + UNLINK in small batches and yields to the event loop
+    between batches, so it never blocks request handling. Returns the number
+    of keys removed.
+    """
+    removed = 0
+    pending: list = []
+    try:
+        async for key in r.scan_iter(match="g*:*", count=batch_size):
+            gen = _key_generation(key)
+            if gen is None or gen >= current:
+                continue
+            pending.append(key)
+            if len(pending) >= batch_size:
+                removed += int(await r.unlink(*pending) or 0)
+                pending = []
+                await asyncio.sleep(0)
+        if pending:
+            removed += int(await r.unlink(*pending) or 0)
+    except Exception as e:
+        logger.warning("Cache sweeper stopped early: %s", e)
+    logger.info("Cache sweeper removed %s keys older than generation %s", removed, current)
+    return removed
+
+
+def start_background_sweep(r: redis.Redis, current: int) -> asyncio.Task:
+    """Fire-and-forget :func:`sweep_stale_generations` on the running loop."""
+    task = asyncio.get_running_loop().create_task(sweep_stale_generations(r, current))
+    _sweeper_tasks.add(task)
+    task.add_done_callback(_sweeper_tasks.discard)
+    return task
@@ -0,0 +1,68 @@
+"""Named worker-thread pools per workload class.
+
+Everything synchronous used to share anyio's default thread limiter (40
+tokens), so a handful of paid scans with long LLM calls could starve cheap
+DataFetcher calls — including free-tier heuristic scans, which make no LLM
+calls at all. Each workload now has its own ``CapacityLimiter``:
+
+- ``fetch``  — DataFetcher / RPC / explorer HTTP calls
+- ``llm``    — agent ``analyze``, debate lines, preprocessor, convergence
+- ``render`` — PDF and share-image rendering (CPU-bound)
+
+Sizes come from ``EXECUTOR_{FETCH,LLM,RENDER}_THREADS``. Usage/waiting
+counts per pool are exported on ``/metrics`` (``vs_thread_pool_tokens``,
+``vs_queue_depth``).
+"""
+
+from __future__ import annotations
+
+from typing import Any, Callable, Dict, TypeVar
+
+import anyio
+import anyio.to_thread
+
+from ..config import get_settings
+
+T = TypeVar("T")
+
+WORKLOADS = ("fetch", "llm", "render")
+
+_limiters: Dict[str, anyio.CapacityLimiter] = {}
+
+
+def _size(workload: str) -> int:
+    settings = get_settings()
+    return max(1, int(getattr(settings, f"executor_{workload}_threads")))
+
+
+def get_limiter(workload: str) -> anyio.CapacityLimiter:
+    """The limiter for ``workload`` (created on first use, inside the event loop)."""
+    limiter = _limiters.get(workload)
+    if limiter is None:
+        if workload not in WORKLOADS:
+            raise ValueError(f"Unknown workload: {workload}")
+        limiter = _limiters[workload] = anyio.CapacityLimiter(_size(workload))
+    return limiter
+
+
+async def run_in(workload: str, fn: Callable[..., T], *args: Any) -> T:
+    """``anyio.to_thread.run_sync`` on the named pool."""
+    return await anyio.to_thread.run_sync(fn, *args, limiter=get_limiter(workload))
+
+
+def pool_stats() -> Dict[str, Dict[str, float]]:
+    """Per-pool borrowed/total/waiting token counts."""
+    out: Dict[str, Dict[str, float]] = {}
+    for name in WORKLOADS:
+        limiter = _limiters.get(name)
+        if limiter is None:
+            # Not used yet on this worker
+            out[name] = {"borrowed": 0.0, "total": float(_size(name)), "waiting": 0.0}
+            continue
+        stats = limiter.statistics()
+        out[name] = {
+            "borrowed": float(stats.borrowed_tokens),
+            "total": float(stats.total_tokens),
+            "waiting": float(stats.tasks_waiting),
+        }
+    return out
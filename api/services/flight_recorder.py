@@ -0,0 +1,158 @@
+"""Slow-scan flight recorder.
+
+Every streamed scan already carries a :class:`~src.services.tracing.Trace`.
+When a scan finishes slower than ``SLOW_SCAN_THRESHOLD_MS`` or ends in an
+error, the recorder snapshots it — span waterfall, per-LLM-call
+provider/model, attempts and prompt/response sizes, and the SSE event
+sequence — into a bounded ring buffer:
+
+- in memory (``collections.deque``), always available on this worker;
+- in Redis (``LPUSH`` + ``LTRIM`` on ``slowscans``), shared across workers.
+
+Scans under the threshold cost one comparison. The Redis write is
+fire-and-forget so it never delays the stream.
+
+Retrieved via ``GET /api/admin/slow-scans``.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections import deque
+from datetime import datetime, timezone
+from typing import Any, Deque, Dict, List, Optional, Set, Tuple
+
+import orjson
+
+from ..config import get_settings
+
+logger = logging.getLogger(__name__)
+
+REDIS_KEY = "slowscans"
+# Events kept per recorded scan (agent:thinking chatter can be long).
+MAX_EVENTS = 300
+
+_pending_writes: Set[asyncio.Task] = set()
+
+
+def _llm_calls(waterfall: Dict[str, Any]) -> List[Dict[str, Any]]:
+    calls: List[Dict[str, Any]] = []
+    for row in waterfall.get("spans", []):
+        name = str(row.get("name", ""))
+        if not name.startswith("llm:"):
+            continue
+        attrs = row.get("attrs") or {}
+        calls.append({
+            "provider_model": name[4:],
+            "duration_ms": row.get("duration_ms"),
+            "attempt": attrs.get("attempt", 1),
+            "prompt_chars": attrs.get("prompt_chars"),
+            "response_chars": attrs.get("response_chars"),
+            "error": row.get("error"),
+        })
+    return calls
+
+
+class FlightRecorder:
+    def __init__(self, *, threshold_ms: float, capacity: int = 50) -> None:
+        self.threshold_ms = float(threshold_ms)
+        self.capacity = max(1, int(capacity))
+        self._entries: Deque[Dict[str, Any]] = deque(maxlen=self.capacity)
+
+    def should_record(self, duration_ms: float, error: Optional[str]) -> bool:
+        return error is not None or duration_ms >= self.threshold_ms
+
+    def capture(
+        self,
+        trace: Any,
+        *,
+        meta: Dict[str, Any],
+        tape: EventTape,
+        error: Optional[str],
+        redis_client: Any = None,
+    ) -> Optional[Dict[str, Any]]:
+        """Record ``trace`` if it qualifies. Returns the stored entry, if any."""
+        duration_ms = trace.elapsed_ms()
+        if not self.should_record(duration_ms, error):
+            return None
+
+        waterfall = trace.waterfall()
+        calls = _llm_calls(waterfall)
+        entry: Dict[str, Any] = {
+            **meta,
+            "scan_id": trace.scan_id,
+            "recorded_at": datetime.now(timezone.utc).isoformat().replace("+00:00", "Z"),
+            "duration_ms": round(duration_ms, 1),
+            "reason": "error" if error is not None else "slow",
+            "error": error,
+            "threshold_ms": self.threshold_ms,
+            "llm_calls": calls,
+            "retries": sum(1 for c in calls if (c.get("attempt") or 1) > 1),
+            "events": [{"t_ms": round(t, 1), "event": name} for t, name in tape.events],
+            "events_truncated": tape.overflow,
+            "timing": waterfall,
+        }
+        self._entries.appendleft(entry)
+        if redis_client is not None:
+            try:
+                task = asyncio.get_running_loop().create_task(self._persist(redis_client, entry))
+                _pending_writes.add(task)
+                task.add_done_callback(_pending_writes.discard)
+            except RuntimeError:
+                pass  # no running loop — memory copy only
+        return entry
+
+    async def _persist(self, redis_client: Any, entry: Dict[str, Any]) -> None:
+        try:
+            pipe = redis_client.pipeline(transaction=False)
+            pipe.lpush(REDIS_KEY, orjson.dumps(entry))
+            pipe.ltrim(REDIS_KEY, 0, self.capacity - 1)
+            await pipe.execute()
+        except Exception as e:
+            logger.warning("Flight recorder Redis write failed: %s", e)
+
+    def local(self, limit: int) -> List[Dict[str, Any]]:
+        return list(self._entries)[: max(0, int(limit))]
+
+    async def recent(self, redis_client: Any = None, limit: int = 20) -> Tuple[List[Dict[str, Any]], str]:
+        """Newest-first entries from Redis (all workers), else this worker's buffer."""
+        if redis_client is not None:
+            try:
+                raw = await redis_client.lrange(REDIS_KEY, 0, max(0, int(limit) - 1))
+                return [orjson.loads(r) for r in raw or []], "redis"
+            except Exception as e:
+                logger.warning("Flight recorder Redis read failed: %s", e)
+        return self.local(limit), "memory"
+
+
+_recorder: Optional[FlightRecorder] = None
+
+
+def get_flight_recorder() -> FlightRecorder:
+    global _recorder
+    if _recorder is None:
+        settings = get_settings()
+        _recorder = FlightRecorder(
+            threshold_ms=settings.slow_scan_threshold_ms,
+            capacity=settings.slow_scan_buffer_size,
+        )
+    return _recorder
+
+
+class EventTape:
+    """Bounded (offset_ms, event) log of what a stream yielded."""
+
+    __slots__ = ("_t0", "events", "overflow")
+
+    def __init__(self) -> None:
+        self._t0 = time.perf_counter()
+        self.events: List[Tuple[float, str]] = []
+        self.overflow = 0
+
+    def add(self, event: str) -> None:
+        if len(self.events) < MAX_EVENTS:
+            self.events.append(((time.perf_counter() - self._t0) * 1000.0, event))
+        else:
+            self.overflow += 1
@@ -0,0 +1,227 @@
+"""Latency histograms — p50/p95/p99 per scan stage, agent and provider.
+
+HDR-style log-linear buckets: values below ``SUB_BUCKETS`` ms get one bucket
+each, above that every power-of-two range is split into ``SUB_BUCKETS``
+linear sub-buckets (≤12.5% relative error). Bucket indices are stable, so
+histograms from different workers merge by adding counts.
+
+Two views of the same data:
+
+- **Local** (``LatencyRecorder``): rolling in-process histograms over the last
+  one or two ``WINDOW_S`` windows. Cheap to query, used by deadline logic
+  (e.g. per-call LLM timeouts) on the hot path.
+- **Shared** (Redis): every observation is also added to the buffered metrics
+  flush as ``HINCRBY metrics:{date}:latency "{series}|{bucket}" 1``, so the
+  fleet-wide distribution for a day is one ``HGETALL`` (see
+  ``GET /api/metrics/latency``).
+
+Series naming: ``stage:fetch``, ``stage:preprocess``, ``stage:convergence``,
+``stage:onchain``, ``stage:total``, ``agent:{Bot}:{provider}/{model}`` (a whole
+``analyze``, possibly several LLM calls), ``llm:{provider}/{model}`` (one
+successful provider round trip; what per-call LLM deadlines are taken from),
+``debate:{category|cross_category|devils_advocate}``, ``llm:debate``.
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Dict, Iterator, Optional
+
+from .metrics import get_metrics_buffer
+
+SUB_BUCKETS = 8
+_SUB_BITS = 3  # log2(SUB_BUCKETS)
+
+WINDOW_S = float(os.getenv("LATENCY_WINDOW_S", "900"))
+# Percentile-derived deadlines need a minimum sample size to be trusted.
+MIN_SAMPLES = 20
+
+
+def bucket_index(ms: float) -> int:
+    v = max(0, int(ms))
+    if v < SUB_BUCKETS:
+        return v
+    exp = v.bit_length() - 1
+    sub = (v >> (exp - _SUB_BITS)) - SUB_BUCKETS
+    return SUB_BUCKETS + (exp - _SUB_BITS) * SUB_BUCKETS + sub
+
+
+def bucket_upper_ms(idx: int) -> int:
+    """Highest value (inclusive) that maps to bucket ``idx``."""
+    if idx < SUB_BUCKETS:
+        return idx
+    exp = (idx - SUB_BUCKETS) // SUB_BUCKETS + _SUB_BITS
+    sub = (idx - SUB_BUCKETS) % SUB_BUCKETS
+    width = 1 << (exp - _SUB_BITS)
+    return (1 << exp) + (sub + 1) * width - 1
+
+
+class LatencyHistogram:
+    """Sparse bucket → count map with percentile queries."""
+
+    __slots__ = ("counts", "total", "max_ms")
+
+    def __init__(self) -> None:
+        self.counts: Dict[int, int] = {}
+        self.total = 0
+        self.max_ms = 0.0
+
+    def record(self, ms: float, count: int = 1) -> None:
+        idx = bucket_index(ms)
+        self.counts[idx] = self.counts.get(idx, 0) + count
+        self.total += count
+        if ms > self.max_ms:
+            self.max_ms = float(ms)
+
+    def merge(self, other: "LatencyHistogram") -> "LatencyHistogram":
+        for idx, n in other.counts.items():
+            self.counts[idx] = self.counts.get(idx, 0) + n
+        self.total += other.total
+        self.max_ms = max(self.max_ms, other.max_ms)
+        return self
+
+    def percentile(self, p: float) -> Optional[int]:
+        if self.total <= 0:
+            return None
+        rank = max(1, int(round(p / 100.0 * self.total + 0.5)))
+        seen = 0
+        for idx in sorted(self.counts):
+            seen += self.counts[idx]
+            if seen >= rank:
+                return bucket_upper_ms(idx)
+        return bucket_upper_ms(max(self.counts))
+
+    def summary(self) -> Dict[str, Optional[int]]:
+        return {
+            "count": self.total,
+            "p50": self.percentile(50),
+            "p95": self.percentile(95),
+            "p99": self.percentile(99),
+        }
+
+
+class LatencyRecorder:
+    """Process-wide rolling histograms + Redis fan-out via the metrics buffer."""
+
+    def __init__(self, window_s: float = WINDOW_S) -> None:
+        self.window_s = window_s
+        self._lock = threading.Lock()
+        self._current: Dict[str, LatencyHistogram] = {}
+        self._previous: Dict[str, LatencyHistogram] = {}
+        self._window_started = time.monotonic()
+
+    def _rotate(self, now: float) -> None:
+        if now - self._window_started < self.window_s:
+            return
+        # Skipped a whole window with no traffic → the old data is stale too.
+        stale = now - self._window_started >= 2 * self.window_s
+        self._previous = {} if stale else self._current
+        self._current = {}
+        self._window_started = now
+
+    def record(self, series: str, ms: float) -> None:
+        now = time.monotonic()
+        with self._lock:
+            self._rotate(now)
+            hist = self._current.get(series)
+            if hist is None:
+                hist = self._current[series] = LatencyHistogram()
+            hist.record(ms)
+        date_key = datetime.now(timezone.utc).strftime("%Y-%m-%d")
+        get_metrics_buffer().add(
+            f"metrics:{date_key}:latency", f"{series}|{bucket_index(ms)}", 1, 86400 * 30
+        )
+
+    def local(self, series: str) -> LatencyHistogram:
+        """Merged recent (current + previous window) histogram for ``series``."""
+        with self._lock:
+            self._rotate(time.monotonic())
+            merged = LatencyHistogram()
+            for bucket in (self._previous, self._current):
+                if series in bucket:
+                    merged.merge(bucket[series])
+            return merged
+
+    def percentile(self, series: str, p: float) -> Optional[int]:
+        return self.local(series).percentile(p)
+
+    def deadline_s(
+        self,
+        series: str,
+        default_s: float,
+        *,
+        p: float = 99.0,
+        headroom: float = 1.5,
+        floor_s: float = 5.0,
+        ceiling_s: Optional[float] = None,
+    ) -> float:
+        """Timeout budget for an operation: ``headroom × p{p}``, clamped.
+
+        Falls back to ``default_s`` until ``MIN_SAMPLES`` observations exist.
+        ``ceiling_s`` defaults to ``default_s`` so a slow provider can only
+        tighten, never loosen, the configured limit.
+        """
+        hist = self.local(series)
+        if hist.total < MIN_SAMPLES:
+            return default_s
+        observed = hist.percentile(p) or 0
+        budget = observed / 1000.0 * headroom
+        return max(floor_s, min(ceiling_s if ceiling_s is not None else default_s, budget))
+
+    @contextmanager
+    def time(self, series: str) -> Iterator[None]:
+        """Record the wall time of the ``with`` block (also on exceptions)."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(series, (time.perf_counter() - start) * 1000)
+
+
+_recorder: Optional[LatencyRecorder] = None
+
+
+def get_latency_recorder() -> LatencyRecorder:
+    global _recorder
+    if _recorder is None:
+        _recorder = LatencyRecorder()
+    return _recorder
+
+
+def agent_series(bot_name: str, provider_model: object) -> str:
+    if isinstance(provider_model, (tuple, list)) and len(provider_model) == 2:
+        return f"agent:{bot_name}:{provider_model[0]}/{provider_model[1]}"
+    return f"agent:{bot_name}:default"
+
+
+def llm_series(provider: str, model: str) -> str:
+    return f"llm:{provider}/{model}"
+
+
+def llm_deadline_s(provider: str, model: str, default_s: float) -> float:
+    """``AIClient.deadline_s`` policy: each call's budget from that model's per-call tail."""
+    return get_latency_recorder().deadline_s(llm_series(provider, model), default_s)
+
+
+async def load_latency_summary(redis_client, date: Optional[str] = None) -> dict:
+    """Fleet-wide percentiles for ``date`` (default: today UTC). One HGETALL."""
+    if not date:
+        date = datetime.now(timezone.utc).strftime("%Y-%m-%d")
+    raw = await redis_client.hgetall(f"metrics:{date}:latency")
+    merged: Dict[str, LatencyHistogram] = {}
+    for field, count in (raw or {}).items():
+        field_s = field if isinstance(field, str) else field.decode()
+        series, _, bucket = field_s.rpartition("|")
+        if not series or not bucket.isdigit():
+            continue
+        hist = merged.get(series)
+        if hist is None:
+            hist = merged[series] = LatencyHistogram()
+        n = int(count or 0)
+        hist.counts[int(bucket)] = hist.counts.get(int(bucket), 0) + n
+        hist.total += n
+    return {"date": date, "series": {name: merged[name].summary() for name in sorted(merged)}}
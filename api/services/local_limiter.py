@@ -0,0 +1,115 @@
+"""In-process pre-filter for abusive rate-limit identifiers.
+
+Sits in front of the authoritative Redis limiter (``rate_limiter.py``) so a
+handful of IPs hammering ``/api/scan/stream`` don't cost a Redis round trip
+per request:
+
+- **Burst buckets** — per-identifier token buckets, deliberately more lenient
+  than the Redis burst limit (``LOCAL_BURST_MULTIPLIER``×), so only traffic
+  that is obviously over the limit is rejected locally.
+- **Learned blocks** — when Redis rejects an identifier, the verdict is cached
+  locally until the Redis retry-after or ``sync_interval_s`` (whichever comes
+  first); after that the next request re-checks Redis. This is the periodic
+  sync with the authoritative counters.
+
+Both maps are LRU-bounded by ``max_identifiers``. State is per worker and
+approximate by design — Redis stays the source of truth.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from typing import List, Optional, Tuple
+
+from ..config import get_settings
+from .rate_limiter import QuotaDecision
+
+LOCAL_BURST_MULTIPLIER = 2
+# Verdicts a repeat of the same single request would get again. Anything
+# else (a future reason, a rejection tied to one request's cost) is not
+# worth holding locally.
+_RECORDED_REASONS = {"burst", "daily"}
+
+
+class LocalPreFilter:
+    def __init__(
+        self,
+        *,
+        burst_capacity: float,
+        refill_per_s: float,
+        max_identifiers: int = 10000,
+        sync_interval_s: float = 30.0,
+    ) -> None:
+        self.burst_capacity = float(burst_capacity)
+        self.refill_per_s = float(refill_per_s)
+        self.max_identifiers = int(max_identifiers)
+        self.sync_interval_s = float(sync_interval_s)
+        self._lock = threading.Lock()
+        self._buckets: "OrderedDict[str, List[float]]" = OrderedDict()  # id -> [tokens, ts]
+        self._blocked: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()  # id -> (until, reason)
+
+    def _touch(self, table: OrderedDict, key: str, value) -> None:
+        table[key] = value
+        table.move_to_end(key)
+        while len(table) > self.max_identifiers:
+            table.popitem(last=False)
+
+    def check_burst(self, identifier: str) -> Optional[int]:
+        """Take one local burst token. Returns retry-after seconds if rejected."""
+        if self.burst_capacity <= 0 or self.refill_per_s <= 0:
+            return None
+        now = time.monotonic()
+        with self._lock:
+            tokens, ts = self._buckets.get(identifier, (self.burst_capacity, now))
+            tokens = min(self.burst_capacity, tokens + (now - ts) * self.refill_per_s)
+            if tokens < 1.0:
+                self._touch(self._buckets, identifier, [tokens, now])
+                return max(1, int((1.0 - tokens) / self.refill_per_s + 0.999))
+            self._touch(self._buckets, identifier, [tokens - 1.0, now])
+            return None
+
+    def blocked(self, identifier: str) -> Optional[Tuple[int, str]]:
+        """(seconds left, reason) of a locally cached Redis rejection, else None."""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._blocked.get(identifier)
+            if entry is None:
+                return None
+            until, reason = entry
+            if until <= now:
+                del self._blocked[identifier]
+                return None
+            return max(1, int(until - now + 0.999)), reason
+
+    def record(self, identifier: str, decision: QuotaDecision) -> None:
+        """Sync with an authoritative Redis verdict for ``identifier``.
+
+        Only pass verdicts of per-request (cost 1) checks; a rejection is held
+        for ``min(retry_after, sync_interval_s)``.
+        """
+        with self._lock:
+            if decision.allowed:
+                self._blocked.pop(identifier, None)
+                return
+            if decision.reason not in _RECORDED_REASONS:
+                return
+            hold_s = min(float(decision.retry_after_s), self.sync_interval_s)
+            self._touch(self._blocked, identifier, (time.monotonic() + hold_s, decision.reason))
+
+
+_prefilter: Optional[LocalPreFilter] = None
+
+
+def get_prefilter() -> LocalPreFilter:
+    global _prefilter
+    if _prefilter is None:
+        settings = get_settings()
+        _prefilter = LocalPreFilter(
+            burst_capacity=settings.rate_burst_capacity * LOCAL_BURST_MULTIPLIER,
+            refill_per_s=settings.rate_burst_refill_per_s * LOCAL_BURST_MULTIPLIER,
+            max_identifiers=settings.prefilter_max_identifiers,
+            sync_interval_s=settings.prefilter_sync_interval_s,
+        )
+    return _prefilter
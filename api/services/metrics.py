@@ -1,58 +1,184 @@
 """Metrics service — Redis-backed counters for observability.
 
-All counters organized by date for time-series queries.
+All counters organized by date for time-series queries, stored as Redis
+hashes so reads are a constant number of round trips:
+
+  metrics:{YYYY-MM-DD}        field {metric} / {metric}:{tag}={val}   (30d)
+  metrics:{YYYY-MM-DD}:{HH}   field {metric}                          (7d)
+
 Designed for agent consumption (SRE bot polls /api/metrics).
+
+Writes are buffered in-process (see ``MetricsBuffer``): ``track`` only bumps
+a local counter, and a background task flushes everything to Redis every
+``METRICS_FLUSH_INTERVAL_MS`` in a single pipeline. Reads go straight to Redis.
 """
 
+import asyncio
+import logging
+import os
+import threading
 from datetime import datetime, timezone
-from typing import Optional
+from typing import Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+FLUSH_INTERVAL_S = int(os.getenv("METRICS_FLUSH_INTERVAL_MS", "1000")) / 1000.0
+# Distinct Redis keys held between flushes. Reaching it triggers an early
+# flush; past twice this, new keys are dropped (and counted) until it lands.
+MAX_BUFFERED_KEYS = int(os.getenv("METRICS_MAX_BUFFERED_KEYS", "5000"))
+
+
+class MetricsBuffer:
+    """Process-wide aggregator of pending counter increments.
+
+    ``add`` is safe to call from worker threads; the flush loop itself runs
+    on the event loop.
+    """
+
+    def __init__(self, flush_interval_s: float = FLUSH_INTERVAL_S, max_keys: int = MAX_BUFFERED_KEYS):
+        self.flush_interval_s = flush_interval_s
+        self.max_keys = max_keys
+        self.dropped = 0
+        # (redis key, hash field) -> pending increment
+        self._counters: Dict[Tuple[str, str], int] = {}
+        self._ttls: Dict[str, int] = {}
+        self._r = None
+        self._lock = threading.Lock()
+        self._task: Optional[asyncio.Task] = None
+        self._flush_lock: Optional[asyncio.Lock] = None
+
+    def bind(self, redis_client) -> None:
+        if self._r is None and redis_client is not None:
+            self._r = redis_client
+
+    def add(self, key: str, field: str, value: int, ttl_s: int) -> None:
+        slot = (key, field)
+        early_flush = False
+        with self._lock:
+            if slot not in self._counters:
+                if len(self._counters) >= self.max_keys * 2:
+                    self.dropped += 1
+                    return
+                early_flush = len(self._counters) >= self.max_keys
+            self._counters[slot] = self._counters.get(slot, 0) + int(value)
+            self._ttls[key] = ttl_s
+        if early_flush:
+            self._schedule(self.flush())
+        self._ensure_loop()
+
+    def _schedule(self, coro) -> None:
+        try:
+            asyncio.get_running_loop().create_task(coro)
+        except RuntimeError:
+            coro.close()
+
+    def _ensure_loop(self) -> None:
+        if self._task is not None and not self._task.done():
+            return
+        try:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+        except RuntimeError:
+            pass  # called from a worker thread — the loop-side caller starts it
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.flush_interval_s)
+            await self.flush()
+
+    async def flush(self) -> int:
+        """Write all pending increments in one pipeline. Returns fields flushed."""
+        if not self._counters or self._r is None:
+            return 0
+        if self._flush_lock is None:
+            self._flush_lock = asyncio.Lock()
+        async with self._flush_lock:
+            with self._lock:
+                counters, ttls = self._counters, self._ttls
+                self._counters, self._ttls = {}, {}
+            if not counters:
+                return 0
+            try:
+                pipe = self._r.pipeline(transaction=False)
+                for (key, field), value in counters.items():
+                    pipe.hincrby(key, field, value)
+                for key, ttl_s in ttls.items():
+                    pipe.expire(key, ttl_s)
+                await pipe.execute()
+            except Exception as e:
+                logger.warning("Metrics flush failed (%s fields): %s", len(counters), e)
+                # Put the increments back so the next flush retries them.
+                with self._lock:
+                    for slot, value in counters.items():
+                        if slot in self._counters or len(self._counters) < self.max_keys * 2:
+                            self._counters[slot] = self._counters.get(slot, 0) + value
+                            self._ttls[slot[0]] = ttls[slot[0]]
+                        else:
+                            self.dropped += 1
+                return 0
+            return len(counters)
+
+    async def close(self) -> None:
+        """Stop the flush loop and drain whatever is buffered (app shutdown)."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except (asyncio.CancelledError, Exception):
+                pass
+            self._task = None
+        await self.flush()
+
+
+_buffer: Optional[MetricsBuffer] = None
+
+
+def get_metrics_buffer() -> MetricsBuffer:
+    global _buffer
+    if _buffer is None:
+        _buffer = MetricsBuffer()
+    return _buffer
+
+
+def _s(v) -> str:
+    return v if isinstance(v, str) else v.decode()
 
 
 class MetricsService:
-    def __init__(self, redis_client):
+    def __init__(self, redis_client, buffer: Optional[MetricsBuffer] = None):
         self.r = redis_client
+        self.buffer = buffer or get_metrics_buffer()
+        self.buffer.bind(redis_client)
 
     async def track(self, metric: str, value: int = 1, tags: dict = None):
-        """Increment a metric counter.
+        """Increment a metric counter (buffered — no Redis I/O on this path).
 
-        Keys: metrics:{YYYY-MM-DD}:{HH}:{metric}
-        Also rolls up to daily: metrics:{YYYY-MM-DD}:{metric}
+        Hash field {metric} in metrics:{YYYY-MM-DD}:{HH}
+        Also rolls up to daily: field {metric} in metrics:{YYYY-MM-DD}
         """
         now = datetime.now(timezone.utc)
         date_key = now.strftime("%Y-%m-%d")
         hour_key = now.strftime("%H")
+        daily_key = f"metrics:{date_key}"
 
-        # Daily counter
-        daily_key = f"metrics:{date_key}:{metric}"
-        await self.r.incrby(daily_key, value)
-        await self.r.expire(daily_key, 86400 * 30)  # 30 day retention
+        # Daily counter (30 day retention)
+        self.buffer.add(daily_key, metric, value, 86400 * 30)
 
-        # Hourly counter (for rate detection)
-        hourly_key = f"metrics:{date_key}:{hour_key}:{metric}"
-        await self.r.incrby(hourly_key, value)
-        await self.r.expire(hourly_key, 86400 * 7)  # 7 day retention
+        # Hourly counter (for rate detection, 7 day retention)
+        self.buffer.add(f"metrics:{date_key}:{hour_key}", metric, value, 86400 * 7)
 
         # Tagged counters (chain, tier, etc.)
         if tags:
             for k, v_tag in tags.items():
-                tagged_key = f"metrics:{date_key}:{metric}:{k}={v_tag}"
-                await self.r.incrby(tagged_key, value)
-                await self.r.expire(tagged_key, 86400 * 30)
+                self.buffer.add(daily_key, f"{metric}:{k}={v_tag}", value, 86400 * 30)
 
     async def track_duration(self, metric: str, duration_ms: int):
         """Track a duration metric (stores sum + count for averaging)."""
         now = datetime.now(timezone.utc)
         date_key = now.strftime("%Y-%m-%d")
 
-        sum_key = f"metrics:{date_key}:{metric}_sum_ms"
-        count_key = f"metrics:{date_key}:{metric}_count"
-
-        pipe = self.r.pipeline()
-        pipe.incrby(sum_key, duration_ms)
-        pipe.incr(count_key)
-        pipe.expire(sum_key, 86400 * 30)
-        pipe.expire(count_key, 86400 * 30)
-        await pipe.execute()
+        daily_key = f"metrics:{date_key}"
+        self.buffer.add(daily_key, f"{metric}_sum_ms", duration_ms, 86400 * 30)
+        self.buffer.add(daily_key, f"{metric}_count", 1, 86400 * 30)
 
     async def get_snapshot(self, date: str = None) -> dict:
         """Full metrics snapshot for a given date (default: today).
@@ -62,20 +188,9 @@ class MetricsService:
         if not date:
             date = datetime.now(timezone.utc).strftime("%Y-%m-%d")
 
-        # Get all daily keys for this date
-        pattern = f"metrics:{date}:*"
-        metrics = {}
-        async for key in self.r.scan_iter(match=pattern):
-            key_str = key if isinstance(key, str) else key.decode()
-            parts = key_str.split(":")
-            # Daily keys: metrics:date:metric or metrics:date:metric:tag=val
-            # Skip hourly keys: metrics:date:HH:metric (where HH is 2 digits)
-            after_date = parts[2] if len(parts) > 2 else ""
-            if len(after_date) == 2 and after_date.isdigit():
-                continue  # hourly key
-            name = key_str.replace(f"metrics:{date}:", "")
-            val = await self.r.get(key)
-            metrics[name] = int(val or 0)
+        # One HGETALL regardless of how many metrics/tag combinations exist
+        raw = await self.r.hgetall(f"metrics:{date}")
+        metrics = {_s(k): int(v or 0) for k, v in (raw or {}).items()}
 
         # Compute derived metrics
         total_scans = metrics.get("scans_total", 0)
@@ -103,12 +218,14 @@ class MetricsService:
         if not date:
             date = datetime.now(timezone.utc).strftime("%Y-%m-%d")
 
-        hourly = {}
+        pipe = self.r.pipeline(transaction=False)
         for hour in range(24):
-            hh = f"{hour:02d}"
-            key = f"metrics:{date}:{hh}:scans_total"
-            val = await self.r.get(key)
+            pipe.hget(f"metrics:{date}:{hour:02d}", "scans_total")
+        values = await pipe.execute()
+
+        hourly = {}
+        for hour, val in enumerate(values):
             if val:
-                hourly[f"{hh}:00"] = int(val)
+                hourly[f"{hour:02d}:00"] = int(val)
 
         return {"date": date, "hourly_scans": hourly}
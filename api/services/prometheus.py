@@ -0,0 +1,370 @@
+"""In-process OpenMetrics instruments for the scan pipeline.
+
+Deliberately tiny (no prometheus_client dependency): counters, gauges and
+fixed-bucket histograms are plain dicts behind one lock, so recording is a
+couple of dict operations and safe from worker threads. Gauges and counters
+that mirror state owned elsewhere (thread-pool usage, client call totals)
+are sampled by callbacks at scrape time instead of being updated on the hot
+path.
+
+Scraped via ``GET /metrics`` (see ``api/routers/metrics.py``).
+"""
+
+from __future__ import annotations
+
+import math
+import threading
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+CONTENT_TYPE = "application/openmetrics-text; version=1.0.0; charset=utf-8"
+
+LabelValues = Tuple[str, ...]
+
+_lock = threading.Lock()
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _fmt(v: float) -> str:
+    if v == math.inf:
+        return "+Inf"
+    if float(v).is_integer():
+        return str(int(v))
+    return repr(float(v))
+
+
+class _Metric:
+    kind = "unknown"
+
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = ()) -> None:
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+
+    def _key(self, labels: Dict[str, str]) -> LabelValues:
+        return tuple(str(labels.get(n, "")) for n in self.labelnames)
+
+    def header(self) -> List[str]:
+        return [f"# TYPE {self.name} {self.kind}", f"# HELP {self.name} {self.help}"]
+
+    def samples(self) -> Iterable[str]:  # pragma: no cover - abstract
+        return ()
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(
+        self,
+        name: str,
+        help_text: str,
+        labelnames: Sequence[str] = (),
+        callback: Optional[Callable[[], Dict[LabelValues, float]]] = None,
+    ) -> None:
+        super().__init__(name, help_text, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+        # Monotonic totals kept elsewhere (e.g. a client's "since start" stats).
+        self._callback = callback
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = self._key(labels)
+        with _lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def samples(self) -> Iterable[str]:
+        if self._callback is not None:
+            try:
+                items = list(self._callback().items())
+            except Exception:
+                items = []
+        else:
+            with _lock:
+                items = list(self._values.items())
+        for key, v in items:
+            yield f"{self.name}_total{_labels(self.labelnames, key)} {_fmt(v)}"
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def __init__(
+        self,
+        name: str,
+        help_text: str,
+        labelnames: Sequence[str] = (),
+        callback: Optional[Callable[[], Dict[LabelValues, float]]] = None,
+    ) -> None:
+        super().__init__(name, help_text, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+        self._callback = callback
+
+    def set(self, value: float, **labels: str) -> None:
+        with _lock:
+            self._values[self._key(labels)] = float(value)
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = self._key(labels)
+        with _lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def dec(self, amount: float = 1.0, **labels: str) -> None:
+        self.inc(-amount, **labels)
+
+    def samples(self) -> Iterable[str]:
+        if self._callback is not None:
+            try:
+                items = list(self._callback().items())
+            except Exception:
+                items = []
+        else:
+            with _lock:
+                items = list(self._values.items())
+        for key, v in items:
+            yield f"{self.name}{_labels(self.labelnames, key)} {_fmt(v)}"
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = ()) -> None:
+        super().__init__(name, help_text, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+        # label values -> [per-bucket counts..., sum]
+        self._values: Dict[LabelValues, List[float]] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        idx = len(self.buckets) - 1
+        for i, upper in enumerate(self.buckets):
+            if value <= upper:
+                idx = i
+                break
+        with _lock:
+            row = self._values.get(key)
+            if row is None:
+                row = self._values[key] = [0.0] * (len(self.buckets) + 1)
+            row[idx] += 1
+            row[-1] += value
+
+    def samples(self) -> Iterable[str]:
+        with _lock:
+            items = [(k, list(v)) for k, v in self._values.items()]
+        for key, row in items:
+            cumulative = 0.0
+            for upper, n in zip(self.buckets, row):
+                cumulative += n
+                le = 'le="' + _fmt(upper) + '"'
+                yield f"{self.name}_bucket{_labels(self.labelnames, key, le)} {_fmt(cumulative)}"
+            yield f"{self.name}_count{_labels(self.labelnames, key)} {_fmt(cumulative)}"
+            yield f"{self.name}_sum{_labels(self.labelnames, key)} {_fmt(row[-1])}"
+
+
+class Registry:
+    def __init__(self) -> None:
+        self._metrics: Dict[str, _Metric] = {}
+
+    def register(self, metric: _Metric) -> _Metric:
+        return self._metrics.setdefault(metric.name, metric)
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in self._metrics.values():
+            lines.extend(metric.header())
+            lines.extend(metric.samples())
+        lines.append("# EOF")
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+
+def _thread_pool_stats() -> Dict[LabelValues, float]:
+    import anyio.to_thread
+
+    from .executors import pool_stats
+
+    stats = anyio.to_thread.current_default_thread_limiter().statistics()
+    out = {
+        ("default", "borrowed"): float(stats.borrowed_tokens),
+        ("default", "total"): float(stats.total_tokens),
+        ("default", "waiting"): float(stats.tasks_waiting),
+    }
+    for pool, values in pool_stats().items():
+        for state, v in values.items():
+            out[(pool, state)] = v
+    return out
+
+
+def _queue_depth() -> Dict[LabelValues, float]:
+    stats = _thread_pool_stats()
+    return {(pool,): v for (pool, state), v in stats.items() if state == "waiting"}
+
+
+def _metrics_buffer_stats() -> Dict[LabelValues, float]:
+    from .metrics import get_metrics_buffer
+
+    buf = get_metrics_buffer()
+    return {("pending",): float(len(buf._counters)), ("dropped",): float(buf.dropped)}  # noqa: SLF001
+
+
+def _log_pipeline_stats() -> Dict[LabelValues, float]:
+    from src.log_pipeline import log_stats
+
+    stats = log_stats()
+    return {(k,): float(stats[k]) for k in ("enqueued", "dropped", "sampled_out", "queue_depth")}
+
+
+def _log_producer_cost() -> Dict[LabelValues, float]:
+    from src.log_pipeline import log_stats
+
+    return {(): log_stats()["avg_producer_us"] / 1e6}
+
+
+def _fetch_cache_stats() -> Dict[LabelValues, float]:
+    from .. import deps
+
+    scanner = deps._scanner_singleton  # noqa: SLF001
+    if scanner is None:
+        return {}
+    out: Dict[LabelValues, float] = {}
+    for source, counts in scanner.fetcher.cache.stats().items():
+        out[(source, "hit")] = float(counts["hits"])
+        out[(source, "miss")] = float(counts["misses"])
+    return out
+
+
+def _etherscan_stats() -> Dict[LabelValues, float]:
+    from src.services.etherscan_scheduler import get_etherscan_scheduler
+
+    stats = get_etherscan_scheduler().stats()
+    out: Dict[LabelValues, float] = {}
+    for key, s in stats["keys"].items():
+        for field in ("calls", "rate_limited", "errors"):
+            out[(key, field)] = float(s[field])
+    out[("all", "coalesced")] = float(stats["coalesced"])
+    out[("all", "timeouts")] = float(stats["timeouts"])
+    return out
+
+
+def _etherscan_waiting() -> Dict[LabelValues, float]:
+    from src.services.etherscan_scheduler import get_etherscan_scheduler
+
+    return {(): float(get_etherscan_scheduler().stats()["waiting"])}
+
+
+def _solana_rpc_stats() -> Dict[LabelValues, float]:
+    from src.services.solana_rpc import get_solana_rpc
+
+    stats = get_solana_rpc().stats()
+    out: Dict[LabelValues, float] = {}
+    for name, s in stats["endpoints"].items():
+        for field, value in s.items():
+            if field != "idle":
+                out[(name, field)] = float(value)
+    out[("all", "fallbacks")] = float(stats["fallbacks"])
+    return out
+
+
+def _solana_rpc_idle() -> Dict[LabelValues, float]:
+    from src.services.solana_rpc import get_solana_rpc
+
+    return {(name,): float(s["idle"]) for name, s in get_solana_rpc().stats()["endpoints"].items()}
+
+
+def _scan_jobs_in_flight() -> Dict[LabelValues, float]:
+    from .scan_jobs import jobs_in_flight
+
+    return {(): float(jobs_in_flight())}
+
+
+SCANS = REGISTRY.register(Counter("vs_scans", "Completed scans", ("chain", "tier")))
+CACHE_REQUESTS = REGISTRY.register(Counter("vs_cache_requests", "Scan cache lookups", ("result",)))
+SCANS_IN_FLIGHT = REGISTRY.register(Gauge("vs_scans_in_flight", "Scans currently executing"))
+SSE_CONNECTIONS = REGISTRY.register(Gauge("vs_sse_connections", "Open SSE scan streams"))
+RATE_LIMITED = REGISTRY.register(
+    Counter("vs_rate_limited", "Requests rejected with HTTP 429", ("endpoint", "tier"))
+)
+PREFILTER_REJECTED = REGISTRY.register(
+    Counter("vs_prefilter_rejections", "Requests rejected by the local pre-filter (no Redis)", ("reason",))
+)
+PROVIDER_THROTTLED = REGISTRY.register(
+    Counter("vs_provider_throttled", "HTTP 429 responses received from LLM providers", ("provider",))
+)
+PROVIDER_LATENCY = REGISTRY.register(
+    Histogram(
+        "vs_llm_request_duration_seconds",
+        "LLM provider round-trip latency",
+        ("provider", "model", "outcome"),
+        buckets=(0.25, 0.5, 1, 2, 4, 8, 15, 30, 60),
+    )
+)
+THREAD_POOL = REGISTRY.register(
+    Gauge("vs_thread_pool_tokens", "Worker-thread limiter usage", ("pool", "state"), callback=_thread_pool_stats)
+)
+QUEUE_DEPTH = REGISTRY.register(
+    Gauge("vs_queue_depth", "Tasks waiting for a worker thread", ("pool",), callback=_queue_depth)
+)
+SCAN_JOBS = REGISTRY.register(Counter("vs_scan_jobs", "Finished async scan jobs", ("status",)))
+SCAN_JOBS_IN_FLIGHT = REGISTRY.register(
+    Gauge("vs_scan_jobs_in_flight", "Async scan jobs queued or running on this worker", callback=_scan_jobs_in_flight)
+)
+WEBHOOK_DELIVERIES = REGISTRY.register(
+    Counter("vs_webhook_deliveries", "Scan job webhook deliveries", ("outcome",))
+)
+FETCH_CACHE = REGISTRY.register(
+    Counter("vs_fetch_cache_lookups", "DataFetcher upstream cache lookups", ("source", "result"), callback=_fetch_cache_stats)
+)
+ETHERSCAN = REGISTRY.register(
+    Counter("vs_etherscan_calls", "Etherscan scheduler counters per API key (masked)", ("key", "state"), callback=_etherscan_stats)
+)
+ETHERSCAN_WAITING = REGISTRY.register(
+    Gauge("vs_etherscan_waiting", "Etherscan calls queued for a rate-limit slot", callback=_etherscan_waiting)
+)
+SOLANA_RPC = REGISTRY.register(
+    Counter("vs_solana_rpc", "Solana RPC client counters per endpoint", ("endpoint", "state"), callback=_solana_rpc_stats)
+)
+SOLANA_RPC_IDLE = REGISTRY.register(
+    Gauge("vs_solana_rpc_idle_connections", "Pooled idle Solana RPC connections", ("endpoint",), callback=_solana_rpc_idle)
+)
+SCANS_IN_FLIGHT.set(0)
+SSE_CONNECTIONS.set(0)
+METRICS_BUFFER = REGISTRY.register(
+    Gauge("vs_metrics_buffer", "Buffered Redis metric fields", ("state",), callback=_metrics_buffer_stats)
+)
+
+LOG_RECORDS = REGISTRY.register(
+    Gauge("vs_log_records", "Structured log pipeline records", ("state",), callback=_log_pipeline_stats)
+)
+LOG_PRODUCER_COST = REGISTRY.register(
+    Gauge(
+        "vs_log_producer_avg_seconds",
+        "Mean caller-side cost of enqueueing a log record",
+        callback=_log_producer_cost,
+    )
+)
+
+
+def observe_llm_request(provider: str, model: str, elapsed_ms: float, error: Optional[BaseException]) -> None:
+    """``AIClient`` request observer (see ``src.agents.ai_client``)."""
+    outcome = "ok" if error is None else "error"
+    if error is not None and "HTTP 429" in str(error):
+        outcome = "throttled"
+        PROVIDER_THROTTLED.inc(provider=provider)
+    PROVIDER_LATENCY.observe(elapsed_ms / 1000.0, provider=provider, model=model, outcome=outcome)
+    if error is None:
+        from .latency import get_latency_recorder, llm_series
+
+        get_latency_recorder().record(llm_series(provider, model), elapsed_ms)
+
+
+def render() -> str:
+    return REGISTRY.render()
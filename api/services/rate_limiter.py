@@ -1,10 +1,68 @@
 from __future__ import annotations
 
+import hashlib
+import time
 from dataclasses import dataclass
 from datetime import datetime, timedelta, timezone
-from typing import Dict, Tuple
+from typing import Dict, Optional, Tuple
 
 import redis.asyncio as redis
+from redis.exceptions import NoScriptError
+
+# Atomic quota check: fixed-window daily counter + token-bucket burst limit.
+#
+# KEYS[1]  daily counter            KEYS[2]  burst bucket hash {tokens, ts}
+# ARGV[1]  cost                     ARGV[2]  daily limit (<= 0: unlimited, still counted)
+# ARGV[3]  daily TTL (s)            ARGV[4]  burst capacity (<= 0: no burst limit)
+# ARGV[5]  burst refill (tokens/s)  ARGV[6]  now (ms)
+# ARGV[7]  burst cost (clamped to the capacity)
+#
+# The daily counter is charged the full ``cost``; the burst bucket limits
+# request *rate*, so it is charged ``burst cost`` (1 per request by default).
+# Clamping keeps a charge above the capacity satisfiable once the bucket is
+# full instead of rejecting it forever.
+#
+# Returns {allowed, used_today, burst_tokens_left, retry_after_ms, reason}
+# with reason 0 = ok, 1 = daily quota, 2 = burst. Nothing is written when
+# the request is rejected.
+_QUOTA_LUA = """
+local cost = tonumber(ARGV[1])
+local limit = tonumber(ARGV[2])
+local cap = tonumber(ARGV[4])
+local rate = tonumber(ARGV[5])
+local now = tonumber(ARGV[6])
+local bcost = math.min(tonumber(ARGV[7]), cap)
+local used = tonumber(redis.call('GET', KEYS[1]) or '0')
+local tokens = -1
+
+if cap > 0 then
+  local b = redis.call('HMGET', KEYS[2], 'tokens', 'ts')
+  tokens = tonumber(b[1]) or cap
+  local ts = tonumber(b[2]) or now
+  tokens = math.min(cap, tokens + math.max(0, now - ts) * rate / 1000)
+  if tokens < bcost then
+    return {0, used, math.floor(tokens), math.ceil((bcost - tokens) * 1000 / rate), 2}
+  end
+end
+
+if limit > 0 and used + cost > limit then
+  local ttl = redis.call('PTTL', KEYS[1])
+  if ttl < 0 then ttl = tonumber(ARGV[3]) * 1000 end
+  return {0, used, math.floor(tokens), ttl, 1}
+end
+
+used = redis.call('INCRBY', KEYS[1], cost)
+if redis.call('TTL', KEYS[1]) < 0 then
+  redis.call('EXPIRE', KEYS[1], ARGV[3])
+end
+if cap > 0 then
+  tokens = tokens - bcost
+  redis.call('HSET', KEYS[2], 'tokens', tostring(tokens), 'ts', now)
+  redis.call('PEXPIRE', KEYS[2], math.ceil(cap * 1000 / rate) + 1000)
+end
+return {1, used, math.floor(tokens), 0, 0}
+"""
+_QUOTA_SHA = hashlib.sha1(_QUOTA_LUA.encode("utf-8")).hexdigest()
 
 
 class RateLimitExceeded(Exception):
@@ -22,6 +80,24 @@ class Usage:
     reset_at: datetime
 
 
+@dataclass(frozen=True)
+class QuotaDecision:
+    allowed: bool
+    used: int
+    limit: int
+    remaining: int
+    retry_after_s: int
+    reason: str  # "ok" | "daily" | "burst"
+
+
+_REASONS = {0: "ok", 1: "daily", 2: "burst"}
+
+
+async def load_scripts(r: redis.Redis) -> None:
+    """SCRIPT LOAD the limiter script (also done lazily on NOSCRIPT)."""
+    await r.script_load(_QUOTA_LUA)
+
+
 def _utc_midnight_next() -> datetime:
     now = datetime.now(timezone.utc)
     tomorrow = (now + timedelta(days=1)).date()
@@ -29,22 +105,87 @@ def _utc_midnight_next() -> datetime:
 
 
 class RedisRateLimiter:
-    def __init__(self, r: redis.Redis, *, tier_limits: Dict[str, int]):
+    def __init__(
+        self,
+        r: redis.Redis,
+        *,
+        tier_limits: Dict[str, int],
+        burst_capacity: int = 0,
+        burst_refill_per_s: float = 1.0,
+    ):
         self.r = r
         self.tier_limits = {k.lower(): int(v) for k, v in tier_limits.items()}
+        self.burst_capacity = int(burst_capacity)
+        self.burst_refill_per_s = float(burst_refill_per_s)
 
     def limit_for_tier(self, tier: str) -> int:
         return int(self.tier_limits.get((tier or "agent").lower(), self.tier_limits.get("agent", 1000)))
 
-    async def consume(self, *, api_key_id: str, tier: str, cost: int = 1, identifier: str | None = None) -> Usage:
+    async def acquire(
+        self,
+        key: str,
+        *,
+        cost: int = 1,
+        limit: int,
+        ttl_s: int,
+        burst_key: Optional[str] = None,
+        burst_cost: int = 1,
+    ) -> QuotaDecision:
+        """Atomically check + charge ``cost`` against ``key`` in one round trip.
+
+        ``limit <= 0`` means unlimited (usage is still counted). The burst
+        bucket applies only when ``burst_key`` is given and a burst capacity
+        is configured; it is charged ``burst_cost`` (capped at the capacity),
+        not ``cost``, so one multi-unit request is one burst token.
+        """
+        capacity = self.burst_capacity if burst_key and self.burst_refill_per_s > 0 else 0
+        keys = [key, burst_key or f"{key}:burst"]
+        args = [
+            int(cost),
+            int(limit),
+            max(int(ttl_s), 1),
+            capacity,
+            self.burst_refill_per_s,
+            int(time.time() * 1000),
+            max(int(burst_cost), 0),
+        ]
+        try:
+            res = await self.r.evalsha(_QUOTA_SHA, len(keys), *keys, *args)
+        except NoScriptError:
+            await load_scripts(self.r)
+            res = await self.r.evalsha(_QUOTA_SHA, len(keys), *keys, *args)
+
+        allowed, used, _tokens, retry_ms, reason = (int(x) for x in res)
+        remaining = max(int(limit) - used, 0) if limit > 0 else 0
+        return QuotaDecision(
+            allowed=bool(allowed),
+            used=used,
+            limit=int(limit),
+            remaining=remaining,
+            retry_after_s=max(1, -(-retry_ms // 1000)) if not allowed else 0,
+            reason=_REASONS.get(reason, "ok"),
+        )
+
+    async def consume(
+        self,
+        *,
+        api_key_id: str,
+        tier: str,
+        cost: int = 1,
+        identifier: str | None = None,
+        burst_cost: int = 1,
+    ) -> Usage:
         """Consume rate limit quota.
 
         Args:
             api_key_id: API key ID (legacy, for backward compatibility)
             tier: Tier level
-            cost: Number of calls to consume (default 1)
+            cost: Number of calls to consume (default 1). Charged in full
+                  against the daily quota.
             identifier: Rate limit identifier (e.g., "ip:1.2.3.4" or "wallet:0x123")
                        If provided, this takes precedence over api_key_id
+            burst_cost: Burst-bucket tokens to take (default 1 per request;
+                  capped at the bucket capacity)
         """
         now = datetime.now(timezone.utc)
         reset_at = _utc_midnight_next()
@@ -59,19 +200,24 @@ class RedisRateLimiter:
         key_id = identifier if identifier else api_key_id
         k = f"rl:{key_id}:{now.date().isoformat()}"
 
-        # Increment by cost
-        pipe = self.r.pipeline()
-        pipe.incrby(k, int(cost))
-        pipe.expire(k, ttl)
-        calls_today, _ = await pipe.execute()
-
-        calls_today = int(calls_today)
-        remaining = max(calls_limit - calls_today, 0)
-
-        if calls_today > calls_limit:
-            raise RateLimitExceeded(retry_after_s=ttl, calls_limit=calls_limit)
-
-        return Usage(calls_today=calls_today, calls_limit=calls_limit, calls_remaining=remaining, reset_at=reset_at)
+        # Check + increment atomically; rejected calls are not charged.
+        decision = await self.acquire(
+            k,
+            cost=int(cost),
+            limit=calls_limit,
+            ttl_s=ttl,
+            burst_key=f"rl:burst:{key_id}",
+            burst_cost=burst_cost,
+        )
+        if not decision.allowed:
+            raise RateLimitExceeded(retry_after_s=decision.retry_after_s, calls_limit=calls_limit)
+
+        return Usage(
+            calls_today=decision.used,
+            calls_limit=calls_limit,
+            calls_remaining=decision.remaining,
+            reset_at=reset_at,
+        )
 
     async def get_usage(self, *, api_key_id: str, tier: str, identifier: str | None = None) -> Usage:
         """Get current usage without consuming quota.
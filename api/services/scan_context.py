@@ -0,0 +1,70 @@
+"""Per-scan state for the SSE pipeline.
+
+Everything a streamed scan mutates — event bus and flush cursor, verdicts,
+per-agent timings, debate log, the challenge-pair de-duplication set, trace
+and deadline — lives on one ``ScanContext`` that is passed explicitly to the
+debate helpers. Nothing is shared between concurrent scans in a worker, so
+helpers can be exercised in isolation with a fresh context.
+"""
+
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from src.services.tracing import Trace
+
+from ..models.scan_events import ScanEvent
+from .event_bus import ScanEventBus
+
+
+@dataclass
+class ScanContext:
+    scan_id: str
+    bus: ScanEventBus = field(default_factory=ScanEventBus)
+    trace: Optional[Trace] = None
+    # SSE reconnection: only replay events newer than this (Last-Event-ID)
+    last_event_ts: Optional[int] = None
+    # time.monotonic() deadline for optional stages (debates, convergence)
+    deadline: Optional[float] = None
+
+    verdicts: Dict[str, Any] = field(default_factory=dict)
+    timings: Dict[str, float] = field(default_factory=dict)
+    debates_log: List[Dict[str, str]] = field(default_factory=list)
+    challenge_pairs: Set[Tuple[str, str]] = field(default_factory=set)
+    cursor: int = 0
+
+    @classmethod
+    def create(
+        cls,
+        scan_id: str,
+        *,
+        budget_s: Optional[float] = None,
+        last_event_ts: Optional[int] = None,
+    ) -> "ScanContext":
+        deadline = time.monotonic() + budget_s if budget_s and budget_s > 0 else None
+        return cls(scan_id=scan_id, trace=Trace(scan_id), last_event_ts=last_event_ts, deadline=deadline)
+
+    def pending_events(self) -> List[ScanEvent]:
+        """Events emitted since the last call (i.e. not yet yielded)."""
+        all_events = self.bus.replay(after_timestamp=self.last_event_ts)
+        result = all_events[self.cursor:]
+        self.cursor = len(all_events)
+        return result
+
+    def claim_challenge_pair(self, a: str, b: str) -> bool:
+        """True the first time the unordered pair (a, b) is seen in this scan."""
+        key = (a, b) if a <= b else (b, a)
+        if key in self.challenge_pairs:
+            return False
+        self.challenge_pairs.add(key)
+        return True
+
+    def remaining_s(self) -> Optional[float]:
+        if self.deadline is None:
+            return None
+        return max(0.0, self.deadline - time.monotonic())
+
+    def expired(self) -> bool:
+        return self.deadline is not None and time.monotonic() >= self.deadline
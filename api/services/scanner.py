@@ -1,11 +1,10 @@
 from __future__ import annotations
 
 import asyncio
+import logging
 from datetime import datetime, timezone
 from typing import Any, Dict, List, Optional, Tuple
 
-import anyio
-
 # Import from ../src (relative to repo root)
 from src.agents import (
     DevilsAdvocate,
@@ -16,11 +15,22 @@ from src.agents import (
     TokenomicsBot,
 )
 from src.data_fetcher import DataFetcher, TokenData, is_solana_address
+from src.services.chain_resolver import is_auto_chain
+from src.services.facts_store import FactsStore, RedisFactsStore, TieredFactsStore, local_facts_store
+from src.services.source_store import RedisSourceStore, set_source_store
 from src.scoring_engine import AgentVerdict, ScoringEngine
 from src.tier_config import allowed_bots_for_tier
 from src.free_tier import free_tier_scan
+from src.services.fetch_cache import FetchCache, MemoryFetchCache, RedisFetchCache, TieredFetchCache
+from src.services.tracing import span
 from src.tiers import TierLevel
 
+from ..config import get_settings
+from .executors import run_in
+from .latency import get_latency_recorder
+
+logger = logging.getLogger(__name__)
+
 
 def _risk_level(score_0_to_10: float) -> str:
     # Higher score => safer. Convert to risk.
@@ -46,17 +56,94 @@ def _tier_from_str(tier: str | None) -> TierLevel:
     return TierLevel.FREE
 
 
+def _sync_redis(purpose: str) -> Optional[Any]:
+    """Synchronous Redis client for the fetch-thread stores, or None if unreachable.
+
+    ``from_url`` connects lazily, so the client is pinged once here: with Redis
+    down, every store call would otherwise wait out the connect timeout.
+    """
+    try:
+        import redis as sync_redis
+
+        # Called from fetch worker threads, so a plain synchronous client.
+        client = sync_redis.Redis.from_url(
+            get_settings().redis_url,
+            socket_timeout=0.5,
+            socket_connect_timeout=0.5,
+        )
+        client.ping()
+    except Exception as e:
+        logger.warning("%s falling back to in-process storage (%s)", purpose, e)
+        return None
+    return client
+
+
+def build_fetch_cache() -> FetchCache:
+    """DataFetcher cache shared by every scan in this process (FETCH_CACHE_BACKEND)."""
+    settings = get_settings()
+    backend = (settings.fetch_cache_backend or "memory").strip().lower()
+    local = MemoryFetchCache(max_entries=settings.fetch_cache_max_entries)
+    if backend not in {"redis", "tiered"}:
+        return local
+    client = _sync_redis("Fetch cache")
+    if client is None:
+        return local
+    shared = RedisFetchCache(client)
+    return shared if backend == "redis" else TieredFetchCache(local, shared)
+
+
+def build_facts_store() -> FactsStore:
+    """Immutable on-chain facts (FACTS_STORE_BACKEND; local copy via VS_FACTS_SQLITE_PATH)."""
+    local = local_facts_store()
+    if (get_settings().facts_store_backend or "redis").strip().lower() != "redis":
+        return local
+    client = _sync_redis("Facts store")
+    if client is None:
+        return local
+    return TieredFactsStore(local, RedisFactsStore(client))
+
+
+def install_source_store() -> None:
+    """Share verified source and per-source analyses across workers (SOURCE_STORE_BACKEND)."""
+    if (get_settings().source_store_backend or "redis").strip().lower() != "redis":
+        return  # per-process memory store (the default in src/)
+    client = _sync_redis("Source store")
+    if client is not None:
+        set_source_store(RedisSourceStore(client))
+
+
 class ScannerService:
     def __init__(self) -> None:
-        self.fetcher = DataFetcher()
+        install_source_store()
+        self.fetcher = DataFetcher(cache=build_fetch_cache(), facts=build_facts_store())
         self.engine = ScoringEngine()
 
+    async def resolve_chain(self, address: str, chain: Optional[str]) -> str:
+        """``chain`` as given, or the detected one when it is ``"auto"``/empty."""
+        if not is_auto_chain(chain):
+            return str(chain)
+        if is_solana_address(address):
+            return "solana"
+        with span("resolve_chain"):
+            return await run_in("fetch", self.fetcher.resolve_chain, address)
+
     async def _fetch_token_data(self, address: str, chain: str) -> TokenData:
         # Auto-detect Solana vs EVM
         chain_lower = (chain or "base").lower().strip()
-        if chain_lower == "solana" or is_solana_address(address):
-            return await anyio.to_thread.run_sync(self.fetcher.fetch_solana_token_data, address)
-        return await anyio.to_thread.run_sync(self.fetcher.fetch, address, chain)
+        with get_latency_recorder().time("stage:fetch"), span("fetch", chain=chain_lower):
+            if chain_lower == "solana" or is_solana_address(address):
+                return await run_in("fetch", self.fetcher.fetch_solana_token_data, address)
+            return await run_in("fetch", self.fetcher.fetch, address, chain)
+
+    async def prefetch_market(self, addresses: List[str]) -> None:
+        """Warm the market cache for many tokens (30 per DexScreener request)."""
+        if len(addresses) < 2:
+            return
+        try:
+            with span("fetch:market_many", addresses=len(addresses)):
+                await run_in("fetch", self.fetcher.fetch_market_many, addresses)
+        except Exception as e:
+            logger.warning("Batched market prefetch failed for %s tokens: %s", len(addresses), e)
 
     async def _run_bots(
         self,
@@ -74,7 +161,7 @@ class ScannerService:
 
         async def run_one(bot_cls):
             bot = bot_cls(model_overrides=None)
-            return bot.name, await anyio.to_thread.run_sync(bot.analyze, token_data)
+            return bot.name, await run_in("llm", bot.analyze, token_data)
 
         # Run all bots in parallel
         results = await asyncio.gather(*[run_one(bc) for bc in bots])
@@ -96,6 +183,7 @@ class ScannerService:
         # - full/debate: include devils advocate + scambot raw output
         # tier affects *which bots are allowed to run at all*.
         depth_l = (depth or "basic").lower()
+        chain = await self.resolve_chain(address, chain)
 
         tier_level = _tier_from_str(tier)
         allowed = allowed_bots_for_tier(tier_level)
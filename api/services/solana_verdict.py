@@ -8,11 +8,14 @@ Network: Devnet for hackathon, mainnet-beta for production.
 
 import hashlib
 import json
+import logging
 import os
 import struct
 import time
 from typing import Optional
 
+logger = logging.getLogger(__name__)
+
 # Lazy imports — these are heavy and only needed when storing on-chain
 _solana_available = None
 
@@ -27,7 +30,7 @@ def _check_solana_deps() -> bool:
         import solana  # noqa: F401
         _solana_available = True
     except ImportError:
-        print("[WARN] Solana dependencies not installed (solders, solana). On-chain verdicts disabled.")
+        logger.warning("Solana dependencies not installed (solders, solana). On-chain verdicts disabled.")
         _solana_available = False
     return _solana_available
 
@@ -64,7 +67,7 @@ async def store_verdict_onchain(scan_result: dict) -> Optional[dict]:
         program_id_str = os.getenv("VERDICTSWARM_PROGRAM_ID", "")
 
         if not keypair_path or not program_id_str:
-            print("[WARN] SOLANA_KEYPAIR_PATH or VERDICTSWARM_PROGRAM_ID not set. Skipping on-chain storage.")
+            logger.warning("SOLANA_KEYPAIR_PATH or VERDICTSWARM_PROGRAM_ID not set. Skipping on-chain storage.")
             return None
 
         # Load keypair
@@ -142,7 +145,7 @@ async def store_verdict_onchain(scan_result: dict) -> Optional[dict]:
             cluster_param = f"?cluster={network}" if network != "mainnet-beta" else ""
             explorer_url = f"https://explorer.solana.com/tx/{tx_sig}{cluster_param}"
 
-            print(f"[INFO] Verdict stored on-chain: {explorer_url}")
+            logger.info("Verdict stored on-chain: %s", explorer_url)
 
             return {
                 "txSignature": tx_sig,
@@ -152,5 +155,5 @@ async def store_verdict_onchain(scan_result: dict) -> Optional[dict]:
             }
 
     except Exception as e:
-        print(f"[WARN] On-chain verdict storage failed: {e}")
+        logger.warning("On-chain verdict storage failed: %s", e)
         return None
@@ -29,6 +29,7 @@ try:
     from .agents.scam_bot import ScamBot  # type: ignore
     from .data_fetcher import DataFetcher, TokenData  # type: ignore
     from .scoring_engine import AgentVerdict, ScoringEngine  # type: ignore
+    from .services.chain_resolver import is_auto_chain  # type: ignore
     from .tier_config import allowed_bots_for_tier, can_use_swarm_debate, get_rate_limit  # type: ignore
     from .tiers import TierLevel, tier_badge, tier_name  # type: ignore
     from .token_gate import TokenGate  # type: ignore
@@ -41,6 +42,7 @@ except ImportError:  # pragma: no cover
     from agents.scam_bot import ScamBot
     from data_fetcher import DataFetcher, TokenData
     from scoring_engine import AgentVerdict, ScoringEngine
+    from services.chain_resolver import is_auto_chain
     from tier_config import allowed_bots_for_tier, can_use_swarm_debate, get_rate_limit
     from tiers import TierLevel, tier_badge, tier_name
     from token_gate import TokenGate
@@ -276,14 +278,15 @@ def build_parser() -> argparse.ArgumentParser:
 
     # CLI shape:
     #   python -m verdictswarm report 0x... --chain ethereum --format md
+    #   python -m verdictswarm bulk addresses.txt --out results.jsonl
     # Back-compat:
     #   python -m verdictswarm 0x...
     #   python -m verdictswarm analyze 0x...
-    p.add_argument("command", nargs="?", help="Subcommand: report|analyze (default: report)")
+    p.add_argument("command", nargs="?", help="Subcommand: report|analyze|bulk (default: report)")
     p.add_argument("address", nargs="?", help="Token contract address (0x…)")
     p.add_argument("address2", nargs="?", help=argparse.SUPPRESS)
 
-    p.add_argument("--chain", default="base", help="Chain name (default: base)")
+    p.add_argument("--chain", default="auto", help="Chain name (default: auto-detect)")
 
     p.add_argument("--wallet", default=None, help="Wallet address for token-gated tier resolution")
     p.add_argument(
@@ -313,6 +316,15 @@ def build_parser() -> argparse.ArgumentParser:
 
 
 def main(argv: Optional[List[str]] = None) -> int:
+    argv = list(sys.argv[1:] if argv is None else argv)
+    if argv and argv[0] == "bulk":
+        # Many addresses → JSONL/Parquet (see bulk.py); has its own options.
+        try:
+            from .bulk import main as bulk_main  # type: ignore
+        except ImportError:  # pragma: no cover
+            from bulk import main as bulk_main
+        return bulk_main(argv[1:])
+
     args = build_parser().parse_args(argv)
 
     debug = bool(str(__import__("os").environ.get("VERDICTSWARM_DEBUG", "")).strip())
@@ -348,7 +360,7 @@ def main(argv: Optional[List[str]] = None) -> int:
         sys.stderr.write(f"Error: {e}\n")
         return 2
 
-    chain = str(args.chain or "base")
+    chain = str(args.chain or "auto")
 
     dprint("parsed args")
 
@@ -418,6 +430,9 @@ def main(argv: Optional[List[str]] = None) -> int:
     allowed = allowed_bots_for_tier(tier)
 
     fetcher = DataFetcher()
+    if is_auto_chain(chain):
+        chain = fetcher.resolve_chain(address)
+        dprint(f"resolved chain={chain}")
 
     # Validate that the address is actually a contract (EOA => clear error).
     dprint("checking is_contract_address")
@@ -437,6 +452,7 @@ def main(argv: Optional[List[str]] = None) -> int:
             ScamBot().analyze(
                 {
                     "contract_source": token_data.source_code,
+                    "source_hash": token_data.source_hash,
                     "contract_address": token_data.contract_address,
                     "chain": chain,
                     "contract_age_days": token_data.contract_age_days,
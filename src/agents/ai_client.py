@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import ast
+import contextvars
 import json
 import logging
 import os
@@ -8,10 +9,16 @@ import re
 import socket
 import time
 from dataclasses import dataclass
-from typing import Any, Dict, List, Literal, Optional
+from typing import Any, Callable, Dict, List, Literal, Optional
 from urllib.error import HTTPError, URLError
 from urllib.request import Request, urlopen
 
+try:
+    from ..services.tracing import span  # type: ignore
+except ImportError:  # pragma: no cover
+    # When running from this repo with `src/` on PYTHONPATH.
+    from services.tracing import span
+
 # Ensure outbound HTTP requests fail fast (avoid CLI hangs on network stalls)
 socket.setdefaulttimeout(30.0)
 
@@ -20,6 +27,32 @@ logger = logging.getLogger(__name__)
 
 Provider = Literal["gemini", "xai", "openai", "anthropic", "moonshot"]
 
+# Optional request observers, called after every provider round trip as
+# ``fn(provider, model, elapsed_ms, error_or_None)``. The API registers one to
+# feed its latency histograms / Prometheus instruments; keep them cheap.
+RequestObserver = Callable[[str, str, float, Optional[BaseException]], None]
+_request_observers: List[RequestObserver] = []
+
+
+def add_request_observer(fn: RequestObserver) -> None:
+    if fn not in _request_observers:
+        _request_observers.append(fn)
+
+
+def _notify_observers(provider: str, model: str, elapsed_ms: float, error: Optional[BaseException]) -> None:
+    for fn in list(_request_observers):
+        try:
+            fn(provider, model, elapsed_ms, error)
+        except Exception:  # pragma: no cover - observers must never break a call
+            logger.debug("AIClient request observer failed", exc_info=True)
+
+
+# Timeout for the provider round trip in progress (see ``AIClient.deadline_s``).
+_call_timeout_s: contextvars.ContextVar[Optional[float]] = contextvars.ContextVar("ai_call_timeout_s", default=None)
+
+# ``fn(provider, model, default_s) -> seconds``: per-call timeout policy.
+DeadlinePolicy = Callable[[str, str, float], float]
+
 
 def _extract_first_json_object(text: str) -> str:
     """Best-effort extraction of the first complete JSON object from model output."""
@@ -82,6 +115,9 @@ class AIClient:
     gemini_pro_model: str = ""
     xai_model: str = ""
     timeout_s: float = 20.0
+    # Optional per-call timeout, asked before every round trip with this
+    # client's ``timeout_s`` as the default (e.g. from observed latency).
+    deadline_s: Optional[DeadlinePolicy] = None
 
     # Optional per-provider model defaults (overridable via env)
     openai_model: str = ""
@@ -188,6 +224,7 @@ class AIClient:
                     model=model,
                     temperature=temperature,
                     max_output_tokens=max_output_tokens,
+                    attempt=attempt + 1,
                 )
 
                 json_text = _extract_first_json_object(raw_text)
@@ -237,7 +274,8 @@ class AIClient:
 
     def _request_json(self, req: Request) -> Dict[str, Any]:
         try:
-            with urlopen(req, timeout=float(self.timeout_s)) as resp:
+            timeout_s = _call_timeout_s.get() or self.timeout_s
+            with urlopen(req, timeout=float(timeout_s)) as resp:
                 raw = resp.read().decode("utf-8")
         except HTTPError as e:
             try:
@@ -248,7 +286,7 @@ class AIClient:
                 f"HTTP {e.code} for {req.full_url}: {body or e.reason}"
             ) from e
         except (socket.timeout, TimeoutError) as e:
-            raise TimeoutError(f"Timeout after {self.timeout_s}s for {req.full_url}") from e
+            raise TimeoutError(f"Timeout after {timeout_s}s for {req.full_url}") from e
         except URLError as e:
             raise RuntimeError(f"Network error for {req.full_url}: {e.reason}") from e
 
@@ -267,6 +305,72 @@ class AIClient:
         temperature: float,
         max_output_tokens: int,
         json_mode: bool = True,
+        attempt: int = 1,
+    ) -> str:
+        timeout_s = self.timeout_s
+        if self.deadline_s is not None:
+            try:
+                timeout_s = float(self.deadline_s(provider, model or "default", self.timeout_s))
+            except Exception:  # pragma: no cover - a policy must never break a call
+                logger.debug("AIClient deadline policy failed", exc_info=True)
+        token = _call_timeout_s.set(timeout_s)
+        try:
+            return self._timed_chat_text(
+                provider=provider, system=system, user=user, model=model, temperature=temperature,
+                max_output_tokens=max_output_tokens, json_mode=json_mode, attempt=attempt,
+            )
+        finally:
+            _call_timeout_s.reset(token)
+
+    def _timed_chat_text(
+        self,
+        *,
+        provider: Provider,
+        system: str,
+        user: str,
+        model: Optional[str],
+        temperature: float,
+        max_output_tokens: int,
+        json_mode: bool,
+        attempt: int,
+    ) -> str:
+        with span(
+            f"llm:{provider}/{model or 'default'}",
+            attempt=attempt,
+            prompt_chars=len(system) + len(user),
+        ) as sp:
+            if not _request_observers:
+                text = self._dispatch_chat_text(
+                    provider=provider, system=system, user=user, model=model,
+                    temperature=temperature, max_output_tokens=max_output_tokens, json_mode=json_mode,
+                )
+            else:
+                start = time.perf_counter()
+                error: Optional[BaseException] = None
+                try:
+                    text = self._dispatch_chat_text(
+                        provider=provider, system=system, user=user, model=model,
+                        temperature=temperature, max_output_tokens=max_output_tokens, json_mode=json_mode,
+                    )
+                except BaseException as e:
+                    error = e
+                    raise
+                finally:
+                    _notify_observers(provider, model or "default", (time.perf_counter() - start) * 1000, error)
+            if sp is not None:
+                sp.set(response_chars=len(text or ""))
+            return text
+
+    def _dispatch_chat_text(
+        self,
+        *,
+        provider: Provider,
+        system: str,
+        user: str,
+        model: Optional[str],
+        temperature: float,
+        max_output_tokens: int,
+        json_mode: bool = True,
     ) -> str:
         if provider == "xai":
             return self._xai_chat_text(
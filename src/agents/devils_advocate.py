@@ -10,8 +10,11 @@ so it appears as additional notes.
 
 from __future__ import annotations
 
+import logging
 from typing import Any, Dict, Tuple
 
+logger = logging.getLogger(__name__)
+
 try:
     from ..scoring_engine import AgentVerdict  # type: ignore
     from ..data_fetcher import TokenData  # type: ignore
@@ -59,7 +62,7 @@ class DevilsAdvocate(BaseAgent):
         # Give DA extra timeout since it processes all prior verdicts
         client.timeout_s = max(client.timeout_s, 60.0)
         provider, model = self.routed_provider_model() or ("gemini", self.model_for("gemini") or client.gemini_pro_model)
-        print(f"[DA] Using provider={provider} model={model} has_provider={client.has_provider(provider)}")
+        logger.info("Using provider=%s model=%s has_provider=%s", provider, model, client.has_provider(provider))
         if not client.has_provider(provider):
             raise RuntimeError(f"{provider} API key not set")
 
@@ -160,7 +163,7 @@ class DevilsAdvocate(BaseAgent):
             self.emitter.thinking("Generating AI contrarian assessment — challenging the swarm…")
             try:
                 out = self._ai_contrarian_assessment(token_data, prior_verdicts=prior_verdicts)
-                print(f"[DA] AI call succeeded, got keys: {list(out.keys())}")
+                logger.info("AI call succeeded, got keys: %s", list(out.keys()))
                 score = float(out.get("score", score))
 
                 thesis = str(out.get("thesis", "")).strip()
@@ -200,7 +203,7 @@ class DevilsAdvocate(BaseAgent):
             except Exception as e:
                 import traceback
                 err_msg = f"{type(e).__name__}: {str(e)[:200]}"
-                print(f"[DA] AI contrarian assessment failed: {err_msg}")
+                logger.warning("AI contrarian assessment failed: %s", err_msg)
                 traceback.print_exc()
                 self.emitter.finding("info", "Devil's Advocate using heuristic analysis (AI response was malformed)")
                 # Keep heuristic notes, just append fallback note
@@ -2,9 +2,9 @@
 
 When an ``AIClient`` is available, MacroBot uses Gemini to reason about macro
 conditions and correlations **from provided context** (e.g., BTC/ETH regime,
-rates, DXY, sector narratives). This repo's MVP DataFetcher does not currently
-fetch macro data, so callers may optionally attach a ``macro_context`` payload
-onto TokenData.
+rates, DXY, sector narratives). DataFetcher attaches the global market snapshot
+as ``macro_context``; when it is missing MacroBot reads the shared
+market-context service directly.
 
 Falls back to a neutral heuristic verdict when no macro context is present or
 Gemini isn't configured.
@@ -17,9 +17,11 @@ from typing import Any, Dict, Tuple
 try:
     from ..scoring_engine import AgentVerdict  # type: ignore
     from ..data_fetcher import TokenData  # type: ignore
+    from ..services.market_context import get_market_context  # type: ignore
 except ImportError:  # pragma: no cover
     from scoring_engine import AgentVerdict
     from data_fetcher import TokenData
+    from services.market_context import get_market_context
 
 from .ai_client import AIClient
 from .base_agent import BaseAgent
@@ -47,7 +49,8 @@ class MacroBot(BaseAgent):
         if not client.has_provider(provider):
             raise RuntimeError(f"{provider} API key not set")
 
-        macro_context = getattr(token_data, "macro_context", None)
+        # Attached by DataFetcher; fall back to the shared snapshot (e.g. cached TokenData).
+        macro_context = getattr(token_data, "macro_context", None) or get_market_context().context_string()
 
         system = str(MACRO_SYSTEM)
 
@@ -10,9 +10,12 @@ Update prompts via: POST /api/admin/prompts (API-key protected)
 
 from __future__ import annotations
 
+import logging
 import os
 from typing import Optional
 
+logger = logging.getLogger(__name__)
+
 # Redis client — set at app startup by init_prompt_store()
 _redis_client = None
 
@@ -34,7 +37,7 @@ async def set_prompt(key: str, value: str) -> None:
             await _redis_client.set(f"prompt:{key}", value)
             written = True
         except Exception as e:
-            print(f"[WARN] Redis set failed for prompt:{key}: {e}")
+            logger.warning("Redis set failed for prompt:%s: %s", key, e)
     if not written:
         # Fallback: try direct Redis connection
         try:
@@ -46,7 +49,7 @@ async def set_prompt(key: str, value: str) -> None:
                 await r.aclose()
                 written = True
         except Exception as e:
-            print(f"[WARN] Direct Redis set also failed for prompt:{key}: {e}")
+            logger.warning("Direct Redis set also failed for prompt:%s: %s", key, e)
     _cache[key] = value
 
 
@@ -73,7 +76,7 @@ async def get_all_prompts() -> dict[str, str]:
                 if val:
                     result[name] = val.decode() if isinstance(val, bytes) else val
         except Exception as e:
-            print(f"[WARN] get_all_prompts failed: {e}")
+            logger.warning("get_all_prompts failed: %s", e)
     # Also include in-memory cache
     for k, v in _cache.items():
         if k not in result:
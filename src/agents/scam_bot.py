@@ -26,6 +26,14 @@ except Exception:  # pragma: no cover
         # Standalone / local execution.
         from token_whitelist import get_whitelist_info, is_whitelisted  # type: ignore
 
+try:
+    from ..services.source_store import get_source_store, source_hash  # type: ignore
+except Exception:  # pragma: no cover
+    try:
+        from src.services.source_store import get_source_store, source_hash  # type: ignore
+    except Exception:
+        from services.source_store import get_source_store, source_hash  # type: ignore
+
 
 # Legitimate/safe patterns that should reduce false positives.
 # These patterns are intentionally lightweight (regex / string markers) and are used
@@ -172,8 +180,8 @@ class ScamBot:
             "info": whitelist_info,
         }
 
-        # 1. Contract Analysis
-        contract_signals = await self._analyze_contract(token_data)
+        # 1. Contract Analysis (cached per normalized source, so template clones are free)
+        contract_signals, legitimate_patterns = await self._contract_analysis(token_data)
         signals_detected.extend(contract_signals["signals"])
         signal_details["contract"] = contract_signals["details"]
 
@@ -193,8 +201,6 @@ class ScamBot:
         signal_details["domain"] = domain_signals["details"]
 
         # Context-aware mitigation for known-safe / standard patterns
-        source_code = token_data.get("contract_source") or ""
-        legitimate_patterns = self._detect_legitimate_patterns(source_code)
         mitigated_signals: List[str] = []
 
         # If the token is whitelisted, treat common "red flags" as informational unless
@@ -347,6 +353,33 @@ class ScamBot:
                     return evidence
         return evidence
 
+    async def _contract_analysis(self, token_data: Dict) -> Tuple[Dict, List[str]]:
+        """Contract red flags and legitimate patterns, reused across identical sources."""
+        source = token_data.get("contract_source") or ""
+        if not source:
+            return await self._analyze_contract(token_data), []
+
+        store = get_source_store()
+        h = token_data.get("source_hash") or source_hash(source)
+        kind = f"scam_contract:{self.version}"
+        cached = store.get_analysis(kind, h)
+        if cached:
+            signals = [ScamSignal(v) for v in cached["signals"]]
+            return {"signals": signals, "details": cached["details"]}, list(cached["legitimate_patterns"])
+
+        result = await self._analyze_contract(token_data)
+        patterns = self._detect_legitimate_patterns(source)
+        store.put_analysis(
+            kind,
+            h,
+            {
+                "signals": [s.value for s in result["signals"]],
+                "details": result["details"],
+                "legitimate_patterns": patterns,
+            },
+        )
+        return result, patterns
+
     async def _analyze_contract(self, token_data: Dict) -> Dict:
         """Analyze contract for red flags (regex-based)."""
 
@@ -12,19 +12,39 @@ The AI path is best-effort and falls back to heuristics when not configured.
 
 from __future__ import annotations
 
+import hashlib
 from typing import Any, Dict, Optional, Tuple
 
 try:
     from ..scoring_engine import AgentVerdict  # type: ignore
     from ..data_fetcher import TokenData  # type: ignore
+    from ..services.source_store import get_source_store  # type: ignore
 except ImportError:  # pragma: no cover
     from scoring_engine import AgentVerdict
     from data_fetcher import TokenData
+    from services.source_store import get_source_store
 
 from .ai_client import AIClient
 from .base_agent import BaseAgent
 from .prompts import SECURITY_SYSTEM, SECURITY_USER_TEMPLATE
 
+# The source-only contract review is reused for byte-identical excerpts this
+# long (per provider/model). The per-token assessment built on it is not cached.
+CODE_REVIEW_TTL_S = 7 * 86400
+CODE_REVIEW_VERSION = 1
+
+# Keep prompts reasonable; Gemini 2.5 Flash handles up to ~1M tokens
+# but very large source can dilute the analysis. 12K chars is ~3K tokens.
+MAX_SOURCE_CHARS = 12_000
+
+
+def _source_excerpt(token_data: TokenData) -> str:
+    """The source text sent to the LLM (truncated for size)."""
+    source = (token_data.source_code or "").strip()
+    if len(source) > MAX_SOURCE_CHARS:
+        source = source[:MAX_SOURCE_CHARS] + "\n/* ...truncated (full source is larger)... */"
+    return source
+
 
 class SecurityBot(BaseAgent):
     """Checks contract verification and ScamBot-derived red flags (AI-enhanced)."""
@@ -41,6 +61,59 @@ class SecurityBot(BaseAgent):
     def description(self) -> str:  # noqa: D401
         return "Security posture checks (Claude 3 Haiku)."
 
+    def _contract_review(self, client: AIClient, provider: str, model: str, source: str) -> Dict[str, Any]:
+        """LLM review of the contract code alone, cached per exact excerpt.
+
+        Nothing token-specific goes into this prompt, so a template clone can
+        reuse it; the per-token assessment is built on top of it every scan.
+        """
+        h = hashlib.sha256(source.encode("utf-8")).hexdigest()
+        kind = f"security_code:v{CODE_REVIEW_VERSION}:{provider}:{model}"
+        cached = get_source_store().get_analysis(kind, h)
+        if cached:
+            self.emitter.thinking("Identical contract code was already reviewed — reusing that code review")
+            return dict(cached)
+
+        source_note = ""
+        if "truncated" in source:
+            source_note = (
+                "\nNOTE: Source code was truncated for prompt size. The full contract may contain "
+                "additional logic not shown. Do NOT treat truncation as a red flag — it is a tool limitation. "
+                "Assess only what is visible and note low confidence for unseen portions.\n"
+            )
+        user = (
+            "Review this smart contract source for security issues. Judge the code only; "
+            "token name, market data and deployer are assessed separately.\n\n"
+            f"Source excerpt (may be truncated for size):\n{source}\n{source_note}\n"
+            "Return JSON:\n"
+            "{\n"
+            "  score: number (0-10, higher=safer code),\n"
+            "  summary: string,\n"
+            "  key_risks: string[] (top 5),\n"
+            "  critical_flags: string[] (only truly critical code issues),\n"
+            "  confidence: number (0-1)\n"
+            "}\n"
+            "Guidance: explicitly consider common issues (upgradeability/admin keys, mintability, "
+            "blacklist/whitelist, fee/tax, pausing, reentrancy, auth, owner privileges, proxy patterns)."
+        )
+        out = client.chat_json(
+            provider=provider,
+            model=model or None,
+            system=str(SECURITY_SYSTEM),
+            user=user,
+            temperature=0.0,
+            max_output_tokens=1200,
+        )
+        review = {
+            "score": max(0.0, min(10.0, float(out.get("score", 5.0)))),
+            "summary": str(out.get("summary", "") or "").strip(),
+            "key_risks": [str(x) for x in (out.get("key_risks") or [])][:5],
+            "critical_flags": [str(x) for x in (out.get("critical_flags") or [])][:5],
+            "confidence": out.get("confidence"),
+        }
+        get_source_store().put_analysis(kind, h, review, ttl_s=CODE_REVIEW_TTL_S)
+        return review
+
     def _ai_security_assessment(self, token_data: TokenData) -> Dict[str, Any]:
         client = self.ai_client or AIClient()
         provider, model = self.routed_provider_model() or ("gemini", self.model_for("gemini") or "")
@@ -61,23 +134,13 @@ class SecurityBot(BaseAgent):
                 "signals": [getattr(s, "value", str(s)) for s in (getattr(scam, "signals_detected", []) or [])][:10],
             }
 
-        # Avoid sending massive source.
-        source = (token_data.source_code or "").strip()
-        # Keep prompts reasonable; Gemini 2.5 Flash handles up to ~1M tokens
-        # but very large source can dilute the analysis. 12K chars is ~3K tokens.
-        if len(source) > 12_000:
-            source = source[:12_000] + "\n/* ...truncated (full source is larger)... */"
+        # The code itself is reviewed on its own (and reused across clones);
+        # this scan's assessment sees that review, not the source again.
+        source = _source_excerpt(token_data)
+        code_review = self._contract_review(client, provider, model, source) if source else None
 
         system = str(SECURITY_SYSTEM)
 
-        source_note = ""
-        if source and "truncated" in source:
-            source_note = (
-                "\nNOTE: Source code was truncated for prompt size. The full contract may contain "
-                "additional logic not shown. Do NOT treat truncation as a red flag — it is a tool limitation. "
-                "Assess only what is visible and note low confidence for unseen portions.\n"
-            )
-
         chain = getattr(token_data, "chain", "ethereum")
         chain_note = ""
         if chain == "solana":
@@ -104,9 +167,7 @@ class SecurityBot(BaseAgent):
             f"ScamBot (if provided): {scam_payload}\n\n"
             f"Known findings (if provided): {known_findings}\n\n"
             f"Audit report (if provided, may be text): {audit_report}\n\n"
-            f"Source excerpt (if verified; may be truncated for size):\n"
-            f"{source}\n"
-            f"{source_note}\n"
+            f"Contract code review (source only, if verified): {code_review}\n\n"
             "Return JSON:\n"
             "{\n"
             "  score: number (0-10, higher=safer),\n"
@@ -117,8 +178,8 @@ class SecurityBot(BaseAgent):
             "  confidence: number (0-1),\n"
             "  suggested_checks: string[]\n"
             "}\n"
-            "Guidance: explicitly consider common issues (upgradeability/admin keys, mintability, "
-            "blacklist/whitelist, fee/tax, pausing, reentrancy, auth, owner privileges, proxy patterns). "
+            "Guidance: weigh the code review against this token's own context (age, liquidity, "
+            "deployer, ScamBot signals). "
             "Established tokens with high mcap ($100M+), verified source, and years of operation "
             "should generally score 5+ unless there are concrete critical vulnerabilities."
         )
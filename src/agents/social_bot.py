@@ -79,18 +79,18 @@ class SocialBot(BaseAgent):
                             if title:
                                 all_items.append((title, snippet[:300], str(age)))
                     except Exception as e:
-                        print(f"[SocialBot] Brave search failed for '{q}': {e}")
+                        logger.warning("Brave search failed for '%s': %s", q, e)
         else:
             # Google News RSS fallback (no API key needed)
             import time as _t
             _presearch_start = _t.monotonic()
-            print("[SocialBot] No BRAVE_SEARCH_API_KEY — using Google News RSS fallback")
+            logger.info("No BRAVE_SEARCH_API_KEY — using Google News RSS fallback")
             gnews_url = "https://news.google.com/rss/search"
             with httpx.Client(timeout=4.0, follow_redirects=True) as client:
                 for q in queries:
                     # Hard cap: 10s total for all queries
                     if _t.monotonic() - _presearch_start > 10.0:
-                        print(f"[SocialBot] Pre-search time budget exceeded, stopping after {len(all_items)} items")
+                        logger.warning("Pre-search time budget exceeded, stopping after %s items", len(all_items))
                         break
                     try:
                         time.sleep(0.3)
@@ -109,10 +109,10 @@ class SocialBot(BaseAgent):
                             if title:
                                 all_items.append((title, "", pub))
                     except Exception as e:
-                        print(f"[SocialBot] Google News search failed for '{q}': {e}")
+                        logger.warning("Google News search failed for '%s': %s", q, e)
 
         if not all_items:
-            print("[SocialBot] No pre-search results found")
+            logger.info("No pre-search results found")
             return ""
 
         # Deduplicate by title prefix
@@ -137,16 +137,16 @@ class SocialBot(BaseAgent):
             "═══ END SEARCH CONTEXT ═══\n"
         )
 
-        print(f"[SocialBot] Injected {len(unique)} pre-search results")
+        logger.info("Injected %s pre-search results", len(unique))
         return "\n".join(lines)
 
     def _fetch_social_insights(self, symbol: str, name: str, token_data=None) -> Dict[str, Any]:
         client = self.ai_client or AIClient()
         provider, model = self.routed_provider_model() or ("xai", self.model_for("xai") or "")
         if provider != "xai":
-            print(f"[WARN] SocialBot routed to provider={provider} model={model or '(default)'} instead of xai (Grok)")
+            logger.warning("SocialBot routed to provider=%s model=%s instead of xai (Grok)", provider, model or '(default)')
         else:
-            print(f"[INFO] SocialBot using provider={provider} model={model or '(default)'}")
+            logger.info("SocialBot using provider=%s model=%s", provider, model or '(default)')
         if not client.has_provider(provider):
             raise RuntimeError(f"{provider} API key not set")
 
@@ -225,7 +225,7 @@ class SocialBot(BaseAgent):
             if search_context:
                 user = search_context + user
         except Exception as e:
-            print(f"[SocialBot] Pre-search failed (non-fatal): {type(e).__name__}: {e}")
+            logger.warning("Pre-search failed (non-fatal): %s: %s", type(e).__name__, e)
 
         user = self._prepend_fact_sheet(token_data, user)
 
@@ -282,7 +282,7 @@ class SocialBot(BaseAgent):
                 if conf is not None:
                     notes.append(f"confidence {float(conf):.2f}")
             except Exception as e:
-                print(f"[ERROR] SocialBot AI call failed: {type(e).__name__}: {e}")
+                logger.error("SocialBot AI call failed: %s: %s", type(e).__name__, e)
                 notes.append(f"AI social unavailable ({type(e).__name__})")
 
             # timing tracked via SSE events, not in reasoning text
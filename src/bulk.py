@@ -0,0 +1,456 @@
+"""Bulk offline scanning (``verdictswarm bulk``).
+
+Scores many tokens in one run for research and backfills:
+
+    python3 -m projects.verdictswarm.src bulk addresses.txt --out results.jsonl
+    cat addresses.txt | python3 -m projects.verdictswarm.src bulk - --concurrency 16 --processes 4
+
+Input is one address per line (blank lines and ``#`` comments ignored;
+``address,chain`` overrides ``--chain`` for that line; with the default
+``auto`` the chain of each EVM address is detected and reported as
+``detected_chain``). Each token goes
+through the same pipeline as the single-address CLI — fetch → ScamBot →
+agents → ScoringEngine — and produces one JSON line with the scores, flags
+and per-stage timings (``fetch_ms``, ``scam_ms``, ``agents_ms``,
+``score_ms``, ``total_ms``).
+
+Execution:
+- ``--concurrency N`` bounds how many tokens are in flight at once. Fetches
+  are network-bound and run on a thread pool of that size.
+- ``--processes N`` moves the analysis stage (ScamBot, agents, scoring) into
+  a process pool, so heuristic/regex-heavy work doesn't contend on the GIL.
+  With ``0`` (default) it shares the thread pool.
+- Market data is looked up on DexScreener 30 addresses per request, one
+  chunk of the input at a time, and shared with every fetch thread.
+
+Checkpointing: the output file is appended to and flushed line by line.
+Re-running with the same ``--out`` skips every address already present
+(``--retry-errors`` re-runs the ones that failed), so an interrupted run
+resumes where it stopped.
+
+``--format parquet`` additionally converts the finished JSONL into a
+columnar file next to it; this needs ``pyarrow`` and is the only non-stdlib
+piece (checked up front).
+
+A throughput summary (tokens/s, per-stage p50/p95) is printed to stderr.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import re
+import sys
+import threading
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+try:
+    from .data_fetcher import DEX_SCREENER_MAX_ADDRESSES, DataFetcher, TokenData, is_solana_address  # type: ignore
+    from .services.chain_resolver import is_auto_chain  # type: ignore
+    from .services.facts_store import local_facts_store  # type: ignore
+    from .services.fetch_cache import MemoryFetchCache  # type: ignore
+    from .tiers import TierLevel  # type: ignore
+except ImportError:  # pragma: no cover
+    from data_fetcher import DEX_SCREENER_MAX_ADDRESSES, DataFetcher, TokenData, is_solana_address
+    from services.chain_resolver import is_auto_chain
+    from services.facts_store import local_facts_store
+    from services.fetch_cache import MemoryFetchCache
+    from tiers import TierLevel
+
+
+STAGES = ("fetch", "scam", "agents", "score", "total")
+
+_EVM_RE = re.compile(r"^0x[a-fA-F0-9]{40}$")
+_BASE58_RE = re.compile(r"^[1-9A-HJ-NP-Za-km-z]{32,44}$")
+
+# One DataFetcher per fetch thread; it keeps no shared mutable state but this
+# avoids relying on that. They share one fetch cache so market data prefetched
+# in batches by one thread is seen by all of them, and one facts store.
+_thread_local = threading.local()
+_fetch_cache = MemoryFetchCache(max_entries=8192)
+_facts = local_facts_store()
+
+
+def _address_key(address: str) -> str:
+    # EVM addresses are case-insensitive; base58 ones are not.
+    return address.lower() if address.startswith("0x") else address
+
+
+def _valid_address(address: str, chain: str) -> bool:
+    if chain == "solana":
+        return bool(_BASE58_RE.match(address))
+    return bool(_EVM_RE.match(address))
+
+
+def read_addresses(lines: Iterable[str], default_chain: str) -> Tuple[List[Tuple[str, str]], List[str]]:
+    """Parse input lines into unique (address, chain) pairs, plus rejected lines."""
+    out: List[Tuple[str, str]] = []
+    rejected: List[str] = []
+    seen: Set[Tuple[str, str]] = set()
+    for raw in lines:
+        line = raw.split("#", 1)[0].strip()
+        if not line:
+            continue
+        address, _, chain = line.partition(",")
+        address = address.strip()
+        chain = (chain.strip() or default_chain).lower()
+        if is_auto_chain(chain) and not address.startswith("0x"):
+            chain = "solana"  # only EVM addresses need detecting
+        if not _valid_address(address, chain):
+            rejected.append(line)
+            continue
+        key = (_address_key(address), chain)
+        if key in seen:
+            continue
+        seen.add(key)
+        out.append((address, chain))
+    return out, rejected
+
+
+def load_checkpoint(path: str, *, retry_errors: bool) -> Set[Tuple[str, str]]:
+    """(address, chain) pairs already recorded in an existing output file."""
+    done: Set[Tuple[str, str]] = set()
+    if not os.path.exists(path):
+        return done
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                row = json.loads(line)
+            except ValueError:
+                continue  # torn last line from an interrupted run
+            if retry_errors and row.get("status") != "ok":
+                continue
+            done.add((_address_key(str(row.get("address", ""))), str(row.get("chain", ""))))
+    return done
+
+
+def _fetcher() -> DataFetcher:
+    fetcher = getattr(_thread_local, "fetcher", None)
+    if fetcher is None:
+        fetcher = _thread_local.fetcher = DataFetcher(cache=_fetch_cache, facts=_facts)
+    return fetcher
+
+
+def _fetch(address: str, chain: str) -> Tuple[TokenData, str, float]:
+    t0 = time.perf_counter()
+    fetcher = _fetcher()
+    if is_auto_chain(chain):
+        chain = fetcher.resolve_chain(address)
+    # Same routing as the API's ScannerService: mints never take the EVM path.
+    if chain == "solana" or is_solana_address(address):
+        chain = "solana"
+        token_data = fetcher.fetch_solana_token_data(address)
+    else:
+        token_data = fetcher.fetch(address, chain=chain)
+    return token_data, chain, (time.perf_counter() - t0) * 1000.0
+
+
+def _prefetch_market(addresses: List[str]) -> None:
+    _fetcher().fetch_market_many(addresses)
+
+
+def analyze_token(token_data: TokenData, chain: str, tier_value: str) -> Dict[str, Any]:
+    """ScamBot + agents + scoring for one fetched token.
+
+    Top-level and argument-picklable so it can run in a process pool.
+    """
+    try:
+        from .__main__ import _run_agents, _scam_flags  # type: ignore
+        from .agents.scam_bot import ScamBot  # type: ignore
+        from .model_router import get_models_for_tier  # type: ignore
+        from .scoring_engine import ScoringEngine  # type: ignore
+        from .tier_config import allowed_bots_for_tier  # type: ignore
+    except ImportError:  # pragma: no cover
+        from __main__ import _run_agents, _scam_flags
+        from agents.scam_bot import ScamBot
+        from model_router import get_models_for_tier
+        from scoring_engine import ScoringEngine
+        from tier_config import allowed_bots_for_tier
+
+    tier = TierLevel(tier_value)
+    allowed = allowed_bots_for_tier(tier)
+    timings: Dict[str, float] = {}
+
+    t0 = time.perf_counter()
+    if "ScamBot" in allowed and token_data.source_code:
+        scam = asyncio.run(
+            ScamBot().analyze(
+                {
+                    "contract_source": token_data.source_code,
+                    "source_hash": token_data.source_hash,
+                    "contract_address": token_data.contract_address,
+                    "chain": chain,
+                    "contract_age_days": token_data.contract_age_days,
+                    "volume_24h": token_data.volume_24h,
+                    "contract_verified": token_data.contract_verified,
+                    "liquidity_usd": token_data.liquidity_usd,
+                }
+            )
+        )
+        setattr(token_data, "scam_analysis", scam)
+    timings["scam_ms"] = (time.perf_counter() - t0) * 1000.0
+
+    t0 = time.perf_counter()
+    verdicts = _run_agents(token_data, allowed, model_plan=get_models_for_tier(tier))
+    timings["agents_ms"] = (time.perf_counter() - t0) * 1000.0
+
+    t0 = time.perf_counter()
+    engine = ScoringEngine(missing_category_policy="neutral" if not verdicts else "renormalize")
+    result = engine.score(verdicts, title=f"{token_data.symbol or token_data.contract_address}")
+    flags = _scam_flags(token_data)
+    timings["score_ms"] = (time.perf_counter() - t0) * 1000.0
+
+    return {
+        "final_score": round(float(result.final_score), 2),
+        "sentiment": str(result.final_sentiment),
+        "confidence": round(float(result.confidence or 0.0), 3),
+        "category_scores": {str(k): round(float(v), 2) for k, v in result.category_scores.items()},
+        "agents": {name: round(float(v.score), 2) for name, v in verdicts.items()},
+        "flags": flags,
+        "timings": timings,
+    }
+
+
+def _percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    idx = min(len(ordered) - 1, int(round(pct / 100.0 * (len(ordered) - 1))))
+    return ordered[idx]
+
+
+class BulkRunner:
+    def __init__(
+        self,
+        *,
+        out_path: str,
+        tier: TierLevel,
+        concurrency: int = 8,
+        processes: int = 0,
+    ) -> None:
+        self.out_path = out_path
+        self.tier = tier
+        self.concurrency = max(1, int(concurrency))
+        self.processes = max(0, int(processes))
+        self.stage_ms: Dict[str, List[float]] = {s: [] for s in STAGES}
+        self.ok = 0
+        self.errors = 0
+        self._market_chunks: Dict[int, "asyncio.Future[None]"] = {}
+
+    async def _prefetch_market(self, index: int, targets: List[Tuple[str, str]], fetch_pool: Executor) -> None:
+        """DexScreener data for the 30-address chunk holding ``targets[index]``, once per chunk."""
+        n = index // DEX_SCREENER_MAX_ADDRESSES
+        fut = self._market_chunks.get(n)
+        if fut is None:
+            chunk = [a for a, _ in targets[n * DEX_SCREENER_MAX_ADDRESSES:(n + 1) * DEX_SCREENER_MAX_ADDRESSES]]
+            fut = self._market_chunks[n] = asyncio.get_running_loop().run_in_executor(
+                fetch_pool, _prefetch_market, chunk
+            )
+        try:
+            await fut
+        except Exception:
+            pass  # the per-token fetch falls back to a single lookup
+
+    async def _scan_one(
+        self,
+        index: int,
+        targets: List[Tuple[str, str]],
+        *,
+        sem: asyncio.Semaphore,
+        fetch_pool: Executor,
+        analyze_pool: Executor,
+    ) -> Dict[str, Any]:
+        loop = asyncio.get_running_loop()
+        address, chain = targets[index]
+        row: Dict[str, Any] = {"address": address, "chain": chain}
+        async with sem:
+            t0 = time.perf_counter()
+            try:
+                await self._prefetch_market(index, targets, fetch_pool)
+                token_data, detected, fetch_ms = await loop.run_in_executor(fetch_pool, _fetch, address, chain)
+                if detected != chain:
+                    row["detected_chain"] = detected
+                analysis = await loop.run_in_executor(
+                    analyze_pool, analyze_token, token_data, detected, self.tier.value
+                )
+            except Exception as e:
+                row.update(status="error", error=f"{type(e).__name__}: {str(e)[:300]}")
+                row["timings"] = {"total_ms": round((time.perf_counter() - t0) * 1000.0, 1)}
+                return row
+        timings = {"fetch_ms": fetch_ms, **analysis.pop("timings"), "total_ms": (time.perf_counter() - t0) * 1000.0}
+        row.update(
+            status="ok",
+            name=token_data.name,
+            symbol=token_data.symbol,
+            **analysis,
+            data_sources=list(token_data.data_sources or []),
+            timings={k: round(v, 1) for k, v in timings.items()},
+        )
+        return row
+
+    def _record(self, row: Dict[str, Any]) -> None:
+        if row.get("status") == "ok":
+            self.ok += 1
+            for stage in STAGES:
+                v = row["timings"].get(f"{stage}_ms")
+                if v is not None:
+                    self.stage_ms[stage].append(float(v))
+        else:
+            self.errors += 1
+
+    async def run(self, targets: List[Tuple[str, str]], *, progress: bool = True) -> None:
+        sem = asyncio.Semaphore(self.concurrency)
+        fetch_pool = ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="vs-bulk-fetch")
+        analyze_pool: Executor = (
+            ProcessPoolExecutor(max_workers=self.processes) if self.processes > 0 else fetch_pool
+        )
+        try:
+            with open(self.out_path, "a", encoding="utf-8") as out:
+                tasks = [
+                    asyncio.ensure_future(
+                        self._scan_one(i, targets, sem=sem, fetch_pool=fetch_pool, analyze_pool=analyze_pool)
+                    )
+                    for i in range(len(targets))
+                ]
+                for i, fut in enumerate(asyncio.as_completed(tasks), start=1):
+                    row = await fut
+                    # Flushed per line: this file is the checkpoint.
+                    out.write(json.dumps(row, ensure_ascii=False, default=str) + "\n")
+                    out.flush()
+                    self._record(row)
+                    if progress:
+                        sys.stderr.write(
+                            f"\r[bulk] {i}/{len(targets)} ok={self.ok} errors={self.errors}"
+                        )
+                        sys.stderr.flush()
+                if progress and targets:
+                    sys.stderr.write("\n")
+        finally:
+            fetch_pool.shutdown(wait=False, cancel_futures=True)
+            if analyze_pool is not fetch_pool:
+                analyze_pool.shutdown(wait=False, cancel_futures=True)
+
+    def summary(self, *, elapsed_s: float, skipped: int, rejected: int) -> str:
+        done = self.ok + self.errors
+        rate = done / elapsed_s if elapsed_s > 0 else 0.0
+        lines = [
+            f"Scanned {done} tokens in {elapsed_s:.1f}s ({rate:.2f} tokens/s, "
+            f"concurrency={self.concurrency}, processes={self.processes})",
+            f"  ok={self.ok} errors={self.errors} skipped(checkpoint)={skipped} rejected={rejected}",
+        ]
+        for stage in STAGES:
+            vals = self.stage_ms[stage]
+            if vals:
+                lines.append(
+                    f"  {stage:<7} p50={_percentile(vals, 50):8.1f}ms  p95={_percentile(vals, 95):8.1f}ms"
+                )
+        return "\n".join(lines)
+
+
+def write_parquet(jsonl_path: str, parquet_path: str) -> int:
+    """Convert the JSONL results into a Parquet file (requires ``pyarrow``)."""
+    import pyarrow as pa  # optional dependency
+    import pyarrow.parquet as pq
+
+    rows: List[Dict[str, Any]] = []
+    with open(jsonl_path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                row = json.loads(line)
+            except ValueError:
+                continue
+            # Flatten timings into columns; keep nested maps as JSON strings so
+            # the schema stays stable across rows.
+            for k, v in (row.pop("timings", None) or {}).items():
+                row[k] = v
+            for k in ("category_scores", "agents", "flags", "data_sources"):
+                if k in row:
+                    row[k] = json.dumps(row[k], ensure_ascii=False)
+            rows.append(row)
+    pq.write_table(pa.Table.from_pylist(rows), parquet_path)
+    return len(rows)
+
+
+def build_parser() -> argparse.ArgumentParser:
+    p = argparse.ArgumentParser(prog="verdictswarm bulk", description="Score many tokens offline.")
+    p.add_argument("input", help="File with one address per line ('-' for stdin)")
+    p.add_argument("--chain", default="auto", help="Default chain; auto detects it per address (default: auto)")
+    p.add_argument("--out", default="bulk_results.jsonl", help="JSONL output / checkpoint file")
+    p.add_argument("--format", default="jsonl", choices=["jsonl", "parquet"], help="Output format (default: jsonl)")
+    p.add_argument("--tier", default="free", help="Tier whose agent set is used (default: free)")
+    p.add_argument("--concurrency", type=int, default=8, help="Tokens in flight at once (default: 8)")
+    p.add_argument(
+        "--processes",
+        type=int,
+        default=0,
+        help="Process-pool size for the analysis stage (default: 0 = threads only)",
+    )
+    p.add_argument("--retry-errors", action="store_true", help="Re-run addresses that failed previously")
+    p.add_argument("--quiet", action="store_true", help="No progress line")
+    return p
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+
+    try:
+        from .__main__ import _parse_tier  # type: ignore
+    except ImportError:  # pragma: no cover
+        from __main__ import _parse_tier
+
+    tier = _parse_tier(args.tier)
+    if tier is None:
+        sys.stderr.write(f"Error: unknown tier {args.tier!r}\n")
+        return 2
+
+    if args.format == "parquet":
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            sys.stderr.write("Error: --format parquet requires pyarrow (pip install pyarrow)\n")
+            return 2
+
+    if args.input == "-":
+        targets, rejected = read_addresses(sys.stdin, args.chain.lower())
+    else:
+        try:
+            with open(args.input, "r", encoding="utf-8") as f:
+                targets, rejected = read_addresses(f, args.chain.lower())
+        except OSError as e:
+            sys.stderr.write(f"Error: {e}\n")
+            return 2
+    for line in rejected[:10]:
+        sys.stderr.write(f"[bulk] skipping invalid address: {line}\n")
+
+    done = load_checkpoint(args.out, retry_errors=bool(args.retry_errors))
+    pending = [(a, c) for a, c in targets if (_address_key(a), c) not in done]
+    skipped = len(targets) - len(pending)
+
+    runner = BulkRunner(
+        out_path=args.out,
+        tier=tier,
+        concurrency=args.concurrency,
+        processes=args.processes,
+    )
+    t0 = time.perf_counter()
+    try:
+        asyncio.run(runner.run(pending, progress=not args.quiet))
+    except KeyboardInterrupt:
+        sys.stderr.write("\n[bulk] interrupted — re-run the same command to resume\n")
+    elapsed = time.perf_counter() - t0
+
+    if args.format == "parquet":
+        parquet_path = os.path.splitext(args.out)[0] + ".parquet"
+        n = write_parquet(args.out, parquet_path)
+        sys.stderr.write(f"[bulk] wrote {n} rows to {parquet_path}\n")
+
+    sys.stderr.write(runner.summary(elapsed_s=elapsed, skipped=skipped, rejected=len(rejected)) + "\n")
+    return 0 if runner.errors == 0 else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
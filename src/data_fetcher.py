@@ -13,15 +13,51 @@ Only Python stdlib is used (urllib/json/dataclasses).
 from __future__ import annotations
 
 import json
-import os
+import logging
 import time
 import socket
 from dataclasses import dataclass, field
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 from urllib.error import URLError
-from urllib.parse import urlencode
+from urllib.parse import urlparse
 from urllib.request import Request, urlopen
 
+try:
+    from .services.chain_resolver import ChainResolver, is_auto_chain  # type: ignore
+    from .services.etherscan_scheduler import (  # type: ignore
+        PRIORITY_HOLDERS,
+        PRIORITY_SOURCE,
+        PRIORITY_STATS,
+        EtherscanScheduler,
+        get_etherscan_scheduler,
+    )
+    from .services.facts_store import ContractFacts, FactsStore, local_facts_store  # type: ignore
+    from .services.fetch_cache import FetchCache, MemoryFetchCache, ttls_from_env  # type: ignore
+    from .services.market_context import COINGECKO_GLOBAL_URL, MarketSnapshot, get_market_context  # type: ignore
+    from .services.solana_holders import concentration_calls, parse_concentration  # type: ignore
+    from .services.source_store import SourceStore, get_source_store  # type: ignore
+    from .services.solana_rpc import SolanaRpcClient, get_solana_rpc  # type: ignore
+    from .services.tracing import span  # type: ignore
+except ImportError:  # pragma: no cover
+    # When running from this repo with `src/` on PYTHONPATH.
+    from services.chain_resolver import ChainResolver, is_auto_chain
+    from services.etherscan_scheduler import (
+        PRIORITY_HOLDERS,
+        PRIORITY_SOURCE,
+        PRIORITY_STATS,
+        EtherscanScheduler,
+        get_etherscan_scheduler,
+    )
+    from services.facts_store import ContractFacts, FactsStore, local_facts_store
+    from services.fetch_cache import FetchCache, MemoryFetchCache, ttls_from_env
+    from services.market_context import COINGECKO_GLOBAL_URL, MarketSnapshot, get_market_context
+    from services.solana_holders import concentration_calls, parse_concentration
+    from services.source_store import SourceStore, get_source_store
+    from services.solana_rpc import SolanaRpcClient, get_solana_rpc
+    from services.tracing import span
+
+logger = logging.getLogger(__name__)
+
 try:
     import base58
 except ImportError:
@@ -32,6 +68,8 @@ socket.setdefaulttimeout(10.0)
 
 
 DEX_SCREENER_TOKEN_URL = "https://api.dexscreener.com/latest/dex/tokens/{address}"
+# The tokens endpoint takes up to this many comma-separated addresses.
+DEX_SCREENER_MAX_ADDRESSES = 30
 # Maps symbol → (contract_address, chain). Chain is used to override the default.
 TOKEN_OVERRIDES: Dict[str, tuple] = {
     "ENA": ("0x57e114B691Db790C35207b2e685D4A43181e6061", "ethereum"),
@@ -70,6 +108,10 @@ TOKEN_OVERRIDES: Dict[str, tuple] = {
 COINGECKO_CONTRACT_URL = "https://api.coingecko.com/api/v3/coins/{chain}/contract/{address}"
 # Etherscan V2 API (unified across all chains)
 ETHERSCAN_V2_API_URL = "https://api.etherscan.io/v2/api"
+# 24h tx counting: txlist page size and how many pages before giving up
+# (the count is then a lower bound; DexScreener's count is used if higher).
+TX_PAGE_SIZE = 1000
+TX_MAX_PAGES = 3
 
 # Supported chains and their IDs
 CHAIN_IDS = {
@@ -109,9 +151,6 @@ COINGECKO_PLATFORMS = {
     "sol": "solana",
 }
 
-# Solana RPC endpoint (public or Helius)
-SOLANA_RPC = os.environ.get("HELIUS_RPC_URL", "https://api.mainnet-beta.solana.com")
-
 
 def is_solana_address(address: str) -> bool:
     """Check if address is a valid Solana address (base58, 32-44 chars)."""
@@ -157,6 +196,8 @@ class TokenData:
     holder_count: Optional[int] = None
     top10_holders_pct: Optional[float] = None
     source_code: Optional[str] = None  # Contract source if verified
+    source_hash: Optional[str] = None  # normalized-source hash (services/source_store.py)
+    decimals: Optional[int] = None
 
     # CoinGecko metadata (best-effort)
     coingecko_categories: List[str] = field(default_factory=list)
@@ -177,10 +218,65 @@ class DataFetcher:
 
     Timeouts:
         Each request uses a 5s timeout to keep scoring responsive.
+
+    Etherscan pacing:
+        Explorer calls go through the process-wide ``EtherscanScheduler``
+        (per-key token buckets, priorities, retry on rate limit). Solana calls
+        go through the process-wide ``SolanaRpcClient`` (batched, pooled,
+        rate-limited, Helius → public mainnet fallback).
+
+    Caching:
+        Upstream results are cached per source with source-appropriate freshness
+        (see ``services/fetch_cache.py``). Each instance gets its own in-memory
+        cache unless a shared ``cache`` (e.g. Redis-backed) is passed.
+        Facts that never change (creation time, creator, decimals, verified)
+        are recorded once in ``facts`` (see ``services/facts_store.py``).
+        Verified source is kept once per normalized-source hash in ``sources``
+        (see ``services/source_store.py``); the fetch cache holds only the hash.
     """
 
-    def __init__(self, *, timeout_s: float = 5.0) -> None:
+    def __init__(
+        self,
+        *,
+        timeout_s: float = 5.0,
+        cache: Optional[FetchCache] = None,
+        ttls: Optional[Dict[str, float]] = None,
+        etherscan: Optional[EtherscanScheduler] = None,
+        solana_rpc: Optional[SolanaRpcClient] = None,
+        facts: Optional[FactsStore] = None,
+        sources: Optional[SourceStore] = None,
+    ) -> None:
         self._timeout_s = float(timeout_s)
+        self.etherscan = etherscan if etherscan is not None else get_etherscan_scheduler()
+        self.solana_rpc = solana_rpc if solana_rpc is not None else get_solana_rpc()
+        self.cache = cache if cache is not None else MemoryFetchCache()
+        self.ttls = ttls_from_env(ttls)
+        self.facts = facts if facts is not None else local_facts_store()
+        self.sources = sources if sources is not None else get_source_store()
+        self.chain_resolver = ChainResolver(
+            market_chain=self._market_chain,
+            has_code=self.is_contract_address,
+            cache=self.cache,
+            ttl_s=self.ttls.get("chain", 0.0),
+            default=DEFAULT_CHAIN,
+        )
+
+    def _cached(
+        self,
+        source: str,
+        key: str,
+        loader: Any,
+        max_staleness: Optional[float] = None,
+        store_if: Any = None,
+    ) -> Any:
+        return self.cache.lookup(
+            source,
+            key,
+            loader,
+            ttl_s=self.ttls.get(source, 0.0),
+            max_staleness=max_staleness,
+            store_if=store_if,
+        )
 
     def is_contract_address(self, address: str, chain: str = DEFAULT_CHAIN) -> Optional[bool]:
         """Best-effort check whether an address has contract code.
@@ -215,13 +311,32 @@ class DataFetcher:
         except Exception:
             return None
 
-    def fetch(self, contract_address: str, chain: str = DEFAULT_CHAIN) -> TokenData:
+    def resolve_chain(self, address: str) -> str:
+        """Chain an EVM address is deployed on (see ``services/chain_resolver.py``)."""
+        if is_solana_address(address):
+            return "solana"
+        return self.chain_resolver.resolve(address).chain
+
+    def _market_chain(self, address: str) -> Optional[str]:
+        dex = self._cached("market", self._market_key(address), lambda: self._fetch_dexscreener(address))
+        return (dex or {}).get("chain_id") or None
+
+    def fetch(
+        self,
+        contract_address: str,
+        chain: Optional[str] = DEFAULT_CHAIN,
+        *,
+        max_staleness: Optional[float] = None,
+    ) -> TokenData:
         """Fetch TokenData for the given contract address.
         
         Args:
             contract_address: The token contract address or symbol override (e.g., ENA).
             chain: Chain name (base, ethereum, arbitrum, optimism, polygon, bsc, avalanche).
-                   Aliases supported: eth, arb, op, matic, bnb, avax.
+                   Aliases supported: eth, arb, op, matic, bnb, avax. ``"auto"`` or
+                   None detects it with :meth:`resolve_chain`.
+            max_staleness: Cap (seconds) on the age of cached upstream data used
+                   for this call; 0 refetches everything.
         """
         resolved = (contract_address or "").strip()
         override = TOKEN_OVERRIDES.get(resolved.upper())
@@ -230,7 +345,7 @@ class DataFetcher:
             chain_lower = override_chain.lower()
         else:
             addr = resolved
-            chain_lower = chain.lower().strip()
+            chain_lower = self.resolve_chain(addr) if is_auto_chain(chain) else str(chain).lower().strip()
         chain_id = CHAIN_IDS.get(chain_lower, CHAIN_IDS[DEFAULT_CHAIN])
         ts = int(time.time())
         data_sources: List[str] = []
@@ -259,9 +374,16 @@ class DataFetcher:
             data_sources=data_sources,
         )
 
+        cache_addr = self._market_key(addr)
+
         # CoinGecko metadata (categories)
         try:
-            cats = self._fetch_coingecko_categories(addr, chain_lower)
+            cats = self._cached(
+                "categories",
+                f"{chain_lower}:{cache_addr}",
+                lambda: self._fetch_coingecko_categories(addr, chain_lower),
+                max_staleness,
+            )
             if cats:
                 out.coingecko_categories = cats
                 data_sources.append("coingecko")
@@ -271,7 +393,7 @@ class DataFetcher:
         # Market data (DexScreener)
         dex_tx_count = 0
         try:
-            dex = self._fetch_dexscreener(addr)
+            dex = self._cached("market", cache_addr, lambda: self._fetch_dexscreener(addr), max_staleness)
             if dex:
                 out.name = dex.get("name", out.name)
                 out.symbol = dex.get("symbol", out.symbol)
@@ -293,14 +415,21 @@ class DataFetcher:
 
         # On-chain data (Etherscan V2)
         try:
-            base = self._fetch_etherscan(addr, chain_id)
+            base = self._fetch_etherscan(
+                addr, chain_id, max_staleness=max_staleness, dex_tx_count=dex_tx_count
+            )
             if base:
                 out.contract_verified = bool(base.get("contract_verified", out.contract_verified))
                 out.source_code = base.get("source_code", out.source_code)
+                out.source_hash = base.get("source_hash", out.source_hash)
                 out.creator_address = base.get("creator_address", out.creator_address)
+                out.decimals = base.get("decimals", out.decimals)
                 etherscan_tx = int(base.get("tx_count_24h", 0) or 0)
                 # Prefer DexScreener tx count if Etherscan returns 0 (common for proxy contracts)
                 out.tx_count_24h = etherscan_tx if etherscan_tx > 0 else dex_tx_count
+                if base.get("tx_count_truncated"):
+                    # Explorer count stopped at the page cap: it's a lower bound.
+                    out.tx_count_24h = max(etherscan_tx, dex_tx_count)
                 raw_holders = base.get("holder_count")
                 out.holder_count = int(raw_holders) if raw_holders else out.holder_count
                 raw_top10 = base.get("top10_holders_pct")
@@ -331,11 +460,12 @@ class DataFetcher:
 
         return out
 
-    def fetch_solana_token_data(self, mint_address: str) -> TokenData:
+    def fetch_solana_token_data(self, mint_address: str, *, max_staleness: Optional[float] = None) -> TokenData:
         """Fetch TokenData for a Solana token.
 
         Args:
             mint_address: The Solana mint address.
+            max_staleness: As for :meth:`fetch`.
 
         Returns:
             TokenData with Solana-specific fields populated.
@@ -370,7 +500,7 @@ class DataFetcher:
 
         # 1) Market data (DexScreener — works for Solana!)
         try:
-            dex = self._fetch_dexscreener(addr)
+            dex = self._cached("market", addr, lambda: self._fetch_dexscreener(addr), max_staleness)
             if dex:
                 out.name = dex.get("name", out.name)
                 out.symbol = dex.get("symbol", out.symbol)
@@ -389,104 +519,88 @@ class DataFetcher:
         except Exception:
             pass
 
-        # 2) On-chain data (Solana RPC)
+        # 2) On-chain data (Solana RPC). Everything not already cached goes out as
+        # one JSON-RPC batch: account info plus largest accounts + supply (exact
+        # top-10 concentration, and the holder count for small holder sets).
+        helius = self.solana_rpc.has_endpoint("helius")
+        onchain: Dict[str, Any] = {}
+
+        def _onchain(key: str) -> Any:
+            if not onchain:
+                calls: List[Tuple[str, Any]] = [("getAccountInfo", [addr, {"encoding": "jsonParsed"}])]
+                calls += concentration_calls(addr)
+                onchain.update(zip(["account", "largest", "supply"], self.solana_rpc.batch(calls)))
+            return onchain.get(key)
+
+        # 2a) Top-holder concentration
+        conc: Optional[Dict[str, Any]] = None
         try:
-            # Get account info to verify token exists
-            account_info = self._solana_rpc_call("getAccountInfo", [
-                addr,
-                {"encoding": "jsonParsed"}
-            ])
-
-            result = account_info.get("result")
-            if result and result.get("value"):
-                # Token account exists on-chain. Note: Solana SPL tokens do NOT have
-                # the same concept of "verified source code" as EVM contracts.
-                # We keep contract_verified=False — the chain-aware AI prompts handle this.
-                parsed_data = result.get("value", {}).get("data")
-                if isinstance(parsed_data, dict) and parsed_data.get("parsed"):
-                    data_sources.append("solana-rpc")
-
-                    # Try to extract token info from parsed data
-                    parsed = parsed_data.get("parsed", {})
-                    if isinstance(parsed, dict):
-                        info = parsed.get("info", {})
-                        if isinstance(info, dict):
-                            # Some tokens have metadata in the info field
-                            pass
-
-            # Get token supply
-            try:
-                supply_resp = self._solana_rpc_call("getTokenSupply", [addr])
-                supply_result = supply_resp.get("result")
-                if supply_result and "value" in supply_result:
-                    # Supply data available
-                    pass
-            except Exception:
-                pass
-
-        except Exception:
-            # Solana RPC failed — degrade gracefully
-            pass
+            conc = self._cached(
+                "holders",
+                f"solana-top:{addr}",
+                lambda: self._solana_concentration(_onchain("largest"), _onchain("supply")),
+                max_staleness,
+                store_if=bool,
+            )
+            if conc:
+                out.top10_holders_pct = conc["top10_pct"]
+                out.decimals = conc.get("decimals")
+                data_sources.append("solana-holders")
+                logger.info("Top10 holders for %s: %s%%", addr, out.top10_holders_pct)
+        except Exception as e:
+            logger.warning("Solana holder concentration failed (non-fatal): %s: %s", type(e).__name__, e)
 
-        # 2b) Holder count + top holder analysis via Helius getTokenAccounts
+        # 2b) Holder count. When the largest-accounts answer already holds every
+        # account with a balance, that is the count. Only bigger holder sets need
+        # Helius getTokenAccounts: its ``total`` counts the returned page, so the
+        # page can't shrink without lowering the count's ceiling (1000).
         try:
-            helius_url = os.environ.get("HELIUS_RPC_URL", "").strip()
-            if helius_url:
-                import urllib.request, json as _json
-
-                def _helius_get_token_accounts(mint: str, limit: int = 1000, page: int = 1) -> dict:
-                    payload = _json.dumps({
-                        "jsonrpc": "2.0",
-                        "id": "holder-count",
-                        "method": "getTokenAccounts",
-                        "params": {"mint": mint, "limit": limit, "page": page}
-                    }).encode()
-                    req = urllib.request.Request(helius_url, data=payload, headers={"Content-Type": "application/json"})
-                    with urllib.request.urlopen(req, timeout=8.0) as resp:
-                        return _json.loads(resp.read())
-
-                # Page 1: get total count + first batch of holders
-                result = _helius_get_token_accounts(addr, limit=1000, page=1)
-                token_accounts = result.get("result", {}).get("token_accounts", [])
-                total = result.get("result", {}).get("total", 0)
-
-                if total and int(total) > 0:
-                    out.holder_count = int(total)
+            if conc and conc.get("holders"):
+                out.holder_count = int(conc["holders"])
+            elif helius:
+                def _holder_count() -> int:
+                    result = self.solana_rpc.call(
+                        "getTokenAccounts", {"mint": addr, "limit": 1000, "page": 1}, endpoint="helius"
+                    )
+                    return int((result or {}).get("total", 0) or 0)
+
+                total = self._cached(
+                    "holders",
+                    f"solana-count:{addr}",
+                    _holder_count,
+                    max_staleness,
+                    store_if=lambda n: n > 0,
+                )
+                if total > 0:
+                    out.holder_count = total
                     data_sources.append("helius-holders")
-                    print(f"[SolanaFetch] Holder count for {addr}: {out.holder_count}")
-
-                    # Calculate top 10 holder concentration from the first page
-                    # Sort by amount (descending) to find largest holders
-                    amounts = []
-                    for acct in token_accounts:
-                        amt = float(acct.get("amount", 0) or 0)
-                        if amt > 0:
-                            amounts.append(amt)
-
-                    if amounts:
-                        amounts.sort(reverse=True)
-                        total_in_page = sum(amounts)
-                        top10_sum = sum(amounts[:10])
-
-                        # Get total supply for accurate % calculation
-                        try:
-                            supply_resp = self._solana_rpc_call("getTokenSupply", [addr])
-                            supply_val = supply_resp.get("result", {}).get("value", {})
-                            total_supply = float(supply_val.get("amount", 0) or 0)
-                            decimals = int(supply_val.get("decimals", 0) or 0)
-                            if total_supply > 0 and decimals > 0:
-                                # amounts from Helius are raw (no decimals), supply amount is also raw
-                                top10_pct = (top10_sum / total_supply) * 100.0
-                                out.top10_holders_pct = round(top10_pct, 2)
-                                print(f"[SolanaFetch] Top10 holders for {addr}: {out.top10_holders_pct}%")
-                        except Exception as e:
-                            print(f"[SolanaFetch] Supply fetch for top10 calc failed: {e}")
+                    logger.info("Holder count for %s: %s", addr, out.holder_count)
         except Exception as e:
-            print(f"[SolanaFetch] Helius holder data failed (non-fatal): {type(e).__name__}: {e}")
+            logger.warning("Helius holder data failed (non-fatal): %s: %s", type(e).__name__, e)
+
+        # 2c) Token account exists on-chain. Note: Solana SPL tokens do NOT have
+        # the same concept of "verified source code" as EVM contracts.
+        # We keep contract_verified=False — the chain-aware AI prompts handle this.
+        try:
+            if onchain:
+                account = onchain.get("account")
+            else:
+                account = self.solana_rpc.call("getAccountInfo", [addr, {"encoding": "jsonParsed"}])
+            parsed_data = ((account or {}).get("value") or {}).get("data")
+            if isinstance(parsed_data, dict) and parsed_data.get("parsed"):
+                data_sources.append("solana-rpc")
+        except Exception:
+            # Solana RPC failed — degrade gracefully
+            pass
 
         # 3) CoinGecko (if Solana token is listed)
         try:
-            cats = self._fetch_coingecko_categories(addr, "solana")
+            cats = self._cached(
+                "categories",
+                f"solana:{addr}",
+                lambda: self._fetch_coingecko_categories(addr, "solana"),
+                max_staleness,
+            )
             if cats:
                 out.coingecko_categories = cats
                 data_sources.append("coingecko")
@@ -553,28 +667,10 @@ class DataFetcher:
 
     # -------------------- Solana RPC helpers --------------------
 
-    def _solana_rpc_call(self, method: str, params: List[Any]) -> Dict[str, Any]:
-        """Make a Solana RPC call."""
-        payload = {
-            "jsonrpc": "2.0",
-            "id": 1,
-            "method": method,
-            "params": params,
-        }
-        req = Request(
-            SOLANA_RPC,
-            data=json.dumps(payload).encode("utf-8"),
-            headers={
-                "Content-Type": "application/json",
-                "Accept": "application/json",
-            },
-        )
-        try:
-            with urlopen(req, timeout=self._timeout_s) as resp:
-                raw = resp.read().decode("utf-8")
-            return json.loads(raw)
-        except Exception:
-            raise
+    @staticmethod
+    def _solana_concentration(largest: Any, supply: Any) -> Optional[Dict[str, Any]]:
+        conc = parse_concentration(largest, supply)
+        return conc.to_dict() if conc else None
 
     # -------------------- HTTP helpers --------------------
 
@@ -592,13 +688,12 @@ class DataFetcher:
                 "User-Agent": "VerdictSwarm/0.1 (stdlib; +https://github.com/vswarm-ai/verdictswarm)",
             },
         )
-        try:
+        # Span by host only — query strings carry API keys.
+        with span(f"fetch:{urlparse(url).hostname or 'unknown'}"):
             with urlopen(req, timeout=self._timeout_s) as resp:
                 raw = resp.read().decode("utf-8")
+            # Errors propagate so the caller can degrade gracefully.
             return json.loads(raw)
-        except Exception:
-            # Re-raise to allow caller to degrade gracefully.
-            raise
 
     @staticmethod
     def _safe_float(x: Any, default: float = 0.0) -> float:
@@ -621,28 +716,10 @@ class DataFetcher:
     # -------------------- CoinGecko --------------------
 
     def _fetch_macro_context(self) -> Optional[str]:
-        """Fetch global crypto market data from CoinGecko. Best-effort, never blocks scan."""
+        """Global market context from the shared market-context service (instant when warm)."""
         try:
-            resp = requests.get(
-                "https://api.coingecko.com/api/v3/global",
-                timeout=5,
-                headers={"accept": "application/json"},
-            )
-            resp.raise_for_status()
-            data = resp.json().get("data", {})
-
-            btc_dom = data.get("market_cap_percentage", {}).get("btc", 0)
-            eth_dom = data.get("market_cap_percentage", {}).get("eth", 0)
-            total_mcap = data.get("total_market_cap", {}).get("usd", 0)
-            mcap_change = data.get("market_cap_change_percentage_24h_usd", 0)
-            total_volume = data.get("total_volume", {}).get("usd", 0)
-            active_coins = data.get("active_cryptocurrencies", 0)
-
-            return (
-                f"BTC dominance: {btc_dom:.1f}%, ETH dominance: {eth_dom:.1f}%, "
-                f"Total crypto market cap: ${total_mcap / 1e9:.1f}B (24h change: {mcap_change:+.1f}%), "
-                f"Total 24h volume: ${total_volume / 1e9:.1f}B, "
-                f"Active cryptocurrencies: {active_coins:,}"
+            return get_market_context().context_string(
+                fetcher=lambda: MarketSnapshot.from_coingecko(self._http_get_json(COINGECKO_GLOBAL_URL))
             )
         except Exception:
             return None
@@ -667,11 +744,70 @@ class DataFetcher:
 
     # -------------------- DexScreener --------------------
 
+    @staticmethod
+    def _market_key(address: str) -> str:
+        # EVM addresses are case-insensitive; Solana mints are not.
+        addr = (address or "").strip()
+        return addr.lower() if addr.startswith("0x") else addr
+
     def _fetch_dexscreener(self, address: str) -> Dict[str, Any]:
         url = DEX_SCREENER_TOKEN_URL.format(address=address)
         payload = self._http_get_json(url)
+        return self._select_dex_pair(address, payload.get("pairs"))
+
+    def fetch_market_many(
+        self,
+        addresses: List[str],
+        *,
+        max_staleness: Optional[float] = None,
+    ) -> Dict[str, Dict[str, Any]]:
+        """DexScreener market data for many tokens, up to 30 addresses per request.
+
+        Cached entries are reused; the rest are fetched in chunks and written to
+        the ``market`` cache, so a following :meth:`fetch` of any of them makes
+        no DexScreener call. Returns ``{address: market dict}`` (``{}`` when
+        DexScreener has no pair for it). A failed chunk is logged and skipped.
+        """
+        out: Dict[str, Dict[str, Any]] = {}
+        missing: Dict[str, str] = {}
+        ttl_s = self.ttls.get("market", 0.0)
+        for address in addresses:
+            addr = (address or "").strip()
+            key = self._market_key(addr)
+            if not addr or key in missing:
+                continue
+            entry = self.cache.peek("market", key, ttl_s=ttl_s, max_staleness=max_staleness)
+            if entry is not None:
+                out[addr] = entry[0]
+            else:
+                missing[key] = addr
 
-        pairs = payload.get("pairs") or []
+        todo = list(missing.values())
+        for i in range(0, len(todo), DEX_SCREENER_MAX_ADDRESSES):
+            chunk = todo[i:i + DEX_SCREENER_MAX_ADDRESSES]
+            try:
+                with span("fetch:dexscreener:many", addresses=len(chunk)):
+                    payload = self._http_get_json(DEX_SCREENER_TOKEN_URL.format(address=",".join(chunk)))
+            except Exception as e:
+                logger.warning("DexScreener batch lookup failed for %s addresses: %s", len(chunk), e)
+                continue
+            # One response for the whole chunk: hand each token the pairs it appears in.
+            by_token: Dict[str, List[Dict[str, Any]]] = {addr.lower(): [] for addr in chunk}
+            for pair in payload.get("pairs") or []:
+                if not isinstance(pair, dict):
+                    continue
+                for side in ("baseToken", "quoteToken"):
+                    token_addr = str((pair.get(side) or {}).get("address") or "").lower()
+                    if token_addr in by_token:
+                        by_token[token_addr].append(pair)
+            for addr in chunk:
+                market = self._select_dex_pair(addr, by_token[addr.lower()])
+                self.cache.put("market", self._market_key(addr), market, ttl_s=ttl_s)
+                out[addr] = market
+        return out
+
+    def _select_dex_pair(self, address: str, pairs: Any) -> Dict[str, Any]:
+        """Pick the token's representative pair and extract the market fields."""
         if not isinstance(pairs, list) or not pairs:
             return {}
 
@@ -710,11 +846,7 @@ class DataFetcher:
                 ]
                 if other_chains_high_liq:
                     alt = max(other_chains_high_liq, key=liquidity_usd)
-                    print(
-                        f"[WARN] DexScreener: low-liq pair selected for {address} "
-                        f"(chain={best.get('chainId')} liq=${selected_liq:,.0f}), "
-                        f"higher-liq alt exists (chain={alt.get('chainId')} liq=${liquidity_usd(alt):,.0f})"
-                    )
+                    logger.warning("DexScreener: low-liq pair selected for %s (chain=%s liq=$%s), higher-liq alt exists (chain=%s liq=$%s)", address, best.get('chainId'), selected_liq, alt.get('chainId'), liquidity_usd(alt))
         if not best:
             return {}
 
@@ -744,6 +876,7 @@ class DataFetcher:
         return {
             "name": name,
             "symbol": symbol,
+            "chain_id": str(best.get("chainId") or "").lower(),
             "price_usd": price_usd,
             "price_change_24h": price_change_24h,
             "volume_24h": volume_24h,
@@ -756,81 +889,121 @@ class DataFetcher:
 
     # -------------------- Etherscan V2 (multi-chain) --------------------
 
-    def _etherscan_call(self, params: Dict[str, str], chain_id: str) -> Dict[str, Any]:
-        api_key = os.environ.get("BASESCAN_API_KEY", "").strip()
-        params = dict(params)
-        params["chainid"] = chain_id
-        if api_key:
-            params["apikey"] = api_key
-
-        url = ETHERSCAN_V2_API_URL + "?" + urlencode(params)
-        return self._http_get_json(url)
+    def _etherscan_call(
+        self,
+        params: Dict[str, str],
+        chain_id: str,
+        *,
+        priority: int = PRIORITY_STATS,
+    ) -> Dict[str, Any]:
+        # Key selection, pacing and rate-limit retries happen in the scheduler.
+        return self.etherscan.call(
+            params,
+            chain_id,
+            http_get=self._http_get_json,
+            base_url=ETHERSCAN_V2_API_URL,
+            priority=priority,
+        )
 
-    def _fetch_etherscan(self, address: str, chain_id: str) -> Dict[str, Any]:
+    def _fetch_etherscan(
+        self,
+        address: str,
+        chain_id: str,
+        *,
+        max_staleness: Optional[float] = None,
+        dex_tx_count: int = 0,
+    ) -> Dict[str, Any]:
         out: Dict[str, Any] = {}
+        key = f"{chain_id}:{address.lower()}"
+
+        # 1) Contract source (and creator, if available). The cached entry keeps
+        # only the source hash; the text lives once per hash in the source store.
+        def _load_source() -> Dict[str, Any]:
+            parsed = self._parse_basescan_source(
+                self._etherscan_call(
+                    {
+                        "module": "contract",
+                        "action": "getsourcecode",
+                        "address": address,
+                    },
+                    chain_id,
+                    priority=PRIORITY_SOURCE,
+                )
+            )
+            if parsed.get("source_code"):
+                parsed["source_hash"] = self.sources.put(chain_id, address, parsed.pop("source_code"))
+            return parsed
+
+        def _verified(p: Dict[str, Any]) -> bool:
+            # Only verified source is immutable; unverified may be verified later.
+            return bool(p.get("contract_verified"))
 
-        # 1) Contract source (and creator, if available)
         try:
-            source_payload = self._etherscan_call(
-                {
-                    "module": "contract",
-                    "action": "getsourcecode",
-                    "address": address,
-                },
-                chain_id,
-            )
-            parsed = self._parse_basescan_source(source_payload)
+            parsed = dict(self._cached("source", key, _load_source, max_staleness, store_if=_verified))
+            if parsed.get("source_hash") and not parsed.get("source_code"):
+                source = self.sources.get_source(parsed["source_hash"])
+                if source is None:
+                    # Evicted from the source store: refetch (and re-store) it.
+                    parsed = dict(self._cached("source", key, _load_source, 0, store_if=_verified))
+                    source = self.sources.get_source(parsed.get("source_hash") or "")
+                parsed["source_code"] = source
             out.update(parsed)
         except Exception:
             # Don't fail the whole Etherscan branch.
             pass
 
-        # 1b) Contract age from oldest transaction (more reliable than txlist desc)
+        # 1b) Immutable facts (creation time → age, creator, decimals, verified):
+        # looked up on first sight, then read from the facts store.
         try:
-            age_days = self._get_contract_age_from_first_tx(address, chain_id)
-            if age_days > 0:
-                out["contract_age_days"] = age_days
+            facts = self._contract_facts(address, chain_id, verified=bool(out.get("contract_verified")))
+            if facts.created_at:
+                out["contract_age_days"] = facts.age_days()
+            if facts.creator:
+                out["creator_address"] = facts.creator
+            if facts.decimals is not None:
+                out["decimals"] = facts.decimals
+            if facts.verified:
+                out["contract_verified"] = True
         except Exception:
             pass
 
-        # 2) Transactions (for age + 24h tx count)
-        try:
-            tx_payload = self._etherscan_call(
-                {
-                    "module": "account",
-                    "action": "txlist",
-                    "address": address,
-                    "startblock": "0",
-                    "endblock": "99999999",
-                    "page": "1",
-                    "offset": "10000",
-                    "sort": "desc",
-                },
-                chain_id,
-            )
-            tx_parsed = self._parse_basescan_txlist(tx_payload)
-            # Only take tx_count_24h from txlist (contract_age_days from step 1b is more reliable)
-            if "tx_count_24h" in tx_parsed:
-                out["tx_count_24h"] = tx_parsed["tx_count_24h"]
-            # Fall back to txlist age only if we don't have it yet
-            if "contract_age_days" not in out and "contract_age_days" in tx_parsed:
-                out["contract_age_days"] = tx_parsed["contract_age_days"]
-        except Exception:
-            pass
+        # 2) 24h tx count, counted over the last day's block range only.
+        # Busy tokens already have a (free) DexScreener count; paging through
+        # thousands of explorer rows for them isn't worth it.
+        if dex_tx_count < TX_PAGE_SIZE:
+            try:
+                tx_parsed = self._cached(
+                    "activity",
+                    key,
+                    lambda: self._count_txs_24h(address, chain_id, max_staleness=max_staleness),
+                    max_staleness,
+                    store_if=bool,  # {} = error/NOTOK response
+                )
+                out.update(tx_parsed)
+            except Exception:
+                pass
 
         # 3) Holders
         try:
-            holders_payload = self._etherscan_call(
-                {
-                    "module": "token",
-                    "action": "tokenholderlist",
-                    "contractaddress": address,
-                    "page": "1",
-                    "offset": "100",
-                },
-                chain_id,
+            holders_parsed = self._cached(
+                "holders",
+                key,
+                lambda: self._parse_basescan_holders(
+                    self._etherscan_call(
+                        {
+                            "module": "token",
+                            "action": "tokenholderlist",
+                            "contractaddress": address,
+                            "page": "1",
+                            "offset": "100",
+                        },
+                        chain_id,
+                        priority=PRIORITY_HOLDERS,
+                    )
+                ),
+                max_staleness,
+                store_if=bool,  # {} = error/NOTOK response
             )
-            holders_parsed = self._parse_basescan_holders(holders_payload)
             out.update(holders_parsed)
         except Exception:
             # Endpoint may not exist; ignore.
@@ -875,6 +1048,70 @@ class DataFetcher:
             "contract_name": contract_name,
         }
 
+    def _block_at_or_after(self, ts: int, chain_id: str) -> Optional[int]:
+        payload = self._etherscan_call(
+            {
+                "module": "block",
+                "action": "getblocknobytime",
+                "timestamp": str(ts),
+                "closest": "after",
+            },
+            chain_id,
+        )
+        try:
+            return int(payload.get("result"))
+        except (TypeError, ValueError):
+            return None
+
+    def _count_txs_24h(
+        self,
+        address: str,
+        chain_id: str,
+        *,
+        max_staleness: Optional[float] = None,
+    ) -> Dict[str, Any]:
+        """Count transactions in the last 24h.
+
+        Resolves the block at now-24h (cached per chain per minute) and pages
+        through ``txlist`` from that block only, newest first, stopping at the
+        first short page or the first row older than the cutoff. Rows are still
+        filtered by timestamp, so a missing start block (lookup failed) just
+        means a full-range query bounded by the page cap.
+        """
+        minute = (int(time.time()) - 24 * 60 * 60) // 60
+        start_block = self._cached(
+            "block",
+            f"{chain_id}:{minute}",
+            lambda: self._block_at_or_after(minute * 60, chain_id),
+            max_staleness,
+            store_if=lambda b: b is not None,
+        )
+
+        count = 0
+        for page in range(1, TX_MAX_PAGES + 1):
+            payload = self._etherscan_call(
+                {
+                    "module": "account",
+                    "action": "txlist",
+                    "address": address,
+                    "startblock": str(start_block or 0),
+                    "endblock": "99999999",
+                    "page": str(page),
+                    "offset": str(TX_PAGE_SIZE),
+                    "sort": "desc",
+                },
+                chain_id,
+            )
+            rows = payload.get("result")
+            if not isinstance(rows, list):
+                # Error string (NOTOK); only fatal if we have nothing yet.
+                return {"tx_count_24h": count} if page > 1 else {}
+            in_window = int(self._parse_basescan_txlist(payload).get("tx_count_24h", 0))
+            count += in_window
+            if len(rows) < TX_PAGE_SIZE or in_window < len(rows):
+                return {"tx_count_24h": count}
+        return {"tx_count_24h": count, "tx_count_truncated": True}
+
     def _parse_basescan_txlist(self, payload: Dict[str, Any]) -> Dict[str, Any]:
         result = payload.get("result")
         if not isinstance(result, list) or not result:
@@ -911,57 +1148,110 @@ class DataFetcher:
             "contract_age_days": age_days,
         }
 
-    def _get_contract_age_from_first_tx(self, address: str, chain_id: str) -> int:
-        """Get contract age by fetching the oldest internal transaction (includes contract creation)."""
-        # Try internal transactions first (faster for contracts, includes creation)
+    def _contract_facts(self, address: str, chain_id: str, *, verified: bool = False) -> ContractFacts:
+        """Stored facts, fetching creation and decimals the first time a contract is seen.
+
+        A lookup that finds no creation time is retried only after the
+        ``facts_miss`` TTL, not on every scan.
+        """
+        facts = self.facts.get(chain_id, address)
+        new = ContractFacts(verified=True if verified and not facts.verified else None)
+        miss_key = f"{chain_id}:{address.lower()}"
+        miss_ttl = self.ttls.get("facts_miss", 0.0)
+        if facts.created_at is None and self.cache.peek("facts_miss", miss_key, ttl_s=miss_ttl) is None:
+            new = self._fetch_contract_creation(address, chain_id).merged(new)
+            if new.created_at is None:
+                new.created_at = self._first_tx_timestamp(address, chain_id) or None
+            if facts.decimals is None:
+                new.decimals = self._fetch_decimals(address, chain_id)
+            if new.created_at is None:
+                # Nothing the facts store would keep us from asking again:
+                # remember the miss for a while so every scan doesn't repeat it.
+                self.cache.put("facts_miss", miss_key, True, ttl_s=miss_ttl)
+        if new.to_strings():
+            self.facts.record(chain_id, address, new)
+        return facts.merged(new)
+
+    def _fetch_contract_creation(self, address: str, chain_id: str) -> ContractFacts:
+        """Creator, deploy tx and (where the explorer reports it) deploy time."""
         try:
             payload = self._etherscan_call(
                 {
-                    "module": "account",
-                    "action": "txlistinternal",
-                    "address": address,
-                    "startblock": "0",
-                    "endblock": "99999999",
-                    "page": "1",
-                    "offset": "1",
-                    "sort": "asc",  # Oldest first
+                    "module": "contract",
+                    "action": "getcontractcreation",
+                    "contractaddresses": address,
                 },
                 chain_id,
+                priority=PRIORITY_SOURCE,
             )
-            result = payload.get("result")
-            if isinstance(result, list) and result:
-                row = result[0] if isinstance(result[0], dict) else {}
-                ts = self._safe_int(row.get("timeStamp"), 0)
-                if ts > 0:
-                    now = int(time.time())
-                    return int((now - ts) / (24 * 60 * 60))
         except Exception:
-            pass
-        
-        # Fallback to regular txlist (slower for high-volume contracts)
+            return ContractFacts()
+        result = payload.get("result")
+        if not isinstance(result, list) or not result or not isinstance(result[0], dict):
+            return ContractFacts()
+        row = result[0]
+        ts = self._safe_int(row.get("timestamp"), 0)
+        return ContractFacts(
+            created_at=ts if ts > 0 else None,
+            creator=row.get("contractCreator") or None,
+            deploy_tx=row.get("txHash") or None,
+        )
+
+    def _fetch_decimals(self, address: str, chain_id: str) -> Optional[int]:
+        """ERC-20 ``decimals()`` via eth_call; None for non-tokens or errors."""
         try:
             payload = self._etherscan_call(
                 {
-                    "module": "account",
-                    "action": "txlist",
-                    "address": address,
-                    "startblock": "0",
-                    "endblock": "99999999",
-                    "page": "1",
-                    "offset": "1",
-                    "sort": "asc",
+                    "module": "proxy",
+                    "action": "eth_call",
+                    "to": address,
+                    "data": "0x313ce567",  # decimals()
+                    "tag": "latest",
                 },
                 chain_id,
             )
-            result = payload.get("result")
-            if isinstance(result, list) and result:
-                row = result[0] if isinstance(result[0], dict) else {}
-                ts = self._safe_int(row.get("timeStamp"), 0)
-                if ts > 0:
-                    now = int(time.time())
-                    return int((now - ts) / (24 * 60 * 60))
+            raw = payload.get("result")
+            if not isinstance(raw, str) or len(raw) != 66 or not raw.startswith("0x"):
+                return None
+            value = int(raw, 16)
         except Exception:
-            pass
+            return None
+        return value if 0 <= value <= 255 else None
+
+    def _get_contract_age_from_first_tx(self, address: str, chain_id: str) -> int:
+        """Get contract age in days from the oldest transaction (0 if unknown)."""
+        ts = self._first_tx_timestamp(address, chain_id)
+        if ts <= 0:
+            return 0
+        return int((int(time.time()) - ts) / (24 * 60 * 60))
+
+    def _first_tx_timestamp(self, address: str, chain_id: str) -> int:
+        """Timestamp of the oldest internal transaction (includes contract creation), else of the oldest tx."""
+        # Internal transactions first (faster for contracts, includes creation),
+        # then regular txlist (slower for high-volume contracts).
+        for action in ("txlistinternal", "txlist"):
+            try:
+                payload = self._etherscan_call(
+                    {
+                        "module": "account",
+                        "action": action,
+                        "address": address,
+                        "startblock": "0",
+                        "endblock": "99999999",
+                        "page": "1",
+                        "offset": "1",
+                        "sort": "asc",  # Oldest first
+                    },
+                    chain_id,
+                )
+                result = payload.get("result")
+                if isinstance(result, list) and result:
+                    row = result[0] if isinstance(result[0], dict) else {}
+                    ts = self._safe_int(row.get("timeStamp"), 0)
+                    if ts > 0:
+                        return ts
+            except Exception:
+                pass
         return 0
 
     def _parse_basescan_holders(self, payload: Dict[str, Any]) -> Dict[str, Any]:
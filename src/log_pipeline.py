@@ -0,0 +1,278 @@
+"""Non-blocking structured logging for VerdictSwarm.
+
+Hot paths (the SSE scan pipeline, data fetchers, agents running in worker
+threads) must never block on stdout. ``configure_logging()`` installs a
+single bounded ``QueueHandler`` on the root logger; a background
+``QueueListener`` thread formats records as JSON lines and writes them out.
+
+Producer-side work is kept to a minimum: apply the sampler, interpolate the
+message (``msg % args``, so later mutation of logged objects can't change
+the line), attach the current log context, ``put_nowait``. The JSON/text
+layout is rendered on the listener thread. When the queue is full the record
+is dropped and counted rather than blocking the caller.
+
+Records carry ``scan_id`` / ``agent`` / ``stage`` from :func:`log_context`
+(contextvars, so they follow asyncio tasks and ``anyio.to_thread`` calls).
+
+Environment:
+    LOG_LEVEL          root level (default INFO)
+    LOG_LEVELS         per-module overrides, e.g.
+                       ``src.data_fetcher=WARNING,api.routers.stream_scan=DEBUG``
+    LOG_FORMAT         ``json`` (default) or ``text``
+    LOG_SAMPLE_PER_MIN max INFO/DEBUG records per message template per minute
+                       (default 120; 0 disables sampling). WARNING and above
+                       are never sampled.
+    LOG_QUEUE_SIZE     bounded queue size (default 10000)
+
+Stdlib only.
+"""
+
+from __future__ import annotations
+
+import atexit
+import contextvars
+import copy
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+_log_ctx: contextvars.ContextVar[Dict[str, Any]] = contextvars.ContextVar("vs_log_ctx", default={})
+
+# LogRecord attributes that are not user-supplied ``extra`` fields.
+_STD_ATTRS = frozenset(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime", "ctx"}
+
+
+# ---------------------------------------------------------------------------
+# Context
+# ---------------------------------------------------------------------------
+
+@contextmanager
+def log_context(**fields: Any) -> Iterator[None]:
+    """Attach fields (scan_id, agent, stage, ...) to every record in this block."""
+    token = _log_ctx.set({**_log_ctx.get(), **fields})
+    try:
+        yield
+    finally:
+        _log_ctx.reset(token)
+
+
+def bind_log_context(**fields: Any) -> None:
+    """Like :func:`log_context` but for the rest of the current task/context."""
+    _log_ctx.set({**_log_ctx.get(), **fields})
+
+
+# ---------------------------------------------------------------------------
+# Stats (exposed for /metrics)
+# ---------------------------------------------------------------------------
+
+class _Stats:
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.enqueued = 0
+        self.dropped = 0
+        self.sampled_out = 0
+        self.producer_ns = 0
+
+    def snapshot(self, q: Optional[queue.Queue]) -> Dict[str, float]:
+        with self.lock:
+            n = max(self.enqueued, 1)
+            return {
+                "enqueued": self.enqueued,
+                "dropped": self.dropped,
+                "sampled_out": self.sampled_out,
+                "queue_depth": q.qsize() if q is not None else 0,
+                "avg_producer_us": round(self.producer_ns / n / 1000.0, 3),
+            }
+
+
+_stats = _Stats()
+
+
+# ---------------------------------------------------------------------------
+# Handler / filters / formatter
+# ---------------------------------------------------------------------------
+
+class _Sampler:
+    """Per-template rate limit for INFO/DEBUG records (fixed one-minute window)."""
+
+    def __init__(self, per_minute: int) -> None:
+        self.per_minute = per_minute
+        self._lock = threading.Lock()
+        self._window = 0
+        self._counts: Dict[Tuple[str, str], int] = {}
+
+    def allow(self, record: logging.LogRecord) -> bool:
+        if self.per_minute <= 0 or record.levelno >= logging.WARNING:
+            return True
+        window = int(time.monotonic() // 60)
+        key = (record.name, str(record.msg))
+        with self._lock:
+            if window != self._window:
+                self._window = window
+                self._counts.clear()
+            n = self._counts.get(key, 0) + 1
+            self._counts[key] = n
+        return n <= self.per_minute
+
+
+_EXC_FORMATTER = logging.Formatter()
+
+
+class NonBlockingQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that never blocks and defers the line layout to the listener."""
+
+    def __init__(self, q: queue.Queue, sampler: _Sampler) -> None:
+        super().__init__(q)
+        self.sampler = sampler
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Interpolate ``msg % args`` and render the traceback here, on the
+        # producer's thread, as the stdlib QueueHandler does: logged dicts and
+        # lists may be mutated before the listener gets to the record. Only
+        # the JSON/text layout is left to the listener. The context is
+        # captured here too, before it changes.
+        record = copy.copy(record)  # other handlers still see the original
+        record.message = record.getMessage()
+        record.msg = record.message
+        record.args = None
+        if record.exc_info:
+            record.exc_text = record.exc_text or _EXC_FORMATTER.formatException(record.exc_info)
+            record.exc_info = None
+        record.ctx = _log_ctx.get()
+        return record
+
+    def emit(self, record: logging.LogRecord) -> None:
+        start = time.perf_counter_ns()
+        if not self.sampler.allow(record):
+            with _stats.lock:
+                _stats.sampled_out += 1
+            return
+        try:
+            self.queue.put_nowait(self.prepare(record))
+            ok = True
+        except queue.Full:
+            ok = False
+        with _stats.lock:
+            if ok:
+                _stats.enqueued += 1
+            else:
+                _stats.dropped += 1
+            _stats.producer_ns += time.perf_counter_ns() - start
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        out: Dict[str, Any] = {
+            "ts": datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat().replace("+00:00", "Z"),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        out.update(getattr(record, "ctx", None) or {})
+        for k, v in record.__dict__.items():
+            if k not in _STD_ATTRS and not k.startswith("_"):
+                out[k] = v
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            out["exc"] = record.exc_text
+        return json.dumps(out, default=str, ensure_ascii=False)
+
+
+class TextFormatter(logging.Formatter):
+    def __init__(self) -> None:
+        super().__init__("%(asctime)s %(levelname)s %(name)s: %(message)s")
+
+    def format(self, record: logging.LogRecord) -> str:
+        line = super().format(record)
+        ctx = getattr(record, "ctx", None)
+        if ctx:
+            line += " " + " ".join(f"{k}={v}" for k, v in ctx.items())
+        return line
+
+
+# ---------------------------------------------------------------------------
+# Setup
+# ---------------------------------------------------------------------------
+
+_listener: Optional[logging.handlers.QueueListener] = None
+_queue: Optional[queue.Queue] = None
+
+
+def _parse_levels(spec: str) -> Dict[str, str]:
+    levels: Dict[str, str] = {}
+    for part in (spec or "").split(","):
+        name, sep, level = part.partition("=")
+        if sep and name.strip() and level.strip():
+            levels[name.strip()] = level.strip().upper()
+    return levels
+
+
+def configure_logging(
+    level: Optional[str] = None,
+    *,
+    module_levels: Optional[Dict[str, str]] = None,
+    json_output: Optional[bool] = None,
+    sample_per_minute: Optional[int] = None,
+    queue_size: Optional[int] = None,
+) -> None:
+    """Install the queue-based pipeline on the root logger (idempotent)."""
+    global _listener, _queue
+    if _listener is not None:
+        return
+
+    level = (level or os.getenv("LOG_LEVEL") or "INFO").upper()
+    if json_output is None:
+        json_output = (os.getenv("LOG_FORMAT") or "json").lower() != "text"
+    if sample_per_minute is None:
+        sample_per_minute = int(os.getenv("LOG_SAMPLE_PER_MIN", "120"))
+    if queue_size is None:
+        queue_size = int(os.getenv("LOG_QUEUE_SIZE", "10000"))
+
+    _queue = queue.Queue(maxsize=queue_size)
+    sink = logging.StreamHandler(sys.stdout)
+    sink.setFormatter(JsonFormatter() if json_output else TextFormatter())
+
+    root = logging.getLogger()
+    for h in list(root.handlers):
+        root.removeHandler(h)
+    root.addHandler(NonBlockingQueueHandler(_queue, _Sampler(sample_per_minute)))
+    root.setLevel(level)
+
+    levels = _parse_levels(os.getenv("LOG_LEVELS", ""))
+    levels.update(module_levels or {})
+    for name, lvl in levels.items():
+        logging.getLogger(name).setLevel(lvl)
+
+    _listener = logging.handlers.QueueListener(_queue, sink, respect_handler_level=False)
+    _listener.start()
+    atexit.register(shutdown_logging)
+
+
+def shutdown_logging() -> None:
+    """Flush the queue and stop the listener thread."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+def log_stats() -> Dict[str, float]:
+    return _stats.snapshot(_queue)
+
+
+__all__ = [
+    "bind_log_context",
+    "configure_logging",
+    "log_context",
+    "log_stats",
+    "shutdown_logging",
+]
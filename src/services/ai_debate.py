@@ -14,11 +14,14 @@ can use the existing template text.
 
 from __future__ import annotations
 
+import logging
 import os
 from typing import Any, Dict, List, Optional
 
 from src.agents.ai_client import AIClient
 
+logger = logging.getLogger(__name__)
+
 
 def _get_ai_client() -> Optional[AIClient]:
     """Create an AIClient if Gemini is configured, else return None."""
@@ -90,7 +93,7 @@ def generate_da_challenge(
             json_mode=False,
         )
     except Exception as e:
-        print(f"[WARN] AI debate challenge generation failed for {token_name} ({len(verdicts)} verdicts): {e}")
+        logger.warning("AI debate challenge generation failed for %s (%s verdicts): %s", token_name, len(verdicts), e)
         return None
 
 
@@ -142,7 +145,7 @@ def generate_agent_defense(
             json_mode=False,
         )
     except Exception as e:
-        print(f"[WARN] AI debate defense generation failed for {token_name} ({len(verdicts)} verdicts): {e}")
+        logger.warning("AI debate defense generation failed for %s (%s verdicts): %s", token_name, len(verdicts), e)
         return None
 
 
@@ -201,5 +204,5 @@ def generate_consensus_narrative(
             json_mode=False,
         )
     except Exception as e:
-        print(f"[WARN] AI consensus narrative generation failed for {token_name} ({len(verdicts)} verdicts): {e}")
+        logger.warning("AI consensus narrative generation failed for %s (%s verdicts): %s", token_name, len(verdicts), e)
         return None
@@ -0,0 +1,153 @@
+"""Which chain an EVM address lives on, when the caller didn't say.
+
+The same 0x address format is used on every EVM chain, so a pasted address
+with no chain used to be scanned as ``base``; a token on Ethereum or Arbitrum
+then came back with empty explorer data and a misleading verdict.
+
+:meth:`ChainResolver.resolve` answers from, in order:
+
+1. **Cache** — address → chain mappings are kept under the fetch cache's
+   ``chain`` source (a year by default; deployments don't move).
+2. **DexScreener** — the ``chainId`` of the token's selected pair. One request
+   that the following market fetch reuses, so it is usually free.
+3. **Code probes** — if DexScreener has no answer within ``dex_head_start_s``,
+   ``eth_getCode`` is checked on every supported chain concurrently (through
+   the Etherscan scheduler). When several chains have code the earliest in
+   ``chains`` wins. A late DexScreener answer still takes precedence.
+
+Nothing found → ``default`` (not cached). Stdlib only; the lookups are passed
+in by ``DataFetcher``.
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from typing import Callable, Dict, Optional, Sequence, Tuple
+
+from .fetch_cache import FetchCache
+
+logger = logging.getLogger(__name__)
+
+# Probe order doubles as the tie-break when an address has code on several chains.
+PROBE_CHAINS: Tuple[str, ...] = ("base", "ethereum", "arbitrum", "optimism", "polygon", "bsc", "avalanche")
+DEFAULT_CHAIN_TTL_S = 365 * 86400.0
+DEFAULT_DEX_HEAD_START_S = 1.0
+DEFAULT_TIMEOUT_S = 8.0
+
+_AUTO = {"", "auto"}
+
+
+def is_auto_chain(chain: Optional[str]) -> bool:
+    """True when the caller left the chain for us to work out."""
+    return chain is None or str(chain).strip().lower() in _AUTO
+
+
+@dataclass(frozen=True)
+class ChainResolution:
+    chain: str
+    source: str  # cache | dexscreener | code | default
+    # Chains where the address has code (code probes only).
+    candidates: Tuple[str, ...] = ()
+
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def _pool() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(max_workers=16, thread_name_prefix="vs-chain-probe")
+    return _executor
+
+
+class ChainResolver:
+    def __init__(
+        self,
+        *,
+        market_chain: Callable[[str], Optional[str]],
+        has_code: Callable[[str, str], Optional[bool]],
+        cache: Optional[FetchCache] = None,
+        ttl_s: float = DEFAULT_CHAIN_TTL_S,
+        chains: Sequence[str] = PROBE_CHAINS,
+        default: str = "base",
+        dex_head_start_s: float = DEFAULT_DEX_HEAD_START_S,
+        timeout_s: float = DEFAULT_TIMEOUT_S,
+    ) -> None:
+        self.market_chain = market_chain
+        self.has_code = has_code
+        self.cache = cache
+        self.ttl_s = float(ttl_s)
+        self.chains = tuple(chains)
+        self.default = default
+        self.dex_head_start_s = float(dex_head_start_s)
+        self.timeout_s = float(timeout_s)
+
+    def _dex_chain(self, fut: "Future[Optional[str]]") -> Optional[str]:
+        try:
+            chain = (fut.result() or "").lower()
+        except Exception as e:
+            logger.debug("Chain resolve: DexScreener lookup failed: %s", e)
+            return None
+        return chain if chain in self.chains else None
+
+    def _done(self, key: str, chain: str, source: str, candidates: Tuple[str, ...] = ()) -> ChainResolution:
+        if self.cache is not None:
+            self.cache.put("chain", key, chain, ttl_s=self.ttl_s)
+        logger.info("Resolved chain for %s: %s (via %s)", key, chain, source)
+        return ChainResolution(chain, source, candidates)
+
+    def resolve(self, address: str) -> ChainResolution:
+        addr = (address or "").strip()
+        key = addr.lower()
+        if self.cache is not None:
+            entry = self.cache.peek("chain", key, ttl_s=self.ttl_s)
+            if entry is not None:
+                return ChainResolution(entry[0], "cache")
+
+        pool = _pool()
+        deadline = time.monotonic() + self.timeout_s
+        dex_fut = pool.submit(self.market_chain, addr)
+        wait([dex_fut], timeout=self.dex_head_start_s)
+        if dex_fut.done():
+            chain = self._dex_chain(dex_fut)
+            if chain:
+                return self._done(key, chain, "dexscreener")
+
+        probes: Dict[Future, str] = {pool.submit(self.has_code, addr, c): c for c in self.chains}
+        pending = set(probes) | ({dex_fut} if not dex_fut.done() else set())
+        with_code = set()
+        while pending:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                logger.warning("Chain resolve for %s timed out with %s lookups pending", key, len(pending))
+                break
+            done, pending = wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+            for fut in done:
+                if fut is dex_fut:
+                    chain = self._dex_chain(fut)
+                    if chain:
+                        return self._done(key, chain, "dexscreener")
+                elif not fut.exception() and fut.result() is True:
+                    with_code.add(probes[fut])
+            if with_code and not (pending - {dex_fut}):
+                break  # every probe is in; only wait on DexScreener if they found nothing
+
+        candidates = tuple(c for c in self.chains if c in with_code)
+        if candidates:
+            return self._done(key, candidates[0], "code", candidates)
+        return ChainResolution(self.default, "default")
+
+
+__all__ = [
+    "ChainResolution",
+    "ChainResolver",
+    "PROBE_CHAINS",
+    "is_auto_chain",
+]
@@ -18,12 +18,16 @@ Design goals:
 from __future__ import annotations
 
 import json
+import logging
 import math
 import os
 from dataclasses import dataclass, field
 from typing import Any, Dict, List, Optional, Tuple
 
 from src.agents.ai_client import AIClient
+from src.services.tracing import span
+
+logger = logging.getLogger(__name__)
 
 
 # ---------------------------------------------------------------------------
@@ -177,7 +181,7 @@ def generate_critique(
             raw=json.dumps(result),
         )
     except Exception as e:
-        print(f"[CONVERGENCE] Critique generation failed for {agent_name}: {e}")
+        logger.warning("Critique generation failed for %s: %s", agent_name, e)
         return None
 
 
@@ -285,7 +289,7 @@ def generate_score_update(
             explanation=explanation,
         )
     except Exception as e:
-        print(f"[CONVERGENCE] Score update failed for {agent_name}: {e}")
+        logger.warning("Score update failed for %s: %s", agent_name, e)
         return None
 
 
@@ -455,7 +459,7 @@ async def generate_moderator_verdict(
             strongest_arguments=strongest_arguments,
         )
     except Exception as e:
-        print(f"[CONVERGENCE] Moderator verdict failed: {e}")
+        logger.warning("Moderator verdict failed: %s", e)
         return fallback
 
 
@@ -503,32 +507,34 @@ def run_full_convergence(
             averaged_score=averaged_score,
         )
     
-    print(f"[CONVERGENCE] Starting convergence: {len(scoreable)} agents, σ={initial_sigma:.2f}")
+    logger.info("Starting convergence: %s agents, σ=%.2f", len(scoreable), initial_sigma)
     
     # Phase 2: Attack Round
-    critiques = run_attack_round(verdicts, token_name, token_symbol)
+    with span("convergence:attack"):
+        critiques = run_attack_round(verdicts, token_name, token_symbol)
     if not critiques:
-        print("[CONVERGENCE] Attack round produced no critiques — skipping convergence")
+        logger.info("Attack round produced no critiques — skipping convergence")
         return None
     
-    print(f"[CONVERGENCE] Attack round: {len(critiques)} agents produced critiques")
+    logger.info("Attack round: %s agents produced critiques", len(critiques))
     
     # Phase 3: Convergence Loop
     current_scores = {name: float(getattr(v, "score", 0)) for name, v in scoreable.items()}
     rounds = []
     
     for round_num in range(1, max_rounds + 1):
-        result = run_convergence_round(
-            verdicts=verdicts,
-            current_scores=current_scores,
-            critiques=critiques,
-            round_num=round_num,
-            token_name=token_name,
-            token_symbol=token_symbol,
-        )
+        with span("convergence:round", round=round_num):
+            result = run_convergence_round(
+                verdicts=verdicts,
+                current_scores=current_scores,
+                critiques=critiques,
+                round_num=round_num,
+                token_name=token_name,
+                token_symbol=token_symbol,
+            )
         
         if result is None:
-            print(f"[CONVERGENCE] Round {round_num} failed — stopping")
+            logger.warning("Round %s failed — stopping", round_num)
             break
         
         rounds.append(result)
@@ -537,7 +543,7 @@ def run_full_convergence(
         for u in result.updates:
             current_scores[u.agent_name] = u.updated_score
         
-        print(f"[CONVERGENCE] Round {round_num}: σ={result.std_dev:.2f} converged={result.converged}")
+        logger.info("Round %s: σ=%.2f converged=%s", round_num, result.std_dev, result.converged)
         
         if result.converged:
             break
@@ -555,14 +561,15 @@ def run_full_convergence(
         )
     else:
         # Deadlock: Moderator issues binding verdict
-        moderator_verdict = __import__("asyncio").run(
-            generate_moderator_verdict(
-                agent_verdicts=verdicts,
-                critiques=critiques,
-                rounds=rounds,
-                ai_client=client,
+        with span("convergence:moderator"):
+            moderator_verdict = __import__("asyncio").run(
+                generate_moderator_verdict(
+                    agent_verdicts=verdicts,
+                    critiques=critiques,
+                    rounds=rounds,
+                    ai_client=client,
+                )
             )
-        )
     
     return ConvergenceResult(
         critiques=critiques,
@@ -0,0 +1,278 @@
+"""Central pacing for Etherscan V2 API calls.
+
+Every ``DataFetcher`` in the process sends explorer calls through one
+:class:`EtherscanScheduler`:
+
+- **Token bucket per API key.** ``ETHERSCAN_API_KEYS`` (comma-separated;
+  falls back to ``BASESCAN_API_KEY``) are used round-robin, each paced to
+  ``ETHERSCAN_RATE_PER_KEY`` calls/s (default 5, the free-plan limit).
+- **Priority.** When keys are saturated, waiting calls are served by
+  priority — contract source first, then holders, then tx stats — so the
+  data agents depend on most is the last to be starved.
+- **Retry on rate limit.** ``NOTOK``/"rate limit" responses are retried
+  (with the key paused briefly) instead of being returned as empty data.
+- **Coalescing.** Identical calls already in flight (e.g. two concurrent
+  scans of the same token) share one upstream request. Etherscan has no
+  batch endpoint for these modules, so this is the batching we can do.
+
+:meth:`EtherscanScheduler.stats` reports per-key call/limit/wait counts and
+overall throughput. Stdlib only.
+"""
+
+from __future__ import annotations
+
+import heapq
+import itertools
+import logging
+import os
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from urllib.parse import urlencode
+
+logger = logging.getLogger(__name__)
+
+PRIORITY_SOURCE = 0
+PRIORITY_HOLDERS = 1
+PRIORITY_STATS = 2
+
+DEFAULT_RATE_PER_KEY = 5.0
+# How long a call may wait for a token before giving up.
+DEFAULT_MAX_WAIT_S = 10.0
+MAX_RATE_LIMIT_RETRIES = 2
+# A key that just got rate-limited is not used again for this long.
+RATE_LIMIT_PAUSE_S = 1.0
+
+
+class SchedulerTimeout(Exception):
+    """No API key had capacity within the caller's wait budget."""
+
+
+class TokenBucket:
+    """Classic token bucket; not locked (the scheduler holds its lock)."""
+
+    def __init__(self, rate: float, capacity: Optional[float] = None) -> None:
+        self.rate = max(0.01, float(rate))
+        self.capacity = max(1.0, float(capacity if capacity is not None else rate))
+        self.tokens = self.capacity
+        self._updated = time.monotonic()
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def try_take(self, now: float) -> float:
+        """Take a token and return 0, or return seconds until one is available."""
+        self._refill(now)
+        if self.tokens >= 1.0:
+            self.tokens -= 1.0
+            return 0.0
+        return (1.0 - self.tokens) / self.rate
+
+    def drain(self, now: float, pause_s: float) -> None:
+        """Empty the bucket so the next token arrives after ``pause_s``."""
+        self._refill(now)
+        self.tokens = min(self.tokens, 1.0 - pause_s * self.rate)
+
+
+def _is_rate_limited(payload: Any) -> bool:
+    if not isinstance(payload, dict) or str(payload.get("status", "")) != "0":
+        return False
+    text = f"{payload.get('message', '')} {payload.get('result', '')}".lower()
+    return "rate limit" in text
+
+
+def _mask(key: str) -> str:
+    return f"…{key[-4:]}" if key else "(no key)"
+
+
+class EtherscanScheduler:
+    def __init__(
+        self,
+        keys: Optional[List[str]] = None,
+        *,
+        rate_per_key: float = DEFAULT_RATE_PER_KEY,
+        max_wait_s: float = DEFAULT_MAX_WAIT_S,
+    ) -> None:
+        self.keys: List[str] = [k for k in (keys or []) if k] or [""]
+        self.max_wait_s = float(max_wait_s)
+        self._cond = threading.Condition()
+        self._buckets = {k: TokenBucket(rate_per_key) for k in self.keys}
+        self._rr = itertools.cycle(range(len(self.keys)))
+        self._seq = itertools.count()
+        self._waiting: List[Tuple[int, int]] = []
+        self._inflight: Dict[str, Future] = {}
+        self._started = time.monotonic()
+        self._stats: Dict[str, Dict[str, float]] = {
+            k: {"calls": 0, "rate_limited": 0, "errors": 0, "wait_ms": 0.0} for k in self.keys
+        }
+        self.coalesced = 0
+        self.timeouts = 0
+
+    @classmethod
+    def from_env(cls) -> "EtherscanScheduler":
+        raw = os.environ.get("ETHERSCAN_API_KEYS", "").strip() or os.environ.get("BASESCAN_API_KEY", "").strip()
+        keys = [k.strip() for k in raw.split(",") if k.strip()]
+        try:
+            rate = float(os.environ.get("ETHERSCAN_RATE_PER_KEY", DEFAULT_RATE_PER_KEY))
+        except ValueError:
+            rate = DEFAULT_RATE_PER_KEY
+        return cls(keys, rate_per_key=rate)
+
+    # -------------------- key acquisition --------------------
+
+    def _take_any(self, now: float) -> Tuple[Optional[str], float]:
+        """Round-robin over keys; returns (key, 0) or (None, shortest wait)."""
+        shortest = float("inf")
+        for _ in range(len(self.keys)):
+            key = self.keys[next(self._rr)]
+            wait = self._buckets[key].try_take(now)
+            if wait == 0.0:
+                return key, 0.0
+            shortest = min(shortest, wait)
+        return None, shortest
+
+    def _acquire(self, priority: int) -> str:
+        t0 = time.monotonic()
+        deadline = t0 + self.max_wait_s
+        with self._cond:
+            ticket = (priority, next(self._seq))
+            heapq.heappush(self._waiting, ticket)
+            try:
+                while True:
+                    now = time.monotonic()
+                    wait: Optional[float] = None
+                    if self._waiting[0] == ticket:
+                        key, wait = self._take_any(now)
+                        if key is not None:
+                            self._stats[key]["wait_ms"] += (now - t0) * 1000.0
+                            return key
+                    if now >= deadline:
+                        self.timeouts += 1
+                        raise SchedulerTimeout(f"no Etherscan capacity within {self.max_wait_s:g}s")
+                    self._cond.wait(min(wait if wait is not None else deadline - now, deadline - now))
+            finally:
+                self._waiting.remove(ticket)
+                heapq.heapify(self._waiting)
+                self._cond.notify_all()
+
+    # -------------------- calls --------------------
+
+    def call(
+        self,
+        params: Dict[str, str],
+        chain_id: str,
+        *,
+        http_get: Callable[[str], Dict[str, Any]],
+        base_url: str,
+        priority: int = PRIORITY_STATS,
+    ) -> Dict[str, Any]:
+        """Paced GET of ``base_url?params&chainid=..&apikey=..`` → JSON payload."""
+        query = dict(params)
+        query["chainid"] = chain_id
+        dedupe_key = urlencode(sorted(query.items()))
+
+        with self._cond:
+            pending = self._inflight.get(dedupe_key)
+            if pending is None:
+                owner = True
+                pending = self._inflight[dedupe_key] = Future()
+            else:
+                owner = False
+                self.coalesced += 1
+        if not owner:
+            return pending.result()
+
+        try:
+            payload = self._call_with_retry(query, http_get=http_get, base_url=base_url, priority=priority)
+            pending.set_result(payload)
+            return payload
+        except BaseException as e:
+            pending.set_exception(e)
+            raise
+        finally:
+            with self._cond:
+                self._inflight.pop(dedupe_key, None)
+
+    def _call_with_retry(
+        self,
+        query: Dict[str, str],
+        *,
+        http_get: Callable[[str], Dict[str, Any]],
+        base_url: str,
+        priority: int,
+    ) -> Dict[str, Any]:
+        payload: Dict[str, Any] = {}
+        for attempt in range(MAX_RATE_LIMIT_RETRIES + 1):
+            key = self._acquire(priority)
+            q = dict(query)
+            if key:
+                q["apikey"] = key
+            try:
+                payload = http_get(base_url + "?" + urlencode(q))
+            except Exception:
+                with self._cond:
+                    self._stats[key]["errors"] += 1
+                raise
+            with self._cond:
+                self._stats[key]["calls"] += 1
+                if not _is_rate_limited(payload):
+                    return payload
+                self._stats[key]["rate_limited"] += 1
+                self._buckets[key].drain(time.monotonic(), RATE_LIMIT_PAUSE_S)
+            logger.info(
+                "Etherscan rate limit on key %s (%s), retry %s/%s",
+                _mask(key), query.get("action"), attempt + 1, MAX_RATE_LIMIT_RETRIES,
+            )
+        logger.warning("Etherscan %s still rate-limited after %s retries", query.get("action"), MAX_RATE_LIMIT_RETRIES)
+        return payload
+
+    # -------------------- stats --------------------
+
+    def stats(self) -> Dict[str, Any]:
+        with self._cond:
+            elapsed = max(1e-6, time.monotonic() - self._started)
+            per_key = {}
+            total_calls = 0.0
+            for key, s in self._stats.items():
+                total_calls += s["calls"]
+                per_key[_mask(key)] = {
+                    "calls": int(s["calls"]),
+                    "rate_limited": int(s["rate_limited"]),
+                    "errors": int(s["errors"]),
+                    "avg_wait_ms": round(s["wait_ms"] / s["calls"], 1) if s["calls"] else 0.0,
+                }
+            return {
+                "keys": per_key,
+                "calls": int(total_calls),
+                "calls_per_s": round(total_calls / elapsed, 3),
+                "waiting": len(self._waiting),
+                "coalesced": self.coalesced,
+                "timeouts": self.timeouts,
+            }
+
+
+_scheduler: Optional[EtherscanScheduler] = None
+_scheduler_lock = threading.Lock()
+
+
+def get_etherscan_scheduler() -> EtherscanScheduler:
+    """Process-wide scheduler (buckets must be shared to mean anything)."""
+    global _scheduler
+    if _scheduler is None:
+        with _scheduler_lock:
+            if _scheduler is None:
+                _scheduler = EtherscanScheduler.from_env()
+    return _scheduler
+
+
+__all__ = [
+    "EtherscanScheduler",
+    "PRIORITY_HOLDERS",
+    "PRIORITY_SOURCE",
+    "PRIORITY_STATS",
+    "SchedulerTimeout",
+    "TokenBucket",
+    "get_etherscan_scheduler",
+]
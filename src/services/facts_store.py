@@ -0,0 +1,226 @@
+"""Write-once store for on-chain facts that never change.
+
+A contract's creation time, creator, deploy transaction and decimals are
+fixed at deployment, and verified source stays verified. They were
+refetched from the explorer on every scan. Here each fact is recorded once
+per ``(chain_id, address)`` and later scans read it back; ``contract_age_days``
+is derived locally from :attr:`ContractFacts.created_at`.
+
+Fields are write-once: :meth:`FactsStore.record` never overwrites a stored
+value, and ``None`` / ``verified=False`` are not stored at all (an unverified
+contract may be verified later).
+
+Backends:
+
+- :class:`MemoryFactsStore` — per process (the default).
+- :class:`RedisFactsStore` — hash ``facts:{chain_id}:{address}`` with no TTL,
+  written with ``HSETNX``; takes an already-built *synchronous* client.
+- :class:`SQLiteFactsStore` — a local file (``VS_FACTS_SQLITE_PATH``) that
+  survives restarts without Redis.
+- :class:`TieredFactsStore` — local in front of shared.
+
+Backend errors are logged and swallowed; a failing store only means the
+facts are fetched again. Stdlib only.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import asdict, dataclass, fields
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class ContractFacts:
+    created_at: Optional[int] = None  # unix seconds of the deploy block
+    creator: Optional[str] = None
+    deploy_tx: Optional[str] = None
+    decimals: Optional[int] = None
+    verified: Optional[bool] = None  # only ever True once stored
+
+    @classmethod
+    def from_strings(cls, raw: Dict[str, str]) -> "ContractFacts":
+        """Parse the string form used by the Redis and SQLite backends."""
+        out = cls()
+        for f in fields(cls):
+            v = raw.get(f.name)
+            if v is None or v == "":
+                continue
+            try:
+                if f.name in {"created_at", "decimals"}:
+                    setattr(out, f.name, int(v))
+                elif f.name == "verified":
+                    setattr(out, f.name, str(v) in {"1", "true", "True"})
+                else:
+                    setattr(out, f.name, str(v))
+            except ValueError:
+                logger.debug("Ignoring bad stored fact %s=%r", f.name, v)
+        return out
+
+    def to_strings(self) -> Dict[str, str]:
+        """Set fields only, as strings (False/None are never stored)."""
+        out: Dict[str, str] = {}
+        for name, v in asdict(self).items():
+            if v is None or v is False:
+                continue
+            out[name] = "1" if v is True else str(v)
+        return out
+
+    def merged(self, other: "ContractFacts") -> "ContractFacts":
+        """Self's values, with ``other`` filling the gaps."""
+        return ContractFacts(
+            **{name: (v if v is not None else getattr(other, name)) for name, v in asdict(self).items()}
+        )
+
+    def age_days(self, now: Optional[float] = None) -> int:
+        if not self.created_at:
+            return 0
+        now = time.time() if now is None else now
+        return max(0, int((now - self.created_at) / 86400))
+
+
+def _key(chain_id: str, address: str) -> str:
+    # EVM addresses are case-insensitive; Solana mints are not.
+    a = (address or "").strip()
+    return f"{chain_id}:{a.lower() if a.startswith('0x') else a}"
+
+
+class FactsStore:
+    def get(self, chain_id: str, address: str) -> ContractFacts:
+        raise NotImplementedError
+
+    def record(self, chain_id: str, address: str, facts: ContractFacts) -> None:
+        """Store the set fields of ``facts`` that aren't stored yet."""
+        raise NotImplementedError
+
+
+class MemoryFactsStore(FactsStore):
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._data: Dict[str, ContractFacts] = {}
+
+    def get(self, chain_id: str, address: str) -> ContractFacts:
+        with self._lock:
+            return ContractFacts(**asdict(self._data.get(_key(chain_id, address), ContractFacts())))
+
+    def record(self, chain_id: str, address: str, facts: ContractFacts) -> None:
+        key = _key(chain_id, address)
+        new = ContractFacts.from_strings(facts.to_strings())
+        with self._lock:
+            self._data[key] = self._data.get(key, ContractFacts()).merged(new)
+
+
+class RedisFactsStore(FactsStore):
+    def __init__(self, client: Any, *, prefix: str = "facts:") -> None:
+        self.client = client
+        self.prefix = prefix
+
+    def get(self, chain_id: str, address: str) -> ContractFacts:
+        try:
+            raw = self.client.hgetall(self.prefix + _key(chain_id, address)) or {}
+        except Exception as e:
+            logger.debug("Facts store read failed for %s: %s", address, e)
+            return ContractFacts()
+        return ContractFacts.from_strings(
+            {(k.decode() if isinstance(k, bytes) else k): (v.decode() if isinstance(v, bytes) else v) for k, v in raw.items()}
+        )
+
+    def record(self, chain_id: str, address: str, facts: ContractFacts) -> None:
+        values = facts.to_strings()
+        if not values:
+            return
+        try:
+            pipe = self.client.pipeline(transaction=False)
+            for name, v in values.items():
+                pipe.hsetnx(self.prefix + _key(chain_id, address), name, v)
+            pipe.execute()
+        except Exception as e:
+            logger.debug("Facts store write failed for %s: %s", address, e)
+
+
+class SQLiteFactsStore(FactsStore):
+    _COLUMNS = tuple(f.name for f in fields(ContractFacts))
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS contract_facts ("
+            "key TEXT PRIMARY KEY, " + ", ".join(f"{c} TEXT" for c in self._COLUMNS) + ")"
+        )
+
+    def get(self, chain_id: str, address: str) -> ContractFacts:
+        try:
+            with self._lock:
+                row = self._conn.execute(
+                    f"SELECT {', '.join(self._COLUMNS)} FROM contract_facts WHERE key = ?",
+                    (_key(chain_id, address),),
+                ).fetchone()
+        except sqlite3.Error as e:
+            logger.debug("Facts store read failed for %s: %s", address, e)
+            return ContractFacts()
+        if row is None:
+            return ContractFacts()
+        return ContractFacts.from_strings({c: v for c, v in zip(self._COLUMNS, row) if v is not None})
+
+    def record(self, chain_id: str, address: str, facts: ContractFacts) -> None:
+        values = facts.to_strings()
+        if not values:
+            return
+        key = _key(chain_id, address)
+        sets = ", ".join(f"{c} = COALESCE({c}, ?)" for c in values)
+        try:
+            with self._lock:
+                self._conn.execute("INSERT OR IGNORE INTO contract_facts (key) VALUES (?)", (key,))
+                self._conn.execute(f"UPDATE contract_facts SET {sets} WHERE key = ?", (*values.values(), key))
+        except sqlite3.Error as e:
+            logger.debug("Facts store write failed for %s: %s", address, e)
+
+
+class TieredFactsStore(FactsStore):
+    def __init__(self, local: FactsStore, shared: FactsStore) -> None:
+        self.local = local
+        self.shared = shared
+
+    def get(self, chain_id: str, address: str) -> ContractFacts:
+        facts = self.local.get(chain_id, address)
+        if facts.created_at is not None and facts.decimals is not None and facts.verified:
+            return facts  # nothing left the shared store could add
+        shared = self.shared.get(chain_id, address)
+        if shared.to_strings().keys() - facts.to_strings().keys():
+            self.local.record(chain_id, address, shared)
+        return facts.merged(shared)
+
+    def record(self, chain_id: str, address: str, facts: ContractFacts) -> None:
+        self.local.record(chain_id, address, facts)
+        self.shared.record(chain_id, address, facts)
+
+
+def local_facts_store() -> FactsStore:
+    """SQLite at ``VS_FACTS_SQLITE_PATH`` when set (and openable), else memory."""
+    path = os.environ.get("VS_FACTS_SQLITE_PATH", "").strip()
+    if path:
+        try:
+            return SQLiteFactsStore(path)
+        except sqlite3.Error as e:
+            logger.warning("Facts store: can't open %s (%s), using memory", path, e)
+    return MemoryFactsStore()
+
+
+__all__ = [
+    "ContractFacts",
+    "FactsStore",
+    "MemoryFactsStore",
+    "RedisFactsStore",
+    "SQLiteFactsStore",
+    "TieredFactsStore",
+    "local_facts_store",
+]
@@ -0,0 +1,222 @@
+"""Per-source TTL cache for DataFetcher upstream calls.
+
+Most of what a scan fetches changes on very different clocks: CoinGecko
+categories almost never, verified contract source never, holder lists every
+few minutes, DexScreener pairs every few seconds. The fetcher looks each
+source up here first, with a freshness policy per source (:data:`DEFAULT_TTLS`,
+overridable via ``FETCH_CACHE_TTLS="market=30,holders=300"``). The global
+macro snapshot is shared process-wide by ``market_context`` instead.
+A call to ``DataFetcher.fetch(..., max_staleness=...)`` can tighten the policy
+for one scan (``0`` forces a refetch).
+
+Backends:
+
+- :class:`MemoryFetchCache` — bounded LRU dict, per process (the default).
+- :class:`RedisFetchCache` — shared across workers; takes an already-built
+  *synchronous* redis client so this module stays stdlib-only.
+- :class:`TieredFetchCache` — memory in front of Redis.
+
+Entries carry their store time, so freshness is always judged against the
+caller's policy rather than the backend TTL. Backend errors are swallowed —
+the cache can only make a fetch faster, never fail it.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Seconds a cached value may be served, per source.
+DEFAULT_TTLS: Dict[str, float] = {
+    "categories": 3 * 86400.0,  # CoinGecko categories
+    "source": 30 * 86400.0,  # verified contract source (immutable; bounded for storage)
+    "market": 45.0,  # DexScreener pairs
+    "holders": 600.0,  # holder count / concentration
+    "activity": 120.0,  # 24h tx count
+    "block": 120.0,  # block number at now-24h (keyed per chain per minute)
+    "chain": 365 * 86400.0,  # address -> chain for auto-detection (deployments don't move)
+    "facts_miss": 3600.0,  # contract creation lookup found nothing (retried after this)
+}
+
+Entry = Tuple[Any, float]  # (value, stored_at unix seconds)
+
+
+def ttls_from_env(base: Optional[Dict[str, float]] = None) -> Dict[str, float]:
+    """``DEFAULT_TTLS`` with ``FETCH_CACHE_TTLS`` ("source=seconds,...") applied."""
+    ttls = dict(base or DEFAULT_TTLS)
+    for part in os.environ.get("FETCH_CACHE_TTLS", "").split(","):
+        name, sep, value = part.partition("=")
+        if not sep:
+            continue
+        try:
+            ttls[name.strip()] = float(value)
+        except ValueError:
+            logger.warning("Ignoring bad FETCH_CACHE_TTLS entry: %s", part)
+    return ttls
+
+
+class FetchCache:
+    """Backend interface. ``get`` returns ``(value, stored_at)`` or None."""
+
+    def __init__(self) -> None:
+        self._stats_lock = threading.Lock()
+        self.hits: Dict[str, int] = {}
+        self.misses: Dict[str, int] = {}
+
+    def get(self, key: str) -> Optional[Entry]:
+        raise NotImplementedError
+
+    def set(self, key: str, value: Any, ttl_s: float, stored_at: Optional[float] = None) -> None:
+        raise NotImplementedError
+
+    def _count(self, source: str, hit: bool) -> None:
+        with self._stats_lock:
+            counter = self.hits if hit else self.misses
+            counter[source] = counter.get(source, 0) + 1
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        with self._stats_lock:
+            sources = set(self.hits) | set(self.misses)
+            return {s: {"hits": self.hits.get(s, 0), "misses": self.misses.get(s, 0)} for s in sorted(sources)}
+
+    def peek(
+        self,
+        source: str,
+        key: str,
+        *,
+        ttl_s: float,
+        max_staleness: Optional[float] = None,
+    ) -> Optional[Entry]:
+        """The cached entry if fresh enough under the policy (counted as hit/miss), else None."""
+        limit = ttl_s if max_staleness is None else min(ttl_s, max(0.0, float(max_staleness)))
+        if limit > 0:
+            entry = self.get(f"{source}:{key}")
+            if entry is not None and time.time() - entry[1] <= limit:
+                self._count(source, True)
+                return entry
+        self._count(source, False)
+        return None
+
+    def put(self, source: str, key: str, value: Any, *, ttl_s: float) -> None:
+        if ttl_s > 0:
+            self.set(f"{source}:{key}", value, ttl_s)
+
+    def lookup(
+        self,
+        source: str,
+        key: str,
+        loader: Callable[[], Any],
+        *,
+        ttl_s: float,
+        max_staleness: Optional[float] = None,
+        store_if: Optional[Callable[[Any], bool]] = None,
+    ) -> Any:
+        """Return a fresh-enough cached value, else ``loader()`` (stored on success)."""
+        entry = self.peek(source, key, ttl_s=ttl_s, max_staleness=max_staleness)
+        if entry is not None:
+            return entry[0]
+        value = loader()  # errors propagate and are not cached
+        if store_if is None or store_if(value):
+            self.put(source, key, value, ttl_s=ttl_s)
+        return value
+
+
+class MemoryFetchCache(FetchCache):
+    def __init__(self, max_entries: int = 2048) -> None:
+        super().__init__()
+        self.max_entries = max(1, int(max_entries))
+        self._lock = threading.Lock()
+        self._data: "OrderedDict[str, Tuple[Any, float, float]]" = OrderedDict()
+
+    def get(self, key: str) -> Optional[Entry]:
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            value, stored_at, expires_at = item
+            if time.time() >= expires_at:
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value, stored_at
+
+    def set(self, key: str, value: Any, ttl_s: float, stored_at: Optional[float] = None) -> None:
+        stored_at = time.time() if stored_at is None else stored_at
+        with self._lock:
+            self._data[key] = (value, stored_at, stored_at + ttl_s)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+
+class RedisFetchCache(FetchCache):
+    """JSON entries under ``{prefix}{key}`` with a matching Redis TTL."""
+
+    def __init__(self, client: Any, *, prefix: str = "fetch:") -> None:
+        super().__init__()
+        self.client = client
+        self.prefix = prefix
+
+    def get(self, key: str) -> Optional[Entry]:
+        try:
+            raw = self.client.get(self.prefix + key)
+            if not raw:
+                return None
+            obj = json.loads(raw)
+            return obj["v"], float(obj["t"])
+        except Exception as e:
+            logger.debug("Fetch cache read failed for %s: %s", key, e)
+            return None
+
+    def set(self, key: str, value: Any, ttl_s: float, stored_at: Optional[float] = None) -> None:
+        stored_at = time.time() if stored_at is None else stored_at
+        try:
+            payload = json.dumps({"t": stored_at, "v": value}, separators=(",", ":"))
+            self.client.set(self.prefix + key, payload, ex=max(1, int(ttl_s)))
+        except Exception as e:
+            logger.debug("Fetch cache write failed for %s: %s", key, e)
+
+
+class TieredFetchCache(FetchCache):
+    """Process memory in front of a shared backend.
+
+    Shared hits are copied into ``local`` for the TTL of their source, taken
+    from the same table ``DataFetcher`` resolves (``ttls_from_env``).
+    """
+
+    def __init__(self, local: FetchCache, shared: FetchCache, ttls: Optional[Dict[str, float]] = None) -> None:
+        super().__init__()
+        self.local = local
+        self.shared = shared
+        self.ttls = ttls_from_env(ttls)
+
+    def get(self, key: str) -> Optional[Entry]:
+        entry = self.local.get(key)
+        if entry is not None:
+            return entry
+        entry = self.shared.get(key)
+        if entry is not None:
+            # Keep the original store time so freshness is judged correctly.
+            self.local.set(key, entry[0], ttl_s=self.ttls.get(key.split(":", 1)[0], 60.0), stored_at=entry[1])
+        return entry
+
+    def set(self, key: str, value: Any, ttl_s: float, stored_at: Optional[float] = None) -> None:
+        self.local.set(key, value, ttl_s, stored_at)
+        self.shared.set(key, value, ttl_s, stored_at)
+
+
+__all__ = [
+    "DEFAULT_TTLS",
+    "FetchCache",
+    "MemoryFetchCache",
+    "RedisFetchCache",
+    "TieredFetchCache",
+    "ttls_from_env",
+]
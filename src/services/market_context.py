@@ -0,0 +1,271 @@
+"""Process-wide global market context (CoinGecko ``/global``).
+
+The macro snapshot is the same for every token, so instead of each scan
+fetching it synchronously, one :class:`MarketContextService` per process keeps
+the latest snapshot plus a short history ring (for trend) in memory:
+
+- In the API a background asyncio task (:meth:`MarketContextService.run`)
+  refreshes it every ``interval_s``. With a Redis client, workers share one
+  copy: whoever takes the ``marketctx:lock`` key polls upstream and publishes
+  ``marketctx:latest`` / ``marketctx:history``; the others just read those.
+- Scans (``DataFetcher``) and ``MacroBot`` read :meth:`context_string`
+  instantly. Outside the API (CLI, bulk runs) nothing refreshes in the
+  background, so the first read fetches once synchronously and later reads
+  reuse it until it is older than ``max_age_s``.
+
+Stdlib only; the Redis client (``redis.asyncio``) is passed in by the caller.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import threading
+import time
+from collections import deque
+from dataclasses import asdict, dataclass
+from typing import Any, Deque, Dict, List, Optional
+from urllib.request import Request, urlopen
+
+logger = logging.getLogger(__name__)
+
+COINGECKO_GLOBAL_URL = "https://api.coingecko.com/api/v3/global"
+
+REDIS_LATEST_KEY = "marketctx:latest"
+REDIS_HISTORY_KEY = "marketctx:history"
+REDIS_LOCK_KEY = "marketctx:lock"
+
+DEFAULT_INTERVAL_S = 120.0
+DEFAULT_HISTORY_SIZE = 60  # ~2h at the default interval
+# Snapshots older than this are not served to scans.
+DEFAULT_MAX_AGE_S = 900.0
+# Synchronous (no background task) callers wait this long after a failed fetch.
+FAILURE_BACKOFF_S = 60.0
+
+
+@dataclass(frozen=True)
+class MarketSnapshot:
+    fetched_at: float
+    total_mcap_usd: float
+    total_volume_usd: float
+    btc_dominance: float
+    eth_dominance: float
+    mcap_change_24h_pct: float
+    active_cryptocurrencies: int
+
+    @classmethod
+    def from_coingecko(cls, payload: Dict[str, Any], fetched_at: Optional[float] = None) -> "MarketSnapshot":
+        data = payload.get("data") or {}
+        dominance = data.get("market_cap_percentage") or {}
+        return cls(
+            fetched_at=time.time() if fetched_at is None else fetched_at,
+            total_mcap_usd=float((data.get("total_market_cap") or {}).get("usd", 0) or 0),
+            total_volume_usd=float((data.get("total_volume") or {}).get("usd", 0) or 0),
+            btc_dominance=float(dominance.get("btc", 0) or 0),
+            eth_dominance=float(dominance.get("eth", 0) or 0),
+            mcap_change_24h_pct=float(data.get("market_cap_change_percentage_24h_usd", 0) or 0),
+            active_cryptocurrencies=int(data.get("active_cryptocurrencies", 0) or 0),
+        )
+
+    @classmethod
+    def from_dict(cls, d: Dict[str, Any]) -> "MarketSnapshot":
+        return cls(**{k: d[k] for k in cls.__dataclass_fields__})  # type: ignore[attr-defined]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+    def describe(self) -> str:
+        return (
+            f"BTC dominance: {self.btc_dominance:.1f}%, ETH dominance: {self.eth_dominance:.1f}%, "
+            f"Total crypto market cap: ${self.total_mcap_usd / 1e9:.1f}B (24h change: {self.mcap_change_24h_pct:+.1f}%), "
+            f"Total 24h volume: ${self.total_volume_usd / 1e9:.1f}B, "
+            f"Active cryptocurrencies: {self.active_cryptocurrencies:,}"
+        )
+
+
+def fetch_global_snapshot(timeout_s: float = 5.0) -> MarketSnapshot:
+    """One synchronous CoinGecko ``/global`` call."""
+    req = Request(
+        COINGECKO_GLOBAL_URL,
+        headers={
+            "Accept": "application/json",
+            "User-Agent": "VerdictSwarm/0.1 (stdlib; +https://github.com/vswarm-ai/verdictswarm)",
+        },
+    )
+    with urlopen(req, timeout=timeout_s) as resp:
+        payload = json.loads(resp.read().decode("utf-8"))
+    return MarketSnapshot.from_coingecko(payload)
+
+
+class MarketContextService:
+    def __init__(
+        self,
+        *,
+        history_size: int = DEFAULT_HISTORY_SIZE,
+        max_age_s: float = DEFAULT_MAX_AGE_S,
+        fetcher: Any = fetch_global_snapshot,
+    ) -> None:
+        self.max_age_s = float(max_age_s)
+        self._fetcher = fetcher
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self._last_failure = float("-inf")
+        self._history: Deque[MarketSnapshot] = deque(maxlen=max(1, int(history_size)))
+        self._task: Optional[asyncio.Task] = None
+        self.refreshes = 0
+        self.errors = 0
+
+    # -------------------- reads (any thread) --------------------
+
+    def latest(self) -> Optional[MarketSnapshot]:
+        with self._lock:
+            return self._history[-1] if self._history else None
+
+    def history(self) -> List[MarketSnapshot]:
+        with self._lock:
+            return list(self._history)
+
+    def update(self, snap: MarketSnapshot) -> None:
+        with self._lock:
+            if self._history and self._history[-1].fetched_at >= snap.fetched_at:
+                return  # already have this (or a newer) snapshot
+            self._history.append(snap)
+
+    def trend(self) -> Optional[Dict[str, float]]:
+        """Change across the history window, or None with fewer than two points."""
+        hist = self.history()
+        if len(hist) < 2:
+            return None
+        first, last = hist[0], hist[-1]
+        mcap_pct = (last.total_mcap_usd / first.total_mcap_usd - 1.0) * 100.0 if first.total_mcap_usd else 0.0
+        return {
+            "window_min": (last.fetched_at - first.fetched_at) / 60.0,
+            "mcap_change_pct": mcap_pct,
+            "btc_dominance_change": last.btc_dominance - first.btc_dominance,
+            "volume_change_pct": (
+                (last.total_volume_usd / first.total_volume_usd - 1.0) * 100.0 if first.total_volume_usd else 0.0
+            ),
+        }
+
+    def _fresh(self) -> Optional[MarketSnapshot]:
+        snap = self.latest()
+        if snap is None or time.time() - snap.fetched_at > self.max_age_s:
+            return None
+        return snap
+
+    def context_string(self, *, fetch_if_stale: bool = True, fetcher: Any = None) -> Optional[str]:
+        """Macro context for prompts; None when no fresh-enough snapshot exists.
+
+        ``fetcher`` overrides the upstream call used for a synchronous refresh.
+        """
+        snap = self._fresh()
+        if snap is None and fetch_if_stale and not self.running:
+            # No background refresher (CLI): one caller fetches, concurrent ones
+            # wait and reuse it; after a failure, don't retry for a while.
+            with self._refresh_lock:
+                snap = self._fresh()
+                if snap is None and time.monotonic() - self._last_failure >= FAILURE_BACKOFF_S:
+                    snap = self.refresh_once(fetcher)
+        if snap is None:
+            return None
+        text = snap.describe()
+        trend = self.trend()
+        if trend and trend["window_min"] >= 5:
+            text += (
+                f". Trend over last {trend['window_min']:.0f} min: market cap {trend['mcap_change_pct']:+.2f}%, "
+                f"BTC dominance {trend['btc_dominance_change']:+.2f}pp, volume {trend['volume_change_pct']:+.1f}%"
+            )
+        return text
+
+    # -------------------- refresh --------------------
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def refresh_once(self, fetcher: Any = None) -> Optional[MarketSnapshot]:
+        """Fetch upstream now (blocking). Returns the snapshot, or None on failure."""
+        try:
+            snap = (fetcher or self._fetcher)()
+        except Exception as e:
+            self.errors += 1
+            self._last_failure = time.monotonic()
+            logger.warning("Market context refresh failed: %s", e)
+            return None
+        self.refreshes += 1
+        self.update(snap)
+        return snap
+
+    async def _refresh_shared(self, redis_client: Any, interval_s: float) -> None:
+        # One worker per interval polls upstream; the rest read its result.
+        if await redis_client.set(REDIS_LOCK_KEY, b"1", nx=True, ex=max(1, int(interval_s * 0.9))):
+            snap = await asyncio.to_thread(self.refresh_once)
+            if snap is not None:
+                raw = json.dumps(snap.to_dict())
+                pipe = redis_client.pipeline(transaction=False)
+                pipe.set(REDIS_LATEST_KEY, raw, ex=int(self.max_age_s))
+                pipe.lpush(REDIS_HISTORY_KEY, raw)
+                pipe.ltrim(REDIS_HISTORY_KEY, 0, self._history.maxlen - 1)
+                await pipe.execute()
+            return
+        if not self._history:
+            # Cold worker: seed the trend window from the shared history.
+            for raw in reversed(await redis_client.lrange(REDIS_HISTORY_KEY, 0, -1) or []):
+                self.update(MarketSnapshot.from_dict(json.loads(raw)))
+        raw = await redis_client.get(REDIS_LATEST_KEY)
+        if raw:
+            self.update(MarketSnapshot.from_dict(json.loads(raw)))
+
+    async def run(self, *, interval_s: float = DEFAULT_INTERVAL_S, redis_client: Any = None) -> None:
+        """Refresh forever (until cancelled)."""
+        while True:
+            try:
+                if redis_client is not None:
+                    await self._refresh_shared(redis_client, interval_s)
+                else:
+                    await asyncio.to_thread(self.refresh_once)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.errors += 1
+                logger.warning("Market context refresh loop error: %s", e)
+            await asyncio.sleep(interval_s)
+
+    def start(self, *, interval_s: float = DEFAULT_INTERVAL_S, redis_client: Any = None) -> asyncio.Task:
+        """Start :meth:`run` on the running loop (idempotent)."""
+        if not self.running:
+            self._task = asyncio.get_running_loop().create_task(
+                self.run(interval_s=interval_s, redis_client=redis_client)
+            )
+        return self._task  # type: ignore[return-value]
+
+    async def stop(self) -> None:
+        task, self._task = self._task, None
+        if task is not None:
+            task.cancel()
+            try:
+                await task
+            except (asyncio.CancelledError, Exception):
+                pass
+
+
+_service: Optional[MarketContextService] = None
+_service_lock = threading.Lock()
+
+
+def get_market_context() -> MarketContextService:
+    global _service
+    if _service is None:
+        with _service_lock:
+            if _service is None:
+                _service = MarketContextService()
+    return _service
+
+
+__all__ = [
+    "MarketContextService",
+    "MarketSnapshot",
+    "fetch_global_snapshot",
+    "get_market_context",
+]
@@ -10,6 +10,7 @@ Latency: ~200-500ms per search
 
 from __future__ import annotations
 
+import logging
 import os
 import re
 from dataclasses import dataclass, field
@@ -17,6 +18,8 @@ from typing import List, Optional
 
 import httpx
 
+logger = logging.getLogger(__name__)
+
 BRAVE_API_KEY = os.environ.get("BRAVE_SEARCH_API_KEY", "").strip()
 BRAVE_SEARCH_URL = "https://api.search.brave.com/res/v1/web/search"
 
@@ -146,7 +149,7 @@ async def _search_google_news_rss(query: str) -> List[dict]:
                 })
         return results
     except Exception as e:
-        print(f"[NEWS] Google News RSS fallback failed: {e}")
+        logger.warning("Google News RSS fallback failed: %s", e)
         return []
 
 
@@ -249,10 +252,10 @@ async def prefetch_news(
 
     except httpx.TimeoutException:
         result.error = "Search timed out (5s)"
-        print(f"[NEWS] Search timed out for: {query}")
+        logger.warning("Search timed out for: %s", query)
     except Exception as e:
         result.error = f"{type(e).__name__}: {str(e)[:100]}"
-        print(f"[NEWS] Search failed for {query}: {e}")
+        logger.warning("Search failed for %s: %s", query, e)
 
     return result
 
@@ -312,7 +315,7 @@ async def prefetch_whale_activity(
                     age=str(age),
                 ))
         except Exception as e:
-            print(f"[NEWS] Whale search failed for '{query}': {e}")
+            logger.warning("Whale search failed for '%s': %s", query, e)
 
     # Deduplicate by title similarity
     seen_titles = set()
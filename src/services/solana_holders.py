@@ -0,0 +1,94 @@
+"""Solana holder concentration from ``getTokenLargestAccounts``.
+
+The RPC returns the 20 largest token accounts for a mint with raw amounts;
+together with ``getTokenSupply`` (same JSON-RPC batch, one round trip) that
+gives exact top-10 / top-20 percentages of total supply — no paging through
+thousands of token accounts and no approximation against a partial page.
+
+The transport is injected: ``rpc_batch`` takes ``[(method, params), ...]`` and
+returns the matching ``result`` objects (``None`` for a failed entry), so the
+caller decides endpoint, pooling and fallback. Stdlib only.
+"""
+
+from __future__ import annotations
+
+from dataclasses import asdict, dataclass
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+RpcCall = Tuple[str, List[Any]]
+RpcBatch = Callable[[Sequence[RpcCall]], List[Optional[Dict[str, Any]]]]
+
+# getTokenLargestAccounts never returns more accounts than this.
+LARGEST_ACCOUNTS_LIMIT = 20
+
+
+@dataclass(frozen=True)
+class HolderConcentration:
+    top10_pct: float
+    top20_pct: float
+    # Accounts returned by the RPC (≤ 20); fewer means that's every holder.
+    largest_accounts: int
+    supply_raw: int
+    decimals: int
+    # Exact holder count when the answer holds every account with a balance
+    # (fewer than the limit returned, or a zero balance among them), else None.
+    holders: Optional[int] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, d: Dict[str, Any]) -> "HolderConcentration":
+        return cls(**{k: d[k] for k in cls.__dataclass_fields__ if k in d})  # type: ignore[attr-defined]
+
+
+def concentration_calls(mint: str) -> List[RpcCall]:
+    return [
+        ("getTokenLargestAccounts", [mint, {"commitment": "confirmed"}]),
+        ("getTokenSupply", [mint, {"commitment": "confirmed"}]),
+    ]
+
+
+def _raw_amount(v: Any) -> int:
+    try:
+        return int(str(v))
+    except (TypeError, ValueError):
+        return 0
+
+
+def parse_concentration(
+    largest: Optional[Dict[str, Any]],
+    supply: Optional[Dict[str, Any]],
+) -> Optional[HolderConcentration]:
+    """Build the concentration from the two RPC ``result`` objects."""
+    if not isinstance(largest, dict) or not isinstance(supply, dict):
+        return None
+    accounts = largest.get("value")
+    supply_value = supply.get("value") or {}
+    total = _raw_amount(supply_value.get("amount"))
+    if not isinstance(accounts, list) or total <= 0:
+        return None
+    amounts = sorted((_raw_amount(a.get("amount")) for a in accounts if isinstance(a, dict)), reverse=True)
+    complete = len(amounts) < LARGEST_ACCOUNTS_LIMIT or (bool(amounts) and amounts[-1] == 0)
+    return HolderConcentration(
+        top10_pct=round(sum(amounts[:10]) / total * 100.0, 2),
+        top20_pct=round(sum(amounts[:20]) / total * 100.0, 2),
+        largest_accounts=len(amounts),
+        supply_raw=total,
+        decimals=int(supply_value.get("decimals", 0) or 0),
+        holders=sum(1 for a in amounts if a > 0) if complete else None,
+    )
+
+
+def fetch_concentration(mint: str, rpc_batch: RpcBatch) -> Optional[HolderConcentration]:
+    largest, supply = rpc_batch(concentration_calls(mint))
+    return parse_concentration(largest, supply)
+
+
+__all__ = [
+    "LARGEST_ACCOUNTS_LIMIT",
+    "HolderConcentration",
+    "concentration_calls",
+    "fetch_concentration",
+    "parse_concentration",
+]
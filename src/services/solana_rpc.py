@@ -0,0 +1,298 @@
+"""Pooled, batching Solana JSON-RPC client.
+
+One :class:`SolanaRpcClient` per process (:func:`get_solana_rpc`) serves every
+Solana call the fetcher makes:
+
+- **Batches.** :meth:`SolanaRpcClient.batch` sends ``[(method, params), ...]``
+  as one JSON-RPC array, so everything a scan needs for a mint is a single
+  round trip. Endpoints that reject arrays get the calls one by one.
+- **Keep-alive.** Each endpoint keeps a small pool of ``http.client``
+  connections, so repeat calls skip the TCP/TLS handshake. A reused
+  connection that turns out to be stale is replaced and the request retried.
+- **Rate limiting.** A token bucket per endpoint (``SOLANA_RPC_RATE``
+  requests/s, default 10). If an endpoint has no capacity within
+  ``max_wait_s`` the next one is tried.
+- **Fallback.** ``SOLANA_RPC_URLS`` (comma-separated, in order), else
+  ``HELIUS_RPC_URL`` then public mainnet. An endpoint that errors, returns
+  429 or 5xx is skipped for ``COOLDOWN_S`` unless nothing else is left.
+- **Async.** :meth:`SolanaRpcClient.abatch` / :meth:`SolanaRpcClient.acall`
+  run the blocking request in a worker thread.
+
+Per-call results are returned in request order; a call that came back with a
+JSON-RPC ``error`` yields ``None``. Stdlib only.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import http.client
+import json
+import logging
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+from urllib.parse import urlparse
+
+from .etherscan_scheduler import TokenBucket
+from .tracing import span
+
+logger = logging.getLogger(__name__)
+
+PUBLIC_MAINNET_URL = "https://api.mainnet-beta.solana.com"
+
+DEFAULT_RATE_PER_ENDPOINT = 10.0
+DEFAULT_TIMEOUT_S = 8.0
+DEFAULT_MAX_WAIT_S = 2.0
+DEFAULT_POOL_SIZE = 4
+# A failing endpoint is only used again (unless it's the last resort) after this.
+COOLDOWN_S = 30.0
+
+Params = Union[List[Any], Dict[str, Any]]
+RpcCall = Tuple[str, Params]
+
+
+class SolanaRpcError(Exception):
+    """Every endpoint failed for a request."""
+
+
+def _endpoint_name(url: str) -> str:
+    host = urlparse(url).hostname or url
+    return "helius" if "helius" in host else host
+
+
+class _Endpoint:
+    def __init__(self, url: str, *, rate: float, timeout_s: float, pool_size: int) -> None:
+        parsed = urlparse(url)
+        self.url = url
+        self.name = _endpoint_name(url)
+        self.https = parsed.scheme != "http"
+        self.host = parsed.hostname or ""
+        self.port = parsed.port
+        self.path = (parsed.path or "/") + (f"?{parsed.query}" if parsed.query else "")
+        self.timeout_s = timeout_s
+        self.pool_size = pool_size
+        self.bucket = TokenBucket(rate)
+        self.lock = threading.Lock()
+        self.idle: List[http.client.HTTPConnection] = []
+        self.down_until = 0.0
+        self.stats: Dict[str, int] = {"requests": 0, "calls": 0, "errors": 0, "rate_limited": 0, "connections": 0}
+
+    def reserve(self, max_wait_s: float) -> bool:
+        """Take a rate token, waiting up to ``max_wait_s``; False if none came."""
+        deadline = time.monotonic() + max_wait_s
+        while True:
+            with self.lock:
+                wait = self.bucket.try_take(time.monotonic())
+            if wait == 0.0:
+                return True
+            if time.monotonic() + wait > deadline:
+                return False
+            time.sleep(wait)
+
+    def checkout(self) -> Tuple[http.client.HTTPConnection, bool]:
+        """A pooled connection (reused=True) or a new one."""
+        with self.lock:
+            if self.idle:
+                return self.idle.pop(), True
+            self.stats["connections"] += 1
+        cls = http.client.HTTPSConnection if self.https else http.client.HTTPConnection
+        return cls(self.host, self.port, timeout=self.timeout_s), False
+
+    def checkin(self, conn: http.client.HTTPConnection) -> None:
+        with self.lock:
+            if len(self.idle) < self.pool_size:
+                self.idle.append(conn)
+                return
+        conn.close()
+
+    def close(self) -> None:
+        with self.lock:
+            idle, self.idle = self.idle, []
+        for conn in idle:
+            conn.close()
+
+
+class SolanaRpcClient:
+    def __init__(
+        self,
+        urls: Sequence[str],
+        *,
+        rate_per_endpoint: float = DEFAULT_RATE_PER_ENDPOINT,
+        timeout_s: float = DEFAULT_TIMEOUT_S,
+        max_wait_s: float = DEFAULT_MAX_WAIT_S,
+        pool_size: int = DEFAULT_POOL_SIZE,
+    ) -> None:
+        seen: List[str] = []
+        for u in urls:
+            u = (u or "").strip()
+            if u and u not in seen:
+                seen.append(u)
+        if not seen:
+            seen = [PUBLIC_MAINNET_URL]
+        self.max_wait_s = float(max_wait_s)
+        self.endpoints = [
+            _Endpoint(u, rate=rate_per_endpoint, timeout_s=float(timeout_s), pool_size=max(1, int(pool_size)))
+            for u in seen
+        ]
+        self.fallbacks = 0
+        self._ids = 0
+        self._ids_lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> "SolanaRpcClient":
+        raw = os.environ.get("SOLANA_RPC_URLS", "").strip()
+        if raw:
+            urls = [u.strip() for u in raw.split(",")]
+        else:
+            urls = [os.environ.get("HELIUS_RPC_URL", ""), PUBLIC_MAINNET_URL]
+        try:
+            rate = float(os.environ.get("SOLANA_RPC_RATE", DEFAULT_RATE_PER_ENDPOINT))
+        except ValueError:
+            rate = DEFAULT_RATE_PER_ENDPOINT
+        return cls(urls, rate_per_endpoint=rate)
+
+    def has_endpoint(self, name: str) -> bool:
+        return any(ep.name == name for ep in self.endpoints)
+
+    # -------------------- transport --------------------
+
+    def _next_id(self) -> int:
+        with self._ids_lock:
+            self._ids += 1
+            return self._ids
+
+    def _post(self, ep: _Endpoint, body: bytes) -> Any:
+        headers = {"Content-Type": "application/json", "Accept": "application/json", "Connection": "keep-alive"}
+        for attempt in range(2):
+            conn, reused = ep.checkout()
+            try:
+                conn.request("POST", ep.path, body=body, headers=headers)
+                resp = conn.getresponse()
+                raw = resp.read()
+            except (http.client.HTTPException, OSError):
+                conn.close()
+                if reused and attempt == 0:
+                    continue  # server dropped the idle connection; retry on a fresh one
+                raise
+            if resp.will_close:
+                conn.close()
+            else:
+                ep.checkin(conn)
+            if resp.status == 429:
+                with ep.lock:
+                    ep.stats["rate_limited"] += 1
+                raise SolanaRpcError(f"{ep.name}: HTTP 429")
+            if resp.status >= 400:
+                raise SolanaRpcError(f"{ep.name}: HTTP {resp.status}")
+            return json.loads(raw.decode("utf-8"))
+        raise SolanaRpcError(f"{ep.name}: connection failed")  # pragma: no cover
+
+    def _send(self, ep: _Endpoint, calls: Sequence[RpcCall]) -> List[Optional[Any]]:
+        ids = [self._next_id() for _ in calls]
+        payload = [
+            {"jsonrpc": "2.0", "id": i, "method": method, "params": params}
+            for i, (method, params) in zip(ids, calls)
+        ]
+        body = payload[0] if len(payload) == 1 else payload
+        reply = self._post(ep, json.dumps(body).encode("utf-8"))
+        if isinstance(reply, dict) and len(calls) > 1:
+            # Endpoint doesn't take arrays (single error object back): one by one.
+            logger.info("Solana RPC %s rejected a batch; sending %s calls singly", ep.name, len(calls))
+            return [self._send(ep, [c])[0] for c in calls]
+        entries = reply if isinstance(reply, list) else [reply]
+        by_id = {e.get("id"): e for e in entries if isinstance(e, dict)}
+        out: List[Optional[Any]] = []
+        for i, (method, _) in zip(ids, calls):
+            entry = by_id.get(i) or {}
+            if entry.get("error"):
+                logger.debug("Solana RPC %s %s error: %s", ep.name, method, entry["error"])
+            out.append(entry.get("result"))
+        return out
+
+    def _candidates(self, endpoint: Optional[str]) -> List[_Endpoint]:
+        eps = [ep for ep in self.endpoints if endpoint is None or ep.name == endpoint]
+        now = time.monotonic()
+        # Healthy endpoints first (in configured order), cooling-down ones as a last resort.
+        return [ep for ep in eps if ep.down_until <= now] + [ep for ep in eps if ep.down_until > now]
+
+    # -------------------- API --------------------
+
+    def batch(self, calls: Sequence[RpcCall], *, endpoint: Optional[str] = None) -> List[Optional[Any]]:
+        """Send ``calls`` in one round trip; ``result`` per call, in order.
+
+        ``endpoint`` restricts the request to endpoints of that name (e.g.
+        ``"helius"`` for Helius-only DAS methods).
+        """
+        if not calls:
+            return []
+        candidates = self._candidates(endpoint)
+        if not candidates:
+            raise SolanaRpcError(f"no Solana RPC endpoint named {endpoint!r}")
+        methods = ",".join(m for m, _ in calls)
+        last_error: Optional[BaseException] = None
+        for n, ep in enumerate(candidates):
+            if n:
+                self.fallbacks += 1
+            if not ep.reserve(self.max_wait_s if n < len(candidates) - 1 else self.max_wait_s * 2):
+                last_error = SolanaRpcError(f"{ep.name}: rate limit")
+                continue
+            try:
+                with span("fetch:solana_rpc", endpoint=ep.name, calls=methods):
+                    results = self._send(ep, calls)
+            except Exception as e:
+                with ep.lock:
+                    ep.stats["errors"] += 1
+                ep.down_until = time.monotonic() + COOLDOWN_S
+                logger.warning("Solana RPC %s failed for %s: %s", ep.name, methods, e)
+                last_error = e
+                continue
+            with ep.lock:
+                ep.stats["requests"] += 1
+                ep.stats["calls"] += len(calls)
+            ep.down_until = 0.0
+            return results
+        raise SolanaRpcError(f"all Solana RPC endpoints failed for {methods}: {last_error}")
+
+    def call(self, method: str, params: Params, *, endpoint: Optional[str] = None) -> Optional[Any]:
+        return self.batch([(method, params)], endpoint=endpoint)[0]
+
+    async def abatch(self, calls: Sequence[RpcCall], *, endpoint: Optional[str] = None) -> List[Optional[Any]]:
+        return await asyncio.to_thread(self.batch, calls, endpoint=endpoint)
+
+    async def acall(self, method: str, params: Params, *, endpoint: Optional[str] = None) -> Optional[Any]:
+        return (await self.abatch([(method, params)], endpoint=endpoint))[0]
+
+    def stats(self) -> Dict[str, Any]:
+        per_endpoint = {}
+        for i, ep in enumerate(self.endpoints):
+            name = ep.name if ep.name not in per_endpoint else f"{ep.name}#{i}"
+            with ep.lock:
+                per_endpoint[name] = dict(ep.stats, idle=len(ep.idle))
+        return {"endpoints": per_endpoint, "fallbacks": self.fallbacks}
+
+    def close(self) -> None:
+        for ep in self.endpoints:
+            ep.close()
+
+
+_client: Optional[SolanaRpcClient] = None
+_client_lock = threading.Lock()
+
+
+def get_solana_rpc() -> SolanaRpcClient:
+    """Process-wide client (pools and rate buckets are only useful shared)."""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = SolanaRpcClient.from_env()
+    return _client
+
+
+__all__ = [
+    "PUBLIC_MAINNET_URL",
+    "SolanaRpcClient",
+    "SolanaRpcError",
+    "get_solana_rpc",
+]
@@ -0,0 +1,223 @@
+"""Content-addressed store for verified contract source, plus per-source analysis.
+
+Thousands of memecoins are deployed from the same template, so the same
+verified source shows up under many addresses. Sources are keyed by
+:func:`source_hash` — sha256 of the source with comments removed and
+whitespace collapsed — and stored once, zlib-compressed. Each address maps
+to its hash.
+
+Analyses that only depend on the code are cached per hash with
+:meth:`SourceStore.get_analysis` / :meth:`SourceStore.put_analysis`. The
+``kind`` names the analysis and whatever it depends on, e.g.
+``"scam_contract:1.0.0"`` or ``"security_code:v1:gemini:gemini-2.5-flash"``. Scanning
+another clone of a known template then costs no regex or LLM work on the
+contract portion.
+
+Backends:
+
+- :class:`MemorySourceStore` — bounded LRU per process (the default).
+- :class:`RedisSourceStore` — shared across workers; takes an already-built
+  *synchronous* client. It uses these keys:
+  - ``src:blob:{hash}`` — the source, no TTL
+  - ``src:addr:{chain_id}:{address}`` — the address's hash, no TTL
+  - ``src:analysis:{kind}:{hash}`` — an analysis, with the TTL given
+
+Bots reach the store through :func:`get_source_store`; the API installs a
+Redis-backed one with :func:`set_source_store`. Backend errors are logged and
+swallowed: the store can only save work, never fail a scan. Stdlib only.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import re
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from typing import Any, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Comments (// line and /* block */) and runs of whitespace.
+_COMMENT_RE = re.compile(r"//[^\n]*|/\*.*?\*/", re.DOTALL)
+_SPACE_RE = re.compile(r"\s+")
+
+
+def normalize_source(source: str) -> str:
+    """Source with comments removed and whitespace collapsed (for hashing only)."""
+    return _SPACE_RE.sub(" ", _COMMENT_RE.sub(" ", source or "")).strip()
+
+
+def source_hash(source: str) -> str:
+    return hashlib.sha256(normalize_source(source).encode("utf-8")).hexdigest()
+
+
+def _address(chain_id: str, address: str) -> str:
+    # EVM addresses are case-insensitive; Solana mints are not.
+    a = (address or "").strip()
+    return f"{chain_id}:{a.lower() if a.startswith('0x') else a}"
+
+
+class SourceStore:
+    def put(self, chain_id: str, address: str, source: str) -> str:
+        """Store ``source`` (once per hash), map the address to it, return the hash."""
+        h = source_hash(source)
+        self._put_blob(h, zlib.compress(source.encode("utf-8"), 6))
+        self._put_address(_address(chain_id, address), h)
+        return h
+
+    def get_source(self, h: str) -> Optional[str]:
+        blob = self._get_blob(h)
+        if blob is None:
+            return None
+        try:
+            return zlib.decompress(blob).decode("utf-8")
+        except (zlib.error, UnicodeDecodeError) as e:
+            logger.warning("Source store: corrupt blob %s (%s)", h[:12], e)
+            return None
+
+    def hash_for(self, chain_id: str, address: str) -> Optional[str]:
+        return self._get_address(_address(chain_id, address))
+
+    def get_analysis(self, kind: str, h: str) -> Optional[Any]:
+        raise NotImplementedError
+
+    def put_analysis(self, kind: str, h: str, value: Any, *, ttl_s: Optional[float] = None) -> None:
+        raise NotImplementedError
+
+    def _put_blob(self, h: str, blob: bytes) -> None:
+        raise NotImplementedError
+
+    def _get_blob(self, h: str) -> Optional[bytes]:
+        raise NotImplementedError
+
+    def _put_address(self, key: str, h: str) -> None:
+        raise NotImplementedError
+
+    def _get_address(self, key: str) -> Optional[str]:
+        raise NotImplementedError
+
+
+class MemorySourceStore(SourceStore):
+    def __init__(self, max_entries: int = 1024) -> None:
+        self.max_entries = max(1, int(max_entries))
+        self._lock = threading.Lock()
+        # One LRU for blobs, address mappings and analyses alike.
+        self._data: "OrderedDict[str, Tuple[Any, float]]" = OrderedDict()
+
+    def _get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            value, expires_at = item
+            if time.time() >= expires_at:
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def _set(self, key: str, value: Any, ttl_s: Optional[float] = None) -> None:
+        expires_at = time.time() + ttl_s if ttl_s else float("inf")
+        with self._lock:
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def get_analysis(self, kind: str, h: str) -> Optional[Any]:
+        return self._get(f"analysis:{kind}:{h}")
+
+    def put_analysis(self, kind: str, h: str, value: Any, *, ttl_s: Optional[float] = None) -> None:
+        self._set(f"analysis:{kind}:{h}", value, ttl_s)
+
+    def _put_blob(self, h: str, blob: bytes) -> None:
+        if self._get(f"blob:{h}") is None:
+            self._set(f"blob:{h}", blob)
+
+    def _get_blob(self, h: str) -> Optional[bytes]:
+        return self._get(f"blob:{h}")
+
+    def _put_address(self, key: str, h: str) -> None:
+        self._set(f"addr:{key}", h)
+
+    def _get_address(self, key: str) -> Optional[str]:
+        return self._get(f"addr:{key}")
+
+
+class RedisSourceStore(SourceStore):
+    def __init__(self, client: Any, *, prefix: str = "src:") -> None:
+        self.client = client
+        self.prefix = prefix
+
+    def get_analysis(self, kind: str, h: str) -> Optional[Any]:
+        try:
+            raw = self.client.get(f"{self.prefix}analysis:{kind}:{h}")
+            return json.loads(raw) if raw else None
+        except Exception as e:
+            logger.debug("Source store analysis read failed (%s): %s", kind, e)
+            return None
+
+    def put_analysis(self, kind: str, h: str, value: Any, *, ttl_s: Optional[float] = None) -> None:
+        try:
+            self.client.set(
+                f"{self.prefix}analysis:{kind}:{h}",
+                json.dumps(value, separators=(",", ":"), default=str),
+                ex=max(1, int(ttl_s)) if ttl_s else None,
+            )
+        except Exception as e:
+            logger.debug("Source store analysis write failed (%s): %s", kind, e)
+
+    def _put_blob(self, h: str, blob: bytes) -> None:
+        try:
+            self.client.set(f"{self.prefix}blob:{h}", blob, nx=True)
+        except Exception as e:
+            logger.debug("Source store blob write failed: %s", e)
+
+    def _get_blob(self, h: str) -> Optional[bytes]:
+        try:
+            return self.client.get(f"{self.prefix}blob:{h}")
+        except Exception as e:
+            logger.debug("Source store blob read failed: %s", e)
+            return None
+
+    def _put_address(self, key: str, h: str) -> None:
+        try:
+            self.client.set(f"{self.prefix}addr:{key}", h)
+        except Exception as e:
+            logger.debug("Source store address write failed: %s", e)
+
+    def _get_address(self, key: str) -> Optional[str]:
+        try:
+            raw = self.client.get(f"{self.prefix}addr:{key}")
+        except Exception as e:
+            logger.debug("Source store address read failed: %s", e)
+            return None
+        return raw.decode() if isinstance(raw, bytes) else raw
+
+
+_store: SourceStore = MemorySourceStore()
+
+
+def get_source_store() -> SourceStore:
+    return _store
+
+
+def set_source_store(store: SourceStore) -> None:
+    """Install the process-wide store (e.g. Redis-backed in the API)."""
+    global _store
+    _store = store
+
+
+__all__ = [
+    "MemorySourceStore",
+    "RedisSourceStore",
+    "SourceStore",
+    "get_source_store",
+    "normalize_source",
+    "set_source_store",
+    "source_hash",
+]
@@ -10,7 +10,7 @@ bad data (e.g. JUP showing as 0 days old).
   3. Grok             (xAI   — true provider redundancy)
   4. None             (skip  — agents run with raw TokenData only)
 
-**Cache:** Redis (key ``preprocess:{chain}:{address}``, 24 h TTL).
+**Cache:** Redis (key ``g{generation}:preprocess:{chain}:{address}``, 24 h TTL).
 
 **Fallback:** If ALL providers fail the scan continues unchanged.
 """
@@ -18,6 +18,7 @@ bad data (e.g. JUP showing as 0 days old).
 from __future__ import annotations
 
 import json
+import logging
 import os
 import traceback
 from dataclasses import asdict, dataclass, field
@@ -25,6 +26,8 @@ from typing import Any, Dict, List, Optional
 
 from src.agents.ai_client import AIClient
 
+logger = logging.getLogger(__name__)
+
 # ---------------------------------------------------------------------------
 # Structured output dataclass
 # ---------------------------------------------------------------------------
@@ -248,11 +251,11 @@ def _run_cascade(
             )
             if isinstance(result, dict) and result.get("token_type"):
                 label = f"{provider}{'(flash)' if use_flash else '(pro)'}"
-                print(f"[INFO] Token preprocessor succeeded via {label}")
+                logger.info("Token preprocessor succeeded via %s", label)
                 return result
         except Exception as e:
             label = f"{provider}{'(flash)' if use_flash else '(pro)'}"
-            print(f"[WARN] Token preprocessor {label} failed: {e}")
+            logger.warning("Token preprocessor %s failed: %s", label, e)
             continue
 
     return None
@@ -262,28 +265,35 @@ def _run_cascade(
 # Redis cache helpers (async, uses the api Cache service)
 # ---------------------------------------------------------------------------
 
+async def _cache_key(cache: Any, chain: str, address: str) -> str:
+    """Preprocessor cache key inside the current cache generation (if supported)."""
+    if hasattr(cache, "versioned_key"):
+        return await cache.versioned_key("preprocess", chain, address.lower())
+    return f"preprocess:{chain}:{address.lower()}"
+
+
 async def _cache_get(cache: Any, chain: str, address: str) -> Optional[PreprocessedFacts]:
     """Try to load cached preprocessed facts. Returns None on miss or error."""
     try:
-        key = f"preprocess:{chain}:{address.lower()}"
+        key = await _cache_key(cache, chain, address)
         result = await cache.r.get(key)
         if result is None:
             return None
         data = json.loads(result if isinstance(result, str) else result.decode("utf-8"))
         return PreprocessedFacts.from_dict(data)
     except Exception as e:
-        print(f"[WARN] Preprocessor cache get failed: {e}")
+        logger.warning("Preprocessor cache get failed: %s", e)
         return None
 
 
 async def _cache_set(cache: Any, chain: str, address: str, facts: PreprocessedFacts) -> None:
     """Store preprocessed facts in Redis with 24h TTL."""
     try:
-        key = f"preprocess:{chain}:{address.lower()}"
+        key = await _cache_key(cache, chain, address)
         payload = json.dumps(facts.to_dict())
         await cache.r.set(key, payload, ex=86400)  # 24 hours
     except Exception as e:
-        print(f"[WARN] Preprocessor cache set failed: {e}")
+        logger.warning("Preprocessor cache set failed: %s", e)
 
 
 # ---------------------------------------------------------------------------
@@ -296,6 +306,7 @@ async def preprocess_token(
     address: str,
     *,
     cache: Any = None,
+    limiter: Any = None,
 ) -> Optional[PreprocessedFacts]:
     """Run the Token Preprocessor (Fact Oracle).
 
@@ -304,6 +315,8 @@ async def preprocess_token(
         chain: Blockchain identifier (e.g. ``"solana"``, ``"base"``).
         address: Token contract / mint address.
         cache: Optional ``Cache`` instance (with async Redis ``cache.r``).
+        limiter: Optional anyio ``CapacityLimiter`` for the provider cascade
+            thread (defaults to anyio's shared thread limiter).
 
     Returns:
         ``PreprocessedFacts`` on success, ``None`` if all providers failed
@@ -314,14 +327,14 @@ async def preprocess_token(
     if cache is not None:
         cached = await _cache_get(cache, chain, address)
         if cached is not None:
-            print(f"[INFO] Preprocessor cache hit for {chain}:{address}")
+            logger.info("Preprocessor cache hit for %s:%s", chain, address)
             return cached
 
     # --- 2. Build prompt ---
     try:
         system, user = _build_prompt(token_data, chain, address)
     except Exception as e:
-        print(f"[ERROR] Preprocessor prompt build failed: {e}")
+        logger.error("Preprocessor prompt build failed: %s", e)
         traceback.print_exc()
         return None
 
@@ -331,22 +344,23 @@ async def preprocess_token(
         client = AIClient()
         client.timeout_s = 15.0  # Per-provider timeout (generous for rate limit retries)
         raw = await anyio.to_thread.run_sync(
-            lambda: _run_cascade(client, system, user)
+            lambda: _run_cascade(client, system, user),
+            limiter=limiter,
         )
     except Exception as e:
-        print(f"[ERROR] Preprocessor cascade failed: {e}")
+        logger.error("Preprocessor cascade failed: %s", e)
         traceback.print_exc()
         return None
 
     if raw is None:
-        print("[WARN] All preprocessor providers failed — agents will use raw data")
+        logger.warning("All preprocessor providers failed — agents will use raw data")
         return None
 
     # --- 4. Parse into dataclass ---
     try:
         facts = PreprocessedFacts.from_dict(raw)
     except Exception as e:
-        print(f"[ERROR] Preprocessor result parsing failed: {e}")
+        logger.error("Preprocessor result parsing failed: %s", e)
         traceback.print_exc()
         return None
 
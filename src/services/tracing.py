@@ -0,0 +1,141 @@
+"""Per-scan trace spans.
+
+A scan binds a :class:`Trace` to the current context with
+:func:`start_trace`; anything running underneath it — DataFetcher HTTP calls,
+AIClient requests (one span per retry attempt), agent analysis, debates,
+convergence rounds — opens spans with::
+
+    with span("fetch:api.dexscreener.com"):
+        ...
+
+Spans nest through a contextvar, so the parent/child structure follows
+asyncio tasks and ``anyio.to_thread`` worker calls (both copy the context).
+Outside of a scan there is no active trace and :func:`span` is a no-op
+costing a single contextvar lookup.
+
+``Trace.waterfall()`` renders the spans as a JSON-friendly timeline
+(offsets relative to trace start) that the API attaches to the scan payload
+and optionally streams as a ``scan:timing`` SSE event.
+
+Stdlib only.
+"""
+
+from __future__ import annotations
+
+import contextvars
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterator, List, Optional
+
+# Hard cap per trace so a runaway retry loop can't bloat the cached payload.
+MAX_SPANS = 500
+
+_current_trace: contextvars.ContextVar[Optional["Trace"]] = contextvars.ContextVar("vs_trace", default=None)
+_current_span: contextvars.ContextVar[Optional[int]] = contextvars.ContextVar("vs_span", default=None)
+
+
+@dataclass
+class Span:
+    id: int
+    name: str
+    parent: Optional[int]
+    start_ms: float
+    duration_ms: Optional[float] = None
+    attrs: Dict[str, Any] = field(default_factory=dict)
+    error: Optional[str] = None
+
+    def set(self, **attrs: Any) -> None:
+        self.attrs.update(attrs)
+
+
+class Trace:
+    def __init__(self, scan_id: str, *, max_spans: int = MAX_SPANS) -> None:
+        self.scan_id = scan_id
+        self.max_spans = max_spans
+        self._t0 = time.perf_counter()
+        self._lock = threading.Lock()
+        self._spans: List[Span] = []
+        self.dropped = 0
+
+    def elapsed_ms(self) -> float:
+        return (time.perf_counter() - self._t0) * 1000.0
+
+    def _open(self, name: str, parent: Optional[int], attrs: Dict[str, Any]) -> Optional[Span]:
+        start = self.elapsed_ms()
+        with self._lock:
+            if len(self._spans) >= self.max_spans:
+                self.dropped += 1
+                return None
+            s = Span(id=len(self._spans), name=name, parent=parent, start_ms=start, attrs=attrs)
+            self._spans.append(s)
+            return s
+
+    def waterfall(self) -> Dict[str, Any]:
+        """Spans ordered by start time, with nesting depth for rendering."""
+        with self._lock:
+            spans = list(self._spans)
+        depth: Dict[int, int] = {}
+        rows: List[Dict[str, Any]] = []
+        for s in sorted(spans, key=lambda s: (s.start_ms, s.id)):
+            d = depth.get(s.parent, -1) + 1 if s.parent is not None else 0
+            depth[s.id] = d
+            row: Dict[str, Any] = {
+                "id": s.id,
+                "name": s.name,
+                "parent": s.parent,
+                "depth": d,
+                "start_ms": round(s.start_ms, 1),
+                # Still open (e.g. on-chain storage at snapshot time)
+                "duration_ms": round(s.duration_ms, 1) if s.duration_ms is not None else None,
+            }
+            if s.attrs:
+                row["attrs"] = dict(s.attrs)
+            if s.error:
+                row["error"] = s.error
+            rows.append(row)
+        return {
+            "scan_id": self.scan_id,
+            "total_ms": round(self.elapsed_ms(), 1),
+            "spans": rows,
+            "dropped": self.dropped,
+        }
+
+
+def bind_trace(trace: Trace) -> Trace:
+    """Bind an existing trace to the rest of the current task/context."""
+    _current_trace.set(trace)
+    _current_span.set(None)
+    return trace
+
+
+def start_trace(scan_id: str) -> Trace:
+    """Create a trace and bind it to the rest of the current task/context."""
+    return bind_trace(Trace(scan_id))
+
+
+def current_trace() -> Optional[Trace]:
+    return _current_trace.get()
+
+
+@contextmanager
+def span(name: str, **attrs: Any) -> Iterator[Optional[Span]]:
+    """Time a block as a child of the current span. No-op without a trace."""
+    trace = _current_trace.get()
+    s = trace._open(name, _current_span.get(), attrs) if trace is not None else None  # noqa: SLF001
+    if s is None:
+        yield None
+        return
+    token = _current_span.set(s.id)
+    try:
+        yield s
+    except BaseException as e:
+        s.error = f"{type(e).__name__}: {str(e)[:200]}"
+        raise
+    finally:
+        s.duration_ms = trace.elapsed_ms() - s.start_ms
+        _current_span.reset(token)
+
+
+__all__ = ["Span", "Trace", "bind_trace", "current_trace", "span", "start_trace"]
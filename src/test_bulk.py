@@ -0,0 +1,160 @@
+import asyncio
+import io
+import json
+import os
+import tempfile
+import unittest
+from contextlib import redirect_stderr
+from unittest.mock import patch
+
+from projects.verdictswarm.src import bulk
+from projects.verdictswarm.src.data_fetcher import DataFetcher, TokenData
+from projects.verdictswarm.src.tiers import TierLevel
+
+EVM = "0x" + "ab" * 20
+JUP = "JUPyiwrYJFskUPiHa7hkeR8VUtAeFoSYbKedZNsDvCN"
+
+
+class TestReadAddresses(unittest.TestCase):
+    def test_lines_are_parsed_and_deduplicated(self):
+        lines = [
+            "# header comment",
+            "",
+            f"{EVM}  # trailing comment",
+            EVM.upper().replace("0X", "0x"),  # same EVM address, other case
+            f"{EVM},BASE",
+            f"  {JUP}  ",
+            "0x1234",
+            "not an address",
+        ]
+        targets, rejected = bulk.read_addresses(lines, "auto")
+
+        self.assertEqual(targets, [(EVM, "auto"), (EVM, "base"), (JUP, "solana")])
+        self.assertEqual(rejected, ["0x1234", "not an address"])
+
+    def test_base58_case_is_significant(self):
+        targets, _ = bulk.read_addresses([JUP, "j" + JUP[1:]], "solana")
+        self.assertEqual(len(targets), 2)
+
+    def test_evm_address_under_solana_is_rejected(self):
+        targets, rejected = bulk.read_addresses([EVM], "solana")
+        self.assertEqual((targets, rejected), ([], [EVM]))
+
+
+class TestCheckpoint(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.path = os.path.join(tmp.name, "out.jsonl")
+
+    def test_missing_file_is_empty(self):
+        self.assertEqual(bulk.load_checkpoint(self.path, retry_errors=False), set())
+
+    def test_rows_are_loaded_and_torn_line_ignored(self):
+        with open(self.path, "w", encoding="utf-8") as f:
+            f.write(json.dumps({"address": EVM.upper().replace("0X", "0x"), "chain": "base", "status": "ok"}) + "\n")
+            f.write(json.dumps({"address": JUP, "chain": "solana", "status": "error"}) + "\n")
+            f.write('{"address": "0xdead')  # interrupted mid-write
+
+        self.assertEqual(
+            bulk.load_checkpoint(self.path, retry_errors=False), {(EVM, "base"), (JUP, "solana")}
+        )
+        self.assertEqual(bulk.load_checkpoint(self.path, retry_errors=True), {(EVM, "base")})
+
+
+def _token(address: str, chain: str) -> TokenData:
+    return TokenData(
+        contract_address=address, name="T", symbol="T", contract_verified=False, tx_count_24h=0,
+        creator_address="", contract_age_days=0, price_usd=0.0, price_change_24h=0.0, volume_24h=0.0,
+        liquidity_usd=0.0, mcap=0.0, fdv=0.0, fetch_timestamp=0, data_sources=["test"], chain=chain,
+    )
+
+
+def _analysis(token_data, chain, tier_value):
+    return {"final_score": 5.0, "chain_seen": chain, "timings": {"scam_ms": 0.0, "agents_ms": 0.0, "score_ms": 0.0}}
+
+
+class TestBulkRun(unittest.TestCase):
+    """Runs the bulk pipeline with fetches and analysis stubbed out."""
+
+    def setUp(self):
+        self.evm_calls = []
+        self.solana_calls = []
+
+        def fetch(fetcher, address, chain=None, **kw):
+            self.evm_calls.append((address, chain))
+            return _token(address, chain)
+
+        def fetch_solana(fetcher, address, **kw):
+            self.solana_calls.append(address)
+            return _token(address, "solana")
+
+        for p in (
+            patch.object(DataFetcher, "fetch", fetch),
+            patch.object(DataFetcher, "fetch_solana_token_data", fetch_solana),
+            patch.object(DataFetcher, "resolve_chain", lambda fetcher, address: "ethereum"),
+            patch.object(DataFetcher, "fetch_market_many", lambda fetcher, addresses, **kw: {}),
+            patch.object(bulk, "analyze_token", _analysis),
+        ):
+            p.start()
+            self.addCleanup(p.stop)
+        bulk._thread_local.__dict__.clear()
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.out = os.path.join(tmp.name, "out.jsonl")
+
+    def run_lines(self, lines, default_chain="auto"):
+        targets, rejected = bulk.read_addresses(lines, default_chain)
+        runner = bulk.BulkRunner(out_path=self.out, tier=TierLevel.FREE, concurrency=2)
+        asyncio.run(runner.run(targets, progress=False))
+        with open(self.out, encoding="utf-8") as f:
+            return {row["address"]: row for row in map(json.loads, f)}, rejected
+
+    def test_solana_lines_never_reach_the_evm_path(self):
+        rows, rejected = self.run_lines([JUP, f"{JUP},solana", EVM])
+
+        self.assertEqual(rejected, [])
+        self.assertEqual(self.solana_calls, [JUP])  # the duplicate line is dropped
+        self.assertEqual(self.evm_calls, [(EVM, "ethereum")])
+        self.assertEqual(rows[JUP]["status"], "ok")
+        self.assertEqual(rows[JUP]["chain"], "solana")
+        self.assertEqual(rows[JUP]["chain_seen"], "solana")
+        self.assertEqual(rows[EVM]["detected_chain"], "ethereum")
+
+    def test_mint_under_an_evm_default_chain_is_rejected(self):
+        rows, rejected = self.run_lines([JUP], default_chain="base")
+        self.assertEqual(rejected, [JUP])
+        self.assertEqual(self.solana_calls + self.evm_calls, [])
+
+    def main(self, *args):
+        with redirect_stderr(io.StringIO()):
+            return bulk.main([self.input, "--out", self.out, "--quiet", "--concurrency", "2", *args])
+
+    def test_rerun_resumes_from_the_output_file(self):
+        other = "0x" + "cd" * 20
+        self.input = os.path.join(os.path.dirname(self.out), "in.txt")
+        with open(self.input, "w", encoding="utf-8") as f:
+            f.write(f"{EVM}\n{other}\n{JUP}\n")
+
+        def flaky(fetcher, address, chain=None, **kw):
+            self.evm_calls.append((address, chain))
+            if address == other:
+                raise TimeoutError("upstream")
+            return _token(address, chain)
+
+        with patch.object(DataFetcher, "fetch", flaky):
+            self.assertEqual(self.main(), 1)
+            self.assertEqual(self.main(), 0)  # nothing left to do
+            self.assertEqual(len(self.evm_calls), 2)
+            self.assertEqual(self.solana_calls, [JUP])
+
+            self.assertEqual(self.main("--retry-errors"), 1)
+        self.assertEqual(self.evm_calls[2:], [(other, "ethereum")])  # only the failed row is retried
+
+        with open(self.out, encoding="utf-8") as f:
+            statuses = [(row["address"], row["status"]) for row in map(json.loads, f)]
+        self.assertEqual(sorted(statuses), sorted([(EVM, "ok"), (other, "error"), (JUP, "ok"), (other, "error")]))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,127 @@
+import threading
+import time
+import unittest
+
+from projects.verdictswarm.src.services import chain_resolver
+from projects.verdictswarm.src.services.chain_resolver import ChainResolver, is_auto_chain
+from projects.verdictswarm.src.services.fetch_cache import MemoryFetchCache
+
+ADDR = "0x" + "AB" * 20
+
+
+class _Lookups:
+    """Stubbed DexScreener and ``eth_getCode`` lookups with per-call delays."""
+
+    def __init__(self, dex=None, dex_delay_s=0.0, code=(), code_delay_s=None):
+        self.dex = dex
+        self.dex_delay_s = dex_delay_s
+        self.code = set(code)
+        self.code_delay_s = dict(code_delay_s or {})
+        self.dex_calls = 0
+        self.probed = []
+        self._lock = threading.Lock()
+
+    def market_chain(self, address):
+        with self._lock:
+            self.dex_calls += 1
+        time.sleep(self.dex_delay_s)
+        if isinstance(self.dex, Exception):
+            raise self.dex
+        return self.dex
+
+    def has_code(self, address, chain):
+        with self._lock:
+            self.probed.append(chain)
+        time.sleep(self.code_delay_s.get(chain, 0.0))
+        return chain in self.code
+
+
+class TestChainResolver(unittest.TestCase):
+    def resolver(self, lookups, **kw):
+        kw.setdefault("cache", MemoryFetchCache())
+        kw.setdefault("dex_head_start_s", 0.1)
+        return ChainResolver(market_chain=lookups.market_chain, has_code=lookups.has_code, **kw)
+
+    def test_is_auto_chain(self):
+        for chain in (None, "", " auto ", "AUTO"):
+            self.assertTrue(is_auto_chain(chain), chain)
+        self.assertFalse(is_auto_chain("base"))
+
+    def test_prompt_dexscreener_answer_skips_the_probes(self):
+        lookups = _Lookups(dex="Ethereum", code={"base"})
+        resolver = self.resolver(lookups)
+
+        with self.assertLogs(chain_resolver.logger, "INFO"):
+            res = resolver.resolve(ADDR)
+        self.assertEqual((res.chain, res.source), ("ethereum", "dexscreener"))
+        self.assertEqual(lookups.probed, [])
+
+    def test_resolution_is_cached_per_lowercased_address(self):
+        lookups = _Lookups(dex="arbitrum")
+        resolver = self.resolver(lookups)
+        with self.assertLogs(chain_resolver.logger, "INFO"):
+            resolver.resolve(ADDR)
+
+        res = resolver.resolve(ADDR.lower())
+        self.assertEqual((res.chain, res.source), ("arbitrum", "cache"))
+        self.assertEqual(lookups.dex_calls, 1)
+
+    def test_slow_dexscreener_falls_back_to_code_probes(self):
+        lookups = _Lookups(dex=None, dex_delay_s=0.3, code={"arbitrum", "ethereum"})
+        resolver = self.resolver(lookups)
+
+        with self.assertLogs(chain_resolver.logger, "INFO"):
+            res = resolver.resolve(ADDR)
+        self.assertEqual((res.chain, res.source), ("ethereum", "code"))  # earliest in PROBE_CHAINS
+        self.assertEqual(res.candidates, ("ethereum", "arbitrum"))
+        self.assertEqual(sorted(lookups.probed), sorted(chain_resolver.PROBE_CHAINS))
+
+    def test_probes_do_not_wait_for_dexscreener_once_code_is_found(self):
+        lookups = _Lookups(dex="polygon", dex_delay_s=1.0, code={"base"})
+        resolver = self.resolver(lookups)
+
+        t0 = time.monotonic()
+        with self.assertLogs(chain_resolver.logger, "INFO"):
+            res = resolver.resolve(ADDR)
+        self.assertEqual((res.chain, res.source), ("base", "code"))
+        self.assertLess(time.monotonic() - t0, 0.8)
+
+    def test_late_dexscreener_answer_beats_pending_probes(self):
+        lookups = _Lookups(dex="polygon", dex_delay_s=0.2, code={"base"}, code_delay_s={"bsc": 0.6})
+        resolver = self.resolver(lookups)
+
+        with self.assertLogs(chain_resolver.logger, "INFO"):
+            res = resolver.resolve(ADDR)
+        self.assertEqual((res.chain, res.source), ("polygon", "dexscreener"))
+
+    def test_unsupported_or_failing_dexscreener_is_ignored(self):
+        for dex in ("fantom", RuntimeError("dexscreener down")):
+            lookups = _Lookups(dex=dex, code={"optimism"})
+            with self.assertLogs(chain_resolver.logger, "INFO"):
+                res = self.resolver(lookups).resolve(ADDR)
+            self.assertEqual((res.chain, res.source), ("optimism", "code"), dex)
+
+    def test_nothing_found_returns_default_uncached(self):
+        lookups = _Lookups(dex=None)
+        cache = MemoryFetchCache()
+        resolver = self.resolver(lookups, cache=cache, default="base")
+
+        res = resolver.resolve(ADDR)
+        self.assertEqual((res.chain, res.source), ("base", "default"))
+        resolver.resolve(ADDR)
+        self.assertEqual(lookups.dex_calls, 2)
+        self.assertIsNone(cache.get(f"chain:{ADDR.lower()}"))
+
+    def test_timeout_returns_default(self):
+        lookups = _Lookups(dex=None, code={"base"}, code_delay_s={"base": 1.0})
+        resolver = self.resolver(lookups, dex_head_start_s=0.0, timeout_s=0.2)
+
+        t0 = time.monotonic()
+        with self.assertLogs(chain_resolver.logger, "WARNING"):
+            res = resolver.resolve(ADDR)
+        self.assertEqual(res.source, "default")
+        self.assertLess(time.monotonic() - t0, 0.8)
+
+
+if __name__ == "__main__":
+    unittest.main()
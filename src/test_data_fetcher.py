@@ -4,8 +4,11 @@ import time
 import unittest
 from unittest.mock import patch
 from urllib.error import URLError
+from urllib.parse import parse_qs, urlparse
 
 from projects.verdictswarm.src.data_fetcher import DataFetcher
+from projects.verdictswarm.src.services.facts_store import MemoryFactsStore
+from projects.verdictswarm.src.services.fetch_cache import DEFAULT_TTLS
 
 
 class _FakeResp:
@@ -77,12 +80,30 @@ class TestDataFetcher(unittest.TestCase):
             ],
         }
 
+        # Block at now-24h (start of the txlist block range)
+        block_payload = {"status": "1", "message": "OK", "result": "12345"}
+
+        # Contract creation (recorded once in the facts store)
+        creation = {
+            "status": "1",
+            "message": "OK",
+            "result": [
+                {"contractCreator": "0xcreator", "txHash": "0xdeploy", "timestamp": str(now - 10 * 86400 - 60)}
+            ],
+        }
+
         def fake_urlopen(req, timeout=0):
             url = req.full_url
             if "dexscreener.com" in url:
                 return _FakeResp(dex_payload)
+            if "module=block" in url and "action=getblocknobytime" in url:
+                return _FakeResp(block_payload)
             if "module=contract" in url and "action=getsourcecode" in url:
                 return _FakeResp(basescan_source)
+            if "module=contract" in url and "action=getcontractcreation" in url:
+                return _FakeResp(creation)
+            if "module=proxy" in url and "action=eth_call" in url:
+                return _FakeResp({"jsonrpc": "2.0", "id": 1, "result": "0x" + "0" * 62 + "12"})
             if "module=account" in url and "action=txlist" in url:
                 return _FakeResp(basescan_tx)
             if "module=token" in url and "action=tokenholderlist" in url:
@@ -100,6 +121,9 @@ class TestDataFetcher(unittest.TestCase):
         self.assertEqual(td.symbol, "VIRTUAL")
         self.assertTrue(td.contract_verified)
         self.assertEqual(td.creator_address, "0xcreator")
+        self.assertEqual(td.contract_age_days, 10)
+        self.assertEqual(td.decimals, 18)
+        self.assertEqual(df.facts.get("8453", addr).deploy_tx, "0xdeploy")
         self.assertEqual(td.tx_count_24h, 2)
         self.assertEqual(td.holder_count, 2)
         self.assertAlmostEqual(td.top10_holders_pct, 15.0)
@@ -139,5 +163,219 @@ class TestDataFetcher(unittest.TestCase):
         self.assertNotIn("dexscreener", td.data_sources)
 
 
+class TestTxCount24h(unittest.TestCase):
+    """Paging through txlist over the last day's blocks (page size 3 here)."""
+
+    def setUp(self):
+        self.now = int(time.time())
+        self.old = self.now - 25 * 60 * 60
+        self.requested = []
+        for p in (
+            patch("projects.verdictswarm.src.data_fetcher.TX_PAGE_SIZE", 3),
+            patch("projects.verdictswarm.src.data_fetcher.TX_MAX_PAGES", 3),
+            patch.dict(os.environ, {"BASESCAN_API_KEY": ""}),
+        ):
+            p.start()
+            self.addCleanup(p.stop)
+
+    def serve(self, pages, dex_txns=0):
+        """Patch urlopen: txlist page N returns ``pages[N-1]`` (timestamps, or an error string)."""
+
+        def fake_urlopen(req, timeout=0):
+            url = req.full_url
+            if "dexscreener.com" in url:
+                pair = {"baseToken": {"name": "T", "symbol": "T"}, "txns": {"h24": {"buys": dex_txns, "sells": 0}}}
+                return _FakeResp({"pairs": [pair]})
+            q = parse_qs(urlparse(url).query)
+            if "action=txlist" in url and q.get("sort") == ["desc"]:
+                page = int(q["page"][0])
+                self.requested.append(page)
+                rows = pages[page - 1] if page <= len(pages) else []
+                if isinstance(rows, str):
+                    return _FakeResp({"status": "0", "message": "NOTOK", "result": rows})
+                return _FakeResp({"status": "1", "message": "OK", "result": [{"timeStamp": str(t)} for t in rows]})
+            return _FakeResp({"status": "0", "message": "NOTOK", "result": []})
+
+        p = patch("projects.verdictswarm.src.data_fetcher.urlopen", side_effect=fake_urlopen)
+        p.start()
+        self.addCleanup(p.stop)
+
+    def count(self):
+        return DataFetcher(timeout_s=0.1)._count_txs_24h("0xabc", "8453")
+
+    def test_pages_until_a_short_page(self):
+        self.serve([[self.now] * 3, [self.now] * 3, [self.now]])
+        self.assertEqual(self.count(), {"tx_count_24h": 7})
+        self.assertEqual(self.requested, [1, 2, 3])
+
+    def test_stops_at_the_cutoff_mid_page(self):
+        self.serve([[self.now] * 3, [self.now, self.old, self.old], [self.now] * 3])
+        self.assertEqual(self.count(), {"tx_count_24h": 4})
+        self.assertEqual(self.requested, [1, 2])
+
+    def test_truncated_at_max_pages(self):
+        self.serve([[self.now] * 3] * 4)
+        self.assertEqual(self.count(), {"tx_count_24h": 9, "tx_count_truncated": True})
+        self.assertEqual(self.requested, [1, 2, 3])
+
+    def test_error_after_first_page_keeps_partial_count(self):
+        self.serve([[self.now] * 3, "Max rate limit reached"])
+        self.assertEqual(self.count(), {"tx_count_24h": 3})
+
+    def test_fetch_uses_truncated_explorer_count(self):
+        self.serve([[self.now] * 3] * 4, dex_txns=2)
+        td = DataFetcher(timeout_s=0.1).fetch("0xabc")
+        self.assertEqual(td.tx_count_24h, 9)
+
+    def test_busy_token_skips_txlist(self):
+        self.serve([[self.now] * 3] * 4, dex_txns=5)  # ≥ one page: DexScreener count is enough
+        td = DataFetcher(timeout_s=0.1).fetch("0xabc")
+        self.assertEqual(self.requested, [])
+        self.assertEqual(td.tx_count_24h, 5)
+
+
+class TestFetchMarketMany(unittest.TestCase):
+    """DexScreener lookups for many tokens, 30 addresses per request."""
+
+    def setUp(self):
+        self.chunks = []
+        self.listed = set()
+
+        def fake_urlopen(req, timeout=0):
+            chunk = req.full_url.rsplit("/", 1)[1].split(",")
+            self.chunks.append(chunk)
+            # DexScreener reports addresses in its own (lowercase) form.
+            pairs = [
+                {
+                    "baseToken": {"address": a.lower(), "name": a, "symbol": "T"},
+                    "priceUsd": "1.0",
+                    "liquidity": {"usd": "100"},
+                }
+                for a in chunk
+                if a.lower() in self.listed
+            ]
+            return _FakeResp({"pairs": pairs})
+
+        p = patch("projects.verdictswarm.src.data_fetcher.urlopen", side_effect=fake_urlopen)
+        p.start()
+        self.addCleanup(p.stop)
+
+    def test_chunks_maps_back_and_caches_misses(self):
+        addresses = [f"0x{i:038x}Ab" for i in range(66)]
+        self.listed = {a.lower() for a in addresses[::2]}
+        df = DataFetcher(timeout_s=0.1)
+
+        out = df.fetch_market_many(addresses + [addresses[0].lower()])
+
+        self.assertEqual([len(c) for c in self.chunks], [30, 30, 6])
+        self.assertEqual(sorted(a for c in self.chunks for a in c), sorted(addresses))
+        self.assertEqual(set(out), set(addresses))  # keyed by the caller's spelling
+        self.assertEqual(out[addresses[0]]["name"], addresses[0])
+        self.assertEqual(out[addresses[2]]["price_usd"], 1.0)
+        self.assertEqual(out[addresses[1]], {})  # not returned by DexScreener
+
+        self.chunks.clear()
+        again = df.fetch_market_many(addresses)
+        self.assertEqual(self.chunks, [])  # listed and unlisted both cached
+        self.assertEqual(again, out)
+
+
+class TestContractFactsMiss(unittest.TestCase):
+    """Creation lookups that find nothing are not repeated on every scan."""
+
+    def setUp(self):
+        self.actions = []
+        self.creation = []
+
+        def fake_call(params, chain_id, *, priority=0):
+            self.actions.append(params["action"])
+            if params["action"] == "getcontractcreation" and self.creation:
+                return {"status": "1", "message": "OK", "result": self.creation}
+            return {"status": "0", "message": "NOTOK", "result": []}
+
+        p = patch.object(DataFetcher, "_etherscan_call", side_effect=fake_call)
+        p.start()
+        self.addCleanup(p.stop)
+
+    def fetcher(self, **ttls):
+        return DataFetcher(timeout_s=0.1, facts=MemoryFactsStore(), ttls=dict(DEFAULT_TTLS, **ttls))
+
+    def test_miss_is_cached(self):
+        df = self.fetcher()
+        self.assertIsNone(df._contract_facts("0xAbc", "8453").created_at)
+        self.assertIn("getcontractcreation", self.actions)
+        self.assertIn("eth_call", self.actions)
+
+        self.actions.clear()
+        self.assertIsNone(df._contract_facts("0xabc", "8453").created_at)
+        self.assertEqual(self.actions, [])
+        df._contract_facts("0xabc", "1")  # per chain
+        self.assertIn("getcontractcreation", self.actions)
+
+    def test_miss_is_retried_when_not_cached(self):
+        df = self.fetcher(facts_miss=0)
+        df._contract_facts("0xabc", "8453")
+        self.actions.clear()
+        df._contract_facts("0xabc", "8453")
+        self.assertIn("getcontractcreation", self.actions)
+
+    def test_found_creation_goes_to_the_facts_store(self):
+        self.creation = [{"contractCreator": "0xdev", "txHash": "0xtx", "timestamp": "1700000000"}]
+        df = self.fetcher()
+        self.assertEqual(df._contract_facts("0xabc", "8453").created_at, 1700000000)
+        self.actions.clear()
+        facts = df._contract_facts("0xabc", "8453")
+        self.assertEqual((facts.created_at, facts.creator), (1700000000, "0xdev"))
+        self.assertEqual(self.actions, [])
+
+
+class _FakeSolanaRpc:
+    def __init__(self, amounts, helius=True):
+        self.amounts = amounts
+        self.helius = helius
+        self.requests = []
+
+    def has_endpoint(self, name):
+        return self.helius and name == "helius"
+
+    def batch(self, calls, endpoint=None):
+        self.requests.append(([method for method, _ in calls], endpoint))
+        results = {
+            "getAccountInfo": {"value": {"owner": "TokenkegQfeZyiNwAJbNbGKPFXCWuBvf9Ss623VQ5DA"}},
+            "getTokenLargestAccounts": {"value": [{"amount": str(a)} for a in self.amounts]},
+            "getTokenSupply": {"value": {"amount": "10000", "decimals": 6}},
+            "getTokenAccounts": {"total": 1000},
+        }
+        return [results[method] for method, _ in calls]
+
+    def call(self, method, params, endpoint=None):
+        return self.batch([(method, params)], endpoint=endpoint)[0]
+
+
+class TestSolanaHolderCount(unittest.TestCase):
+    mint = "So1anaMint1111111111111111111111111111111"
+
+    def fetch(self, rpc):
+        with patch(
+            "projects.verdictswarm.src.data_fetcher.urlopen",
+            side_effect=lambda req, timeout=0: _FakeResp({"pairs": []}),
+        ):
+            return DataFetcher(timeout_s=0.1, solana_rpc=rpc).fetch_solana_token_data(self.mint)
+
+    def test_small_holder_set_is_counted_from_largest_accounts(self):
+        rpc = _FakeSolanaRpc([500, 300, 200, 0])
+        td = self.fetch(rpc)
+        self.assertEqual(td.holder_count, 3)
+        self.assertAlmostEqual(td.top10_holders_pct, 10.0)
+        self.assertEqual(rpc.requests, [(["getAccountInfo", "getTokenLargestAccounts", "getTokenSupply"], None)])
+
+    def test_large_holder_set_asks_helius_only(self):
+        rpc = _FakeSolanaRpc([100] * 20)
+        td = self.fetch(rpc)
+        self.assertEqual(td.holder_count, 1000)
+        self.assertEqual(rpc.requests[-1], (["getTokenAccounts"], "helius"))
+        self.assertEqual(len(rpc.requests), 2)
+
+
 if __name__ == "__main__":
     unittest.main()
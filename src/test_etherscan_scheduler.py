@@ -0,0 +1,174 @@
+import threading
+import time
+import unittest
+from urllib.parse import parse_qs, urlparse
+
+from projects.verdictswarm.src.services import etherscan_scheduler
+from projects.verdictswarm.src.services.etherscan_scheduler import (
+    PRIORITY_HOLDERS,
+    PRIORITY_SOURCE,
+    PRIORITY_STATS,
+    EtherscanScheduler,
+    SchedulerTimeout,
+)
+
+BASE = "https://api.etherscan.io/v2/api"
+OK = {"status": "1", "message": "OK", "result": []}
+LIMITED = {"status": "0", "message": "NOTOK", "result": "Max calls per sec rate limit reached (5/sec)"}
+
+
+def _query(url):
+    return {k: v[0] for k, v in parse_qs(urlparse(url).query).items()}
+
+
+class _Transport:
+    """Stubbed ``http_get``: records queries, replays canned responses."""
+
+    def __init__(self, responses=None):
+        self.queries = []
+        self.responses = list(responses or [])
+        self._lock = threading.Lock()
+
+    def __call__(self, url):
+        with self._lock:
+            self.queries.append(_query(url))
+            return self.responses.pop(0) if self.responses else OK
+
+
+def _exhaust(scheduler):
+    """Leave every key with an empty bucket, as after a burst."""
+    now = time.monotonic()
+    for bucket in scheduler._buckets.values():
+        bucket.tokens, bucket._updated = 0.0, now
+
+
+class TestEtherscanScheduler(unittest.TestCase):
+    def call(self, scheduler, transport, action, priority=PRIORITY_STATS):
+        return scheduler.call(
+            {"module": "x", "action": action}, "8453", http_get=transport, base_url=BASE, priority=priority
+        )
+
+    def test_query_carries_chain_and_key(self):
+        transport = _Transport()
+        scheduler = EtherscanScheduler(["k1", "k2"])
+        self.assertEqual(self.call(scheduler, transport, "a"), OK)
+        self.call(scheduler, transport, "b")
+        self.assertEqual([q["apikey"] for q in transport.queries], ["k1", "k2"])  # round-robin
+        self.assertEqual(transport.queries[0]["chainid"], "8453")
+
+    def test_saturated_keys_serve_waiters_by_priority(self):
+        transport = _Transport()
+        scheduler = EtherscanScheduler(["k1"], rate_per_key=5)  # one token per 200ms
+        _exhaust(scheduler)
+
+        threads = []
+        for action, priority in (("stats", PRIORITY_STATS), ("holders", PRIORITY_HOLDERS), ("source", PRIORITY_SOURCE)):
+            t = threading.Thread(target=self.call, args=(scheduler, transport, action, priority))
+            t.start()
+            threads.append(t)
+            time.sleep(0.02)  # queued in this order, well before the next token
+        self.assertEqual(scheduler.stats()["waiting"], 3)
+        for t in threads:
+            t.join()
+
+        self.assertEqual([q["action"] for q in transport.queries], ["source", "holders", "stats"])
+        self.assertEqual(scheduler.stats()["waiting"], 0)
+
+    def test_identical_inflight_calls_share_one_request(self):
+        entered, release = threading.Event(), threading.Event()
+        calls = []
+
+        def slow_get(url):
+            calls.append(url)
+            entered.set()
+            release.wait(2)
+            return {"status": "1", "result": ["shared"]}
+
+        scheduler = EtherscanScheduler(["k1"])
+        results = []
+        first = threading.Thread(target=lambda: results.append(self.call(scheduler, slow_get, "same")))
+        first.start()
+        entered.wait(2)
+        second = threading.Thread(target=lambda: results.append(self.call(scheduler, slow_get, "same")))
+        second.start()
+        for _ in range(200):
+            if scheduler.coalesced:
+                break
+            time.sleep(0.005)
+        release.set()
+        first.join()
+        second.join()
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(scheduler.coalesced, 1)
+        self.assertEqual(results, [{"status": "1", "result": ["shared"]}] * 2)
+        self.call(scheduler, slow_get, "same")  # no longer in flight: a new request
+        self.assertEqual(len(calls), 2)
+
+    def test_inflight_failure_reaches_every_waiter(self):
+        entered, release = threading.Event(), threading.Event()
+
+        def failing_get(url):
+            entered.set()
+            release.wait(2)
+            raise OSError("connection reset")
+
+        scheduler = EtherscanScheduler(["k1"])
+        errors = []
+
+        def run():
+            try:
+                self.call(scheduler, failing_get, "same")
+            except OSError as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=run)]
+        threads[0].start()
+        entered.wait(2)
+        threads.append(threading.Thread(target=run))
+        threads[1].start()
+        while not scheduler.coalesced:
+            time.sleep(0.005)
+        release.set()
+        for t in threads:
+            t.join()
+        self.assertEqual(len(errors), 2)
+        self.assertEqual(scheduler.stats()["keys"]["…k1"]["errors"], 1)
+
+    def test_rate_limited_response_is_retried_on_another_key(self):
+        transport = _Transport([LIMITED])
+        scheduler = EtherscanScheduler(["key-aaaa", "key-bbbb"])
+
+        with self.assertLogs(etherscan_scheduler.logger, "INFO"):
+            self.assertEqual(self.call(scheduler, transport, "a"), OK)
+
+        self.assertEqual([q["apikey"] for q in transport.queries], ["key-aaaa", "key-bbbb"])
+        stats = scheduler.stats()["keys"]
+        self.assertEqual(stats["…aaaa"]["rate_limited"], 1)
+        self.assertEqual(stats["…bbbb"]["rate_limited"], 0)
+        wait = scheduler._buckets["key-aaaa"].try_take(time.monotonic())
+        self.assertAlmostEqual(wait, etherscan_scheduler.RATE_LIMIT_PAUSE_S, delta=0.1)  # key paused
+
+    def test_persistent_rate_limit_returns_the_last_payload(self):
+        transport = _Transport([LIMITED] * 10)
+        scheduler = EtherscanScheduler(["k1", "k2", "k3"])
+        with self.assertLogs(etherscan_scheduler.logger, "WARNING"):
+            self.assertEqual(self.call(scheduler, transport, "a"), LIMITED)
+        self.assertEqual(len(transport.queries), etherscan_scheduler.MAX_RATE_LIMIT_RETRIES + 1)
+
+    def test_no_capacity_within_the_wait_budget_times_out(self):
+        transport = _Transport()
+        scheduler = EtherscanScheduler(["k1"], rate_per_key=0.01, max_wait_s=0.05)
+        self.call(scheduler, transport, "a")
+
+        t0 = time.monotonic()
+        with self.assertRaises(SchedulerTimeout):
+            self.call(scheduler, transport, "b")
+        self.assertLess(time.monotonic() - t0, 1.0)
+        self.assertEqual(len(transport.queries), 1)
+        self.assertEqual(scheduler.stats()["timeouts"], 1)
+        self.assertEqual(scheduler.stats()["waiting"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
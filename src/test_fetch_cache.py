@@ -0,0 +1,52 @@
+import os
+import unittest
+from unittest.mock import patch
+
+from projects.verdictswarm.src.services.fetch_cache import DEFAULT_TTLS, MemoryFetchCache, TieredFetchCache
+
+
+class TestTieredFetchCache(unittest.TestCase):
+    def tiered(self, **kw):
+        shared = MemoryFetchCache()
+        shared.set("market:0xabc", {"p": 1}, ttl_s=3600, stored_at=1000.0)
+        shared.set("holders:0xabc", {"n": 2}, ttl_s=3600, stored_at=1000.0)
+        return TieredFetchCache(MemoryFetchCache(), shared, **kw), shared
+
+    def local_ttl(self, cache, key):
+        value, stored_at, expires_at = cache.local._data[key]
+        return expires_at - stored_at
+
+    def test_shared_hit_is_copied_with_the_env_ttl(self):
+        with patch.dict(os.environ, {"FETCH_CACHE_TTLS": "market=5"}):
+            cache, _ = self.tiered()
+        with patch("projects.verdictswarm.src.services.fetch_cache.time") as clock:
+            clock.time.return_value = 1001.0
+            self.assertEqual(cache.get("market:0xabc"), ({"p": 1}, 1000.0))
+            self.assertEqual(cache.get("holders:0xabc"), ({"n": 2}, 1000.0))
+
+        self.assertEqual(self.local_ttl(cache, "market:0xabc"), 5.0)
+        self.assertEqual(self.local_ttl(cache, "holders:0xabc"), DEFAULT_TTLS["holders"])
+
+    def test_explicit_ttls_are_used(self):
+        with patch.dict(os.environ, {"FETCH_CACHE_TTLS": ""}):
+            cache, _ = self.tiered(ttls=dict(DEFAULT_TTLS, market=2.0))
+        with patch("projects.verdictswarm.src.services.fetch_cache.time") as clock:
+            clock.time.return_value = 1001.0
+            cache.get("market:0xabc")
+        self.assertEqual(self.local_ttl(cache, "market:0xabc"), 2.0)
+
+    def test_local_copy_expires_before_the_shared_entry(self):
+        with patch.dict(os.environ, {"FETCH_CACHE_TTLS": "market=5"}):
+            cache, shared = self.tiered()
+        with patch("projects.verdictswarm.src.services.fetch_cache.time") as clock:
+            clock.time.return_value = 1001.0
+            cache.get("market:0xabc")
+            shared.set("market:0xabc", {"p": 2}, ttl_s=3600, stored_at=1004.0)
+            clock.time.return_value = 1004.5
+            self.assertEqual(cache.get("market:0xabc")[0], {"p": 1})  # local copy still live
+            clock.time.return_value = 1005.0
+            self.assertEqual(cache.get("market:0xabc")[0], {"p": 2})  # expired; refreshed from shared
+
+
+if __name__ == "__main__":
+    unittest.main()
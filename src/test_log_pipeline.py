@@ -0,0 +1,59 @@
+import json
+import logging
+import queue
+import unittest
+
+from projects.verdictswarm.src.log_pipeline import (
+    JsonFormatter,
+    NonBlockingQueueHandler,
+    TextFormatter,
+    _Sampler,
+    log_context,
+)
+
+
+class TestQueueHandlerPrepare(unittest.TestCase):
+    def setUp(self):
+        self.q = queue.Queue()
+        self.handler = NonBlockingQueueHandler(self.q, _Sampler(0))
+        self.logger = logging.getLogger("vs.test.log_pipeline")
+        self.logger.propagate = False
+        self.logger.setLevel(logging.DEBUG)
+        self.logger.addHandler(self.handler)
+        self.addCleanup(self.logger.removeHandler, self.handler)
+
+    def test_message_is_interpolated_on_the_producer(self):
+        payload = {"state": "queued"}
+        self.logger.info("job %s", payload)
+        payload["state"] = "mutated later"
+
+        record = self.q.get_nowait()
+        self.assertEqual(record.msg, "job {'state': 'queued'}")
+        self.assertIsNone(record.args)
+        self.assertEqual(json.loads(JsonFormatter().format(record))["msg"], "job {'state': 'queued'}")
+
+    def test_context_is_captured_at_emit(self):
+        with log_context(scan_id="abc"):
+            self.logger.info("inside")
+        self.logger.info("outside")
+
+        inside, outside = self.q.get_nowait(), self.q.get_nowait()
+        self.assertEqual(inside.ctx, {"scan_id": "abc"})
+        self.assertTrue(TextFormatter().format(inside).endswith("inside scan_id=abc"))
+        self.assertFalse(outside.ctx)
+
+    def test_exception_is_rendered_before_queueing(self):
+        try:
+            raise ValueError("bad input")
+        except ValueError:
+            self.logger.exception("failed")
+
+        record = self.q.get_nowait()
+        self.assertIsNone(record.exc_info)
+        self.assertIn("ValueError: bad input", record.exc_text)
+        self.assertIn("ValueError: bad input", json.loads(JsonFormatter().format(record))["exc"])
+        self.assertIn("ValueError: bad input", TextFormatter().format(record))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,162 @@
+import asyncio
+import json
+import threading
+import time
+import unittest
+from unittest.mock import patch
+
+try:
+    import fakeredis
+    import fakeredis.aioredis
+except ImportError:  # pragma: no cover
+    fakeredis = None
+
+from projects.verdictswarm.src.services import market_context
+from projects.verdictswarm.src.services.market_context import (
+    FAILURE_BACKOFF_S,
+    REDIS_HISTORY_KEY,
+    REDIS_LATEST_KEY,
+    REDIS_LOCK_KEY,
+    MarketContextService,
+    MarketSnapshot,
+)
+
+
+def _snap(fetched_at=None, mcap=2.0e12, btc=50.0):
+    return MarketSnapshot(
+        fetched_at=time.time() if fetched_at is None else fetched_at,
+        total_mcap_usd=mcap,
+        total_volume_usd=1.0e11,
+        btc_dominance=btc,
+        eth_dominance=15.0,
+        mcap_change_24h_pct=1.0,
+        active_cryptocurrencies=10_000,
+    )
+
+
+class _Upstream:
+    """Stub for the CoinGecko call: counts calls, fails while ``down``."""
+
+    def __init__(self, delay_s=0.0):
+        self.calls = 0
+        self.down = False
+        self.delay_s = delay_s
+        self._lock = threading.Lock()
+
+    def __call__(self):
+        with self._lock:
+            self.calls += 1
+        if self.delay_s:
+            time.sleep(self.delay_s)
+        if self.down:
+            raise OSError("coingecko down")
+        return _snap()
+
+
+class TestSynchronousRefresh(unittest.TestCase):
+    def setUp(self):
+        self.upstream = _Upstream()
+        self.svc = MarketContextService(max_age_s=900, fetcher=self.upstream)
+
+    def test_first_read_fetches_and_later_reads_reuse(self):
+        self.assertIn("BTC dominance: 50.0%", self.svc.context_string())
+        self.svc.context_string()
+        self.assertEqual(self.upstream.calls, 1)
+
+    def test_stale_snapshot_is_not_served(self):
+        self.svc.update(_snap(fetched_at=time.time() - 901))
+        self.assertIsNone(self.svc.context_string(fetch_if_stale=False))
+
+        self.assertIsNotNone(self.svc.context_string())
+        self.assertEqual(self.upstream.calls, 1)
+        self.assertEqual(len(self.svc.history()), 2)
+
+    def test_failure_backs_off(self):
+        self.upstream.down = True
+        with patch.object(market_context.time, "monotonic", return_value=1000.0) as clock:
+            with self.assertLogs(market_context.logger, "WARNING"):
+                self.assertIsNone(self.svc.context_string())
+            self.upstream.down = False
+            clock.return_value = 1000.0 + FAILURE_BACKOFF_S - 1
+            self.assertIsNone(self.svc.context_string())
+            self.assertEqual(self.upstream.calls, 1)
+
+            clock.return_value = 1000.0 + FAILURE_BACKOFF_S
+            self.assertIsNotNone(self.svc.context_string())
+        self.assertEqual((self.upstream.calls, self.svc.errors, self.svc.refreshes), (2, 1, 1))
+
+    def test_concurrent_cold_reads_fetch_once(self):
+        self.upstream.delay_s = 0.05
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(self.svc.context_string())) for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertEqual(self.upstream.calls, 1)
+        self.assertEqual(len(results), 8)
+        self.assertTrue(all(results))
+
+    def test_trend_needs_a_five_minute_window(self):
+        now = time.time()
+        self.svc.update(_snap(now - 120, mcap=2.0e12))
+        self.svc.update(_snap(now, mcap=2.2e12))
+        self.assertNotIn("Trend", self.svc.context_string())
+        self.svc.update(_snap(now + 300, mcap=2.2e12, btc=51.0))
+        with patch.object(market_context.time, "time", return_value=now + 300):
+            text = self.svc.context_string()
+        self.assertIn("market cap +10.00%", text)
+        self.assertIn("BTC dominance +1.00pp", text)
+
+    def test_running_service_does_not_fetch_inline(self):
+        async def scenario():
+            self.upstream.down = True
+            self.svc.start(interval_s=3600)
+            await asyncio.sleep(0.05)  # the first background refresh fails
+            self.assertIsNone(self.svc.context_string())
+            await self.svc.stop()
+
+        with self.assertLogs(market_context.logger, "WARNING"):
+            asyncio.run(scenario())
+        self.assertEqual(self.upstream.calls, 1)  # only the background task hit upstream
+
+
+@unittest.skipUnless(fakeredis is not None, "fakeredis not installed")
+class TestSharedRefresh(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        server = fakeredis.FakeServer()
+        self.redis = [fakeredis.aioredis.FakeRedis(server=server) for _ in range(2)]
+        self.upstream = [_Upstream(), _Upstream()]
+        self.workers = [MarketContextService(history_size=3, fetcher=u) for u in self.upstream]
+
+    async def test_one_worker_polls_and_the_other_reads(self):
+        for worker, client in zip(self.workers, self.redis):
+            await worker._refresh_shared(client, interval_s=120)
+
+        self.assertEqual([u.calls for u in self.upstream], [1, 0])
+        self.assertEqual(self.workers[1].latest(), self.workers[0].latest())
+        self.assertIsNotNone(await self.redis[1].get(REDIS_LATEST_KEY))
+        self.assertGreater(await self.redis[1].ttl(REDIS_LATEST_KEY), 0)
+
+    async def test_cold_worker_seeds_history_in_order(self):
+        now = time.time()
+        for age in (300, 200, 100):  # newest ends up at the head of the list
+            await self.redis[0].lpush(REDIS_HISTORY_KEY, json.dumps(_snap(now - age).to_dict()))
+        await self.redis[0].set(REDIS_LOCK_KEY, b"1")  # another worker holds this interval
+
+        await self.workers[1]._refresh_shared(self.redis[1], interval_s=120)
+
+        self.assertEqual([round(now - s.fetched_at) for s in self.workers[1].history()], [300, 200, 100])
+        self.assertEqual(self.upstream[1].calls, 0)
+
+    async def test_history_is_trimmed_to_its_size(self):
+        for _ in range(5):
+            await self.redis[0].delete(REDIS_LOCK_KEY)
+            await self.workers[0]._refresh_shared(self.redis[0], interval_s=120)
+            await asyncio.sleep(0.001)  # distinct fetched_at
+        self.assertEqual(await self.redis[0].llen(REDIS_HISTORY_KEY), 3)
+        self.assertEqual(len(self.workers[0].history()), 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
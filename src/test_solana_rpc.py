@@ -0,0 +1,185 @@
+import http.client
+import json
+import unittest
+from unittest.mock import patch
+
+from projects.verdictswarm.src.services import solana_rpc
+from projects.verdictswarm.src.services.solana_rpc import SolanaRpcClient, SolanaRpcError
+
+A = "https://rpc-a.example/"
+B = "https://rpc-b.example/?api-key=x"
+
+
+class _Server:
+    """Stubbed RPC hosts: ``handlers[host](payload) -> (status, reply)``."""
+
+    def __init__(self):
+        self.handlers = {}
+        self.requests = []  # (host, payload, connection)
+        self.connections = []
+
+    def connection(self, host, port=None, timeout=None):
+        conn = _Connection(self, host)
+        self.connections.append(conn)
+        return conn
+
+
+class _Response:
+    def __init__(self, status, body, will_close=False):
+        self.status = status
+        self.will_close = will_close
+        self._body = body
+
+    def read(self):
+        return self._body
+
+
+class _Connection:
+    def __init__(self, server, host):
+        self.server = server
+        self.host = host
+        self.stale = False
+        self.closed = False
+        self._pending = None
+
+    def request(self, method, path, body=None, headers=None):
+        if self.stale:
+            raise http.client.RemoteDisconnected("Remote end closed connection without response")
+        payload = json.loads(body)
+        self.server.requests.append((self.host, payload, self))
+        self._pending = self.server.handlers[self.host](payload)
+
+    def getresponse(self):
+        status, reply = self._pending
+        return _Response(status, json.dumps(reply).encode("utf-8"))
+
+    def close(self):
+        self.closed = True
+
+
+def _ok(payload):
+    """Echo ``method`` as the result for every call (single or batch)."""
+    if isinstance(payload, list):
+        return 200, [{"jsonrpc": "2.0", "id": p["id"], "result": p["method"]} for p in reversed(payload)]
+    return 200, {"jsonrpc": "2.0", "id": payload["id"], "result": payload["method"]}
+
+
+class TestSolanaRpcClient(unittest.TestCase):
+    def setUp(self):
+        self.server = _Server()
+        self.server.handlers = {"rpc-a.example": _ok, "rpc-b.example": _ok}
+        p = patch.object(solana_rpc.http.client, "HTTPSConnection", self.server.connection)
+        p.start()
+        self.addCleanup(p.stop)
+        self.client = SolanaRpcClient([A, B], rate_per_endpoint=1000)
+
+    def hosts(self):
+        return [host for host, _, _ in self.server.requests]
+
+    def test_batch_is_one_round_trip_in_request_order(self):
+        calls = [("getAccountInfo", ["m"]), ("getTokenSupply", ["m"]), ("getTokenLargestAccounts", ["m"])]
+        self.assertEqual(self.client.batch(calls), ["getAccountInfo", "getTokenSupply", "getTokenLargestAccounts"])
+        self.assertEqual(len(self.server.requests), 1)
+        self.assertIsInstance(self.server.requests[0][1], list)
+        self.assertEqual(self.client.call("getSlot", []), "getSlot")
+        self.assertIsInstance(self.server.requests[1][1], dict)  # a single call is not wrapped
+
+    def test_rpc_error_entry_yields_none(self):
+        def partial(payload):
+            return 200, [
+                {"id": payload[0]["id"], "result": 1},
+                {"id": payload[1]["id"], "error": {"code": -32602, "message": "invalid param"}},
+            ]
+
+        self.server.handlers["rpc-a.example"] = partial
+        self.assertEqual(self.client.batch([("a", []), ("b", [])]), [1, None])
+
+    def test_rejected_batch_falls_back_to_single_calls(self):
+        def no_arrays(payload):
+            if isinstance(payload, list):
+                return 200, {"jsonrpc": "2.0", "id": None, "error": {"code": -32600, "message": "batch not allowed"}}
+            return _ok(payload)
+
+        self.server.handlers["rpc-a.example"] = no_arrays
+        with self.assertLogs(solana_rpc.logger, "INFO"):
+            self.assertEqual(self.client.batch([("a", []), ("b", []), ("c", [])]), ["a", "b", "c"])
+
+        payloads = [p for _, p, _ in self.server.requests]
+        self.assertIsInstance(payloads[0], list)
+        self.assertEqual([p["method"] for p in payloads[1:]], ["a", "b", "c"])
+        self.assertEqual(set(self.hosts()), {"rpc-a.example"})  # not treated as an endpoint failure
+        self.assertEqual(self.client.fallbacks, 0)
+
+    def test_failing_endpoint_falls_back_and_cools_down(self):
+        self.server.handlers["rpc-a.example"] = lambda payload: (503, {})
+        with self.assertLogs(solana_rpc.logger, "WARNING"):
+            self.assertEqual(self.client.call("getSlot", []), "getSlot")
+        self.assertEqual(self.hosts(), ["rpc-a.example", "rpc-b.example"])
+        self.assertEqual(self.client.fallbacks, 1)
+
+        self.client.call("getSlot", [])  # A is cooling down: B first, A not tried
+        self.assertEqual(self.hosts()[2:], ["rpc-b.example"])
+
+        with patch.object(solana_rpc.time, "monotonic", return_value=solana_rpc.time.monotonic() + solana_rpc.COOLDOWN_S):
+            self.server.handlers["rpc-a.example"] = _ok
+            self.client.call("getSlot", [])
+        self.assertEqual(self.hosts()[3:], ["rpc-a.example"])  # back in order after the cooldown
+        self.assertEqual(self.client.stats()["endpoints"]["rpc-a.example"]["errors"], 1)
+
+    def test_cooling_endpoint_is_a_last_resort(self):
+        self.server.handlers["rpc-a.example"] = lambda payload: (429, {})
+        with self.assertLogs(solana_rpc.logger, "WARNING"):
+            self.client.call("getSlot", [])
+        self.server.handlers["rpc-a.example"] = _ok
+        self.server.handlers["rpc-b.example"] = lambda payload: (500, {})
+        with self.assertLogs(solana_rpc.logger, "WARNING"):
+            self.assertEqual(self.client.call("getSlot", []), "getSlot")
+        self.assertEqual(self.hosts()[-2:], ["rpc-b.example", "rpc-a.example"])
+        self.assertEqual(self.client.stats()["endpoints"]["rpc-a.example"]["rate_limited"], 1)
+
+    def test_all_endpoints_failing_raises(self):
+        for host in self.server.handlers:
+            self.server.handlers[host] = lambda payload: (502, {})
+        with self.assertLogs(solana_rpc.logger, "WARNING"), self.assertRaises(SolanaRpcError):
+            self.client.call("getSlot", [])
+
+    def test_endpoint_filter(self):
+        helius = SolanaRpcClient(["https://mainnet.helius-rpc.com/?api-key=k", A], rate_per_endpoint=1000)
+        self.server.handlers["mainnet.helius-rpc.com"] = _ok
+        helius.call("getAsset", {"id": "m"}, endpoint="helius")
+        self.assertEqual(self.hosts(), ["mainnet.helius-rpc.com"])
+        with self.assertRaises(SolanaRpcError):
+            helius.call("getAsset", {"id": "m"}, endpoint="nope")
+
+    def test_connections_are_reused(self):
+        for _ in range(3):
+            self.client.call("getSlot", [])
+        self.assertEqual(len(self.server.connections), 1)
+        self.assertEqual(self.client.stats()["endpoints"]["rpc-a.example"]["idle"], 1)
+
+    def test_stale_pooled_connection_is_replaced_and_retried(self):
+        self.client.call("getSlot", [])
+        pooled = self.server.connections[0]
+        pooled.stale = True  # the server closed it while idle
+
+        self.assertEqual(self.client.call("getBalance", ["w"]), "getBalance")
+        self.assertTrue(pooled.closed)
+        self.assertEqual(len(self.server.connections), 2)
+        self.assertIs(self.server.requests[-1][2], self.server.connections[1])
+        self.assertEqual(self.client.fallbacks, 0)
+        self.assertEqual(self.client.stats()["endpoints"]["rpc-a.example"]["errors"], 0)
+
+    def test_fresh_connection_failure_is_not_retried(self):
+        def refused(host, port=None, timeout=None):
+            conn = self.server.connection(host, port, timeout)
+            conn.stale = host == "rpc-a.example"
+            return conn
+
+        with patch.object(solana_rpc.http.client, "HTTPSConnection", refused):
+            with self.assertLogs(solana_rpc.logger, "WARNING"):
+                self.assertEqual(self.client.call("getSlot", []), "getSlot")
+        self.assertEqual([c.host for c in self.server.connections], ["rpc-a.example", "rpc-b.example"])
+
+
+if __name__ == "__main__":
+    unittest.main()
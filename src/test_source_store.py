@@ -0,0 +1,253 @@
+import asyncio
+import unittest
+from unittest.mock import patch
+
+try:
+    import fakeredis
+except ImportError:  # pragma: no cover
+    fakeredis = None
+
+from projects.verdictswarm.src.agents.scam_bot import ScamBot, ScamSignal
+from projects.verdictswarm.src.agents.security_bot import SecurityBot
+from projects.verdictswarm.src.data_fetcher import TokenData
+from projects.verdictswarm.src.services.source_store import (
+    MemorySourceStore,
+    RedisSourceStore,
+    normalize_source,
+    source_hash,
+)
+
+TEMPLATE = """// SPDX-License-Identifier: MIT
+pragma solidity ^0.8.0;
+
+/* Standard meme token */
+contract Token {
+    uint256 public fee = 5;
+    function mint(address to, uint256 amount) public { _mint(to, amount); }
+}
+"""
+
+# Same code: other comments, indentation, line endings and blank lines.
+COSMETIC = (
+    "// SPDX-License-Identifier: UNLICENSED\r\n"
+    "pragma solidity ^0.8.0;\r\n"
+    "/**\r\n * @title PEPE2 - to the moon\r\n */\r\n"
+    "contract Token {\r\n"
+    "\tuint256 public fee = 5;  // 5%\r\n\r\n\r\n"
+    "\tfunction mint(address to, uint256 amount) public {\r\n\t\t_mint(to, amount);\r\n\t}\r\n"
+    "}\r\n"
+)
+
+# Different code: one constant, one modifier.
+SEMANTIC = [
+    TEMPLATE.replace("fee = 5", "fee = 6"),
+    TEMPLATE.replace("public {", "public onlyOwner {"),
+]
+
+
+class TestSourceHash(unittest.TestCase):
+    def test_normalize_drops_comments_and_whitespace(self):
+        self.assertEqual(
+            normalize_source("a  /* x\n y */ b // c\n\n\tc"),
+            "a b c",
+        )
+        self.assertEqual(normalize_source(""), "")
+        self.assertEqual(normalize_source(None), "")
+
+    def test_identical_sources_hash_alike(self):
+        self.assertEqual(source_hash(TEMPLATE), source_hash(str(TEMPLATE)))
+        self.assertEqual(len(source_hash(TEMPLATE)), 64)
+
+    def test_cosmetic_differences_hash_alike(self):
+        self.assertEqual(normalize_source(COSMETIC), normalize_source(TEMPLATE))
+        self.assertEqual(source_hash(COSMETIC), source_hash(TEMPLATE))
+
+    def test_semantic_differences_hash_apart(self):
+        hashes = {source_hash(s) for s in [TEMPLATE, *SEMANTIC]}
+        self.assertEqual(len(hashes), 3)
+
+    def test_hash_is_stable(self):
+        # Stored keys outlive processes: the hash must not depend on the run.
+        expected = "7ff3da8117bf263b90ac8fb9058d15c16b3ee70c02b7f7fe99f4df755b4a75c6"
+        self.assertEqual(source_hash("contract A {}"), expected)
+        self.assertEqual(source_hash("contract  A {}  // trailing"), expected)
+
+
+class _StoreCases:
+    """Shared cases; subclasses set ``self.store``."""
+
+    def test_clones_share_one_blob(self):
+        h1 = self.store.put("8453", "0xAAA", TEMPLATE)
+        h2 = self.store.put("8453", "0xBBB", COSMETIC)
+        self.assertEqual(h1, h2)
+        self.assertEqual(self.store.get_source(h1), TEMPLATE)  # first copy is kept
+        self.assertEqual(self.store.hash_for("8453", "0xaaa"), h1)  # EVM case-insensitive
+        self.assertEqual(self.store.hash_for("8453", "0xbbb"), h1)
+        self.assertIsNone(self.store.hash_for("1", "0xaaa"))  # per chain
+
+    def test_semantic_change_gets_its_own_entry(self):
+        h1 = self.store.put("8453", "0xAAA", TEMPLATE)
+        h2 = self.store.put("8453", "0xCCC", SEMANTIC[0])
+        self.assertNotEqual(h1, h2)
+        self.assertEqual(self.store.get_source(h2), SEMANTIC[0])
+
+    def test_analysis_reused_per_hash_and_kind(self):
+        h = self.store.put("8453", "0xAAA", TEMPLATE)
+        self.assertIsNone(self.store.get_analysis("scam_contract:1.0.0", h))
+        self.store.put_analysis("scam_contract:1.0.0", h, {"signals": ["honeypot"]})
+
+        clone = self.store.put("8453", "0xBBB", COSMETIC)
+        self.assertEqual(self.store.get_analysis("scam_contract:1.0.0", clone), {"signals": ["honeypot"]})
+        self.assertIsNone(self.store.get_analysis("scam_contract:2.0.0", clone))
+        self.assertIsNone(self.store.get_analysis("scam_contract:1.0.0", source_hash(SEMANTIC[1])))
+
+
+class TestMemorySourceStore(_StoreCases, unittest.TestCase):
+    def setUp(self):
+        self.store = MemorySourceStore()
+
+    def test_analysis_ttl(self):
+        h = self.store.put("8453", "0xAAA", TEMPLATE)
+        with patch("projects.verdictswarm.src.services.source_store.time") as clock:
+            clock.time.return_value = 1000.0
+            self.store.put_analysis("security:x", h, {"score": 3}, ttl_s=60)
+            clock.time.return_value = 1059.0
+            self.assertEqual(self.store.get_analysis("security:x", h), {"score": 3})
+            clock.time.return_value = 1060.0
+            self.assertIsNone(self.store.get_analysis("security:x", h))
+
+    def test_lru_bound(self):
+        store = MemorySourceStore(max_entries=2)
+        h = store.put("8453", "0xAAA", TEMPLATE)  # blob + address
+        store.put_analysis("k", h, 1)
+        self.assertIsNone(store.get_source(h))
+        self.assertEqual(store.get_analysis("k", h), 1)
+
+
+@unittest.skipUnless(fakeredis is not None, "fakeredis not installed")
+class TestRedisSourceStore(_StoreCases, unittest.TestCase):
+    def setUp(self):
+        self.r = fakeredis.FakeRedis()
+        self.store = RedisSourceStore(self.r)
+
+    def test_keys(self):
+        h = self.store.put("8453", "0xAAA", TEMPLATE)
+        self.store.put_analysis("security:x", h, {"score": 3}, ttl_s=60)
+        self.assertEqual(self.r.get("src:addr:8453:0xaaa").decode(), h)
+        self.assertIsNotNone(self.r.get(f"src:blob:{h}"))
+        self.assertEqual(self.r.ttl(f"src:blob:{h}"), -1)
+        self.assertTrue(0 < self.r.ttl(f"src:analysis:security:x:{h}") <= 60)
+
+    def test_backend_errors_are_swallowed(self):
+        class _Down:
+            def get(self, *a, **kw):
+                raise ConnectionError("down")
+
+            set = get
+
+        store = RedisSourceStore(_Down())
+        h = store.put("8453", "0xAAA", TEMPLATE)
+        self.assertEqual(h, source_hash(TEMPLATE))
+        self.assertIsNone(store.get_source(h))
+        self.assertIsNone(store.hash_for("8453", "0xAAA"))
+        store.put_analysis("k", h, {"x": 1})
+        self.assertIsNone(store.get_analysis("k", h))
+
+
+class TestScamBotReuse(unittest.TestCase):
+    def setUp(self):
+        self.store = MemorySourceStore()
+        p = patch("projects.verdictswarm.src.agents.scam_bot.get_source_store", return_value=self.store)
+        p.start()
+        self.addCleanup(p.stop)
+        self.runs = 0
+        original = ScamBot._analyze_contract
+
+        async def counting(bot, token_data):
+            self.runs += 1
+            return await original(bot, token_data)
+
+        p = patch.object(ScamBot, "_analyze_contract", counting)
+        p.start()
+        self.addCleanup(p.stop)
+
+    def analyze(self, source, address):
+        return asyncio.run(ScamBot().analyze({"contract_source": source, "contract_address": address}))
+
+    def test_clone_reuses_contract_analysis(self):
+        first = self.analyze(TEMPLATE, "0xAAA")
+        clone = self.analyze(COSMETIC, "0xBBB")
+
+        self.assertEqual(self.runs, 1)
+        self.assertIn(ScamSignal.HIDDEN_MINT, first.signals_detected)
+        self.assertEqual(clone.signals_detected, first.signals_detected)
+        self.assertEqual(clone.signal_details["contract"], first.signal_details["contract"])
+        self.assertEqual(clone.scam_score, first.scam_score)
+
+    def test_changed_code_is_analyzed_again(self):
+        first = self.analyze(TEMPLATE, "0xAAA")
+        guarded = self.analyze(SEMANTIC[1], "0xCCC")
+
+        self.assertEqual(self.runs, 2)
+        self.assertIn(ScamSignal.HIDDEN_MINT, first.signals_detected)
+        self.assertNotIn(ScamSignal.HIDDEN_MINT, guarded.signals_detected)
+
+
+class _FakeAI:
+    def __init__(self):
+        self.prompts = []
+
+    def has_provider(self, provider):
+        return True
+
+    def chat_json(self, *, provider, model, system, user, temperature, max_output_tokens):
+        self.prompts.append(user)
+        if "Judge the code only" in user:
+            return {"score": 4.0, "summary": "mint is unrestricted", "key_risks": ["open mint"], "critical_flags": []}
+        return {"score": 8.0 if "Liquidity (USD): 100,000,000.00" in user else 2.0, "summary": "per token"}
+
+
+def _token(address, name, liquidity, source=TEMPLATE):
+    return TokenData(
+        contract_address=address, name=name, symbol=name, contract_verified=True, tx_count_24h=0,
+        creator_address="0xdev", contract_age_days=1, price_usd=1.0, price_change_24h=0.0,
+        volume_24h=0.0, liquidity_usd=liquidity, mcap=0.0, fdv=0.0, fetch_timestamp=0,
+        data_sources=[], source_code=source, chain="base",
+    )
+
+
+class TestSecurityBotReuse(unittest.TestCase):
+    def setUp(self):
+        self.store = MemorySourceStore()
+        p = patch("projects.verdictswarm.src.agents.security_bot.get_source_store", return_value=self.store)
+        p.start()
+        self.addCleanup(p.stop)
+        self.ai = _FakeAI()
+
+    def assess(self, token):
+        bot = SecurityBot(ai_client=self.ai, provider_model=("gemini", "flash"))
+        return bot._ai_security_assessment(token)
+
+    def test_code_review_is_reused_but_assessment_is_per_token(self):
+        big = self.assess(_token("0xAAA", "BIG", 100_000_000.0))
+        rug = self.assess(_token("0xBBB", "RUG", 500.0))
+
+        code_prompts = [u for u in self.ai.prompts if "Judge the code only" in u]
+        token_prompts = [u for u in self.ai.prompts if "Judge the code only" not in u]
+        self.assertEqual(len(code_prompts), 1)  # the source went to the LLM once
+        self.assertEqual(len(token_prompts), 2)
+        self.assertNotIn("BIG", code_prompts[0])
+        self.assertIn("mint is unrestricted", token_prompts[1])
+        self.assertIn("RUG", token_prompts[1])
+        self.assertNotIn("BIG", token_prompts[1])
+        self.assertNotIn("contract Token", token_prompts[1])
+        self.assertEqual((big["score"], rug["score"]), (8.0, 2.0))
+
+    def test_review_is_keyed_by_the_text_sent(self):
+        self.assess(_token("0xAAA", "A", 1.0))
+        self.assess(_token("0xBBB", "B", 1.0, source=COSMETIC))  # same hash, different text
+        self.assertEqual(len([u for u in self.ai.prompts if "Judge the code only" in u]), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
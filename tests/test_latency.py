@@ -0,0 +1,161 @@
+import asyncio
+import unittest
+from unittest.mock import patch
+from urllib.error import URLError
+
+from api.services import latency
+from api.services.latency import (
+    SUB_BUCKETS,
+    LatencyHistogram,
+    LatencyRecorder,
+    bucket_index,
+    bucket_upper_ms,
+    llm_deadline_s,
+    load_latency_summary,
+)
+from src.agents.ai_client import AIClient
+
+
+class _FakeRedis:
+    def __init__(self, hashes: dict):
+        self.hashes = hashes
+
+    async def hgetall(self, key):
+        return self.hashes.get(key, {})
+
+
+class TestBuckets(unittest.TestCase):
+    def test_small_values_get_one_bucket_each(self):
+        self.assertEqual(bucket_index(0), 0)
+        self.assertEqual(bucket_index(-5), 0)
+        self.assertEqual(bucket_index(0.9), 0)
+        for v in range(SUB_BUCKETS):
+            self.assertEqual(bucket_index(v), v)
+            self.assertEqual(bucket_upper_ms(v), v)
+
+    def test_powers_of_two_start_a_bucket(self):
+        self.assertEqual(bucket_index(8), 8)
+        self.assertEqual(bucket_index(16), 16)
+        self.assertEqual(bucket_upper_ms(16), 17)  # width 2 from 16 ms on
+        for exp in range(3, 40):
+            v = 1 << exp
+            idx = bucket_index(v)
+            self.assertEqual(bucket_upper_ms(idx - 1), v - 1)
+            self.assertEqual(bucket_index(v - 1), idx - 1)
+
+    def test_upper_bound_round_trips(self):
+        values = list(range(0, 5000)) + [(1 << 31) - 1, 1 << 31, 10 ** 12]
+        for v in values:
+            idx = bucket_index(v)
+            self.assertGreaterEqual(bucket_upper_ms(idx), v)
+            if idx:
+                self.assertLess(bucket_upper_ms(idx - 1), v)
+            # ≤ 12.5% relative error above the linear range
+            if v >= SUB_BUCKETS:
+                self.assertLessEqual(bucket_upper_ms(idx) - v, v / SUB_BUCKETS)
+
+    def test_largest_values_stay_monotonic(self):
+        top = bucket_index(10 ** 12)
+        self.assertEqual(bucket_index(bucket_upper_ms(top)), top)
+        self.assertEqual(bucket_index(bucket_upper_ms(top) + 1), top + 1)
+
+
+class TestHistogram(unittest.TestCase):
+    def test_known_distribution(self):
+        hist = LatencyHistogram()
+        for v in range(1, 101):
+            hist.record(v)
+        self.assertEqual(hist.total, 100)
+        self.assertEqual(hist.percentile(50), 51)  # 50 ms → bucket [48, 51]
+        self.assertEqual(hist.percentile(99), 103)  # 100 ms → bucket [96, 103]
+        self.assertEqual(hist.percentile(100), 103)
+        self.assertEqual(hist.max_ms, 100.0)
+
+    def test_empty_and_single(self):
+        self.assertIsNone(LatencyHistogram().percentile(50))
+        hist = LatencyHistogram()
+        hist.record(0)
+        self.assertEqual(hist.summary(), {"count": 1, "p50": 0, "p95": 0, "p99": 0})
+
+    def test_merge_adds_counts(self):
+        a, b = LatencyHistogram(), LatencyHistogram()
+        for v in range(1, 51):
+            a.record(v)
+        for v in range(51, 101):
+            b.record(v)
+        whole = LatencyHistogram()
+        for v in range(1, 101):
+            whole.record(v)
+        merged = a.merge(b)
+        self.assertEqual(merged.counts, whole.counts)
+        self.assertEqual(merged.total, 100)
+        self.assertEqual(merged.max_ms, 100.0)
+        self.assertEqual(merged.summary(), whole.summary())
+
+    def test_fleet_summary_merges_workers(self):
+        # Two workers' HINCRBYs land in the same hash fields.
+        whole = LatencyHistogram()
+        for v in list(range(1, 101)) + list(range(1, 101)):
+            whole.record(v)
+        fields = {f"stage:total|{idx}".encode(): str(n).encode() for idx, n in whole.counts.items()}
+        fields[b"garbage"] = b"3"
+        r = _FakeRedis({"metrics:2026-01-01:latency": fields})
+
+        out = asyncio.run(load_latency_summary(r, "2026-01-01"))
+
+        self.assertEqual(out["date"], "2026-01-01")
+        self.assertEqual(out["series"], {"stage:total": whole.summary()})
+        self.assertEqual(out["series"]["stage:total"]["count"], 200)
+
+
+class TestLlmDeadline(unittest.TestCase):
+    def setUp(self):
+        p = patch.object(latency, "_recorder", LatencyRecorder())
+        p.start()
+        self.addCleanup(p.stop)
+
+    def test_deadline_follows_the_per_call_series_only(self):
+        rec = latency.get_latency_recorder()
+        for _ in range(50):
+            rec.record("llm:gemini/flash", 8000)  # one round trip
+            rec.record("agent:TokenomicsBot:gemini/flash", 60000)  # several calls in one analyze
+        self.assertAlmostEqual(llm_deadline_s("gemini", "flash", 20.0), 1.5 * bucket_upper_ms(bucket_index(8000)) / 1000)
+        self.assertEqual(llm_deadline_s("gemini", "pro", 20.0), 20.0)  # too few samples yet
+
+    def test_client_asks_the_policy_before_each_round_trip(self):
+        asked, timeouts = [], []
+
+        def policy(provider, model, default_s):
+            asked.append((provider, model, default_s))
+            return 7.5
+
+        def fake_urlopen(req, timeout=0):
+            timeouts.append(timeout)
+            raise URLError("offline")
+
+        client = AIClient(openai_api_key="k", timeout_s=60.0, deadline_s=policy)
+        with patch("src.agents.ai_client.urlopen", side_effect=fake_urlopen):
+            with self.assertRaises(RuntimeError):
+                client.chat_text(provider="openai", model="gpt-x", system="s", user="u")
+            client.timeout_s = 30.0
+            with self.assertRaises(RuntimeError):
+                client.chat_text(provider="openai", system="s", user="u")
+
+        self.assertEqual(asked, [("openai", "gpt-x", 60.0), ("openai", "default", 30.0)])
+        self.assertEqual(timeouts, [7.5, 7.5])
+
+    def test_client_without_policy_uses_its_timeout(self):
+        timeouts = []
+
+        def fake_urlopen(req, timeout=0):
+            timeouts.append(timeout)
+            raise URLError("offline")
+
+        with patch("src.agents.ai_client.urlopen", side_effect=fake_urlopen):
+            with self.assertRaises(RuntimeError):
+                AIClient(openai_api_key="k", timeout_s=12.0).chat_text(provider="openai", system="s", user="u")
+        self.assertEqual(timeouts, [12.0])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,89 @@
+import unittest
+from unittest.mock import patch
+
+from api.services.local_limiter import LocalPreFilter
+from api.services.rate_limiter import QuotaDecision
+
+
+class _Clock:
+    def __init__(self, now: float = 1000.0):
+        self.now = now
+
+    def monotonic(self) -> float:
+        return self.now
+
+
+def _rejected(reason: str, retry_after_s: int) -> QuotaDecision:
+    return QuotaDecision(allowed=False, used=5, limit=5, remaining=0, retry_after_s=retry_after_s, reason=reason)
+
+
+_ALLOWED = QuotaDecision(allowed=True, used=1, limit=5, remaining=4, retry_after_s=0, reason="ok")
+
+
+class TestLocalPreFilter(unittest.TestCase):
+    def setUp(self):
+        self.clock = _Clock()
+        p = patch("api.services.local_limiter.time", self.clock)
+        p.start()
+        self.addCleanup(p.stop)
+
+    def test_burst_refills(self):
+        pf = LocalPreFilter(burst_capacity=2, refill_per_s=0.5)
+        self.assertIsNone(pf.check_burst("ip:1"))
+        self.assertIsNone(pf.check_burst("ip:1"))
+        self.assertEqual(pf.check_burst("ip:1"), 2)  # 1 token at 0.5/s
+        self.assertIsNone(pf.check_burst("ip:2"))  # buckets are per identifier
+
+        self.clock.now += 1.0
+        self.assertEqual(pf.check_burst("ip:1"), 1)
+        self.clock.now += 1.0
+        self.assertIsNone(pf.check_burst("ip:1"))
+
+    def test_disabled_burst(self):
+        pf = LocalPreFilter(burst_capacity=0, refill_per_s=1.0)
+        for _ in range(100):
+            self.assertIsNone(pf.check_burst("ip:1"))
+
+    def test_lru_eviction(self):
+        pf = LocalPreFilter(burst_capacity=1, refill_per_s=0.001, max_identifiers=2)
+        pf.check_burst("a")
+        pf.check_burst("b")
+        self.assertIsNotNone(pf.check_burst("a"))  # "a" is now most recent
+        pf.check_burst("c")  # evicts "b"
+        self.assertIsNone(pf.check_burst("b"))  # fresh bucket again
+        self.assertEqual(len(pf._buckets), 2)
+
+        for ident in ("x", "y", "z"):
+            pf.record(ident, _rejected("daily", 60))
+        self.assertIsNone(pf.blocked("x"))
+        self.assertIsNotNone(pf.blocked("z"))
+
+    def test_record_holds_min_of_retry_after_and_sync_interval(self):
+        pf = LocalPreFilter(burst_capacity=10, refill_per_s=1.0, sync_interval_s=30.0)
+        pf.record("burst", _rejected("burst", 2))
+        pf.record("daily", _rejected("daily", 3600))
+
+        self.assertEqual(pf.blocked("burst"), (2, "burst"))
+        self.assertEqual(pf.blocked("daily"), (30, "daily"))
+
+        self.clock.now += 2.0
+        self.assertIsNone(pf.blocked("burst"))
+        self.assertEqual(pf.blocked("daily"), (28, "daily"))
+        self.clock.now += 28.0
+        self.assertIsNone(pf.blocked("daily"))  # next request re-checks Redis
+
+    def test_allowed_verdict_clears_block(self):
+        pf = LocalPreFilter(burst_capacity=10, refill_per_s=1.0)
+        pf.record("ip:1", _rejected("daily", 60))
+        pf.record("ip:1", _ALLOWED)
+        self.assertIsNone(pf.blocked("ip:1"))
+
+    def test_only_burst_and_daily_rejections_are_recorded(self):
+        pf = LocalPreFilter(burst_capacity=10, refill_per_s=1.0)
+        pf.record("ip:1", _rejected("ok", 60))
+        pf.record("ip:1", _rejected("other", 60))
+        self.assertIsNone(pf.blocked("ip:1"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,43 @@
+import unittest
+
+from api.services import prometheus
+from api.services.prometheus import Counter, Gauge, Registry
+
+
+class TestCallbackCounters(unittest.TestCase):
+    def test_callback_counter_renders_total_samples(self):
+        totals = {("market", "hit"): 3.0}
+        reg = Registry()
+        reg.register(Counter("vs_lookups", "Lookups", ("source", "result"), callback=lambda: totals))
+
+        out = reg.render()
+
+        self.assertIn("# TYPE vs_lookups counter", out)
+        self.assertIn('vs_lookups_total{source="market",result="hit"} 3', out)
+        totals[("market", "hit")] = 5.0  # sampled at scrape time
+        self.assertIn('vs_lookups_total{source="market",result="hit"} 5', reg.render())
+
+    def test_failing_callback_renders_no_samples(self):
+        def broken():
+            raise RuntimeError("boom")
+
+        reg = Registry()
+        reg.register(Counter("vs_broken", "Broken", callback=broken))
+        self.assertEqual(reg.render(), "# TYPE vs_broken counter\n# HELP vs_broken Broken\n# EOF\n")
+
+    def test_client_totals_are_counters(self):
+        for metric in (prometheus.FETCH_CACHE, prometheus.ETHERSCAN, prometheus.SOLANA_RPC):
+            self.assertIsInstance(metric, Counter, metric.name)
+            self.assertFalse(metric.name.endswith("_total"), metric.name)
+        for metric in (prometheus.ETHERSCAN_WAITING, prometheus.SOLANA_RPC_IDLE):
+            self.assertIsInstance(metric, Gauge, metric.name)
+
+        out = prometheus.render()
+        self.assertIn("# TYPE vs_etherscan_calls counter", out)
+        self.assertIn('vs_etherscan_calls_total{key="all",state="coalesced"}', out)
+        self.assertNotIn('state="waiting"', out)
+        self.assertIn("vs_etherscan_waiting ", out)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,113 @@
+import asyncio
+import unittest
+from unittest.mock import patch
+
+try:
+    import fakeredis
+except ImportError:  # pragma: no cover
+    fakeredis = None
+
+from api.services.rate_limiter import RateLimitExceeded, RedisRateLimiter
+
+
+class _Clock:
+    def __init__(self, now: float = 1_700_000_000.0):
+        self.now = now
+
+    def time(self) -> float:
+        return self.now
+
+
+@unittest.skipUnless(fakeredis is not None, "fakeredis (with lupa) not installed")
+class TestQuotaScript(unittest.TestCase):
+    def setUp(self):
+        self.r = fakeredis.FakeAsyncRedis()
+        self.clock = _Clock()
+        p = patch("api.services.rate_limiter.time", self.clock)
+        p.start()
+        self.addCleanup(p.stop)
+
+    def limiter(self, **kw) -> RedisRateLimiter:
+        kw.setdefault("burst_capacity", 3)
+        kw.setdefault("burst_refill_per_s", 1.0)
+        return RedisRateLimiter(self.r, tier_limits={"agent": 1000}, **kw)
+
+    def acquire(self, rl: RedisRateLimiter, **kw):
+        kw.setdefault("limit", 100)
+        kw.setdefault("ttl_s", 3600)
+        kw.setdefault("burst_key", "b")
+        return asyncio.run(rl.acquire("d", **kw))
+
+    def test_burst_exhausts_then_refills(self):
+        rl = self.limiter()
+        for i in range(3):
+            self.assertTrue(self.acquire(rl).allowed, i)
+        d = self.acquire(rl)
+        self.assertFalse(d.allowed)
+        self.assertEqual(d.reason, "burst")
+        self.assertEqual(d.retry_after_s, 1)
+        self.assertEqual(d.used, 3)  # rejected call not charged
+
+        self.clock.now += 1.0
+        d = self.acquire(rl)
+        self.assertTrue(d.allowed)
+        self.assertEqual(d.used, 4)
+        self.assertFalse(self.acquire(rl).allowed)
+
+    def test_cost_above_capacity_takes_one_burst_token(self):
+        rl = self.limiter()
+        d = self.acquire(rl, cost=50)
+        self.assertTrue(d.allowed)
+        self.assertEqual(d.used, 50)
+        self.assertEqual(d.remaining, 50)
+        # Two tokens left for two more requests of any cost.
+        self.assertTrue(self.acquire(rl, cost=40).allowed)
+        self.assertTrue(self.acquire(rl, cost=1).allowed)
+        self.assertEqual(self.acquire(rl, cost=1).reason, "burst")
+
+    def test_burst_cost_is_clamped_to_capacity(self):
+        rl = self.limiter()
+        d = self.acquire(rl, cost=20, burst_cost=20)
+        self.assertTrue(d.allowed)  # full bucket satisfies any charge
+        d = self.acquire(rl, cost=20, burst_cost=20)
+        self.assertFalse(d.allowed)
+        self.assertEqual(d.retry_after_s, 3)  # refill to capacity, not to 20
+
+        self.clock.now += 3.0
+        self.assertTrue(self.acquire(rl, cost=20, burst_cost=20).allowed)
+
+    def test_daily_limit_rejects_without_charging(self):
+        rl = self.limiter(burst_capacity=0)
+        self.assertTrue(self.acquire(rl, cost=2, limit=3).allowed)
+        d = self.acquire(rl, cost=2, limit=3)
+        self.assertFalse(d.allowed)
+        self.assertEqual(d.reason, "daily")
+        self.assertEqual(d.used, 2)
+        self.assertTrue(self.acquire(rl, cost=1, limit=3).allowed)
+
+    def test_admin_unlimited_is_still_counted(self):
+        rl = self.limiter()
+        for _ in range(10):
+            d = self.acquire(rl, limit=0, burst_key=None)
+            self.assertTrue(d.allowed)
+        self.assertEqual(d.used, 10)
+        self.assertEqual(d.remaining, 0)
+        self.assertEqual(int(asyncio.run(self.r.get("d"))), 10)
+
+    def test_consume_charges_quota_in_full_and_burst_once(self):
+        rl = RedisRateLimiter(self.r, tier_limits={"agent": 200}, burst_capacity=2, burst_refill_per_s=1.0)
+
+        async def run():
+            u = await rl.consume(api_key_id="k", tier="agent", cost=100)
+            self.assertEqual((u.calls_today, u.calls_remaining), (100, 100))
+            u = await rl.consume(api_key_id="k", tier="agent", cost=60)
+            self.assertEqual(u.calls_today, 160)
+            with self.assertRaises(RateLimitExceeded) as ctx:
+                await rl.consume(api_key_id="k", tier="agent", cost=1)
+            self.assertEqual(ctx.exception.retry_after_s, 1)
+
+        asyncio.run(run())
+
+
+if __name__ == "__main__":
+    unittest.main()
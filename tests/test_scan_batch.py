@@ -0,0 +1,140 @@
+import json
+import unittest
+
+try:
+    import fakeredis
+except ImportError:  # pragma: no cover
+    fakeredis = None
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from api.deps import get_cache, get_rate_limiter, get_scanner
+from api.middleware.auth import ApiKeyInfo, require_api_key
+from api.routers import scan
+from api.services.cache import Cache
+from api.services.rate_limiter import RateLimitExceeded, RedisRateLimiter
+from src.services.chain_resolver import is_auto_chain
+
+
+class _FakeScanner:
+    def __init__(self, fail=()):
+        self.fail = set(fail)
+        self.scanned = []
+        self.prefetched = None
+
+    async def prefetch_market(self, addresses):
+        self.prefetched = list(addresses)
+
+    async def resolve_chain(self, address, chain):
+        return "base" if is_auto_chain(chain) else chain
+
+    async def scan(self, *, address, chain, depth, tier):
+        self.scanned.append(address)
+        if address in self.fail:
+            raise RuntimeError(f"upstream down for {address}")
+        return {"address": address, "chain": chain, "score": 5.0}
+
+
+@unittest.skipUnless(fakeredis is not None, "fakeredis (with lupa) not installed")
+class TestBatchScan(unittest.TestCase):
+    def setUp(self):
+        self.r = fakeredis.FakeAsyncRedis()
+        self.scanner = _FakeScanner()
+        self.limiter = RedisRateLimiter(
+            self.r, tier_limits={"agent": 1000}, burst_capacity=10, burst_refill_per_s=0.01
+        )
+        app = FastAPI()
+        app.include_router(scan.router)
+        app.dependency_overrides[require_api_key] = lambda: ApiKeyInfo(
+            api_key="k", api_key_id="key1", tier="agent"
+        )
+        app.dependency_overrides[get_cache] = lambda: Cache(self.r)
+        app.dependency_overrides[get_rate_limiter] = lambda: self.limiter
+        app.dependency_overrides[get_scanner] = lambda: self.scanner
+        self.client = TestClient(app)
+
+    def post(self, body, **kw):
+        body.setdefault("chain", "base")
+        return self.client.post("/v1/scan/batch", json=body, **kw)
+
+    def test_duplicates_are_scanned_and_charged_once(self):
+        resp = self.post({"addresses": ["0xAbC", "0xabc", " 0xABC ", "0xdef"]})
+
+        self.assertEqual(resp.status_code, 200)
+        body = resp.json()
+        self.assertEqual(len(body["data"]), 4)  # one result per requested address
+        self.assertEqual(body["data"][0], body["data"][1])
+        self.assertEqual(body["data"][0]["address"], "0xAbC")
+        self.assertEqual(sorted(self.scanner.scanned), ["0xAbC", "0xdef"])
+        self.assertEqual(body["usage"]["calls_today"], 2)
+
+    def test_failing_address_does_not_fail_the_batch(self):
+        self.scanner.fail = {"0x2"}
+        resp = self.post({"addresses": ["0x1", "0x2", "0x3"]})
+
+        self.assertEqual(resp.status_code, 200)
+        data = resp.json()["data"]
+        self.assertEqual(data[1]["address"], "0x2")
+        self.assertEqual(data[1]["error"]["code"], "SCAN_FAILED")
+        self.assertIn("upstream down", data[1]["error"]["message"])
+        self.assertEqual([d["score"] for d in (data[0], data[2])], [5.0, 5.0])
+        self.assertFalse(data[0]["cached"])
+
+    def test_cached_results_skip_the_scanner(self):
+        self.post({"addresses": ["0x1"]})
+        resp = self.post({"addresses": ["0x1", "0x2"]})
+
+        data = resp.json()["data"]
+        self.assertTrue(data[0]["cached"])
+        self.assertFalse(data[1]["cached"])
+        self.assertEqual(self.scanner.scanned, ["0x1", "0x2"])
+        self.assertEqual(self.scanner.prefetched, ["0x2"])  # misses only
+
+    def test_ndjson_streams_items_then_summary(self):
+        self.scanner.fail = {"0x2"}
+        for kw in ({"body": {"stream": True}}, {"headers": {"Accept": "application/x-ndjson"}}):
+            self.r = fakeredis.FakeAsyncRedis()  # fresh cache and quota
+            self.limiter.r = self.r
+            body = dict({"addresses": ["0x1", "0x2", "0x1"]}, **kw.get("body", {}))
+            resp = self.post(body, headers=kw.get("headers"))
+
+            self.assertEqual(resp.status_code, 200)
+            self.assertTrue(resp.headers["content-type"].startswith("application/x-ndjson"))
+            lines = [json.loads(line) for line in resp.text.splitlines()]
+            self.assertEqual(len(lines), 3)  # two unique results + summary
+            self.assertEqual({line.get("address") for line in lines[:2]}, {"0x1", "0x2"})
+            summary = lines[-1]["summary"]
+            self.assertEqual((summary["requested"], summary["unique"], summary["errors"]), (3, 2, 1))
+            self.assertEqual(summary["usage"]["calls_today"], 2)
+
+    def test_json_response_by_default(self):
+        resp = self.post({"addresses": ["0x1"]})
+        self.assertTrue(resp.headers["content-type"].startswith("application/json"))
+        self.assertTrue(resp.json()["success"])
+
+    def test_auto_chain_is_resolved_before_caching(self):
+        resp = self.post({"addresses": ["0x1", "0x2"], "chain": "auto"})
+
+        self.assertEqual([d["chain"] for d in resp.json()["data"]], ["base", "base"])
+        self.assertEqual(self.scanner.prefetched, ["0x1", "0x2"])
+        # Stored under the detected chain: an explicit request hits the cache.
+        data = self.post({"addresses": ["0x1"], "chain": "base"}).json()["data"]
+        self.assertTrue(data[0]["cached"])
+
+    def test_batch_larger_than_burst_capacity_is_accepted(self):
+        addresses = [f"0x{i:040x}" for i in range(30)]
+        resp = self.post({"addresses": addresses})
+
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp.json()["usage"]["calls_today"], 30)
+        self.assertEqual(len(self.scanner.scanned), 30)
+
+        # The batch emptied the bucket (min(30, capacity) tokens): the next
+        # request waits for a refill rather than being charged.
+        with self.assertRaises(RateLimitExceeded):
+            self.post({"addresses": ["0x1"]})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,359 @@
+import hashlib
+import hmac
+import socket
+import threading
+import time
+import unittest
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from types import SimpleNamespace
+from unittest.mock import patch
+
+try:
+    import fakeredis
+except ImportError:  # pragma: no cover
+    fakeredis = None
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from api.deps import get_cache, get_rate_limiter, get_scanner
+from api.middleware.auth import ApiKeyInfo, require_api_key
+from api.routers import jobs
+from api.services import scan_jobs
+from api.services.cache import Cache
+from api.services.rate_limiter import RedisRateLimiter
+from api.services.scan_jobs import ScanJobStore, deliver_webhook, validate_webhook_url
+
+
+class _FakeScanner:
+    def __init__(self, fail: bool = False):
+        self.fail = fail
+        self.calls = []
+
+    async def resolve_chain(self, address, chain):
+        return "ethereum" if chain == "auto" else chain
+
+    async def scan(self, *, address, chain, depth, tier):
+        self.calls.append((address, chain, depth, tier))
+        if self.fail:
+            raise RuntimeError("scan exploded")
+        return {"address": address, "chain": chain, "score": 7.0}
+
+
+def _job(job_id: str = "job_1", webhook_url=None) -> dict:
+    return {
+        "job_id": job_id,
+        "status": "queued",
+        "owner": "key1",
+        "request": {"address": "0xabc", "chain": "base", "depth": "basic", "tier": "FREE", "force_refresh": False},
+        "webhook_url": webhook_url,
+        "result": None,
+        "error": None,
+    }
+
+
+@unittest.skipUnless(fakeredis is not None, "fakeredis (with lupa) not installed")
+class TestRunJob(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.r = fakeredis.FakeAsyncRedis()
+        self.store = ScanJobStore(self.r, ttl_s=3600)
+        self.cache = Cache(self.r)
+        scan_jobs._semaphore = None
+
+    async def run_job(self, job, scanner):
+        await scan_jobs._run_job(job, store=self.store, cache=self.cache, scanner=scanner, ttl_s=60)
+        return await self.store.get(job["job_id"])
+
+    async def test_success_is_stored(self):
+        stored = await self.run_job(_job(), _FakeScanner())
+        self.assertEqual(stored["status"], "succeeded")
+        self.assertEqual(stored["result"]["score"], 7.0)
+        self.assertFalse(stored["result"]["cached"])
+        self.assertIsNotNone(stored["finished_at"])
+        self.assertNotIn("webhook", stored)
+
+    async def test_auto_chain_is_resolved_before_caching(self):
+        job = _job()
+        job["request"]["chain"] = "auto"
+        scanner = _FakeScanner()
+        stored = await self.run_job(job, scanner)
+
+        self.assertEqual(stored["result"]["chain"], "ethereum")
+        self.assertEqual(scanner.calls[0][1], "ethereum")
+        key = await self.cache.versioned_key("scan", "ethereum", "0xabc", "basic", "FREE")
+        self.assertIsNotNone(await self.cache.get_json(key))
+
+    async def test_failure_is_stored(self):
+        stored = await self.run_job(_job(), _FakeScanner(fail=True))
+        self.assertEqual(stored["status"], "failed")
+        self.assertEqual(stored["error"]["code"], "SCAN_FAILED")
+        self.assertIn("scan exploded", stored["error"]["message"])
+
+    async def test_result_is_visible_before_webhook_delivery(self):
+        seen = {}
+
+        async def slow_delivery(job):
+            seen["stored"] = await self.store.get(job["job_id"])
+            return {"attempts": 3, "status_code": 500, "delivered": False, "error": "HTTP 500", "pending": False}
+
+        with patch.object(scan_jobs, "deliver_webhook", slow_delivery):
+            stored = await self.run_job(_job(webhook_url="https://hooks.example.com/x"), _FakeScanner())
+
+        self.assertEqual(seen["stored"]["status"], "succeeded")
+        self.assertTrue(seen["stored"]["webhook"]["pending"])
+        self.assertEqual(stored["webhook"]["error"], "HTTP 500")
+        self.assertFalse(stored["webhook"]["pending"])
+
+
+@unittest.skipUnless(fakeredis is not None, "fakeredis (with lupa) not installed")
+class TestOrphanedJobs(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.r = fakeredis.FakeAsyncRedis()
+        self.store = ScanJobStore(self.r, ttl_s=3600)
+
+    async def test_startup_fails_jobs_of_dead_workers(self):
+        await self.store.beat("alive", 60)
+        jobs_by_id = {
+            "job_dead_running": dict(_job("job_dead_running"), status="running", worker="dead"),
+            "job_dead_queued": dict(_job("job_dead_queued"), worker="dead"),
+            "job_legacy": _job("job_legacy"),  # record from before workers were tracked
+            "job_alive": dict(_job("job_alive"), status="running", worker="alive"),
+            "job_done": dict(_job("job_done"), status="succeeded", worker="dead"),
+        }
+        for job in jobs_by_id.values():
+            await self.store.save(job)
+
+        found = await scan_jobs.start_worker(self.store, heartbeat_s=15)
+        self.addAsyncCleanup(scan_jobs.stop_worker, self.store)
+
+        self.assertEqual(found, 3)
+        for job_id in ("job_dead_running", "job_dead_queued", "job_legacy"):
+            stored = await self.store.get(job_id)
+            self.assertEqual(stored["status"], "failed")
+            self.assertEqual(stored["error"]["code"], "ORPHANED")
+        self.assertEqual((await self.store.get("job_alive"))["status"], "running")
+        self.assertEqual((await self.store.get("job_done"))["status"], "succeeded")
+        self.assertTrue(await self.r.exists(f"scanjob:worker:{scan_jobs.WORKER_ID}"))
+
+    async def test_stopped_worker_leaves_orphans(self):
+        await scan_jobs.start_worker(self.store, heartbeat_s=15)
+        job = dict(_job(), status="running", worker=scan_jobs.WORKER_ID)
+        self.assertFalse(await self.store.fail_if_orphaned(job))  # our own job
+
+        await scan_jobs.stop_worker(self.store)
+        with patch.object(scan_jobs, "WORKER_ID", "restarted"):
+            self.assertTrue(await self.store.fail_if_orphaned(job))
+        self.assertEqual(job["status"], "failed")
+
+
+def _settings(env: str = "production", secret: str = ""):
+    return SimpleNamespace(env=env, vs_webhook_secret=secret)
+
+
+def _resolves_to(*addresses):
+    def fake_getaddrinfo(host, port, *args, **kwargs):
+        return [(socket.AF_INET, socket.SOCK_STREAM, 6, "", (a, port)) for a in addresses]
+
+    return fake_getaddrinfo
+
+
+class TestValidateWebhookUrl(unittest.TestCase):
+    def test_rejects_non_public_targets(self):
+        with patch.object(scan_jobs, "get_settings", lambda: _settings()):
+            for url in (
+                "http://hooks.example.com/x",
+                "ftp://hooks.example.com/x",
+                "https:///x",
+                "https://localhost/x",
+                "https://api.localhost/x",
+                "https://metadata.google.internal/x",
+                "https://127.0.0.1/x",
+                "https://10.1.2.3/x",
+                "https://169.254.169.254/latest/meta-data",
+                "https://[::1]/x",
+            ):
+                self.assertIsNotNone(validate_webhook_url(url), url)
+            self.assertIsNone(validate_webhook_url("https://hooks.example.com/x?a=1"))
+            self.assertIsNone(validate_webhook_url("https://8.8.8.8/x"))
+
+    def test_dev_allows_http_and_loopback_only(self):
+        with patch.object(scan_jobs, "get_settings", lambda: _settings(env="dev")):
+            self.assertIsNone(validate_webhook_url("http://localhost:8080/x"))
+            self.assertIsNone(validate_webhook_url("http://127.0.0.1:8080/x"))
+            self.assertIsNotNone(validate_webhook_url("http://169.254.169.254/latest"))
+            self.assertIsNotNone(validate_webhook_url("http://10.0.0.7/x"))
+            self.assertIsNotNone(validate_webhook_url("http://[::ffff:169.254.169.254]/x"))
+
+
+class TestDeliverWebhook(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.sleeps = []
+
+        async def no_sleep(s):
+            self.sleeps.append(s)
+
+        for p in (
+            patch.object(scan_jobs.asyncio, "sleep", no_sleep),
+            patch.object(scan_jobs, "get_settings", lambda: _settings()),
+        ):
+            p.start()
+            self.addCleanup(p.stop)
+
+    def job(self, url="https://hooks.example.com/x"):
+        return dict(_job(webhook_url=url), status="succeeded", result={"score": 7.0})
+
+    async def test_retries_server_errors_until_delivered(self):
+        codes = iter([500, 503, 204])
+        with patch.object(scan_jobs, "_post", lambda url, body, headers: next(codes)):
+            d = await deliver_webhook(self.job())
+        self.assertEqual((d["delivered"], d["attempts"], d["status_code"]), (True, 3, 204))
+        self.assertIsNone(d["error"])
+        self.assertEqual(self.sleeps, [1, 4])
+
+    async def test_gives_up_after_max_attempts(self):
+        with patch.object(scan_jobs, "_post", lambda url, body, headers: 502):
+            d = await deliver_webhook(self.job())
+        self.assertEqual((d["delivered"], d["attempts"], d["error"]), (False, 3, "HTTP 502"))
+
+    async def test_client_errors_and_redirects_are_not_retried(self):
+        for code in (302, 404):
+            with patch.object(scan_jobs, "_post", lambda url, body, headers: code):
+                d = await deliver_webhook(self.job())
+            self.assertEqual((d["delivered"], d["attempts"]), (False, 1), code)
+
+    async def test_host_resolving_to_private_address_is_refused(self):
+        for address in ("127.0.0.1", "169.254.169.254", "10.0.0.7"):
+            with patch.object(scan_jobs.socket, "getaddrinfo", _resolves_to("93.184.216.34", address)), \
+                    patch.object(scan_jobs.socket, "create_connection") as connect:
+                d = await deliver_webhook(self.job())
+            self.assertFalse(d["delivered"])
+            self.assertEqual(d["attempts"], 1)  # not retried
+            self.assertIn("non-public", d["error"])
+            connect.assert_not_called()
+
+
+class _Receiver(BaseHTTPRequestHandler):
+    hits = []
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers["Content-Length"]))
+        type(self).hits.append((self.path, dict(self.headers), body))
+        if self.path.startswith("/redirect"):
+            self.send_response(302)
+            self.send_header("Location", "/landed")
+        else:
+            self.send_response(200)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+
+class TestWebhookTransport(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        _Receiver.hits = []
+        self.server = HTTPServer(("127.0.0.1", 0), _Receiver)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+        self.base = f"http://127.0.0.1:{self.server.server_port}"
+
+    async def test_signed_delivery_and_no_redirects(self):
+        with patch.object(scan_jobs, "get_settings", lambda: _settings(env="dev", secret="s3cret")):
+            ok = await deliver_webhook(dict(_job(webhook_url=self.base + "/hook?x=1"), status="succeeded"))
+            moved = await deliver_webhook(dict(_job(webhook_url=self.base + "/redirect"), status="succeeded"))
+
+        self.assertTrue(ok["delivered"])
+        path, headers, body = _Receiver.hits[0]
+        self.assertEqual(path, "/hook?x=1")
+        ts = headers["X-VerdictSwarm-Timestamp"]
+        expected = hmac.new(b"s3cret", ts.encode() + b"." + body, hashlib.sha256).hexdigest()
+        self.assertEqual(headers["X-VerdictSwarm-Signature"], "sha256=" + expected)
+        self.assertIn(b'"event":"scan.succeeded"', body)
+
+        self.assertEqual((moved["delivered"], moved["status_code"], moved["attempts"]), (False, 302, 1))
+        self.assertEqual([h[0] for h in _Receiver.hits], ["/hook?x=1", "/redirect"])  # never followed
+
+    async def test_loopback_refused_outside_dev(self):
+        with patch.object(scan_jobs, "get_settings", lambda: _settings()):
+            d = await deliver_webhook(dict(_job(webhook_url=self.base + "/hook"), status="succeeded"))
+        self.assertFalse(d["delivered"])
+        self.assertIn("non-public", d["error"])
+        self.assertEqual(_Receiver.hits, [])
+
+
+@unittest.skipUnless(fakeredis is not None, "fakeredis (with lupa) not installed")
+class TestJobsApi(unittest.TestCase):
+    def setUp(self):
+        self.r = fakeredis.FakeAsyncRedis()
+        self.scanner = _FakeScanner()
+        self.key = ApiKeyInfo(api_key="k", api_key_id="key1", tier="agent")
+        scan_jobs._semaphore = None
+        app = FastAPI()
+        app.include_router(jobs.router)
+        app.dependency_overrides[require_api_key] = lambda: self.key
+        app.dependency_overrides[get_cache] = lambda: Cache(self.r)
+        app.dependency_overrides[get_rate_limiter] = lambda: RedisRateLimiter(
+            self.r, tier_limits={"agent": 1000}, burst_capacity=2, burst_refill_per_s=0.01
+        )
+        app.dependency_overrides[get_scanner] = lambda: self.scanner
+        app.dependency_overrides[jobs.get_job_store] = lambda: ScanJobStore(self.r, ttl_s=3600)
+        self.client = TestClient(app)
+        self.client.__enter__()  # one event loop for requests and background jobs
+        self.addCleanup(self.client.__exit__, None, None, None)
+
+    def submit(self, **body):
+        body.setdefault("address", "0xabc")
+        body.setdefault("chain", "base")
+        return self.client.post("/v1/scans", json=body)
+
+    def poll(self, job_id, until=("succeeded", "failed"), timeout_s=5.0):
+        deadline = time.monotonic() + timeout_s
+        while True:
+            resp = self.client.get(f"/v1/scans/{job_id}")
+            if resp.status_code != 200 or resp.json()["data"]["status"] in until or time.monotonic() > deadline:
+                return resp
+            time.sleep(0.02)
+
+    def test_submit_then_poll(self):
+        resp = self.submit(depth="full")
+
+        self.assertEqual(resp.status_code, 202)
+        data = resp.json()["data"]
+        self.assertEqual(data["status"], "queued")
+        self.assertEqual(resp.headers["Location"], data["status_url"])
+
+        job = self.poll(data["job_id"]).json()["data"]
+        self.assertEqual(job["status"], "succeeded")
+        self.assertEqual(job["result"]["score"], 7.0)
+        self.assertNotIn("owner", job)
+        self.assertEqual(job["worker"], scan_jobs.WORKER_ID)
+        self.assertEqual(self.scanner.calls, [("0xabc", "base", "full", "FREE")])
+
+    def test_other_keys_cannot_see_the_job(self):
+        job_id = self.submit().json()["data"]["job_id"]
+        self.key = ApiKeyInfo(api_key="k2", api_key_id="key2", tier="agent")
+        self.assertEqual(self.client.get(f"/v1/scans/{job_id}").status_code, 404)
+        self.assertEqual(self.client.get("/v1/scans/job_missing").status_code, 404)
+
+    def test_many_submissions_skip_the_burst_bucket(self):
+        responses = [self.submit(address=f"0x{i}") for i in range(12)]  # burst capacity is 2
+        self.assertEqual({r.status_code for r in responses}, {202})
+        self.assertEqual(responses[-1].json()["usage"]["calls_today"], 12)
+
+    def test_rejects_private_webhook(self):
+        resp = self.submit(webhook_url="https://169.254.169.254/latest")
+        self.assertEqual(resp.status_code, 422)
+
+    def test_poll_fails_job_of_dead_worker(self):
+        async def seed():
+            await ScanJobStore(self.r, ttl_s=3600).save(dict(_job("job_lost"), status="running", worker="gone"))
+
+        self.client.portal.call(seed)
+        job = self.client.get("/v1/scans/job_lost").json()["data"]
+        self.assertEqual((job["status"], job["error"]["code"]), ("failed", "ORPHANED"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,75 @@
+import time
+import unittest
+from types import SimpleNamespace
+from unittest.mock import patch
+
+try:
+    import fakeredis
+except ImportError:  # pragma: no cover
+    fakeredis = None
+
+from api.services import scanner
+from src.services import source_store
+from src.services.facts_store import TieredFactsStore
+from src.services.fetch_cache import MemoryFetchCache, RedisFetchCache, TieredFetchCache
+
+
+def _settings(redis_url: str) -> SimpleNamespace:
+    return SimpleNamespace(
+        redis_url=redis_url,
+        fetch_cache_backend="tiered",
+        fetch_cache_max_entries=16,
+        facts_store_backend="redis",
+        source_store_backend="redis",
+    )
+
+
+class TestRedisBackends(unittest.TestCase):
+    def setUp(self):
+        previous = source_store.get_source_store()
+        self.addCleanup(source_store.set_source_store, previous)
+        self.installed = source_store.MemorySourceStore()
+        source_store.set_source_store(self.installed)
+
+    def use(self, redis_url: str):
+        p = patch.object(scanner, "get_settings", return_value=_settings(redis_url))
+        p.start()
+        self.addCleanup(p.stop)
+
+    def test_unreachable_redis_falls_back_at_construction(self):
+        self.use("redis://127.0.0.1:1/0")  # nothing listens on port 1
+
+        with self.assertLogs(scanner.logger, "WARNING") as logs:
+            cache = scanner.build_fetch_cache()
+            facts = scanner.build_facts_store()
+            scanner.install_source_store()
+
+        self.assertIsInstance(cache, MemoryFetchCache)
+        self.assertNotIsInstance(facts, TieredFactsStore)
+        self.assertIs(source_store.get_source_store(), self.installed)
+        self.assertEqual(len(logs.records), 3)
+
+        # The local stores answer without any connection attempt.
+        t0 = time.perf_counter()
+        for i in range(20):
+            cache.put("market", f"k{i}", {}, ttl_s=60)
+            cache.get(f"market:k{i}")
+        self.assertLess(time.perf_counter() - t0, 0.5)
+
+    @unittest.skipUnless(fakeredis is not None, "fakeredis not installed")
+    def test_reachable_redis_is_used(self):
+        self.use("redis://localhost:6379/0")
+        server = fakeredis.FakeServer()
+        with patch("redis.Redis.from_url", lambda *a, **kw: fakeredis.FakeRedis(server=server)):
+            cache = scanner.build_fetch_cache()
+            facts = scanner.build_facts_store()
+            scanner.install_source_store()
+
+        self.assertIsInstance(cache, TieredFetchCache)
+        self.assertIsInstance(cache.shared, RedisFetchCache)
+        self.assertIsInstance(facts, TieredFactsStore)
+        self.assertIsInstance(source_store.get_source_store(), source_store.RedisSourceStore)
+
+
+if __name__ == "__main__":
+    unittest.main()